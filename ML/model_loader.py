@@ -3,10 +3,14 @@ Model loader module for histogram prediction.
 This module can be imported into main.py for inference.
 """
 
+import random
+import time
+from contextlib import contextmanager, nullcontext
+
 import torch
 import torch.nn as nn
 import numpy as np
-from typing import List, Tuple
+from typing import Callable, List, Optional, Tuple
 from pathlib import Path
 
 
@@ -216,21 +220,52 @@ def evaluate_on_synthetic_data(predictor: "HistogramPredictor",
 # Model Loader
 # ============================================================================
 
+# Submodules timed by the layer instrumentation (see HistogramPredictor.layer_timer)
+INSTRUMENTED_LAYERS = (
+        "input_proj",
+        "encoder.mab1.attention",
+        "encoder.mab1.ffn",
+        "encoder.mab2.attention",
+        "encoder.mab2.ffn",
+        "decoder",
+)
+
+
+def _tensor_bytes(output) -> int:
+    """Total size in bytes of the tensors in a module output (tensor or tuple such as (attn_out, attn_weights))."""
+    if isinstance(output, torch.Tensor):
+        return output.numel() * output.element_size()
+    if isinstance(output, (tuple, list)):
+        return sum(_tensor_bytes(item) for item in output)
+    return 0
+
+
 class HistogramPredictor:
     """
     Wrapper class for histogram prediction model.
     """
 
-    def __init__(self, model_path: str = "ML/best_model_nnj359uw.pt", device: str = None):
+    def __init__(self, model_path: str = "ML/best_model_nnj359uw.pt", device: str = None,
+                 stage_timer: Optional[Callable[[str, float], None]] = None,
+                 layer_timer: Optional[Callable[[str, float, int, int], None]] = None,
+                 layer_sample_rate: float = 0.0):
         """
         Initialize the predictor.
 
         Args:
             model_path: Path to the trained model checkpoint
             device: Device to run inference on ('cuda' or 'cpu')
+            stage_timer: Optional callback stage_timer(stage, seconds) called by predict()
+                         for "preprocess", "forward" and "postprocess"
+            layer_timer: Optional callback layer_timer(layer, seconds, set_size, output_bytes) called for each
+                         module in INSTRUMENTED_LAYERS on sampled predict() calls
+            layer_sample_rate: Fraction of predict() calls run with layer forward hooks (0 disables them)
         """
         self.device = device if device else ('cuda' if torch.cuda.is_available() else 'cpu')
         self.model_path = model_path
+        self.stage_timer = stage_timer
+        self.layer_timer = layer_timer
+        self.layer_sample_rate = layer_sample_rate
 
         # Load model
         self.model, self.checkpoint = self._load_model()
@@ -273,6 +308,8 @@ class HistogramPredictor:
         Returns:
             Dictionary with histogram (either probabilities or student counts)
         """
+        started = time.perf_counter()
+
         # Validate input
         if not scores:
             raise ValueError("Scores list cannot be empty")
@@ -288,12 +325,16 @@ class HistogramPredictor:
         # Convert to tensor
         x = torch.tensor(scores_norm, dtype=torch.float32).unsqueeze(0).to(self.device)
 
-        # Predict
-        with torch.no_grad():
+        started = self._record_stage("preprocess", started)
+
+        # Predict (copying to CPU waits for the device, so it is counted as forward time)
+        instrument = self.layer_timer is not None and random.random() < self.layer_sample_rate
+        with torch.no_grad(), (self._layer_hooks(len(scores)) if instrument else nullcontext()):
             predicted_hist = self.model(x)
+        histogram_values = predicted_hist.cpu().numpy()[0]
+        started = self._record_stage("forward", started)
 
         # Convert to dict format
-        histogram_values = predicted_hist.cpu().numpy()[0]
 
         # Denormalize to student counts if total_students is provided
         if total_students is not None:
@@ -314,9 +355,53 @@ class HistogramPredictor:
                 "80-90" : int(histogram_values[8]) if total_students else float(histogram_values[8]),
                 "90-100": int(histogram_values[9]) if total_students else float(histogram_values[9]),
         }
+        self._record_stage("postprocess", started)
 
         return result
 
+    def _record_stage(self, stage: str, started: float) -> float:
+        """Report the time since `started` to stage_timer and return the current time."""
+        now = time.perf_counter()
+        if self.stage_timer is not None:
+            self.stage_timer(stage, now - started)
+        return now
+
+    @contextmanager
+    def _layer_hooks(self, set_size: int):
+        """
+        Temporarily attach forward hooks that report each INSTRUMENTED_LAYERS module to layer_timer.
+
+        Hooks are only registered for sampled calls, so unsampled calls keep the hook-free fast path.
+        On CUDA the device is synchronized around each module so the wall time belongs to that module.
+        """
+        sync = torch.cuda.synchronize if self.device.startswith("cuda") else None
+        started = {}
+        handles = []
+
+        def pre_hook(name):
+            def hook(module, inputs):
+                if sync:
+                    sync()
+                started[name] = time.perf_counter()
+            return hook
+
+        def post_hook(name):
+            def hook(module, inputs, output):
+                if sync:
+                    sync()
+                self.layer_timer(name, time.perf_counter() - started[name], set_size, _tensor_bytes(output))
+            return hook
+
+        try:
+            for name in INSTRUMENTED_LAYERS:
+                module = self.model.get_submodule(name)
+                handles.append(module.register_forward_pre_hook(pre_hook(name)))
+                handles.append(module.register_forward_hook(post_hook(name)))
+            yield
+        finally:
+            for handle in handles:
+                handle.remove()
+
     def get_model_info(self) -> dict:
         """Get model information."""
         return {
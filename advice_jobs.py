@@ -0,0 +1,398 @@
+"""
+AI 조언 비동기 작업(job) 큐 모듈.
+
+LLM 호출이 HTTP 요청 수명에 묶이면 Caddy/클라이언트 타임아웃 시 생성 결과 전체를 버리게 되므로,
+조언 요청을 작업으로 등록하고 작업 ID로 결과를 조회(폴링 또는 대기)하도록 분리합니다.
+
+구성:
+    - RedisJobBackend: Redis 리스트를 작업 큐로 사용 (여러 uvicorn 워커 프로세스가 같은 큐를 공유)
+    - MemoryJobBackend: Redis가 없을 때 사용하는 프로세스 내부 큐 (작업 조회도 같은 프로세스에서만 가능)
+    - FailoverJobBackend: Redis 백엔드 호출을 서킷 브레이커로 감싸고, 브레이커가 열려 있는 동안 메모리 백엔드로 대신 처리
+    - AdviceJobQueue: 백엔드에서 작업을 꺼내 handler(kind, params)를 실행하는 워커 concurrency개를 관리
+
+작업 상태:
+    queued → running → done (result) / failed (error: {"status_code", "detail"})
+
+동작 방식:
+    - 같은 dedupe_key(예: 캐시 키)의 작업이 대기/실행 중이면 새 작업을 만들지 않고 기존 작업을 반환
+    - 작업 기록은 JOB_TTL초 동안 보관
+    - 조언 요청 빈도를 (과목, 목표 성적) 단위로 집계하여 prewarm 대상 선정에 사용
+
+사용 예시 (main.py):
+    backend = FailoverJobBackend(RedisJobBackend(async_redis), MemoryJobBackend(), redis_breaker, timeout=0.5)
+    queue = AdviceJobQueue(backend, run_advice_job, concurrency=4)
+    queue.start()
+    job = await queue.submit("course_advice", {"course_id": 1, "objective_grade": "A+"}, dedupe_key=cache_key)
+    job = await queue.wait(job["job_id"], timeout=30)
+"""
+
+import asyncio
+import json
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from resilience import CLOSED, CircuitBreaker
+
+JOB_TTL = 24 * 3600  # 작업 기록 보관 시간(초)
+DEDUPE_TTL = 15 * 60  # 중복 방지 키 보관 시간(초), 워커가 중간에 종료되어도 이 시간 뒤에는 다시 등록 가능
+POP_TIMEOUT = 1  # 워커가 큐를 기다리는 최대 시간(초), 종료 신호 확인 주기
+WAIT_POLL_INTERVAL = 0.25  # wait()의 상태 확인 주기(초)
+
+KEY_PREFIX = "advice_jobs"
+
+JobHandler = Callable[[str, dict], Awaitable[dict]]
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+# =============================================================================
+# 저장소 백엔드
+# =============================================================================
+
+class MemoryJobBackend:
+    """프로세스 내부 메모리 작업 저장소 (Redis가 없을 때 사용)."""
+
+    name = "memory"
+
+    def __init__(self):
+        self.jobs: Dict[str, dict] = {}
+        self.pending: asyncio.Queue = asyncio.Queue()
+        self.active: Dict[str, str] = {}
+        self.requests: Counter = Counter()
+
+    async def save(self, job: dict) -> None:
+        self.jobs[job["job_id"]] = job
+
+    async def load(self, job_id: str) -> Optional[dict]:
+        return self.jobs.get(job_id)
+
+    async def push(self, job_id: str) -> None:
+        await self.pending.put(job_id)
+
+    async def pop(self, timeout: float) -> Optional[str]:
+        try:
+            return await asyncio.wait_for(self.pending.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def claim(self, dedupe_key: str, job_id: str) -> Optional[str]:
+        """dedupe_key를 job_id로 선점합니다. 이미 진행 중인 작업이 있으면 그 작업 ID를 반환합니다."""
+        if dedupe_key in self.active:
+            return self.active[dedupe_key]
+        self.active[dedupe_key] = job_id
+        return None
+
+    async def release(self, dedupe_key: str) -> None:
+        self.active.pop(dedupe_key, None)
+
+    async def count_request(self, member: str) -> None:
+        self.requests[member] += 1
+
+    async def top_requests(self, limit: int) -> List[Tuple[str, int]]:
+        return self.requests.most_common(limit)
+
+    async def queued(self) -> int:
+        return self.pending.qsize()
+
+
+class RedisJobBackend:
+    """Redis 작업 저장소. 작업은 JSON 문자열, 큐는 리스트(LPUSH/BRPOP), 요청 빈도는 정렬 집합으로 저장합니다."""
+
+    name = "redis"
+
+    def __init__(self, client):
+        """
+        Args:
+            client: redis.asyncio.Redis 클라이언트 (decode_responses=True)
+        """
+        self.client = client
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{KEY_PREFIX}:job:{job_id}"
+
+    async def save(self, job: dict) -> None:
+        await self.client.set(self._job_key(job["job_id"]), json.dumps(job, ensure_ascii=False), ex=JOB_TTL)
+
+    async def load(self, job_id: str) -> Optional[dict]:
+        data = await self.client.get(self._job_key(job_id))
+        return json.loads(data) if data else None
+
+    async def push(self, job_id: str) -> None:
+        await self.client.lpush(f"{KEY_PREFIX}:queue", job_id)
+
+    async def pop(self, timeout: float) -> Optional[str]:
+        item = await self.client.brpop([f"{KEY_PREFIX}:queue"], timeout=timeout)
+        return item[1] if item else None
+
+    async def claim(self, dedupe_key: str, job_id: str) -> Optional[str]:
+        key = f"{KEY_PREFIX}:active:{dedupe_key}"
+        if await self.client.set(key, job_id, nx=True, ex=DEDUPE_TTL):
+            return None
+        return await self.client.get(key)
+
+    async def release(self, dedupe_key: str) -> None:
+        await self.client.delete(f"{KEY_PREFIX}:active:{dedupe_key}")
+
+    async def count_request(self, member: str) -> None:
+        await self.client.zincrby(f"{KEY_PREFIX}:requests", 1, member)
+
+    async def top_requests(self, limit: int) -> List[Tuple[str, int]]:
+        items = await self.client.zrevrange(f"{KEY_PREFIX}:requests", 0, limit - 1, withscores=True)
+        return [(member, int(score)) for member, score in items]
+
+    async def queued(self) -> int:
+        return await self.client.llen(f"{KEY_PREFIX}:queue")
+
+
+class JobBackendUnavailable(Exception):
+    """Redis에 저장된 작업을 Redis 장애로 읽거나 큐에 넣을 수 없는 경우 (AdviceJobQueue 실패 기록과 같은 형식)."""
+
+    status_code = 503
+    detail = "작업 저장소(Redis)에 연결할 수 없습니다. 잠시 후 다시 시도해주세요."
+
+
+class FailoverJobBackend:
+    """
+    Redis 백엔드 호출을 서킷 브레이커로 감싸는 작업 저장소.
+
+    Redis가 시작 후에 죽거나 시작 시 없더라도 요청과 워커가 Redis 타임아웃을 반복해서 기다리지 않도록
+    모든 호출 전에 breaker.allow()를 확인하고, 각 호출을 timeout초로 제한하며, 실패는 브레이커에 기록합니다.
+
+    동작 방식:
+        - 브레이커가 열려 있거나 호출이 실패하면 새 작업, 중복 방지 키, 요청 빈도는 메모리 백엔드에 기록
+        - 메모리 백엔드에 저장된 작업은 끝날 때까지 메모리 백엔드에서 처리 (이 프로세스에서만 조회 가능)
+        - 워커는 메모리 큐의 작업을 먼저 꺼내고, 브레이커가 닫혀 있을 때만 Redis 큐를 기다림
+        - 브레이커가 다시 닫히면(redis_health_monitor의 재연결) 새 작업은 다시 Redis에 기록
+        - Redis에 저장된 작업을 Redis 장애 중에 조회하거나 큐에 넣으면 JobBackendUnavailable
+    """
+
+    def __init__(self, primary: RedisJobBackend, fallback: MemoryJobBackend, breaker: CircuitBreaker,
+                 timeout: float):
+        """
+        Args:
+            primary: Redis 백엔드
+            fallback: 브레이커가 열려 있는 동안 사용할 메모리 백엔드
+            breaker: Redis 서킷 브레이커 (main.py의 동기 캐시 클라이언트와 공유)
+            timeout: pop을 제외한 Redis 호출 하나의 제한 시간(초), pop은 대기 시간에 더해 적용
+        """
+        self.primary = primary
+        self.fallback = fallback
+        self.breaker = breaker
+        self.timeout = timeout
+
+    @property
+    def name(self) -> str:
+        return self.primary.name if self.breaker.state == CLOSED else self.fallback.name
+
+    async def _call(self, method: str, *args, timeout: Optional[float] = None):
+        """브레이커를 거쳐 Redis 백엔드 메서드를 호출합니다 (막히거나 실패하면 JobBackendUnavailable)."""
+        if not self.breaker.allow():
+            raise JobBackendUnavailable()
+        try:
+            result = await asyncio.wait_for(getattr(self.primary, method)(*args), timeout or self.timeout)
+        except Exception as e:
+            self.breaker.record_failure(e)
+            print(f"⚠ Advice job backend {method} error: {e!r}")
+            raise JobBackendUnavailable() from e
+        self.breaker.record_success()
+        return result
+
+    def _is_local(self, job_id: str) -> bool:
+        return job_id in self.fallback.jobs
+
+    async def save(self, job: dict) -> None:
+        if not self._is_local(job["job_id"]):
+            try:
+                return await self._call("save", job)
+            except JobBackendUnavailable:
+                pass
+        await self.fallback.save(job)
+
+    async def load(self, job_id: str) -> Optional[dict]:
+        if self._is_local(job_id):
+            return await self.fallback.load(job_id)
+        return await self._call("load", job_id)
+
+    async def push(self, job_id: str) -> None:
+        if self._is_local(job_id):
+            return await self.fallback.push(job_id)
+        await self._call("push", job_id)
+
+    async def pop(self, timeout: float) -> Optional[str]:
+        if not self.fallback.pending.empty():
+            return self.fallback.pending.get_nowait()
+        # 브레이커가 열려 있으면 시험 호출은 상태 확인 작업에 맡기고 메모리 큐만 기다림
+        if self.breaker.state != CLOSED:
+            return await self.fallback.pop(timeout)
+        try:
+            return await self._call("pop", timeout, timeout=timeout + self.timeout)
+        except JobBackendUnavailable:
+            return await self.fallback.pop(timeout)
+
+    async def claim(self, dedupe_key: str, job_id: str) -> Optional[str]:
+        if not self._is_local(job_id):
+            try:
+                return await self._call("claim", dedupe_key, job_id)
+            except JobBackendUnavailable:
+                pass
+        return await self.fallback.claim(dedupe_key, job_id)
+
+    async def release(self, dedupe_key: str) -> None:
+        await self.fallback.release(dedupe_key)
+        try:
+            await self._call("release", dedupe_key)
+        except JobBackendUnavailable:
+            pass  # Redis의 키는 DEDUPE_TTL 뒤 만료
+
+    async def count_request(self, member: str) -> None:
+        try:
+            await self._call("count_request", member)
+        except JobBackendUnavailable:
+            await self.fallback.count_request(member)
+
+    async def top_requests(self, limit: int) -> List[Tuple[str, int]]:
+        try:
+            return await self._call("top_requests", limit)
+        except JobBackendUnavailable:
+            return await self.fallback.top_requests(limit)
+
+    async def queued(self) -> int:
+        try:
+            queued = await self._call("queued")
+        except JobBackendUnavailable:
+            queued = 0
+        return queued + await self.fallback.queued()
+
+
+# =============================================================================
+# 작업 큐
+# =============================================================================
+
+class AdviceJobQueue:
+    """작업 등록/조회와 워커 실행을 담당합니다."""
+
+    def __init__(self, backend, handler: JobHandler, concurrency: int = 4):
+        """
+        Args:
+            backend: MemoryJobBackend, RedisJobBackend 또는 FailoverJobBackend
+            handler: 작업 실행 함수 async (kind, params) -> result 딕셔너리.
+                     실패 시 status_code/detail 속성이 있는 예외(HTTPException)를 던지면 그대로 기록
+            concurrency: 이 프로세스에서 동시에 실행할 작업 수
+        """
+        self.backend = backend
+        self.handler = handler
+        self.concurrency = concurrency
+        self.workers: List[asyncio.Task] = []
+        self.running = 0
+
+    async def submit(self, kind: str, params: dict, dedupe_key: Optional[str] = None) -> dict:
+        """
+        작업을 등록합니다.
+
+        Args:
+            kind: 작업 종류 (handler가 해석)
+            params: 작업 파라미터 (JSON 직렬화 가능해야 함)
+            dedupe_key: 같은 키의 작업이 대기/실행 중이면 새로 만들지 않음
+
+        Returns:
+            작업 딕셔너리 (기존 작업이면 그 작업)
+        """
+        job_id = uuid.uuid4().hex
+        job = {
+                "job_id"     : job_id,
+                "kind"       : kind,
+                "params"     : params,
+                "dedupe_key" : dedupe_key,
+                "status"     : "queued",
+                "result"     : None,
+                "error"      : None,
+                "created_at" : _now(),
+                "started_at" : None,
+                "finished_at": None,
+        }
+        # 다른 요청이 선점 직후의 작업 기록을 찾을 수 있도록 선점 전에 저장 (선점에 실패한 기록은 JOB_TTL 뒤 만료)
+        await self.backend.save(job)
+
+        for _ in range(2 if dedupe_key else 0):
+            existing_id = await self.backend.claim(dedupe_key, job_id)
+            if existing_id is None:
+                break
+            existing = await self.backend.load(existing_id)
+            if existing and existing["status"] in ("queued", "running"):
+                return existing
+            # 기록이 만료되었거나 끝난 작업의 키가 남아 있으면 해제 후 다시 선점
+            await self.backend.release(dedupe_key)
+
+        await self.backend.push(job_id)
+        return job
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        """작업을 조회합니다 (없거나 만료되면 None)."""
+        return await self.backend.load(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[dict]:
+        """작업이 끝나거나 timeout초가 지날 때까지 기다린 뒤 작업을 반환합니다."""
+        loop = asyncio.get_running_loop()
+        expires_at = loop.time() + timeout
+        while True:
+            job = await self.backend.load(job_id)
+            if job is None or job["status"] in ("done", "failed") or loop.time() >= expires_at:
+                return job
+            await asyncio.sleep(min(WAIT_POLL_INTERVAL, max(0.0, expires_at - loop.time())))
+
+    async def _run(self, job_id: str) -> None:
+        job = await self.backend.load(job_id)
+        if job is None or job["status"] != "queued":
+            return
+
+        job.update(status="running", started_at=_now())
+        await self.backend.save(job)
+        try:
+            job.update(status="done", result=await self.handler(job["kind"], job["params"]))
+        except Exception as e:
+            job.update(status="failed", error={"status_code": getattr(e, "status_code", 500),
+                                               "detail"     : getattr(e, "detail", str(e))})
+            print(f"⚠ Advice job failed ({job['kind']} {job_id}): {job['error']['detail']}")
+        job["finished_at"] = _now()
+        await self.backend.save(job)
+        if job["dedupe_key"]:
+            await self.backend.release(job["dedupe_key"])
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                job_id = await self.backend.pop(POP_TIMEOUT)
+            except Exception as e:
+                print(f"⚠ Advice job queue error: {e}")
+                await asyncio.sleep(POP_TIMEOUT)
+                continue
+            if job_id is None:
+                continue
+
+            self.running += 1
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                print(f"⚠ Advice job error ({job_id}): {e}")
+            finally:
+                self.running -= 1
+
+    def start(self) -> None:
+        """워커 concurrency개를 시작합니다 (이벤트 루프 안에서 호출)."""
+        self.workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        """워커를 종료합니다. 실행 중이던 작업은 failed로 기록되지 않고 DEDUPE_TTL 뒤 다시 등록할 수 있습니다."""
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    async def stats(self) -> dict:
+        """큐 상태 (백엔드, 대기 작업 수, 이 프로세스의 실행 중 작업 수)."""
+        return {"backend": self.backend.name, "queued": await self.backend.queued(),
+                "running": self.running, "workers": len(self.workers)}
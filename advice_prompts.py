@@ -0,0 +1,476 @@
+"""
+AI 학습 조언 프롬프트 및 응답 스키마 모듈.
+
+main.py의 조언 엔드포인트와 prompt/ 디렉터리의 실험 스크립트가 동일한 프롬프트와
+JSON Schema를 사용하도록 한 곳에 모아 둡니다.
+
+제공 항목:
+    - build_course_advice_prompt: 단일 목표 성적에 대한 과목 조언 프롬프트
+    - build_multi_grade_advice_prompt: 여러 목표 성적에 대한 조언을 한 번에 요청하는 프롬프트
+    - build_semester_plan_prompt: 과목별 분석과 로컬 노력 배분 결과로 학기 전체 조언을 요청하는 프롬프트
+    - build_review_label_prompt / REVIEW_LABEL_SCHEMA: 수강평별 난이도 라벨 추출 (label_reviews.py)
+    - COURSE_ADVICE_SCHEMA / SEMESTER_ADVICE_SCHEMA / multi_grade_advice_schema: Structured Output 스키마
+    - parse_llm_json: 모델 출력 텍스트에서 JSON 객체를 추출
+    - StreamingJsonFields: 스트리밍 출력에서 완성된 최상위 필드를 차례로 추출 (SSE 조언 엔드포인트)
+    - estimate_tokens: 프롬프트 토큰 수 추정 (tiktoken 설치 시 정확한 값)
+"""
+
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+try:
+    import tiktoken
+
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+except Exception:
+    _ENCODING = None
+
+# =============================================================================
+# 공통 설정
+# =============================================================================
+ADVICE_MODEL = "gpt-5-mini"
+
+# 난이도 추출 지시문 (단일/다중 목표 성적 프롬프트 공통)
+_DIFFICULTY_EXTRACTION = """
+            이건 이전 수강자들의 강의평 입니다. 각 강의평은 과목 ID와 함께 주어집니다.
+            강의평에서 과제의 난이도와 관련한 정보를 추출해서 난이도를 정수형으로 추출해서 반환해주세요.
+            강의평에서 시험의 난이도와 관련한 정보를 추출해서 난이도를 정수형으로 추출해서 반환해주세요.
+            난이도는 1부터 5까지의 정수로 추출해주세요.
+            1: 매우 쉬움
+            2: 쉬움
+            3: 보통
+            4: 어려움
+            5: 매우 어려움"""
+
+# 요약 및 조언 작성 지시문
+_ADVICE_INSTRUCTIONS = """
+            시험과 과제와 관련해 공통된 언급들은 정리해서 1-2문장으로 정리해주세요.
+            정리한 내용을 바탕으로 각 과제와 시험 중 어느 곳에 집중해야 할지 1-2문장으로 정리해서 조언형식으로 반환해주세요.
+            이 때 조언에는 과제와 시험 난이도 특성을 근거로 각 과제와 시험 중 어느 곳에 집중해야 할지 정리해주세요.
+            조언에는 목표성적에 따라 각 과제와 시험 중 어느 곳에 집중해야 할지 정리해주세요.
+            만약 하지 않아도 되는 과제가 있다면 그 과제는 하지 않아도 된다고 정리해주세요.
+            만약 그런 과제가 없다면 이 부분은 언급하지 말아주세요.
+            사용자 선호도 및 특성을 고려하여 조언을 주세요.
+            각 과제의 성적 비중이 어느 정도인지에 따라 각 과제와 시험 중 어느 곳에 집중해야 할지 정리해주세요.
+            비중이 크고 작은 것을 판단할 때에는 강의평에 언급된 경우에 대한 내용을 참고해주세요.
+            """
+
+_DIFFICULTY_INSTRUCTIONS = _DIFFICULTY_EXTRACTION + _ADVICE_INSTRUCTIONS
+
+# =============================================================================
+# 과목별 조언
+# =============================================================================
+COURSE_ADVICE_SCHEMA = {
+        "type"                : "object",
+        "properties"          : {
+                "assignment_difficulty": {"type": "integer"},
+                "exam_difficulty"      : {"type": "integer"},
+                "summary"              : {"type": "string"},
+                "advice"               : {"type": "string"}
+        },
+        "required"            : ["assignment_difficulty", "exam_difficulty", "summary", "advice"],
+        "additionalProperties": False
+}
+
+
+# 난이도를 미리 집계한 경우 요약/조언만 생성하는 스키마
+COURSE_PROSE_SCHEMA = {
+        "type"                : "object",
+        "properties"          : {
+                "summary": {"type": "string"},
+                "advice" : {"type": "string"}
+        },
+        "required"            : ["summary", "advice"],
+        "additionalProperties": False
+}
+
+
+def format_difficulty_signals(signals: dict) -> str:
+    """
+    수강평 라벨 집계값을 프롬프트에 넣을 문장으로 변환합니다.
+
+    Args:
+        signals: 과목별 라벨 집계 (assignment_difficulty, exam_difficulty, workload,
+                 grading_leniency, labeled_reviews)
+
+    Returns:
+        "수강평 N개 분석 결과: ..." 형식의 문자열
+    """
+    def fmt(value) -> str:
+        return "언급 없음" if value is None else f"{value:.1f}/5"
+
+    return (
+            f"\n            수강평 {signals['labeled_reviews']}개 분석 결과 (1~5 척도 평균): "
+            f"과제 난이도 {fmt(signals['assignment_difficulty'])}, 시험 난이도 {fmt(signals['exam_difficulty'])}, "
+            f"과제/공부 분량 {fmt(signals.get('workload'))}, 채점 관대함 {fmt(signals.get('grading_leniency'))}"
+            f"\n            난이도는 이미 분석되었으므로 위 수치를 근거로 요약(summary)과 조언(advice)만 작성해주세요."
+    )
+
+
+def _instructions(signals: Optional[dict]) -> str:
+    """집계된 난이도가 있으면 난이도 추출 대신 집계값을, 없으면 기존 추출 지시문을 사용합니다."""
+    if signals is None:
+        return _DIFFICULTY_INSTRUCTIONS
+    return format_difficulty_signals(signals) + _ADVICE_INSTRUCTIONS
+
+
+def build_course_advice_prompt(objective_grade: str, preferences: Optional[str], course_reviews_str: str,
+                               signals: Optional[dict] = None) -> str:
+    """
+    단일 목표 성적에 대한 과목 조언 프롬프트를 생성합니다.
+
+    Args:
+        objective_grade: 목표 성적 (예: "A+")
+        preferences: 학생 선호도 및 특성 (없으면 None)
+        course_reviews_str: "- 리뷰" 형식으로 줄바꿈 연결된 수강평 문자열
+        signals: 수강평 라벨 집계값 (있으면 난이도 추출 없이 COURSE_PROSE_SCHEMA로 요약/조언만 요청)
+
+    Returns:
+        OpenAI Responses API input 문자열
+    """
+    return f"""
+            목표성적: {objective_grade}
+            사용자 선호도 및 특성: {preferences}{_instructions(signals)}
+            강의평:
+            {course_reviews_str}
+            """
+
+
+def multi_grade_advice_schema(grades: List[str], include_difficulty: bool = True) -> dict:
+    """
+    여러 목표 성적에 대한 조언을 한 번에 받기 위한 JSON Schema를 생성합니다.
+
+    난이도와 요약은 목표 성적과 무관하므로 한 번만 생성하고,
+    advice_by_grade 객체에 목표 성적별 조언을 담습니다.
+
+    Args:
+        grades: 목표 성적 리스트 (예: ["A+", "A0", "B+"])
+        include_difficulty: False이면 난이도 필드를 제외 (난이도를 미리 집계한 경우)
+
+    Returns:
+        Structured Output용 JSON Schema
+    """
+    properties = {
+            "assignment_difficulty": {"type": "integer"},
+            "exam_difficulty"      : {"type": "integer"},
+            "summary"              : {"type": "string"},
+            "advice_by_grade"      : {
+                    "type"                : "object",
+                    "properties"          : {grade: {"type": "string"} for grade in grades},
+                    "required"            : list(grades),
+                    "additionalProperties": False
+            }
+    }
+    if not include_difficulty:
+        del properties["assignment_difficulty"], properties["exam_difficulty"]
+
+    return {
+            "type"                : "object",
+            "properties"          : properties,
+            "required"            : list(properties),
+            "additionalProperties": False
+    }
+
+
+def build_multi_grade_advice_prompt(grades: List[str], preferences: Optional[str], course_reviews_str: str,
+                                    signals: Optional[dict] = None) -> str:
+    """
+    여러 목표 성적에 대한 과목 조언을 한 번에 요청하는 프롬프트를 생성합니다.
+
+    Args:
+        grades: 목표 성적 리스트 (예: ["A+", "A0", "B+"])
+        preferences: 학생 선호도 및 특성 (없으면 None)
+        course_reviews_str: "- 리뷰" 형식으로 줄바꿈 연결된 수강평 문자열
+        signals: 수강평 라벨 집계값 (있으면 난이도 추출 없이 요약/조언만 요청)
+
+    Returns:
+        OpenAI Responses API input 문자열
+    """
+    return f"""
+            목표성적 목록: {", ".join(grades)}
+            사용자 선호도 및 특성: {preferences}{_instructions(signals)}
+            난이도와 공통 언급 요약은 목표성적과 관계없이 한 번만 작성해주세요.
+            조언은 목표성적 목록의 각 목표성적마다 따로 작성해서 advice_by_grade에 목표성적을 키로 담아주세요.
+            각 조언은 해당 목표성적을 달성하는 것을 기준으로 작성해주세요.
+
+            강의평:
+            {course_reviews_str}
+            """
+
+
+def split_multi_grade_result(result: dict, grades: List[str]) -> dict:
+    """
+    다중 목표 성적 응답을 목표 성적별 ReviewAnalysisResponse 형식 딕셔너리로 분리합니다.
+
+    Args:
+        result: multi_grade_advice_schema 형식의 모델 응답
+        grades: 분리할 목표 성적 리스트
+
+    Returns:
+        {목표 성적: {"assignment_difficulty", "exam_difficulty", "summary", "advice"}}
+    """
+    advice_by_grade = result.get("advice_by_grade", {})
+    return {
+            grade: {
+                    "assignment_difficulty": result["assignment_difficulty"],
+                    "exam_difficulty"      : result["exam_difficulty"],
+                    "summary"              : result["summary"],
+                    "advice"               : advice_by_grade[grade]
+            }
+            for grade in grades if grade in advice_by_grade
+    }
+
+
+# =============================================================================
+# 학기 전체 조언
+# =============================================================================
+SEMESTER_ADVICE_SCHEMA = {
+        "type"                : "object",
+        "properties"          : {
+                "overall_advice": {"type": "string"}
+        },
+        "required"            : ["overall_advice"],
+        "additionalProperties": False
+}
+
+
+def format_course_analysis(index: int, course: dict, effort_percent: int) -> str:
+    """
+    학기 계획 프롬프트에 넣을 과목 한 개의 분석 요약을 생성합니다.
+
+    Args:
+        index: 과목 순서 (1부터 시작)
+        course: {"name", "grade", "analysis"} (analysis는 과목 조언 결과 딕셔너리, 수강평이 없으면 None)
+        effort_percent: 이 과목에 배분된 노력 비율
+
+    Returns:
+        "[과목 N: 이름 (목표: 성적, 노력 배분: P%)]" 헤더와 난이도/요약 줄
+    """
+    header = f"[과목 {index}: {course['name']} (목표: {course['grade']}, 노력 배분: {effort_percent}%)]"
+    analysis = course["analysis"]
+    if not analysis:
+        return f"{header}\n리뷰 없음"
+    return (f"{header}\n과제 난이도 {analysis['assignment_difficulty']}/5, 시험 난이도 {analysis['exam_difficulty']}/5\n"
+            f"요약: {analysis['summary']}")
+
+
+def build_semester_plan_prompt(courses: List[dict], efforts: List[int], preferences: Optional[str]) -> str:
+    """
+    과목별 분석과 노력 배분 결과로 학기 전체 조언(overall_advice) 프롬프트를 생성합니다.
+
+    노력 배분(effort_percent)은 effort_allocation.py가 로컬에서 계산하므로 LLM에는 조언 문장만 요청합니다.
+
+    Args:
+        courses: 과목 순서대로의 {"name", "grade", "analysis"} 리스트
+        efforts: courses 순서의 노력 배분 비율 (합계 100)
+        preferences: 학생 선호도 및 특성 (없으면 None)
+
+    Returns:
+        OpenAI Responses API input 문자열
+    """
+    course_text = "\n\n".join(format_course_analysis(idx, course, effort)
+                               for idx, (course, effort) in enumerate(zip(courses, efforts), start=1))
+    return f"""
+            사용자 선호도 및 특성: {preferences}
+            너는 학습 계획을 설계하는 조교이다.
+
+            반드시 아래 JSON Schema를 만족하는 JSON 한 개만 출력해야 한다.
+            - JSON 이외의 텍스트(설명, 마크다운 등)는 절대 출력하지 마라.
+
+            과목 {len(courses)}개에 대한 수강평 분석 결과(1~5 척도 난이도와 요약), 목표 성적,
+            그리고 이미 계산된 과목별 노력 배분 비율이 주어진다.
+
+            [규칙]
+            1) 주어진 노력 배분을 바꾸지 말고, 이 배분을 따르는 전체 학기 조언(overall_advice)을 1~2문장으로 작성한다.
+            2) 사용자 선호도 및 특성을 고려하여 조언을 작성한다.
+
+            --------- 과목 분석 시작 ---------
+            {course_text}
+            --------- 과목 분석 끝 ---------
+            """
+
+
+# =============================================================================
+# 수강평별 난이도 라벨 (label_reviews.py)
+# prompt/each_advice_prompt.py의 1~5 난이도 척도를 수강평 단위로 적용
+# =============================================================================
+REVIEW_LABEL_FIELDS = ["assignment_difficulty", "exam_difficulty", "workload", "grading_leniency"]
+
+REVIEW_LABEL_SCHEMA = {
+        "type"                : "object",
+        "properties"          : {
+                "labels": {
+                        "type" : "array",
+                        "items": {
+                                "type"                : "object",
+                                "properties"          : {
+                                        "review_id"            : {"type": "integer"},
+                                        "assignment_difficulty": {"type": ["integer", "null"]},
+                                        "exam_difficulty"      : {"type": ["integer", "null"]},
+                                        "workload"             : {"type": ["integer", "null"]},
+                                        "grading_leniency"     : {"type": ["integer", "null"]}
+                                },
+                                "required"            : ["review_id"] + REVIEW_LABEL_FIELDS,
+                                "additionalProperties": False
+                        }
+                }
+        },
+        "required"            : ["labels"],
+        "additionalProperties": False
+}
+
+
+def build_review_label_prompt(reviews: List[tuple]) -> str:
+    """
+    수강평 여러 개에 대해 수강평별 난이도 라벨을 요청하는 프롬프트를 생성합니다.
+
+    Args:
+        reviews: (review_id, content) 튜플 리스트
+
+    Returns:
+        OpenAI Responses API input 문자열
+    """
+    reviews_str = "\n".join([f"[review_id={review_id}] {content}" for review_id, content in reviews])
+    return f"""
+    아래는 이전 수강자들의 강의평입니다. 각 강의평은 [review_id=번호]로 시작합니다.
+    강의평마다 아래 항목을 1부터 5까지의 정수로 추출해서 review_id와 함께 반환해주세요.
+    강의평에 해당 항목에 대한 언급이 없으면 null로 반환해주세요.
+    - assignment_difficulty (과제 난이도): 1 매우 쉬움, 2 쉬움, 3 보통, 4 어려움, 5 매우 어려움
+    - exam_difficulty (시험 난이도): 1 매우 쉬움, 2 쉬움, 3 보통, 4 어려움, 5 매우 어려움
+    - workload (과제/공부 분량): 1 매우 적음, 2 적음, 3 보통, 4 많음, 5 매우 많음
+    - grading_leniency (채점/학점 관대함): 1 매우 엄격, 2 엄격, 3 보통, 4 관대, 5 매우 관대
+    모든 강의평에 대해 하나씩, 주어진 순서대로 반환해주세요.
+
+    {reviews_str}
+    """
+
+
+# =============================================================================
+# 응답 파싱
+# =============================================================================
+
+def parse_llm_json(text: str) -> dict:
+    """
+    모델 출력 텍스트에서 JSON 객체를 추출하여 파싱합니다.
+
+    마크다운 코드 블록이나 앞뒤 설명 문장이 섞여 있어도 첫 JSON 객체를 찾아 파싱합니다.
+
+    Args:
+        text: 모델 출력 텍스트
+
+    Returns:
+        파싱된 딕셔너리
+
+    Raises:
+        json.JSONDecodeError: JSON 파싱에 실패한 경우
+    """
+    text = text.strip()
+
+    # Try to extract JSON from markdown code blocks if present
+    json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', text, re.DOTALL)
+    if json_match:
+        text = json_match.group(1)
+
+    # Try to find JSON object in the text
+    if not text.startswith('{'):
+        json_match = re.search(r'\{.*\}', text, re.DOTALL)
+        if json_match:
+            text = json_match.group(0)
+
+    return json.loads(text)
+
+
+_WHITESPACE_RE = re.compile(r"[\s,]*")  # 필드 사이 공백과 쉼표
+_SPACE_RE = re.compile(r"\s*")
+
+
+class StreamingJsonFields:
+    """
+    스트리밍으로 들어오는 JSON 객체 텍스트에서 값이 완성된 최상위 필드를 차례로 꺼냅니다.
+
+    Structured Output은 스키마의 필드 순서대로 생성되므로, 앞 필드(예: 난이도)는
+    전체 응답이 끝나기 전에 클라이언트로 보낼 수 있습니다.
+
+    사용 예시:
+        parser = StreamingJsonFields()
+        for delta in deltas:
+            for name, value in parser.feed(delta):
+                ...
+        result = parser.fields
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.fields = {}
+        self._position = None  # 다음 키를 읽을 위치 (여는 중괄호 다음)
+        self._decoder = json.JSONDecoder()
+
+    def feed(self, delta: str) -> List[Tuple[str, Any]]:
+        """
+        출력 텍스트 조각을 추가하고 새로 완성된 필드를 반환합니다.
+
+        Args:
+            delta: 모델 출력 텍스트 조각
+
+        Returns:
+            새로 완성된 (필드 이름, 값) 리스트
+        """
+        self.buffer += delta
+        if self._position is None:
+            start = self.buffer.find("{")
+            if start < 0:
+                return []
+            self._position = start + 1
+
+        completed = []
+        while True:
+            parsed = self._next_field()
+            if parsed is None:
+                return completed
+            name, value, self._position = parsed
+            self.fields[name] = value
+            completed.append((name, value))
+
+    def _next_field(self) -> Optional[Tuple[str, Any, int]]:
+        """현재 위치에서 "키": 값 한 쌍을 읽습니다. 아직 값이 완성되지 않았으면 None."""
+        buffer = self.buffer
+        position = _WHITESPACE_RE.match(buffer, self._position).end()
+        try:
+            name, position = self._decoder.raw_decode(buffer, position)
+            position = _SPACE_RE.match(buffer, position).end()
+            if not buffer.startswith(":", position):
+                return None
+            position = _SPACE_RE.match(buffer, position + 1).end()
+            value, end = self._decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            return None
+
+        # 숫자는 뒤에 자릿수가 더 올 수 있으므로 다음 문자가 들어온 뒤에 완성으로 간주
+        if isinstance(value, (int, float)) and end >= len(buffer):
+            return None
+        return name, value, end
+
+
+# =============================================================================
+# 토큰 수 추정
+# =============================================================================
+
+def estimate_tokens(text: str) -> int:
+    """
+    프롬프트 문자열의 토큰 수를 추정합니다.
+
+    tiktoken이 설치되어 있으면 gpt-5 계열과 같은 o200k_base 인코딩으로 계산하고,
+    없으면 UTF-8 바이트 수 기준으로 근사합니다 (한글 1글자 ≈ 1토큰, 영문 3~4글자 ≈ 1토큰).
+
+    Args:
+        text: 토큰 수를 계산할 문자열
+
+    Returns:
+        추정 토큰 수
+    """
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return max(1, len(text.encode("utf-8")) // 3)
@@ -0,0 +1,102 @@
+"""
+AI 조언 요청 폭주 중 가벼운 엔드포인트의 지연 시간을 측정하는 부하 테스트.
+
+느린 로컬 OpenAI 대역(benchmark/fake_openai.py)에 연결된 서버에
+조언 요청을 한꺼번에 보내는 동안 /health, /courses 지연 시간이 평소와 같은지 확인합니다.
+
+측정 단계:
+    1. baseline: 가벼운 엔드포인트만 --duration초 동안 반복 호출
+    2. burst: 조언 요청 --burst개를 동시에 보내며 같은 방식으로 반복 호출
+       (목표 성적 문자열을 요청마다 다르게 하여 캐시를 우회)
+
+사용법:
+    FAKE_OPENAI_LATENCY=3 uvicorn benchmark.fake_openai:app --port 9100 &
+    OPENAI_BASE_URL=http://localhost:9100/v1 OPENAI_API_KEY=test uvicorn main:app --port 8000 &
+    python benchmark/advice_burst.py --base-url http://localhost:8000 --burst 100
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+import httpx
+import numpy as np
+
+PROBE_PATHS = ["/health", "/courses"]
+PROBE_INTERVAL = 0.05
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event) -> Dict[str, List[float]]:
+    """stop이 설정될 때까지 가벼운 엔드포인트를 번갈아 호출하며 지연 시간(ms)을 기록합니다."""
+    latencies: Dict[str, List[float]] = {path: [] for path in PROBE_PATHS}
+    while not stop.is_set():
+        for path in PROBE_PATHS:
+            start = time.perf_counter()
+            await client.get(path)
+            latencies[path].append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(PROBE_INTERVAL)
+    return latencies
+
+
+async def advice_request(client: httpx.AsyncClient, course_id: int, index: int) -> int:
+    """캐시를 피하도록 목표 성적 문자열을 바꿔 과목 조언을 요청하고 상태 코드를 반환합니다."""
+    try:
+        response = await client.get(f"/courses/{course_id}/advice", params={"objective_grade": f"A0 #{index}"})
+        return response.status_code
+    except httpx.HTTPError:
+        return -1
+
+
+def summarize(name: str, latencies: Dict[str, List[float]]) -> None:
+    """엔드포인트별 지연 시간 백분위를 출력합니다."""
+    for path, values in latencies.items():
+        if not values:
+            continue
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        print(f"{name:<9} {path:<10} {len(values):>6} {p50:>9.1f} {p95:>9.1f} {p99:>9.1f} {max(values):>9.1f}")
+
+
+async def run(base_url: str, burst: int, course_id: int, duration: float) -> None:
+    """baseline과 burst 단계를 차례로 실행하고 결과를 출력합니다."""
+    timeout = httpx.Timeout(300.0)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as probe_client, \
+            httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as burst_client:
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(probe_client, stop))
+        await asyncio.sleep(duration)
+        stop.set()
+        baseline = await probe_task
+
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(probe_client, stop))
+        start = time.perf_counter()
+        statuses = await asyncio.gather(*(advice_request(burst_client, course_id, i) for i in range(burst)))
+        burst_elapsed = time.perf_counter() - start
+        stop.set()
+        during_burst = await probe_task
+
+    print(f"{'phase':<9} {'path':<10} {'count':>6} {'p50_ms':>9} {'p95_ms':>9} {'p99_ms':>9} {'max_ms':>9}")
+    summarize("baseline", baseline)
+    summarize("burst", during_burst)
+
+    counts: Dict[int, int] = {}
+    for status in statuses:
+        counts[status] = counts.get(status, 0) + 1
+    print(f"\n조언 요청 {burst}개: {burst_elapsed:.1f}초, 상태 코드 {dict(sorted(counts.items()))}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="AI 조언 요청 폭주 중 가벼운 엔드포인트 지연 시간 측정")
+    parser.add_argument("--base-url", default="http://localhost:8000", help="API 서버 주소")
+    parser.add_argument("--burst", type=int, default=100, help="동시에 보낼 조언 요청 수")
+    parser.add_argument("--course-id", type=int, default=1, help="조언을 요청할 과목 ID")
+    parser.add_argument("--duration", type=float, default=3.0, help="baseline 측정 시간(초)")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.base_url, args.burst, args.course_id, args.duration))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+캐시 직렬화 형식 비교 벤치마크.
+
+기존 캐시 저장 방식(json.dumps 문자열)과 response_cache.encode_payload(버전 바이트 + UTF-8 JSON, 큰 값은 zlib)의
+항목당 크기와 인코딩/디코딩 시간을 비교합니다. 페이로드는 hackathon.db의 실제 수강평 문장으로 채운
+과목 조언 / 목표 성적별 조언 묶음 / 학기 계획 / 누적 히스토그램 형태입니다.
+
+--redis-url을 주면 같은 값을 Redis에 저장하고 MEMORY USAGE로 Redis가 실제 사용하는 항목당 메모리도 비교합니다.
+
+사용법:
+    python benchmark/cache_codec.py
+    python benchmark/cache_codec.py --compress-min-bytes 512 --redis-url redis://localhost:6379/15
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from response_cache import decode_payload, encode_payload, orjson  # noqa: E402
+
+DB_NAME = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "hackathon.db")
+
+
+def load_sentences(db_path: str) -> List[str]:
+    """페이로드 문장으로 사용할 수강평 본문을 가져옵니다."""
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("SELECT content FROM course_reviews WHERE length(content) > 40 ORDER BY id").fetchall()
+    finally:
+        conn.close()
+    return [row[0] for row in rows]
+
+
+def build_payloads(sentences: List[str]) -> Dict[str, dict]:
+    """캐시에 저장되는 응답 형태별 예시 페이로드를 만듭니다."""
+    def text(start: int, length: int) -> str:
+        out, i = "", start
+        while len(out) < length:
+            out += sentences[i % len(sentences)] + " "
+            i += 1
+        return out[:length]
+
+    advice = {"assignment_difficulty": 3, "exam_difficulty": 4, "summary": text(0, 300), "advice": text(7, 450)}
+    return {
+            "course_advice"   : advice,
+            "advice_by_grade" : {grade: {**advice, "advice": text(20 + i * 5, 450)}
+                                 for i, grade in enumerate(["A+", "A0", "B+", "B0"])},
+            "semester_advice" : {"courses": [{"course_index": i + 1, "effort_percent": p}
+                                             for i, p in enumerate([40, 35, 25])],
+                                 "overall_advice": text(50, 200)},
+            "histogram"       : {"course_id": 2,
+                                 "histogram": {f"{b}-{b + 5}": (b * 37) % 23 for b in range(0, 100, 5)},
+                                 "statistics": {"mean": 71.4, "median": 73.0, "std": 12.9, "total_students": 87}},
+    }
+
+
+def time_us(fn: Callable, repeat: int) -> float:
+    """fn을 repeat번 실행한 평균 시간(µs)."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def redis_memory(client, key: str, value) -> int:
+    """값을 Redis에 저장하고 MEMORY USAGE(바이트)를 반환합니다."""
+    client.set(key, value)
+    usage = client.memory_usage(key, samples=0)
+    client.delete(key)
+    return usage
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="캐시 직렬화 형식 비교")
+    parser.add_argument("--compress-min-bytes", type=int, default=1024, help="zlib 압축 기준 크기(바이트)")
+    parser.add_argument("--repeat", type=int, default=20000, help="시간 측정 반복 횟수")
+    parser.add_argument("--redis-url", default=None, help="MEMORY USAGE 측정용 Redis (예: redis://localhost:6379/15)")
+    parser.add_argument("--db", default=DB_NAME, help="SQLite DB 경로")
+    args = parser.parse_args()
+
+    client = None
+    if args.redis_url:
+        import redis
+        client = redis.Redis.from_url(args.redis_url)
+
+    payloads = build_payloads(load_sentences(args.db))
+    print(f"serializer: {'orjson' if orjson is not None else 'json'}, compress >= {args.compress_min_bytes}B")
+    header = f"{'payload':<16} {'format':<7} {'bytes':>7} {'encode_us':>10} {'decode_us':>10}"
+    print(header + (f" {'redis_mem':>10}" if client else ""))
+    for name, data in payloads.items():
+        legacy = json.dumps(data)
+        encoded = encode_payload(data, args.compress_min_bytes)
+        assert decode_payload(encoded) == decode_payload(legacy) == data
+        rows = [
+                ("json", len(legacy.encode()), time_us(lambda: json.dumps(data), args.repeat),
+                 time_us(lambda: json.loads(legacy), args.repeat), legacy),
+                (f"v{encoded[0]}", len(encoded), time_us(lambda: encode_payload(data, args.compress_min_bytes), args.repeat),
+                 time_us(lambda: decode_payload(encoded), args.repeat), encoded),
+        ]
+        for fmt, size, encode_us, decode_us, value in rows:
+            line = f"{name:<16} {fmt:<7} {size:>7} {encode_us:>10.1f} {decode_us:>10.1f}"
+            if client:
+                line += f" {redis_memory(client, f'cache:benchmark:{name}', value):>10}"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+로컬 OpenAI Responses API 대역(fake) 서버.
+
+실제 OpenAI API 없이 조언 엔드포인트, 라벨링/요약 배치 작업, 부하 테스트를 실행하기 위한 서버입니다.
+요청의 JSON Schema(text.format)를 읽어 스키마에 맞는 JSON을 생성하고,
+설정한 지연 시간만큼 기다린 뒤 OpenAI SDK가 파싱할 수 있는 Response 객체를 반환합니다.
+
+응답 생성 규칙:
+    - string: "fake <필드명>" 뒤에 FAKE_OPENAI_STRING_CHARS자 길이가 되도록 채운 문장
+      (실제 요약/조언 길이와 비슷하게 만들어 스트리밍 시 필드 완성 시점을 현실적으로 재현)
+    - integer/number: minimum~maximum (기본 1~5) 범위의 값
+    - ["integer", "null"] 처럼 null을 허용하는 타입은 null이 아닌 타입으로 생성
+    - 이름이 *_id인 integer 필드는 입력 텍스트의 "[<필드명>=값]" 표시를 순서대로 사용
+      (예: label_reviews.py의 [review_id=123])
+    - array 항목 수는 위 표시 개수 (없으면 3개)
+    - 스키마가 없으면 "- fake summary" 형식의 텍스트
+    - stream=true 요청은 첫 조각을 FAKE_OPENAI_TTFT초 뒤에 보내고, 나머지 조각을
+      FAKE_OPENAI_LATENCY초에 걸쳐 response.output_text.delta 이벤트(SSE)로 전송
+
+사용법:
+    uvicorn benchmark.fake_openai:app --port 9100
+    OPENAI_BASE_URL=http://localhost:9100/v1 OPENAI_API_KEY=test uvicorn main:app
+
+환경 변수:
+    FAKE_OPENAI_LATENCY: 응답 지연 시간(초), 기본값 0.5
+    FAKE_OPENAI_JITTER: 지연 시간에 더할 0~JITTER초 무작위 값, 기본값 0
+    FAKE_OPENAI_ERROR_RATE: 500 에러를 반환할 확률 (0~1), 기본값 0
+    FAKE_OPENAI_TTFT: 스트리밍 응답의 첫 조각까지 걸리는 시간(초), 기본값 0.3
+    FAKE_OPENAI_STRING_CHARS: 문자열 필드 길이, 기본값 200
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+import time
+import uuid
+from typing import Dict, List
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+LATENCY = float(os.getenv("FAKE_OPENAI_LATENCY", "0.5"))
+JITTER = float(os.getenv("FAKE_OPENAI_JITTER", "0"))
+ERROR_RATE = float(os.getenv("FAKE_OPENAI_ERROR_RATE", "0"))
+TTFT = float(os.getenv("FAKE_OPENAI_TTFT", "0.3"))
+STRING_CHARS = int(os.getenv("FAKE_OPENAI_STRING_CHARS", "200"))
+FILLER = " 과제와 시험 준비는 꾸준히 하는 것이 좋습니다."
+STREAM_CHUNK_CHARS = 8
+
+app = FastAPI(title="Fake OpenAI Responses API")
+
+
+# =============================================================================
+# 스키마 기반 응답 생성
+# =============================================================================
+
+def _markers(text: str) -> Dict[str, List[int]]:
+    """입력 텍스트에서 [name=123] 형식의 id 표시를 이름별로 모읍니다."""
+    found: Dict[str, List[int]] = {}
+    for name, value in re.findall(r"\[(\w+_id)=(\d+)\]", text):
+        found.setdefault(name, []).append(int(value))
+    return found
+
+
+def fake_value(schema: dict, name: str, markers: Dict[str, List[int]]):
+    """JSON Schema 하나에 맞는 가짜 값을 생성합니다."""
+    schema_type = schema.get("type", "object")
+    if isinstance(schema_type, list):
+        schema_type = next((t for t in schema_type if t != "null"), "null")
+
+    if schema_type == "object":
+        return {key: fake_value(sub, key, markers) for key, sub in schema.get("properties", {}).items()}
+    if schema_type == "array":
+        items = schema.get("items", {})
+        id_fields = [key for key in items.get("properties", {}) if key in markers]
+        count = len(markers[id_fields[0]]) if id_fields else 3
+        return [fake_value(items, name, markers) for _ in range(count)]
+    if schema_type == "integer":
+        if name in markers and markers[name]:
+            return markers[name].pop(0)
+        return random.randint(int(schema.get("minimum", 1)), int(schema.get("maximum", 5)))
+    if schema_type == "number":
+        return round(random.uniform(schema.get("minimum", 1), schema.get("maximum", 5)), 2)
+    if schema_type == "boolean":
+        return random.random() < 0.5
+    if schema_type == "string":
+        text = f"fake {name}"
+        while len(text) < STRING_CHARS:
+            text += FILLER
+        return text[:max(STRING_CHARS, len(f"fake {name}"))]
+    return None
+
+
+def build_output_text(body: dict) -> str:
+    """요청 본문의 text.format 스키마에 맞는 출력 텍스트를 생성합니다."""
+    input_text = body.get("input") if isinstance(body.get("input"), str) else str(body.get("input"))
+    text_format = (body.get("text") or {}).get("format") or {}
+    if text_format.get("type") == "json_schema":
+        return json.dumps(fake_value(text_format["schema"], text_format.get("name", ""), _markers(input_text)),
+                          ensure_ascii=False)
+    return "- fake summary: 과제 난이도 보통 (다수)\n- fake summary: 시험은 암기 위주"
+
+
+def estimate_tokens(text: str) -> int:
+    """usage 필드용 대략적인 토큰 수."""
+    return max(1, len(text.encode("utf-8")) // 3)
+
+
+def build_response(body: dict, output_text: str) -> dict:
+    """OpenAI SDK가 파싱할 수 있는 Response 객체를 생성합니다."""
+    input_tokens = estimate_tokens(str(body.get("input", "")))
+    output_tokens = estimate_tokens(output_text)
+    return {
+            "id"                 : f"resp_{uuid.uuid4().hex}",
+            "object"             : "response",
+            "created_at"         : int(time.time()),
+            "status"             : "completed",
+            "model"              : body.get("model", "fake-model"),
+            "output"             : [{
+                    "id"     : f"msg_{uuid.uuid4().hex}",
+                    "type"   : "message",
+                    "role"   : "assistant",
+                    "status" : "completed",
+                    "content": [{"type": "output_text", "text": output_text, "annotations": []}],
+            }],
+            "parallel_tool_calls": True,
+            "tool_choice"        : "auto",
+            "tools"              : [],
+            "usage"              : {
+                    "input_tokens"         : input_tokens,
+                    "input_tokens_details" : {"cached_tokens": 0},
+                    "output_tokens"        : output_tokens,
+                    "output_tokens_details": {"reasoning_tokens": 0},
+                    "total_tokens"         : input_tokens + output_tokens,
+            },
+    }
+
+
+async def stream_events(body: dict, output_text: str):
+    """Responses API 스트리밍 이벤트(SSE)를 생성합니다."""
+    response = build_response(body, output_text)
+    message_id = response["output"][0]["id"]
+    chunks = [output_text[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(output_text), STREAM_CHUNK_CHARS)]
+    interval = (LATENCY + random.uniform(0, JITTER)) / max(1, len(chunks))
+
+    def event(sequence: int, payload: dict) -> str:
+        payload = {**payload, "sequence_number": sequence}
+        return f"event: {payload['type']}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+    yield event(0, {"type": "response.created", "response": {**response, "status": "in_progress", "output": []}})
+    await asyncio.sleep(TTFT)
+    for sequence, chunk in enumerate(chunks, start=1):
+        yield event(sequence, {"type"        : "response.output_text.delta", "item_id": message_id, "output_index": 0,
+                               "content_index": 0, "delta": chunk, "logprobs": []})
+        await asyncio.sleep(interval)
+    yield event(len(chunks) + 1, {"type"        : "response.output_text.done", "item_id": message_id,
+                                  "output_index": 0, "content_index": 0, "text": output_text, "logprobs": []})
+    yield event(len(chunks) + 2, {"type": "response.completed", "response": response})
+
+
+# =============================================================================
+# 엔드포인트
+# =============================================================================
+
+@app.post("/v1/responses")
+async def create_response(request: Request):
+    """Responses API 대역. 설정된 지연 후 스키마에 맞는 응답을 반환합니다 (stream=true이면 SSE)."""
+    body = await request.json()
+    failed = random.random() < ERROR_RATE
+
+    if body.get("stream"):
+        if failed:
+            raise HTTPException(status_code=500, detail="fake upstream error")
+        return StreamingResponse(stream_events(body, build_output_text(body)), media_type="text/event-stream")
+
+    await asyncio.sleep(LATENCY + random.uniform(0, JITTER))
+    if failed:
+        raise HTTPException(status_code=500, detail="fake upstream error")
+    return build_response(body, build_output_text(body))
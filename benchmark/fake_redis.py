@@ -0,0 +1,244 @@
+"""
+로컬 Redis 대역(fake) 서버.
+
+Redis가 설치되지 않은 환경에서 부하 테스트(benchmark/load_test.py)를 실행하기 위한 RESP3 서버입니다.
+main.py와 advice_jobs.py가 사용하는 명령만 구현하며, 데이터는 메모리에만 보관합니다.
+
+지원 명령:
+    PING, HELLO, CLIENT, SELECT, GET, MGET, SET (EX/PX/NX), SETEX, DEL, KEYS, EXPIRE, TTL,
+    LPUSH, BRPOP, LLEN, ZINCRBY, ZREVRANGE (WITHSCORES), FLUSHDB, MEMORY USAGE, INFO
+
+사용법:
+    python benchmark/fake_redis.py --port 6390
+    REDIS_PORT=6390 uvicorn main:app
+
+    # 다른 스크립트 안에서 백그라운드 스레드로 실행
+    server = FakeRedisServer(port=0)
+    port = server.start_in_thread()
+"""
+
+import argparse
+import asyncio
+import fnmatch
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+def _bulk(value: Optional[bytes]) -> bytes:
+    return b"_\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def _array(items: List[bytes]) -> bytes:
+    return b"*%d\r\n" % len(items) + b"".join(items)
+
+
+def _int(value: int) -> bytes:
+    return b":%d\r\n" % value
+
+
+def _double(value: float) -> bytes:
+    return b",%s\r\n" % repr(float(value)).encode()
+
+
+OK = b"+OK\r\n"
+
+
+class FakeRedisServer:
+    """메모리 기반 Redis 대역 (단일 이벤트 루프에서 처리하므로 명령 단위로 원자적)."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6390):
+        self.host = host
+        self.port = port
+        self.strings: Dict[bytes, bytes] = {}
+        self.lists: Dict[bytes, List[bytes]] = {}
+        self.zsets: Dict[bytes, Dict[bytes, float]] = {}
+        self.expires: Dict[bytes, float] = {}
+        self.commands = 0
+        self._list_pushed: Optional[asyncio.Condition] = None
+
+    # -------------------------------------------------------------------------
+    # 키 공간
+    # -------------------------------------------------------------------------
+
+    def _expire_if_needed(self, key: bytes) -> None:
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self._delete(key)
+
+    def _delete(self, key: bytes) -> int:
+        self.expires.pop(key, None)
+        found = 0
+        for space in (self.strings, self.lists, self.zsets):
+            if space.pop(key, None) is not None:
+                found = 1
+        return found
+
+    def _exists(self, key: bytes) -> bool:
+        self._expire_if_needed(key)
+        return key in self.strings or key in self.lists or key in self.zsets
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        self._expire_if_needed(key)
+        return self.strings.get(key)
+
+    def _keys(self) -> List[bytes]:
+        keys = [*self.strings, *self.lists, *self.zsets]
+        return [k for k in keys if self._exists(k)]
+
+    # -------------------------------------------------------------------------
+    # 명령 처리
+    # -------------------------------------------------------------------------
+
+    async def execute(self, args: List[bytes]) -> bytes:
+        self.commands += 1
+        cmd = args[0].decode().upper()
+        if cmd == "PING":
+            return b"+PONG\r\n"
+        if cmd == "HELLO":
+            return b"%3\r\n$6\r\nserver\r\n$5\r\nredis\r\n$7\r\nversion\r\n$5\r\n7.2.0\r\n$5\r\nproto\r\n:3\r\n"
+        if cmd in ("CLIENT", "SELECT"):
+            return OK
+        if cmd == "GET":
+            return _bulk(self._get(args[1]))
+        if cmd == "MGET":
+            return _array([_bulk(self._get(k)) for k in args[1:]])
+        if cmd == "SET":
+            return self._set(args)
+        if cmd == "SETEX":
+            self._delete(args[1])
+            self.strings[args[1]] = args[3]
+            self.expires[args[1]] = time.monotonic() + int(args[2])
+            return OK
+        if cmd == "DEL":
+            return _int(sum(self._delete(k) for k in args[1:] if self._exists(k)))
+        if cmd == "KEYS":
+            pattern = args[1].decode()
+            return _array([_bulk(k) for k in self._keys() if fnmatch.fnmatchcase(k.decode(), pattern)])
+        if cmd == "EXPIRE":
+            if not self._exists(args[1]):
+                return _int(0)
+            self.expires[args[1]] = time.monotonic() + int(args[2])
+            return _int(1)
+        if cmd == "TTL":
+            if not self._exists(args[1]):
+                return _int(-2)
+            deadline = self.expires.get(args[1])
+            return _int(-1 if deadline is None else int(deadline - time.monotonic()))
+        if cmd == "LPUSH":
+            items = self.lists.setdefault(args[1], [])
+            for value in args[2:]:
+                items.insert(0, value)
+            async with self._list_pushed:
+                self._list_pushed.notify_all()
+            return _int(len(items))
+        if cmd == "BRPOP":
+            return await self._brpop(args[1:-1], float(args[-1]))
+        if cmd == "LLEN":
+            return _int(len(self.lists.get(args[1], [])))
+        if cmd == "ZINCRBY":
+            zset = self.zsets.setdefault(args[1], {})
+            zset[args[3]] = zset.get(args[3], 0.0) + float(args[2])
+            return _double(zset[args[3]])
+        if cmd == "ZREVRANGE":
+            return self._zrevrange(args)
+        if cmd == "FLUSHDB":
+            for space in (self.strings, self.lists, self.zsets, self.expires):
+                space.clear()
+            return OK
+        if cmd == "MEMORY":
+            value = self._get(args[2])
+            return _bulk(None) if value is None else _int(len(args[2]) + len(value) + 56)
+        if cmd == "INFO":
+            return _bulk(f"# Keyspace\r\ndb0:keys={len(self._keys())}\r\n".encode())
+        return b"-ERR unknown command '%s'\r\n" % cmd.encode()
+
+    def _set(self, args: List[bytes]) -> bytes:
+        key, value = args[1], args[2]
+        options = [a.decode().upper() for a in args[3:]]
+        if "NX" in options and self._exists(key):
+            return b"_\r\n"
+        self._delete(key)
+        self.strings[key] = value
+        for i, option in enumerate(options):
+            if option == "EX":
+                self.expires[key] = time.monotonic() + int(args[4 + i])
+            elif option == "PX":
+                self.expires[key] = time.monotonic() + int(args[4 + i]) / 1000
+        return OK
+
+    async def _brpop(self, keys: List[bytes], timeout: float) -> bytes:
+        deadline = time.monotonic() + timeout if timeout > 0 else None
+        async with self._list_pushed:
+            while True:
+                for key in keys:
+                    if self.lists.get(key):
+                        return _array([_bulk(key), _bulk(self.lists[key].pop())])
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return b"_\r\n"
+                try:
+                    await asyncio.wait_for(self._list_pushed.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _zrevrange(self, args: List[bytes]) -> bytes:
+        zset = self.zsets.get(args[1], {})
+        start, stop = int(args[2]), int(args[3])
+        ranked: List[Tuple[bytes, float]] = sorted(zset.items(), key=lambda item: (-item[1], item[0]))
+        ranked = ranked[start:(stop + 1) or None]
+        if len(args) > 4 and args[4].decode().upper() == "WITHSCORES":
+            return _array([_array([_bulk(member), _double(score)]) for member, score in ranked])
+        return _array([_bulk(member) for member, _ in ranked])
+
+    # -------------------------------------------------------------------------
+    # 네트워크
+    # -------------------------------------------------------------------------
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                args = []
+                for _ in range(int(line[1:])):
+                    length = int((await reader.readline())[1:])
+                    args.append((await reader.readexactly(length + 2))[:-2])
+                writer.write(await self.execute(args))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, ready: Optional[threading.Event] = None) -> None:
+        self._list_pushed = asyncio.Condition()
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        if ready is not None:
+            ready.set()
+        async with server:
+            await server.serve_forever()
+
+    def start_in_thread(self) -> int:
+        """데몬 스레드에서 서버를 실행하고 실제 포트를 반환합니다 (port=0이면 빈 포트 사용)."""
+        ready = threading.Event()
+        threading.Thread(target=lambda: asyncio.run(self.serve(ready)), name="fake-redis", daemon=True).start()
+        ready.wait(5)
+        return self.port
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="부하 테스트용 로컬 Redis 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+
+    server = FakeRedisServer(args.host, args.port)
+    print(f"Fake Redis listening on {args.host}:{args.port}")
+    asyncio.run(server.serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+부하/용량 테스트용 합성 데이터베이스 생성기.
+
+add_scores.py는 과목마다 평가 항목 3개, 항목마다 점수 10개를 한 행씩 넣는 샘플 데이터용입니다.
+이 스크립트는 과목 수, 과목당 평가 항목 수, 항목당 점수 수, 과목당 수강평 수를 지정해 실제 규모 이상의 DB를
+만들고, benchmark/load_test.py --db로 그대로 부하 테스트에 사용할 수 있습니다.
+
+생성 방식:
+    - 스키마: init_db.init_db()와 같은 스키마 (migrations.py 최신 버전), 보조 인덱스는 대량 입력 후 다시 생성
+    - 점수: ML/model_loader.py의 generate_class_scores와 같은 easy/normal/hard/bimodal 혼합 분포를
+      평가 항목마다 하나씩 골라 numpy로 한 번에 생성 (0~100으로 자르고 소수점 첫째 자리로 반올림)
+    - 수강평: crawling/*.csv의 수강평(작성 학기 포함)을 복원 추출
+    - 입력: 테이블별로 executemany를 --batch-size 행씩 호출하고 전체를 하나의 트랜잭션으로 커밋
+      (생성 중에는 journal_mode=OFF, synchronous=OFF, 수강평 검색 색인은 트리거 대신 입력 후 한 번에 rebuild)
+
+사용법:
+    # 과목 200개 × 항목 5개 × 점수 1,000개 = 점수 100만 개
+    python benchmark/generate_dataset.py --output /tmp/capacity.db
+    python benchmark/generate_dataset.py --output /tmp/capacity.db --courses 1000 --scores-per-item 200 \\
+        --mix easy=1,normal=2,hard=1,bimodal=1 --seed 7
+    python benchmark/load_test.py --db /tmp/capacity.db --workload prediction-heavy
+"""
+
+import argparse
+import csv
+import glob
+import os
+import sqlite3
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, BASE_DIR)
+
+from init_db import init_db  # noqa: E402
+from import_csv import COURSE_NAME_MAP  # noqa: E402
+from review_recency import parse_term  # noqa: E402
+from review_search import CREATE_INDEX_SQL as CREATE_REVIEW_SEARCH_SQL, FTS_TABLE  # noqa: E402
+
+REVIEW_CSV_GLOB = os.path.join(BASE_DIR, "crawling", "*.csv")
+PROFILE_PREFERENCES = "암기형, 객관식 선호, 과제보다 시험 선호"
+
+# 분포 종류별 (평균 범위, 표준편차 범위) - generate_class_scores와 같은 값
+# bimodal은 평균 범위를 두 개 가지며, 항목 점수의 앞 절반과 뒤 절반이 각각의 평균을 따름
+CLASS_TYPES = ["easy", "normal", "hard", "bimodal"]
+MU_RANGES = {
+        "easy"   : [(75, 90)],
+        "normal" : [(60, 80)],
+        "hard"   : [(40, 65)],
+        "bimodal": [(40, 60), (70, 90)],
+}
+SIGMA_RANGES = {
+        "easy"   : (5, 10),
+        "normal" : (8, 15),
+        "hard"   : (8, 15),
+        "bimodal": (5, 10),
+}
+
+# 대량 입력하는 테이블 (보조 인덱스를 지웠다가 입력 후 같은 정의로 다시 생성)
+BULK_TABLES = ["courses", "evaluation_items", "other_student_scores", "course_reviews"]
+
+
+# =============================================================================
+# 데이터 생성
+# =============================================================================
+
+def parse_mix(text: str) -> np.ndarray:
+    """
+    "easy=1,normal=2,hard=1,bimodal=1" 형식의 분포 비율을 CLASS_TYPES 순서의 확률 배열로 변환합니다.
+
+    Raises:
+        ValueError: 알 수 없는 분포 이름이거나 비율의 합이 0 이하인 경우
+    """
+    weights = dict.fromkeys(CLASS_TYPES, 0.0)
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        name, _, value = part.partition("=")
+        if name not in weights:
+            raise ValueError(f"알 수 없는 분포: {name} (사용 가능: {', '.join(CLASS_TYPES)})")
+        weights[name] = float(value or 1)
+    probs = np.array([weights[name] for name in CLASS_TYPES])
+    if probs.sum() <= 0 or (probs < 0).any():
+        raise ValueError(f"분포 비율이 올바르지 않습니다: {text}")
+    return probs / probs.sum()
+
+
+def item_names(items_per_course: int) -> List[str]:
+    """과목 하나의 평가 항목 이름 (항목이 3개 이상이면 마지막 두 개는 중간고사/기말고사, 나머지는 과제)."""
+    exams = ["중간고사", "기말고사"][:max(0, min(2, items_per_course - 1))]
+    return [f"과제{i + 1}" for i in range(items_per_course - len(exams))] + exams
+
+
+def item_weights(rng: np.random.Generator, courses: int, items_per_course: int) -> np.ndarray:
+    """과목별 평가 항목 반영 비율 (정수, 과목마다 합이 100). 반환 shape: [courses, items_per_course]."""
+    raw = rng.dirichlet(np.full(items_per_course, 4.0), size=courses) * 100
+    weights = np.floor(raw).astype(np.int64)
+    remainder = 100 - weights.sum(axis=1)
+    weights[np.arange(courses), raw.argmax(axis=1)] += remainder
+    return weights
+
+
+def item_distributions(rng: np.random.Generator, num_items: int,
+                       mix: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    평가 항목마다 분포 종류와 파라미터를 고릅니다.
+
+    Returns:
+        (분포 종류 인덱스, 앞 절반 평균, 뒤 절반 평균, 표준편차), 각각 shape [num_items]
+        (bimodal이 아니면 두 평균이 같음)
+    """
+    kinds = rng.choice(len(CLASS_TYPES), size=num_items, p=mix)
+    mu_low = np.empty(num_items)
+    mu_high = np.empty(num_items)
+    sigma = np.empty(num_items)
+    for k, name in enumerate(CLASS_TYPES):
+        mask = kinds == k
+        n = int(mask.sum())
+        ranges = MU_RANGES[name]
+        mu_low[mask] = rng.uniform(*ranges[0], size=n)
+        mu_high[mask] = rng.uniform(*ranges[-1], size=n) if len(ranges) > 1 else mu_low[mask]
+        sigma[mask] = rng.uniform(*SIGMA_RANGES[name], size=n)
+    return kinds, mu_low, mu_high, sigma
+
+
+def generate_scores(rng: np.random.Generator, mu_low: np.ndarray, mu_high: np.ndarray, sigma: np.ndarray,
+                    scores_per_item: int) -> np.ndarray:
+    """
+    모든 평가 항목의 점수를 한 번에 생성합니다.
+
+    Returns:
+        shape [num_items, scores_per_item]의 점수 (0~100, 소수점 첫째 자리)
+    """
+    second_half = np.arange(scores_per_item) >= scores_per_item // 2
+    mu = np.where(second_half[None, :], mu_high[:, None], mu_low[:, None])
+    scores = rng.normal(mu, sigma[:, None])
+    return np.round(np.clip(scores, 0, 100), 1)
+
+
+def load_reviews(pattern: str = REVIEW_CSV_GLOB) -> List[Tuple[str, Optional[int], Optional[int]]]:
+    """크롤링한 CSV 파일들에서 (수강평, 연도, 학기)를 읽습니다 (빈 수강평과 중복 제외)."""
+    reviews: Dict[str, Tuple[str, Optional[int], Optional[int]]] = {}
+    for path in sorted(glob.glob(pattern)):
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f, skipinitialspace=True):
+                content = (row.get("review") or "").strip()
+                if content:
+                    reviews.setdefault(content, (content, *parse_term(row.get("year"), row.get("semester"))))
+    return list(reviews.values())
+
+
+# =============================================================================
+# 대량 입력
+# =============================================================================
+
+def insert_many(conn: sqlite3.Connection, sql: str, rows: Sequence[Iterable], batch_size: int) -> None:
+    """rows를 batch_size 행씩 executemany로 입력합니다 (커밋하지 않음)."""
+    for start in range(0, len(rows), batch_size):
+        conn.executemany(sql, rows[start:start + batch_size])
+
+
+def build_dataset(path: str, courses: int, items_per_course: int, scores_per_item: int, reviews_per_course: int,
+                  mix: np.ndarray, seed: int, batch_size: int) -> Dict[str, float]:
+    """
+    합성 데이터베이스를 만듭니다 (path에 파일이 있으면 삭제 후 새로 생성).
+
+    Returns:
+        테이블별 행 수와 단계별 소요 시간(초)
+    """
+    rng = np.random.default_rng(seed)
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+
+    init_db(path)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA cache_size = -262144")  # 256MB
+    # 보조 인덱스와 수강평 검색 트리거는 행마다 갱신되므로 지웠다가 입력 후 한 번에 생성/rebuild
+    placeholders = ", ".join("?" * len(BULK_TABLES))
+    indexes = conn.execute(f"SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL "
+                           f"AND tbl_name IN ({placeholders})", BULK_TABLES).fetchall()
+    for name, _ in indexes:
+        conn.execute(f"DROP INDEX {name}")
+    for name in ("course_reviews_fts_ai", "course_reviews_fts_ad", "course_reviews_fts_au"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+    # 1. 과목 / 프로필
+    step = time.perf_counter()
+    codes = list(COURSE_NAME_MAP)
+    course_rows = [
+            (i + 1, COURSE_NAME_MAP[codes[i]] if i < len(codes) else f"합성과목{i + 1}",
+             codes[i] if i < len(codes) else f"SYN{i + 1:05d}", scores_per_item + 1)
+            for i in range(courses)
+    ]
+    conn.execute("BEGIN")
+    conn.execute("INSERT INTO student_profile (id, preferences) VALUES (1, ?)", (PROFILE_PREFERENCES,))
+    insert_many(conn, "INSERT INTO courses (id, name, course_code, total_students) VALUES (?, ?, ?, ?)",
+                course_rows, batch_size)
+
+    # 2. 평가 항목 (앞쪽 항목부터 제출, 내 점수는 항목 분포에서 하나 더 뽑음)
+    num_items = courses * items_per_course
+    names = item_names(items_per_course)
+    weights = item_weights(rng, courses, items_per_course).ravel()
+    _, mu_low, mu_high, sigma = item_distributions(rng, num_items, mix)
+    submitted_count = rng.integers(0, items_per_course + 1, size=courses)
+    submitted = (np.arange(items_per_course)[None, :] < submitted_count[:, None]).ravel()
+    my_mu = np.where(rng.random(num_items) < 0.5, mu_low, mu_high)
+    my_scores = np.round(np.clip(rng.normal(my_mu, sigma), 0, 100), 1)
+    item_rows = [
+            (item_id, (item_id - 1) // items_per_course + 1,
+             names[(item_id - 1) % items_per_course], weight, score if done else None, done)
+            for item_id, weight, score, done in zip(range(1, num_items + 1), weights.tolist(), my_scores.tolist(),
+                                                    submitted.tolist())
+    ]
+    insert_many(conn, "INSERT INTO evaluation_items (id, course_id, name, weight, my_score, is_submitted) "
+                      "VALUES (?, ?, ?, ?, ?, ?)", item_rows, batch_size)
+    timings["courses_items_seconds"] = time.perf_counter() - step
+
+    # 3. 다른 학생 점수
+    step = time.perf_counter()
+    scores = generate_scores(rng, mu_low, mu_high, sigma, scores_per_item).ravel()
+    item_ids = np.repeat(np.arange(1, num_items + 1), scores_per_item)
+    timings["scores_generate_seconds"] = time.perf_counter() - step
+    step = time.perf_counter()
+    insert_many(conn, "INSERT INTO other_student_scores (evaluation_item_id, score) VALUES (?, ?)",
+                list(zip(item_ids.tolist(), scores.tolist())), batch_size)
+    timings["scores_insert_seconds"] = time.perf_counter() - step
+
+    # 4. 수강평 (크롤링 데이터에서 복원 추출)
+    step = time.perf_counter()
+    pool = load_reviews()
+    review_rows = []
+    if pool and reviews_per_course > 0:
+        picks = rng.integers(0, len(pool), size=courses * reviews_per_course)
+        course_ids = np.repeat(np.arange(1, courses + 1), reviews_per_course)
+        review_rows = [(course_id, *pool[pick]) for course_id, pick in zip(course_ids.tolist(), picks.tolist())]
+        insert_many(conn, "INSERT INTO course_reviews (course_id, content, year, semester) VALUES (?, ?, ?, ?)",
+                    review_rows, batch_size)
+    conn.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    for sql in CREATE_REVIEW_SEARCH_SQL:
+        conn.execute(sql)
+    conn.commit()
+    timings["reviews_seconds"] = time.perf_counter() - step
+
+    # 5. 인덱스 (입력 후 한 번에 생성하는 편이 행마다 갱신하는 것보다 빠름)
+    step = time.perf_counter()
+    for _, sql in indexes:
+        conn.execute(sql)
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.execute("PRAGMA journal_mode = DELETE")
+    conn.close()
+    timings["indexes_seconds"] = time.perf_counter() - step
+
+    return {
+            "courses"       : courses,
+            "items"         : num_items,
+            "scores"        : len(scores),
+            "reviews"       : len(review_rows),
+            **timings,
+            "total_seconds" : time.perf_counter() - started,
+    }
+
+
+# =============================================================================
+# 메인
+# =============================================================================
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="부하/용량 테스트용 합성 데이터베이스 생성")
+    parser.add_argument("--output", required=True, help="생성할 SQLite DB 경로")
+    parser.add_argument("--courses", type=int, default=200, help="과목 수")
+    parser.add_argument("--items-per-course", type=int, default=5, help="과목당 평가 항목 수")
+    parser.add_argument("--scores-per-item", type=int, default=1000, help="평가 항목당 다른 학생 점수 수")
+    parser.add_argument("--reviews-per-course", type=int, default=30, help="과목당 수강평 수")
+    parser.add_argument("--mix", default="easy=1,normal=1,hard=1,bimodal=1", help="점수 분포 종류별 비율")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    parser.add_argument("--batch-size", type=int, default=100_000, help="executemany 한 번에 넣는 행 수")
+    parser.add_argument("--force", action="store_true", help="이미 있는 파일을 덮어씀")
+    args = parser.parse_args()
+
+    if min(args.courses, args.items_per_course, args.scores_per_item) < 1 or args.reviews_per_course < 0:
+        parser.error("--courses, --items-per-course, --scores-per-item은 1 이상, --reviews-per-course는 0 이상이어야 합니다.")
+    if os.path.abspath(args.output) == os.path.join(BASE_DIR, "hackathon.db"):
+        parser.error("원본 hackathon.db는 덮어쓸 수 없습니다. 다른 --output 경로를 지정해주세요.")
+    if os.path.exists(args.output) and not args.force:
+        parser.error(f"{args.output} 파일이 이미 있습니다 (덮어쓰려면 --force).")
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    summary = build_dataset(args.output, args.courses, args.items_per_course, args.scores_per_item,
+                            args.reviews_per_course, mix, args.seed, args.batch_size)
+    size_mb = os.path.getsize(args.output) / 1024 / 1024
+    print(f"✅ {args.output} ({size_mb:.1f}MB): 과목 {summary['courses']:,}개, 평가 항목 {summary['items']:,}개, "
+          f"점수 {summary['scores']:,}개, 수강평 {summary['reviews']:,}개")
+    print("⏱️ " + ", ".join(f"{k.removesuffix('_seconds')} {v:.2f}s" for k, v in summary.items() if k.endswith("_seconds")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,437 @@
+"""
+엔드투엔드 부하 테스트.
+
+main.py 변경이 API를 빠르게 했는지 느리게 했는지 커밋 간에 비교하기 위한 스크립트입니다.
+테스트용 SQLite DB 복사본, Redis 대역(benchmark/fake_redis.py, 또는 --redis-url의 실제 Redis),
+지연 시간을 조절할 수 있는 OpenAI 대역(benchmark/fake_openai.py)으로 uvicorn 서버를 띄우고,
+작업 부하(workload)별 요청 조합을 --concurrency개의 가상 사용자가 --duration초 동안 반복합니다.
+
+작업 부하 (WORKLOADS):
+    - prediction-heavy: /predict-histogram, /courses/{id}/cumulative-histogram 위주
+    - advice-heavy: 과목 조언(캐시 적중/미스), 목표 성적별 조언, 학기 조언, 스트리밍 조언 위주
+    - write-heavy: 점수/수강평 등록, 학생 프로필 변경 위주 (수강평 등록은 백그라운드 요약 갱신으로 OpenAI 호출 발생)
+    - list-heavy: 과목/평가 항목/수강평/점수 목록, 수강평 검색 위주
+    - mixed: 위 요청 전체를 실제 사용 비율에 가깝게 섞은 조합
+
+결과:
+    - 엔드포인트(라우트 템플릿)별 요청 수, 처리량(req/s), p50/p95/p99/max 지연 시간(ms), 오류율
+      (5xx와 연결 실패는 errors, 4xx는 client_errors로 따로 집계)
+    - benchmark/results/<시각>-<커밋>-<workload>.json에 저장 (git 커밋, 실행 옵션, 환경 정보 포함)
+    - --compare로 이전 결과 파일과 엔드포인트별 처리량/p95 변화를 비교
+
+사용법:
+    python benchmark/load_test.py --workload mixed --duration 30 --concurrency 32
+    python benchmark/load_test.py --workload advice-heavy --openai-latency 2 --workers 2
+    python benchmark/load_test.py --workload list-heavy --compare benchmark/results/<이전 결과>.json
+    # 이미 실행 중인 서버를 대상으로 (DB/Redis/OpenAI 대역을 띄우지 않음)
+    python benchmark/load_test.py --base-url http://localhost:8000 --workload list-heavy
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+import numpy as np
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+
+from fake_redis import FakeRedisServer  # noqa: E402
+
+DB_NAME = os.path.join(BASE_DIR, "hackathon.db")
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+READY_TIMEOUT = 120  # 서버 시작(모델 로딩 포함) 대기 시간(초)
+REQUEST_TIMEOUT = 120
+GRADES = ["A+", "A0", "B+", "B0"]
+SEARCH_TERMS = ["과제", "시험", "팀플", "출석", "과제 많음", "시험 어려움", "상대평가", "교수님"]
+PREFERENCES = ["시험보다 과제가 많은 수업을 선호합니다.", "팀플이 없는 수업을 원합니다.", "출석이 자유로운 수업이 좋습니다."]
+
+
+# =============================================================================
+# 테스트 데이터
+# =============================================================================
+
+def prepare_database(source: str, run_dir: str) -> str:
+    """원본 DB를 실행 디렉터리에 복사합니다 (쓰기 부하가 원본을 바꾸지 않도록)."""
+    path = os.path.join(run_dir, "benchmark.db")
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(path)
+    try:
+        src.backup(dst)
+    finally:
+        src.close()
+        dst.close()
+    return path
+
+
+def load_ids(db_path: str) -> Dict[str, List[int]]:
+    """요청 파라미터로 사용할 과목/평가 항목 ID를 가져옵니다."""
+    conn = sqlite3.connect(db_path)
+    try:
+        courses = [row[0] for row in conn.execute("SELECT id FROM courses ORDER BY id")]
+        items = [row[0] for row in conn.execute("SELECT id FROM evaluation_items ORDER BY id")]
+        reviewed = [row[0] for row in conn.execute("SELECT DISTINCT course_id FROM course_reviews ORDER BY course_id")]
+    finally:
+        conn.close()
+    if not courses or not items:
+        raise SystemExit(f"{db_path}에 과목/평가 항목이 없습니다.")
+    return {"courses": courses, "items": items, "reviewed_courses": reviewed or courses}
+
+
+# =============================================================================
+# 작업 부하 정의
+# =============================================================================
+
+# (엔드포인트 이름, 요청 생성 함수) - 요청 생성 함수는 (method, path, params, json body)를 반환
+Request = Tuple[str, str, Optional[dict], Optional[dict]]
+Operation = Tuple[str, Callable[[Dict[str, List[int]], random.Random, float], Request]]
+
+OPERATIONS: Dict[str, Operation] = {
+        "predict": ("GET /predict-histogram",
+                    lambda ids, rng, miss: ("GET", "/predict-histogram",
+                                            {"evaluation_item_id": rng.choice(ids["items"])}, None)),
+        "cumulative": ("GET /courses/{course_id}/cumulative-histogram",
+                       lambda ids, rng, miss: ("GET", f"/courses/{rng.choice(ids['courses'])}/cumulative-histogram",
+                                               None, None)),
+        "advice": ("GET /courses/{course_id}/advice",
+                   lambda ids, rng, miss: ("GET", f"/courses/{rng.choice(ids['reviewed_courses'])}/advice",
+                                           {"objective_grade": rng.choice(GRADES) if rng.random() >= miss
+                                           else f"A0 #{rng.getrandbits(32)}"}, None)),
+        "advice_grades": ("GET /courses/{course_id}/advice/grades",
+                          lambda ids, rng, miss: ("GET", f"/courses/{rng.choice(ids['reviewed_courses'])}/advice/grades",
+                                                  None, None)),
+        "advice_stream": ("GET /courses/{course_id}/advice/stream",
+                          lambda ids, rng, miss: ("GET", f"/courses/{rng.choice(ids['reviewed_courses'])}/advice/stream",
+                                                  {"objective_grade": rng.choice(GRADES)}, None)),
+        "semester": ("GET /semester-advice",
+                     lambda ids, rng, miss: semester_request(ids, rng)),
+        "difficulty": ("GET /courses/{course_id}/difficulty-signals",
+                       lambda ids, rng, miss: ("GET", f"/courses/{rng.choice(ids['reviewed_courses'])}/difficulty-signals",
+                                               None, None)),
+        "create_score": ("POST /other-student-scores",
+                         lambda ids, rng, miss: ("POST", "/other-student-scores", None,
+                                                 {"evaluation_item_id": rng.choice(ids["items"]),
+                                                  "score": round(rng.uniform(30, 100), 1)})),
+        "create_review": ("POST /course-reviews",
+                          lambda ids, rng, miss: ("POST", "/course-reviews", None,
+                                                  {"course_id": rng.choice(ids["reviewed_courses"]),
+                                                   "content": f"부하 테스트 수강평 {rng.getrandbits(32)}: "
+                                                              f"{rng.choice(SEARCH_TERMS)} 관련 내용입니다.",
+                                                   "year": 2025, "semester": rng.choice([1, 2])})),
+        "update_profile": ("PUT /student-profile",
+                           lambda ids, rng, miss: ("PUT", "/student-profile", None,
+                                                   {"preferences": rng.choice(PREFERENCES)})),
+        "list_courses": ("GET /courses", lambda ids, rng, miss: ("GET", "/courses", None, None)),
+        "list_items": ("GET /evaluation-items", lambda ids, rng, miss: ("GET", "/evaluation-items", None, None)),
+        "list_reviews": ("GET /course-reviews", lambda ids, rng, miss: ("GET", "/course-reviews", None, None)),
+        "list_scores": ("GET /other-student-scores",
+                        lambda ids, rng, miss: ("GET", "/other-student-scores",
+                                                {"item_id": rng.choice(ids["items"])}, None)),
+        "search_reviews": ("GET /course-reviews/search",
+                           lambda ids, rng, miss: ("GET", "/course-reviews/search",
+                                                   {"q": rng.choice(SEARCH_TERMS)}, None)),
+        "profile": ("GET /student-profile", lambda ids, rng, miss: ("GET", "/student-profile", None, None)),
+}
+
+# 작업 부하별 요청 비율 (OPERATIONS 키: 가중치)
+WORKLOADS: Dict[str, Dict[str, int]] = {
+        "prediction-heavy": {"predict": 50, "cumulative": 35, "list_items": 10, "list_courses": 5},
+        "advice-heavy"    : {"advice": 45, "advice_grades": 15, "semester": 15, "advice_stream": 10,
+                             "difficulty": 10, "list_courses": 5},
+        "write-heavy"     : {"create_score": 45, "create_review": 15, "update_profile": 10, "list_scores": 15,
+                             "predict": 10, "list_reviews": 5},
+        "list-heavy"      : {"list_courses": 25, "list_items": 20, "list_reviews": 15, "list_scores": 20,
+                             "search_reviews": 15, "profile": 5},
+        "mixed"           : {"list_courses": 15, "list_items": 10, "list_scores": 10, "search_reviews": 5,
+                             "predict": 15, "cumulative": 10, "advice": 15, "advice_grades": 3, "semester": 3,
+                             "difficulty": 2, "create_score": 8, "create_review": 1, "update_profile": 1,
+                             "profile": 2},
+}
+
+
+def semester_request(ids: Dict[str, List[int]], rng: random.Random) -> Request:
+    """과목 2~4개와 목표 성적으로 학기 조언 요청을 만듭니다."""
+    courses = rng.sample(ids["reviewed_courses"], min(len(ids["reviewed_courses"]), rng.randint(2, 4)))
+    return "GET", "/semester-advice", {"course_ids": courses, "target_grades": [rng.choice(GRADES) for _ in courses]}, None
+
+
+# =============================================================================
+# 서버 실행
+# =============================================================================
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(url: str, process: Optional[subprocess.Popen], timeout: float = READY_TIMEOUT) -> None:
+    """url이 응답할 때까지 기다립니다 (프로세스가 먼저 종료되면 실패)."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise SystemExit(f"서버 프로세스가 종료되었습니다 (exit {process.returncode}): {url}")
+        try:
+            if httpx.get(url, timeout=2).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise SystemExit(f"{timeout:.0f}초 안에 서버가 응답하지 않았습니다: {url}")
+
+
+def start_process(args: List[str], env: dict, log_path: str) -> subprocess.Popen:
+    log = open(log_path, "w")
+    return subprocess.Popen(args, cwd=BASE_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+
+def stop_process(process: subprocess.Popen) -> None:
+    if process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+@contextmanager
+def local_stack(args: argparse.Namespace, run_dir: str):
+    """
+    테스트 DB, Redis 대역, OpenAI 대역과 API 서버를 띄우고 API 주소를 반환합니다.
+
+    Yields:
+        Tuple[str, str]: (API 서버 주소, 테스트 DB 경로)
+    """
+    db_path = prepare_database(args.db, run_dir)
+    if args.redis_url:
+        redis_url = urlparse(args.redis_url)
+        redis_host, redis_port = redis_url.hostname or "localhost", redis_url.port or 6379
+        redis_db = (redis_url.path or "/0").lstrip("/") or "0"
+    else:
+        redis_host, redis_port, redis_db = "127.0.0.1", FakeRedisServer(port=0).start_in_thread(), "0"
+
+    openai_port, api_port = free_port(), free_port()
+    base_env = {**os.environ, "PYTHONUNBUFFERED": "1"}
+    processes = []
+    try:
+        openai_env = {**base_env, "FAKE_OPENAI_LATENCY": str(args.openai_latency),
+                      "FAKE_OPENAI_JITTER": str(args.openai_jitter), "FAKE_OPENAI_ERROR_RATE": str(args.openai_error_rate)}
+        processes.append(start_process([sys.executable, "-m", "uvicorn", "benchmark.fake_openai:app",
+                                        "--port", str(openai_port), "--log-level", "warning"],
+                                       openai_env, os.path.join(run_dir, "fake_openai.log")))
+        api_env = {
+                **base_env,
+                "DB_PATH"             : db_path,
+                "REDIS_HOST"          : redis_host,
+                "REDIS_PORT"          : str(redis_port),
+                "REDIS_DB"            : redis_db,
+                "OPENAI_API_KEY"      : "benchmark",
+                "OPENAI_BASE_URL"     : f"http://127.0.0.1:{openai_port}/v1",
+                "CACHE_SQLITE_PATH"   : os.path.join(run_dir, "response_cache.db"),
+                "METRICS_DIR"         : os.path.join(run_dir, "metrics"),
+                "PROFILE_DIR"         : os.path.join(run_dir, "profiles"),
+                "TRACE_EXPORTER"      : "",
+                "ADVICE_PREWARM_TIMES": "",
+        }
+        processes.append(start_process([sys.executable, "-m", "uvicorn", "main:app", "--port", str(api_port),
+                                        "--workers", str(args.workers), "--log-level", "warning"],
+                                       api_env, os.path.join(run_dir, "api.log")))
+        wait_until_ready(f"http://127.0.0.1:{openai_port}/docs", processes[0])
+        wait_until_ready(f"http://127.0.0.1:{api_port}/health", processes[1])
+        yield f"http://127.0.0.1:{api_port}", db_path
+    finally:
+        for process in reversed(processes):
+            stop_process(process)
+
+
+# =============================================================================
+# 부하 생성 및 집계
+# =============================================================================
+
+async def send(client: httpx.AsyncClient, request: Request) -> int:
+    """요청을 보내고 응답 본문(스트리밍 포함)을 끝까지 읽은 뒤 상태 코드를 반환합니다 (실패 시 -1)."""
+    method, path, params, body = request
+    try:
+        async with client.stream(method, path, params=params, json=body) as response:
+            await response.aread()
+            return response.status_code
+    except httpx.HTTPError:
+        return -1
+
+
+async def virtual_user(client: httpx.AsyncClient, ids: Dict[str, List[int]], workload: Dict[str, int],
+                       rng: random.Random, miss_rate: float, measure_from: float, stop_at: float,
+                       samples: Dict[str, List[Tuple[float, int]]]) -> None:
+    """stop_at까지 작업 부하 비율대로 요청을 하나씩 보냅니다 (응답을 받은 뒤 다음 요청, 대기 없음)."""
+    names, weights = list(workload), list(workload.values())
+    while time.monotonic() < stop_at:
+        endpoint, build = OPERATIONS[rng.choices(names, weights)[0]]
+        started = time.monotonic()
+        status = await send(client, build(ids, rng, miss_rate))
+        if started >= measure_from:
+            samples.setdefault(endpoint, []).append(((time.monotonic() - started) * 1000, status))
+
+
+def summarize(values: List[Tuple[float, int]], duration: float) -> dict:
+    """(지연 시간 ms, 상태 코드) 목록의 처리량, 백분위, 오류율."""
+    latencies = np.array([latency for latency, _ in values])
+    errors = sum(1 for _, status in values if status < 0 or status >= 500)
+    client_errors = sum(1 for _, status in values if 400 <= status < 500)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+            "requests"     : len(values),
+            "throughput"   : round(len(values) / duration, 2),
+            "p50_ms"       : round(float(p50), 2),
+            "p95_ms"       : round(float(p95), 2),
+            "p99_ms"       : round(float(p99), 2),
+            "max_ms"       : round(float(latencies.max()), 2),
+            "errors"       : errors,
+            "error_rate"   : round(errors / len(values), 4),
+            "client_errors": client_errors,
+    }
+
+
+async def run_load(base_url: str, ids: Dict[str, List[int]], args: argparse.Namespace) -> dict:
+    """워밍업 후 --duration초 동안 측정한 엔드포인트별/전체 결과."""
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    samples: Dict[str, List[Tuple[float, int]]] = {}
+    async with httpx.AsyncClient(base_url=base_url, timeout=REQUEST_TIMEOUT, limits=limits) as client:
+        now = time.monotonic()
+        measure_from, stop_at = now + args.warmup, now + args.warmup + args.duration
+        await asyncio.gather(*(virtual_user(client, ids, WORKLOADS[args.workload], random.Random(args.seed + i),
+                                            args.advice_miss_rate, measure_from, stop_at, samples)
+                               for i in range(args.concurrency)))
+    if not samples:
+        raise SystemExit("측정 구간에 완료된 요청이 없습니다. --duration을 늘려 보세요.")
+    return {
+            "total"    : summarize([s for values in samples.values() for s in values], args.duration),
+            "endpoints": {endpoint: summarize(values, args.duration) for endpoint, values in sorted(samples.items())},
+    }
+
+
+# =============================================================================
+# 결과 저장 및 비교
+# =============================================================================
+
+def git_info() -> dict:
+    def git(*cmd: str) -> str:
+        try:
+            return subprocess.run(["git", *cmd], cwd=BASE_DIR, capture_output=True, text=True, timeout=30).stdout.strip()
+        except (OSError, subprocess.TimeoutExpired):
+            return ""
+    return {"commit": git("rev-parse", "--short", "HEAD") or "unknown",
+            "dirty": bool(git("status", "--porcelain", "--untracked-files=no", "--", ".", ":!hackathon.db"))}
+
+
+def environment_info() -> dict:
+    return {"python": platform.python_version(), "platform": platform.platform(), "cpu_count": os.cpu_count()}
+
+
+def print_report(result: dict) -> None:
+    print(f"\n{'endpoint':<48} {'reqs':>6} {'req/s':>8} {'p50_ms':>8} {'p95_ms':>8} {'p99_ms':>8} {'err%':>6} {'4xx':>5}")
+    rows = [*result["endpoints"].items(), ("TOTAL", result["total"])]
+    for endpoint, s in rows:
+        print(f"{endpoint:<48} {s['requests']:>6} {s['throughput']:>8.1f} {s['p50_ms']:>8.1f} {s['p95_ms']:>8.1f} "
+              f"{s['p99_ms']:>8.1f} {s['error_rate'] * 100:>6.2f} {s['client_errors']:>5}")
+
+
+def print_comparison(result: dict, baseline: dict) -> None:
+    """이전 결과 대비 엔드포인트별 처리량과 p95 변화율(%)을 출력합니다."""
+    def change(new: float, old: float) -> str:
+        return f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+
+    base_meta = baseline.get("meta", {})
+    print(f"\n비교 기준: {base_meta.get('git', {}).get('commit')} ({base_meta.get('timestamp')}, "
+          f"workload={base_meta.get('workload')})")
+    print(f"{'endpoint':<48} {'req/s':>16} {'p95_ms':>18} {'err%':>13}")
+    rows = [*result["endpoints"].items(), ("TOTAL", result["total"])]
+    for endpoint, s in rows:
+        old = baseline["total"] if endpoint == "TOTAL" else baseline.get("endpoints", {}).get(endpoint)
+        if old is None:
+            print(f"{endpoint:<48} {'(new)':>16}")
+            continue
+        print(f"{endpoint:<48} {s['throughput']:>8.1f} {change(s['throughput'], old['throughput']):>7} "
+              f"{s['p95_ms']:>9.1f} {change(s['p95_ms'], old['p95_ms']):>8} "
+              f"{s['error_rate'] * 100:>6.2f}/{old['error_rate'] * 100:<6.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="API 엔드투엔드 부하 테스트")
+    parser.add_argument("--workload", choices=sorted(WORKLOADS), default="mixed", help="작업 부하 종류")
+    parser.add_argument("--duration", type=float, default=30.0, help="측정 시간(초)")
+    parser.add_argument("--warmup", type=float, default=5.0, help="측정 전 워밍업 시간(초, 결과에서 제외)")
+    parser.add_argument("--concurrency", type=int, default=16, help="동시 가상 사용자 수")
+    parser.add_argument("--workers", type=int, default=2, help="uvicorn 워커 수 (Docker 배포와 같은 기본값)")
+    parser.add_argument("--openai-latency", type=float, default=1.0, help="OpenAI 대역 응답 지연(초)")
+    parser.add_argument("--openai-jitter", type=float, default=0.0, help="OpenAI 대역 지연에 더할 무작위 시간(초)")
+    parser.add_argument("--openai-error-rate", type=float, default=0.0, help="OpenAI 대역 500 오류 비율")
+    parser.add_argument("--advice-miss-rate", type=float, default=0.1, help="캐시를 우회하는 과목 조언 요청 비율")
+    parser.add_argument("--redis-url", default=None, help="Redis 대역 대신 사용할 Redis (예: redis://localhost:6379/15)")
+    parser.add_argument("--db", default=DB_NAME, help="복사해서 사용할 SQLite DB")
+    parser.add_argument("--base-url", default=None, help="이미 실행 중인 서버 주소 (지정하면 로컬 서버를 띄우지 않음)")
+    parser.add_argument("--seed", type=int, default=0, help="요청 순서 난수 시드")
+    parser.add_argument("--output", default=None, help="결과 JSON 경로 (기본값: benchmark/results/...)")
+    parser.add_argument("--compare", default=None, help="비교할 이전 결과 JSON")
+    parser.add_argument("--keep-run-dir", action="store_true", help="테스트 DB와 서버 로그 디렉터리를 남김")
+    args = parser.parse_args()
+
+    run_dir = tempfile.mkdtemp(prefix="realthon-load-")
+    try:
+        if args.base_url:
+            ids = load_ids(args.db)
+            wait_until_ready(f"{args.base_url}/health", None)
+            result = asyncio.run(run_load(args.base_url, ids, args))
+        else:
+            with local_stack(args, run_dir) as (base_url, db_path):
+                print(f"서버 준비 완료 ({base_url}, 로그: {run_dir}). {args.workload} 부하 "
+                      f"{args.warmup:.0f}+{args.duration:.0f}초 실행 중...")
+                result = asyncio.run(run_load(base_url, load_ids(db_path), args))
+    finally:
+        if args.keep_run_dir:
+            print(f"실행 디렉터리: {run_dir}")
+        else:
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+    git = git_info()
+    result = {
+            "meta": {
+                    "timestamp"  : time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "git"        : git,
+                    "workload"   : args.workload,
+                    "mix"        : WORKLOADS[args.workload],
+                    "options"    : {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+                    "environment": environment_info(),
+            },
+            **result,
+    }
+    print_report(result)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{git['commit']}"
+                                                      f"{'-dirty' if git['dirty'] else ''}-{args.workload}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print_comparison(result, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
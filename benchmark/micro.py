@@ -0,0 +1,277 @@
+"""
+모델 추론과 히스토그램 계산 마이크로 벤치마크.
+
+HTTP 부하 테스트(benchmark/load_test.py)와 별도로, 요청 하나 안에서 반복 실행되는 함수들의 실행 시간을
+측정하고 이전 결과(기준선)와 비교합니다. pytest-benchmark와 같은 방식(보정한 반복 횟수 × 여러 라운드,
+라운드별 시간의 중앙값으로 비교)을 외부 의존성 없이 구현했습니다.
+
+측정 대상:
+    - predict[n=..., threads=...]: HistogramPredictor.predict, 입력 점수 개수(1, 10, 100, 1k, 10k) × torch 스레드 수
+      (학습된 체크포인트가 없으면 같은 구조의 무작위 가중치 모델 사용, 실행 시간은 가중치와 무관)
+    - histogram_statistics[total_students=...]: main.calculate_histogram_statistics (학생 수만큼 점수 목록을 만듦)
+    - histogram_percentile[total_students=...]: main.histogram_percentile (예측/누적 히스토그램 엔드포인트의 백분위 계산)
+    - generate_class_scores, evaluate_on_synthetic_data[num_classes=...]: ML/model_loader.py의 검증용 합성 데이터 함수
+    - torch가 설치되지 않은 환경에서는 torch가 필요한 항목을 건너뜀
+
+결과:
+    - benchmark/results/micro-<시각>-<커밋>.json에 항목별 중앙값/최소/평균/표준편차(µs)와
+      환경 정보(Python, torch 버전과 스레드 수, CPU 모델과 SIMD 플래그) 저장
+    - --compare로 기준선과 비교하여 중앙값이 --threshold(기본 10%) 이상 느려진 항목이 있으면 종료 코드 1
+
+사용법:
+    python benchmark/micro.py
+    python benchmark/micro.py -k predict --threads 1,4
+    python benchmark/micro.py --compare benchmark/results/micro-<기준선>.json --threshold 0.15
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(BENCHMARK_DIR)
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+MODEL_PATH = os.path.join(BASE_DIR, "ML", "best_model_nnj359uw.pt")
+
+SET_SIZES = [1, 10, 100, 1000, 10000]
+TOTAL_STUDENTS = [30, 100, 1000, 10000]
+SIMD_FLAGS = ("sse4_2", "avx", "avx2", "fma", "avx512f", "avx512bw", "avx512_vnni", "avx512_bf16", "amx_tile",
+              "neon", "asimd", "sve")
+
+Case = Tuple[str, Callable[[], Callable[[], object]]]  # (이름, 측정할 함수를 준비하는 함수)
+
+
+# =============================================================================
+# 측정
+# =============================================================================
+
+def measure(fn: Callable[[], object], rounds: int, min_round_time: float) -> dict:
+    """
+    한 라운드가 min_round_time초 이상 걸리도록 반복 횟수를 정한 뒤 rounds번 측정합니다.
+
+    Returns:
+        dict: 호출 1회 기준 median_us, min_us, mean_us, stddev_us와 rounds, loops
+    """
+    fn()  # 워밍업 (지연 초기화, 캐시)
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_round_time:
+            break
+        loops = max(loops * 2, int(loops * min_round_time / max(elapsed, 1e-9)))
+
+    times = [elapsed / loops]
+    for _ in range(rounds - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        times.append((time.perf_counter() - start) / loops)
+    return {
+            "median_us": round(statistics.median(times) * 1e6, 3),
+            "min_us"   : round(min(times) * 1e6, 3),
+            "mean_us"  : round(statistics.mean(times) * 1e6, 3),
+            "stddev_us": round(statistics.stdev(times) * 1e6, 3) if len(times) > 1 else 0.0,
+            "rounds"   : rounds,
+            "loops"    : loops,
+    }
+
+
+# =============================================================================
+# 측정 대상
+# =============================================================================
+
+def sample_histogram(total_students: int) -> dict:
+    """정규분포(평균 70, 표준편차 15) 모양의 학생 수 히스토그램."""
+    centers = np.arange(5, 100, 10)
+    weights = np.exp(-0.5 * ((centers - 70) / 15) ** 2)
+    counts = np.round(weights / weights.sum() * total_students).astype(int)
+    return {f"{b}-{b + 10}": int(c) for b, c in zip(range(0, 100, 10), counts)}
+
+
+def load_main(run_dir: str):
+    """
+    main.py를 임시 DB/캐시 경로로 가져옵니다 (가져올 때 실행되는 스키마 보정이 원본 DB를 바꾸지 않도록).
+    """
+    shutil.copyfile(os.path.join(BASE_DIR, "hackathon.db"), os.path.join(run_dir, "hackathon.db"))
+    os.environ.update(DB_PATH=os.path.join(run_dir, "hackathon.db"), CACHE_BACKENDS="sqlite",
+                      CACHE_SQLITE_PATH=os.path.join(run_dir, "response_cache.db"),
+                      METRICS_DIR=os.path.join(run_dir, "metrics"), TRACE_EXPORTER="")
+    sys.path.insert(0, BASE_DIR)
+    import main
+    return main
+
+
+def load_predictor(run_dir: str):
+    """학습된 체크포인트로, 없으면 같은 구조의 무작위 가중치 체크포인트를 만들어 HistogramPredictor를 만듭니다."""
+    import torch
+    from ML.model_loader import FlexibleHistogramPredictor, HistogramPredictor
+
+    path = MODEL_PATH
+    if not os.path.exists(path):
+        config = {"hidden_dim": 64, "num_heads": 4, "num_inducers": 16, "dropout": 0.1}
+        model = FlexibleHistogramPredictor(num_bins=10, **config)
+        path = os.path.join(run_dir, "random_model.pt")
+        torch.save({"config": config, "model_state_dict": model.state_dict(), "val_loss": 0.0, "epoch": 0}, path)
+        print("⚠ Trained checkpoint not found. Using randomly initialized weights (same architecture).")
+    return HistogramPredictor(model_path=path, device="cpu")
+
+
+def build_cases(threads: List[int], run_dir: str) -> List[Case]:
+    main = load_main(run_dir)
+    cases: List[Case] = []
+
+    for total in TOTAL_STUDENTS:
+        histogram = sample_histogram(total)
+        cases.append((f"histogram_statistics[total_students={total}]",
+                      lambda h=histogram: lambda: main.calculate_histogram_statistics(h)))
+        cases.append((f"histogram_percentile[total_students={total}]",
+                      lambda h=histogram, t=total: lambda: main.histogram_percentile(h, 73.5, t)))
+
+    try:
+        import torch
+    except ImportError:
+        print("⚠ torch not installed. Skipping predict / generate_class_scores / evaluate_on_synthetic_data.")
+        return cases
+
+    from ML.model_loader import evaluate_on_synthetic_data, generate_class_scores
+    predictor = load_predictor(run_dir)
+    rng = np.random.default_rng(0)
+
+    def with_threads(count: int, fn: Callable[[], object]) -> Callable[[], object]:
+        torch.set_num_threads(count)
+        return fn
+
+    for n in SET_SIZES:
+        scores = np.clip(rng.normal(70, 15, n), 0, 100).tolist()
+        for count in threads:
+            cases.append((f"predict[n={n},threads={count}]",
+                          lambda s=scores, c=count: with_threads(c, lambda: predictor.predict(s, total_students=99))))
+
+    cases.append(("generate_class_scores", lambda: generate_class_scores))
+    cases.append(("evaluate_on_synthetic_data[num_classes=20]",
+                  lambda: with_threads(threads[0], lambda: evaluate_on_synthetic_data(predictor, num_classes=20))))
+    return cases
+
+
+# =============================================================================
+# 환경 정보 및 비교
+# =============================================================================
+
+def environment_info() -> dict:
+    info = {"python": platform.python_version(), "platform": platform.platform(), "machine": platform.machine(),
+            "cpu_count": os.cpu_count(), "numpy": np.__version__}
+    try:
+        with open("/proc/cpuinfo") as f:
+            cpuinfo = f.read()
+        model = next((line.split(":", 1)[1].strip() for line in cpuinfo.splitlines() if line.startswith("model name")), None)
+        flags = next((line.split(":", 1)[1].split() for line in cpuinfo.splitlines()
+                      if line.startswith(("flags", "Features"))), [])
+        info.update(cpu_model=model, cpu_flags=[flag for flag in SIMD_FLAGS if flag in flags])
+    except OSError:
+        info.update(cpu_model=platform.processor() or None, cpu_flags=[])
+    try:
+        import torch
+        info.update(torch=torch.__version__, torch_threads=torch.get_num_threads(),
+                    torch_interop_threads=torch.get_num_interop_threads(),
+                    mkldnn=torch.backends.mkldnn.is_available())
+    except ImportError:
+        info.update(torch=None)
+    return info
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True,
+                              text=True, timeout=30).stdout.strip() or "unknown"
+    except (OSError, subprocess.TimeoutExpired):
+        return "unknown"
+
+
+def compare(results: Dict[str, dict], environment: dict, baseline: dict, threshold: float) -> List[str]:
+    """기준선 대비 중앙값 변화를 출력하고 threshold 이상 느려진 항목 이름을 반환합니다."""
+    base_results = baseline.get("results", {})
+    base_env, env_changes = baseline.get("environment", {}), []
+    for key in ("cpu_model", "torch", "torch_threads", "python"):
+        if key in base_env and base_env.get(key) != environment.get(key):
+            env_changes.append(f"{key}: {base_env.get(key)} → {environment.get(key)}")
+    print(f"\n기준선: {baseline.get('commit')} ({baseline.get('timestamp')}), 회귀 기준 +{threshold * 100:.0f}%")
+    if env_changes:
+        print("⚠ 환경이 다릅니다: " + ", ".join(env_changes))
+    print(f"{'case':<48} {'base_us':>12} {'now_us':>12} {'change':>8}")
+    regressions = []
+    for name, result in results.items():
+        old = base_results.get(name)
+        if old is None:
+            print(f"{name:<48} {'(new)':>12} {result['median_us']:>12.2f}")
+            continue
+        ratio = result["median_us"] / old["median_us"] if old["median_us"] else 1.0
+        marker = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            marker = "  ✗ regression"
+        elif ratio < 1 - threshold:
+            marker = "  ✓ faster"
+        print(f"{name:<48} {old['median_us']:>12.2f} {result['median_us']:>12.2f} {(ratio - 1) * 100:>+7.1f}%{marker}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="모델 추론 / 히스토그램 계산 마이크로 벤치마크")
+    parser.add_argument("-k", dest="keyword", default=None, help="이름에 이 문자열이 포함된 항목만 실행")
+    parser.add_argument("--threads", default="1,2,4", help="predict를 측정할 torch 스레드 수 (쉼표 구분)")
+    parser.add_argument("--rounds", type=int, default=7, help="항목별 측정 라운드 수")
+    parser.add_argument("--min-round-time", type=float, default=0.1, help="라운드당 최소 측정 시간(초)")
+    parser.add_argument("--output", default=None, help="결과 JSON 경로 (기본값: benchmark/results/micro-...)")
+    parser.add_argument("--compare", default=None, help="비교할 기준선 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=0.10, help="회귀로 판단할 중앙값 증가 비율")
+    args = parser.parse_args()
+
+    random.seed(0)
+    np.random.seed(0)
+    threads = [int(t) for t in args.threads.split(",") if t.strip()]
+    run_dir = tempfile.mkdtemp(prefix="realthon-micro-")
+    try:
+        cases = [case for case in build_cases(threads, run_dir) if not args.keyword or args.keyword in case[0]]
+        results: Dict[str, dict] = {}
+        print(f"\n{'case':<48} {'median_us':>12} {'min_us':>12} {'stddev_us':>12} {'loops':>8}")
+        for name, prepare in cases:
+            results[name] = measure(prepare(), args.rounds, args.min_round_time)
+            r = results[name]
+            print(f"{name:<48} {r['median_us']:>12.2f} {r['min_us']:>12.2f} {r['stddev_us']:>12.2f} {r['loops']:>8}")
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+    commit = git_commit()
+    environment = environment_info()
+    report = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": commit,
+              "environment": environment, "results": results}
+    output = args.output or os.path.join(RESULTS_DIR, f"micro-{time.strftime('%Y%m%d-%H%M%S')}-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, environment, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n✗ {len(regressions)}개 항목이 기준선보다 {args.threshold * 100:.0f}% 이상 느려졌습니다.")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
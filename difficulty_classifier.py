@@ -0,0 +1,551 @@
+"""
+수강평 난이도 로컬 분류기 모듈.
+
+label_reviews.py가 LLM으로 추출해 course_review_labels에 저장한 라벨을 학습 데이터로 삼아,
+글자 n-gram TF-IDF + 선형(소프트맥스) 모델로 수강평별 난이도를 네트워크 호출 없이 예측합니다.
+과목 수강평을 한 번에 벡터화해 수강평당 수백 µs 이하로 채점하고 예측을 내용별로 캐시하므로(이후 1µs 내외),
+라벨이 부족한 과목도 요청 중에 난이도를 집계할 수 있습니다.
+
+모델 구성:
+    - 특징: 정규화한 수강평의 글자 NGRAM_RANGE n-gram, 문서 빈도 상위 MAX_FEATURES개
+      (부분 선형 TF × 평활 IDF, L2 정규화)
+    - 분류: REVIEW_LABEL_FIELDS 항목마다 6개 클래스(0 = 언급 없음, 1~5) 소프트맥스 회귀
+      (NumPy 전체 배치 경사 하강 + L2 정규화)
+    - 저장: ML/difficulty_classifier.npz (어휘, IDF, 가중치, 학습 시 검증 일치율)
+
+LLM이 여전히 필요한 경우 (predict_course_signals가 None 반환):
+    - 항목별 확신도(최대 클래스 확률)가 MIN_CONFIDENCE 이상인 수강평 비율이 MIN_CONFIDENT_SHARE 미만
+    - 과제/시험 난이도를 언급한 것으로 확신하는 수강평이 MIN_MENTIONS개 미만
+    - 학습 시 검증 세트의 과제/시험 난이도 ±1 일치율이 MIN_AGREEMENT 미만인 모델
+
+사용법:
+    python difficulty_classifier.py train            # 라벨로 학습 후 검증 일치율 출력 및 저장
+    python difficulty_classifier.py report           # 저장된 모델과 LLM 라벨의 일치율 보고
+    python difficulty_classifier.py bench            # 수강평/과목 단위 예측 속도 측정
+
+    from difficulty_classifier import load_classifier
+    classifier = load_classifier()
+    signals = classifier.predict_course_signals(["과제가 많고 시험은 어려워요", ...])
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from advice_prompts import REVIEW_LABEL_FIELDS
+
+# =============================================================================
+# 경로 및 상수 설정
+# =============================================================================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_NAME = os.path.join(BASE_DIR, "hackathon.db")
+MODEL_PATH = os.path.join(BASE_DIR, "ML", "difficulty_classifier.npz")
+
+NGRAM_RANGE = (2, 4)  # 공백을 포함한 음절 n-gram (어절 경계 정보 유지)
+MAX_FEATURES = 30000
+MIN_DF = 2
+NUM_CLASSES = 6  # 0 = 언급 없음, 1~5 = 라벨 값
+
+EPOCHS = 60
+LEARNING_RATE = 4.0  # 특징이 L2 정규화되어 있어 큰 학습률에서도 안정적
+L2 = 1e-4
+VALIDATION_RATIO = 0.2
+
+MIN_CONFIDENCE = 0.5  # 이 이상의 확률로 예측한 수강평만 집계
+MIN_CONFIDENT_SHARE = 0.5
+MIN_MENTIONS = 3
+MIN_AGREEMENT = 0.7
+
+PREDICTION_CACHE_SIZE = 20000  # 수강평 내용별 예측 캐시 크기
+
+_NORMALIZE_RE = re.compile(r"[^0-9a-z가-힣]+")
+
+
+# =============================================================================
+# 특징 추출
+# =============================================================================
+
+def normalize(text: str) -> str:
+    """소문자로 바꾸고 한글·영문·숫자 이외의 문자를 공백 하나로 합칩니다."""
+    return f" {_NORMALIZE_RE.sub(' ', (text or '').lower()).strip()} "
+
+
+def ngram_keys(texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    수강평 여러 개의 글자 n-gram을 정수 키로 한 번에 변환합니다.
+
+    정규화 후 남는 문자는 모두 U+FFFF 이하이므로 코드 포인트를 16비트씩 이어 붙이면
+    길이 4 이하의 n-gram을 uint64 하나로 충돌 없이 표현할 수 있습니다.
+    수강평을 하나의 배열로 이어 붙여 NumPy 연산 몇 번으로 계산하고, 수강평 경계를 넘는 n-gram은 버립니다.
+
+    Args:
+        texts: 수강평 원문 리스트
+
+    Returns:
+        (n-gram별 수강평 인덱스 배열, n-gram 키 배열)
+    """
+    normalized = [normalize(t) for t in texts]
+    codes = np.frombuffer("".join(normalized).encode("utf-16-le"), dtype=np.uint16).astype(np.uint64)
+    doc = np.repeat(np.arange(len(texts)), [len(t) for t in normalized])
+
+    docs, keys = [], []
+    key = codes
+    for n in range(2, NGRAM_RANGE[1] + 1):
+        if len(codes) < n:
+            break
+        key = key[:-1] | (codes[n - 1:] << np.uint64(16 * (n - 1)))
+        if n >= NGRAM_RANGE[0]:
+            inside = doc[:len(key)] == doc[n - 1:]
+            docs.append(doc[:len(key)][inside])
+            keys.append(key[inside])
+
+    if not keys:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint64)
+    return np.concatenate(docs), np.concatenate(keys)
+
+
+def build_vocabulary(texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    학습 수강평에서 어휘와 IDF를 만듭니다.
+
+    Args:
+        texts: 학습 수강평 리스트
+
+    Returns:
+        ([특징 수] 정렬된 n-gram 키 배열, [특징 수] IDF 배열)
+    """
+    docs, keys = ngram_keys(texts)
+    order = np.lexsort((docs, keys))
+    docs, keys = docs[order], keys[order]
+    first = np.r_[True, (keys[1:] != keys[:-1]) | (docs[1:] != docs[:-1])]  # 수강평마다 한 번만 집계
+
+    keys, df = np.unique(keys[first], return_counts=True)
+    keys, df = keys[df >= MIN_DF], df[df >= MIN_DF]
+    if len(keys) > MAX_FEATURES:
+        top = np.sort(np.argsort(-df, kind="stable")[:MAX_FEATURES])
+        keys, df = keys[top], df[top]
+
+    idf = (np.log((1 + len(texts)) / (1 + df)) + 1).astype(np.float32)
+    return keys, idf
+
+
+class SparseMatrix:
+    """행 순으로 정렬된 COO 형식 희소 행렬 (scipy 없이 학습/예측하기 위한 최소 구현)."""
+
+    def __init__(self, row: np.ndarray, col: np.ndarray, val: np.ndarray, shape: Tuple[int, int]):
+        self.row, self.col, self.val = row, col, val
+        self.shape = shape
+        self._col_order = None  # X.T @ G 계산용 열 기준 정렬 (학습 시에만 필요)
+
+    @staticmethod
+    def _segment_sum(values: np.ndarray, sorted_keys: np.ndarray, size: int) -> np.ndarray:
+        """정렬된 sorted_keys가 같은 구간끼리 values 행을 더해 [size, 열 수] 배열에 채웁니다."""
+        out = np.zeros((size, values.shape[1]), dtype=values.dtype)
+        if len(sorted_keys):
+            starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+            out[sorted_keys[starts]] = np.add.reduceat(values, starts, axis=0)
+        return out
+
+    def dot(self, weights: np.ndarray) -> np.ndarray:
+        """X @ W ([행 수, 열 수])"""
+        return self._segment_sum(weights[self.col] * self.val[:, None], self.row, self.shape[0])
+
+    def t_dot(self, grad: np.ndarray) -> np.ndarray:
+        """X.T @ G ([특징 수, 열 수])"""
+        if self._col_order is None:
+            self._col_order = np.argsort(self.col, kind="stable")
+        order = self._col_order
+        return self._segment_sum(grad[self.row[order]] * self.val[order, None], self.col[order], self.shape[1])
+
+
+def vectorize(texts: Sequence[str], vocabulary: np.ndarray, idf: np.ndarray) -> SparseMatrix:
+    """
+    수강평 여러 개를 희소 TF-IDF 행렬로 변환합니다.
+
+    Args:
+        texts: 수강평 원문 리스트
+        vocabulary: build_vocabulary의 정렬된 n-gram 키 배열
+        idf: IDF 배열
+
+    Returns:
+        [수강평 수, 특징 수] 행별 L2 정규화된 SparseMatrix (어휘에 없는 n-gram만 있는 행은 0)
+    """
+    num_features = len(vocabulary)
+    docs, keys = ngram_keys(texts)
+    if num_features and len(keys):
+        positions = np.minimum(np.searchsorted(vocabulary, keys), num_features - 1)
+        found = vocabulary[positions] == keys
+        docs, features = docs[found], positions[found]
+    else:
+        docs, features = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    pairs, counts = np.unique(docs * max(1, num_features) + features, return_counts=True)
+    rows, cols = np.divmod(pairs, max(1, num_features))
+    values = (1 + np.log(counts.astype(np.float32))) * idf[cols]
+    norms = np.sqrt(np.bincount(rows, weights=values ** 2, minlength=len(texts))).astype(np.float32)
+    return SparseMatrix(rows, cols, values / norms[rows], (len(texts), num_features))
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+def train_softmax(X: SparseMatrix, labels: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    항목별 소프트맥스 회귀를 모멘텀 전체 배치 경사 하강으로 함께 학습합니다.
+
+    Args:
+        X: 학습 특징 행렬
+        labels: [행 수, 항목 수] 클래스 레이블 (0~NUM_CLASSES-1)
+
+    Returns:
+        ([특징 수, 항목 수, 클래스 수] 가중치, [항목 수, 클래스 수] 편향)
+    """
+    num_rows, num_features = X.shape
+    num_fields = labels.shape[1]
+    weights = np.zeros((num_features, num_fields * NUM_CLASSES), dtype=np.float32)
+    # 클래스 빈도로 편향 초기화
+    bias = np.log(np.stack([np.bincount(labels[:, f], minlength=NUM_CLASSES) for f in range(num_fields)]) + 1.0)
+    targets = np.eye(NUM_CLASSES, dtype=np.float32)[labels]
+    velocity_w = np.zeros_like(weights)
+    velocity_b = np.zeros_like(bias)
+
+    for _ in range(EPOCHS):
+        logits = X.dot(weights).reshape(num_rows, num_fields, NUM_CLASSES) + bias
+        grad = ((_softmax(logits) - targets) / num_rows).astype(np.float32)
+        velocity_w = 0.9 * velocity_w - LEARNING_RATE * (X.t_dot(grad.reshape(num_rows, -1)) + L2 * weights)
+        velocity_b = 0.9 * velocity_b - LEARNING_RATE * grad.sum(axis=0)
+        weights += velocity_w
+        bias += velocity_b
+
+    return weights.reshape(num_features, num_fields, NUM_CLASSES), bias
+
+
+# =============================================================================
+# 분류기
+# =============================================================================
+
+class DifficultyClassifier:
+    """REVIEW_LABEL_FIELDS 항목별 소프트맥스 분류기 묶음."""
+
+    def __init__(self, vocabulary: np.ndarray, idf: np.ndarray, weights: np.ndarray, bias: np.ndarray,
+                 metrics: Optional[dict] = None):
+        """
+        Args:
+            vocabulary: [특징 수] 정렬된 n-gram 키 배열
+            idf: [특징 수] IDF 배열
+            weights: [특징 수, 항목 수, 클래스 수] 가중치
+            bias: [항목 수, 클래스 수] 편향
+            metrics: 학습 시 검증 세트 일치율 (agreement_report 결과)
+        """
+        self.vocabulary = vocabulary
+        self.idf = idf.astype(np.float32)
+        self.weights = weights.astype(np.float32)
+        self.bias = bias.astype(np.float32)
+        self.metrics = metrics or {}
+        self._flat_weights = self.weights.reshape(len(vocabulary), -1)
+        self._cache: Dict[str, np.ndarray] = {}
+
+    @property
+    def is_reliable(self) -> bool:
+        """검증 세트에서 과제/시험 난이도 ±1 일치율이 MIN_AGREEMENT 이상인지 여부."""
+        return all(self.metrics.get(field, {}).get("within_one", 0.0) >= MIN_AGREEMENT
+                   for field in ("assignment_difficulty", "exam_difficulty"))
+
+    def predict_proba_many(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        수강평 여러 개의 항목별 클래스 확률을 한 번에 예측합니다.
+
+        이미 예측한 수강평은 내용 문자열 기준 캐시(최대 PREDICTION_CACHE_SIZE개)에서 가져오고
+        나머지만 모아 한 번에 벡터화합니다. 결과는 캐시를 한 번 읽은 값과 이번 예측값으로 만들므로
+        여러 스레드(스레드풀의 엔드포인트)가 동시에 호출해 캐시가 비워져도 안전합니다.
+
+        Args:
+            texts: 수강평 원문 리스트
+
+        Returns:
+            [수강평 수, 항목 수, NUM_CLASSES] 확률 배열 (클래스 0 = 언급 없음)
+        """
+        texts = [t or "" for t in texts]
+        if not texts:
+            return np.empty((0, *self.bias.shape), dtype=np.float32)
+        found: Dict[str, np.ndarray] = {}
+        for text in dict.fromkeys(texts):
+            cached = self._cache.get(text)
+            if cached is not None:
+                found[text] = cached
+        missing = [text for text in dict.fromkeys(texts) if text not in found]
+        if missing:
+            X = vectorize(missing, self.vocabulary, self.idf)
+            probs = _softmax(X.dot(self._flat_weights).reshape(len(missing), *self.bias.shape) + self.bias)
+            found.update(zip(missing, probs))
+            if len(self._cache) + len(missing) > PREDICTION_CACHE_SIZE:
+                self._cache.clear()
+            self._cache.update(zip(missing, probs))
+        return np.stack([found[t] for t in texts])
+
+    def predict_proba(self, text: str) -> np.ndarray:
+        """수강평 하나의 항목별 클래스 확률 ([항목 수, NUM_CLASSES])을 예측합니다."""
+        return self.predict_proba_many([text])[0]
+
+    def clear_cache(self) -> None:
+        """예측 캐시를 비웁니다."""
+        self._cache.clear()
+
+    def predict(self, text: str) -> Dict[str, Optional[int]]:
+        """수강평 하나의 항목별 라벨(1~5, 언급 없음은 None)을 예측합니다."""
+        classes = self.predict_proba(text).argmax(axis=1)
+        return {field: (int(c) or None) for field, c in zip(REVIEW_LABEL_FIELDS, classes)}
+
+    def predict_course_signals(self, texts: Sequence[str]) -> Optional[dict]:
+        """
+        과목 수강평 전체를 채점해 항목별 평균을 집계합니다.
+
+        확신도가 MIN_CONFIDENCE 미만인 예측은 집계에서 제외하고,
+        모듈 설명의 조건에 해당하면 None을 반환하여 LLM이 난이도를 추출하도록 합니다.
+
+        Args:
+            texts: 과목 수강평 원문 리스트
+
+        Returns:
+            {labeled_reviews, 항목별 평균} 딕셔너리 또는 None
+        """
+        if not texts or not self.is_reliable:
+            return None
+
+        probs = self.predict_proba_many(texts)  # [수강평 수, 항목 수, 클래스 수]
+        classes = probs.argmax(axis=2)
+        confident = probs.max(axis=2) >= MIN_CONFIDENCE
+
+        confident_reviews = int(confident.all(axis=1).sum())
+        if confident_reviews < MIN_CONFIDENT_SHARE * len(texts):
+            return None
+
+        signals = {"labeled_reviews": confident_reviews}
+        for f, field in enumerate(REVIEW_LABEL_FIELDS):
+            mentioned = classes[confident[:, f] & (classes[:, f] > 0), f]
+            if field in ("assignment_difficulty", "exam_difficulty") and len(mentioned) < MIN_MENTIONS:
+                return None
+            signals[field] = float(mentioned.mean()) if len(mentioned) else None
+        return signals
+
+    def save(self, path: str = MODEL_PATH) -> None:
+        """모델을 .npz 파일로 저장합니다."""
+        import json
+
+        np.savez_compressed(
+                path,
+                vocabulary=self.vocabulary,
+                idf=self.idf,
+                weights=self.weights,
+                bias=self.bias,
+                fields=np.array(REVIEW_LABEL_FIELDS),
+                metrics=np.array(json.dumps(self.metrics)),
+        )
+
+
+def load_classifier(path: str = MODEL_PATH) -> Optional[DifficultyClassifier]:
+    """
+    저장된 분류기를 불러옵니다.
+
+    Returns:
+        DifficultyClassifier (파일이 없거나 라벨 항목이 현재 REVIEW_LABEL_FIELDS와 다르면 None)
+    """
+    import json
+
+    if not os.path.exists(path):
+        return None
+    data = np.load(path)
+    if list(data["fields"]) != list(REVIEW_LABEL_FIELDS):
+        return None
+    return DifficultyClassifier(data["vocabulary"], data["idf"], data["weights"], data["bias"],
+                                json.loads(str(data["metrics"])))
+
+
+# =============================================================================
+# 학습 및 평가
+# =============================================================================
+
+def fetch_labeled_reviews(conn: sqlite3.Connection) -> Tuple[List[int], List[str], np.ndarray]:
+    """
+    LLM 라벨이 있는 수강평을 조회합니다.
+
+    Returns:
+        (course_id 리스트, 수강평 리스트, [수강평 수, 항목 수] 클래스 배열 (NULL → 0))
+    """
+    rows = conn.execute(f'''
+                        SELECT r.course_id, r.content, {", ".join(f"l.{f}" for f in REVIEW_LABEL_FIELDS)}
+                        FROM course_reviews r
+                                 JOIN course_review_labels l ON l.review_id = r.id
+                        WHERE r.content IS NOT NULL
+                        ORDER BY r.id
+                        ''').fetchall()
+    labels = np.array([[value or 0 for value in row[2:]] for row in rows], dtype=np.int64)
+    labels = labels.reshape(-1, len(REVIEW_LABEL_FIELDS))
+    return [row[0] for row in rows], [row[1] for row in rows], labels
+
+
+def fit(texts: Sequence[str], labels: np.ndarray) -> DifficultyClassifier:
+    """수강평과 LLM 라벨로 분류기를 학습합니다."""
+    vocabulary, idf = build_vocabulary(texts)
+    X = vectorize(texts, vocabulary, idf)
+    weights, bias = train_softmax(X, labels)
+    return DifficultyClassifier(vocabulary, idf, weights, bias)
+
+
+def agreement_report(classifier: DifficultyClassifier, course_ids: Sequence[int], texts: Sequence[str],
+                     labels: np.ndarray) -> dict:
+    """
+    분류기 예측과 LLM 라벨의 일치율을 계산합니다.
+
+    항목별 지표:
+        - mention_agreement: 언급 여부(NULL/값) 일치율
+        - exact: 둘 다 값이 있는 수강평에서 값 일치율
+        - within_one: 둘 다 값이 있는 수강평에서 차이가 1 이하인 비율
+        - course_mae: 과목별 평균 난이도의 절대 오차 평균
+        - coverage: 확신도 MIN_CONFIDENCE 이상으로 예측한 수강평 비율
+
+    Returns:
+        {항목: 지표 딕셔너리}
+    """
+    probs = classifier.predict_proba_many(texts)
+    predicted = probs.argmax(axis=2)
+    confident = probs.max(axis=2) >= MIN_CONFIDENCE
+    course_ids = np.asarray(course_ids)
+
+    report = {}
+    for f, field in enumerate(REVIEW_LABEL_FIELDS):
+        truth, pred = labels[:, f], predicted[:, f]
+        both = (truth > 0) & (pred > 0)
+        course_errors = []
+        for course_id in np.unique(course_ids):
+            in_course = course_ids == course_id
+            truth_values = truth[in_course & (truth > 0)]
+            pred_values = pred[in_course & (pred > 0)]
+            if len(truth_values) and len(pred_values):
+                course_errors.append(abs(truth_values.mean() - pred_values.mean()))
+
+        report[field] = {
+                "mention_agreement": float(((truth > 0) == (pred > 0)).mean()),
+                "exact"            : float((truth[both] == pred[both]).mean()) if both.any() else 0.0,
+                "within_one"       : float((abs(truth[both] - pred[both]) <= 1).mean()) if both.any() else 0.0,
+                "course_mae"       : float(np.mean(course_errors)) if course_errors else None,
+                "coverage"         : float(confident[:, f].mean()),
+                "samples"          : int(len(truth)),
+        }
+    return report
+
+
+def print_report(report: dict) -> None:
+    """agreement_report 결과를 표로 출력합니다."""
+    print(f"{'field':<22} {'mention':>8} {'exact':>7} {'±1':>7} {'course_mae':>10} {'coverage':>9} {'n':>6}")
+    for field, m in report.items():
+        course_mae = f"{m['course_mae']:.2f}" if m["course_mae"] is not None else "-"
+        print(f"{field:<22} {m['mention_agreement']:>8.2%} {m['exact']:>7.2%} {m['within_one']:>7.2%} "
+              f"{course_mae:>10} {m['coverage']:>9.2%} {m['samples']:>6}")
+
+
+def _split(num_rows: int) -> Tuple[np.ndarray, np.ndarray]:
+    """고정 시드로 학습/검증 인덱스를 나눕니다."""
+    order = np.random.default_rng(42).permutation(num_rows)
+    num_valid = int(num_rows * VALIDATION_RATIO)
+    return np.sort(order[num_valid:]), np.sort(order[:num_valid])
+
+
+# =============================================================================
+# 메인 함수
+# =============================================================================
+
+def main() -> None:
+    """학습(train), 일치율 보고(report), 속도 측정(bench)을 실행합니다."""
+    parser = argparse.ArgumentParser(description="수강평 난이도 로컬 분류기")
+    parser.add_argument("command", choices=["train", "report", "bench"])
+    parser.add_argument("--db", default=DB_NAME, help="SQLite 데이터베이스 경로")
+    parser.add_argument("--model", default=MODEL_PATH, help="모델 파일 경로")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        course_ids, texts, labels = fetch_labeled_reviews(conn)
+        course_texts: Dict[int, List[str]] = {}
+        for course_id, content in conn.execute("SELECT course_id, content FROM course_reviews WHERE content IS NOT NULL"):
+            course_texts.setdefault(course_id, []).append(content)
+    finally:
+        conn.close()
+
+    if args.command == "train":
+        if len(texts) < 50:
+            print(f"❌ 라벨링된 수강평이 {len(texts)}개뿐입니다. label_reviews.py를 먼저 실행하세요.")
+            return
+
+        train_idx, valid_idx = _split(len(texts))
+        print(f"🧠 학습 시작... (학습 {len(train_idx)}개, 검증 {len(valid_idx)}개)")
+        start = time.perf_counter()
+        classifier = fit([texts[i] for i in train_idx], labels[train_idx])
+        print(f"   ...학습 완료 ({time.perf_counter() - start:.1f}초, 특징 {len(classifier.vocabulary)}개)")
+
+        metrics = agreement_report(classifier, [course_ids[i] for i in valid_idx], [texts[i] for i in valid_idx],
+                                   labels[valid_idx])
+        print_report(metrics)
+
+        # 검증 지표를 기록한 뒤 전체 라벨로 다시 학습해 저장
+        classifier = fit(texts, labels)
+        classifier.metrics = metrics
+        classifier.save(args.model)
+        status = "사용 가능" if classifier.is_reliable else f"±1 일치율 {MIN_AGREEMENT:.0%} 미만 → 조언 API는 LLM 사용"
+        print(f"✅ 모델 저장 완료: {args.model} ({status})")
+        return
+
+    classifier = load_classifier(args.model)
+    if classifier is None:
+        print(f"❌ 모델 파일이 없습니다: {args.model} (python difficulty_classifier.py train)")
+        return
+
+    if args.command == "report":
+        print("📊 저장된 모델 vs LLM 라벨 (전체 라벨, 학습 데이터 포함)")
+        print_report(agreement_report(classifier, course_ids, texts, labels))
+        print("📊 학습 시 검증 세트")
+        print_report(classifier.metrics)
+        return
+
+    all_texts = [text for contents in course_texts.values() for text in contents]
+
+    # bench: 캐시를 비운 상태(cold)와 채운 상태(warm)의 수강평 단위/일괄 예측 시간
+    timings = {}
+    for mode in ("single", "batch"):
+        classifier.clear_cache()
+        for state in ("cold", "warm"):
+            start = time.perf_counter()
+            if mode == "single":
+                for text in all_texts:
+                    classifier.predict_proba(text)
+            else:
+                classifier.predict_proba_many(all_texts)
+            timings[mode, state] = (time.perf_counter() - start) / max(1, len(all_texts)) * 1e6
+    print(f"⏱ 수강평 {len(all_texts)}개 (µs/개): "
+          f"하나씩 cold {timings['single', 'cold']:.1f} / warm {timings['single', 'warm']:.2f}, "
+          f"일괄 cold {timings['batch', 'cold']:.1f} / warm {timings['batch', 'warm']:.2f}")
+
+    print(f"{'course_id':>9} {'reviews':>8} {'cold_ms':>8} {'warm_ms':>8}  signals")
+    for course_id, contents in sorted(course_texts.items()):
+        classifier.clear_cache()
+        start = time.perf_counter()
+        signals = classifier.predict_course_signals(contents)
+        cold_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        classifier.predict_course_signals(contents)
+        warm_ms = (time.perf_counter() - start) * 1000
+        summary = "LLM 필요" if signals is None else ", ".join(
+                f"{field}={signals[field]:.2f}" for field in REVIEW_LABEL_FIELDS if signals[field] is not None)
+        print(f"{course_id:>9} {len(contents):>8} {cold_ms:>8.2f} {warm_ms:>8.2f}  {summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+학기 노력 배분 로컬 계산 모듈.
+
+학기 계획의 과목별 effort_percent는 수치 배분 문제이므로 LLM 대신 결정적인 규칙으로 계산합니다.
+같은 입력에는 항상 같은 결과를 내며, 과목 수와 관계없이 합이 정확히 100인 정수를 수십 µs 안에 반환합니다.
+
+과목별 수요(demand) = 남은 평가 비중 × 난이도 계수 × 목표 격차 계수
+    - 남은 평가 비중: evaluation_items 중 아직 제출하지 않은 항목과 등록되지 않은 나머지(100 - weight 합)의 비율
+    - 난이도 계수: 0.5 + (난이도 - 1) / 4, 난이도는 과제/시험 난이도와 분량(1~5)의 평균 (없으면 3)
+    - 목표 격차 계수: 0.2 + clamp(목표 백분위 - 현재 백분위 + 0.5, 0, 1.5)
+        - 목표 백분위: 목표 성적을 받기 위해 넘어야 하는 학급 내 비율 (GRADE_PERCENTILES, 상대평가 근사)
+        - 현재 백분위: 제출한 항목의 my_score가 점수 분포(예측 히스토그램 또는 다른 학생 점수)에서
+          차지하는 백분위의 weight 가중 평균 (제출한 점수가 없으면 0.5)
+
+배분 결과는 수요에 비례하도록 최대 잔여(largest remainder) 방식으로 정수화합니다.
+모든 과목의 수요가 0이면 (남은 평가가 없으면) 균등 배분합니다.
+
+사용법:
+    from effort_allocation import allocate_effort
+    efforts = allocate_effort([
+            {"grade": "A+", "difficulty": {"assignment_difficulty": 4, "exam_difficulty": 3},
+             "items": [{"weight": 30, "submitted": True, "percentile": 0.6}, {"weight": 70, "submitted": False}]},
+            {"grade": "B0", "difficulty": None, "items": []},
+    ])  # -> [55, 45]
+
+    # 과목 수별 계산 시간 확인
+    python effort_allocation.py
+"""
+
+import time
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Sequence
+
+# =============================================================================
+# 상수 설정
+# =============================================================================
+# 목표 성적을 받기 위해 넘어야 하는 학급 내 백분위 (0~1)
+GRADE_PERCENTILES = {
+        "A+": 0.85, "A0": 0.70, "A-": 0.65, "A": 0.70,
+        "B+": 0.55, "B0": 0.40, "B-": 0.35, "B": 0.40,
+        "C+": 0.25, "C0": 0.15, "C-": 0.12, "C": 0.15,
+        "D+": 0.08, "D0": 0.05, "D-": 0.03, "D": 0.05,
+        "F" : 0.0, "P": 0.10,
+}
+DIFFICULTY_FIELDS = ["assignment_difficulty", "exam_difficulty", "workload"]
+DEFAULT_DIFFICULTY = 3.0
+DEFAULT_PERCENTILE = 0.5
+
+
+# =============================================================================
+# 점수 분포 백분위
+# =============================================================================
+
+def percentile_in_samples(samples: Sequence[float], score: float) -> Optional[float]:
+    """
+    점수 표본에서 score의 백분위(0~1)를 계산합니다. 동점은 절반으로 셉니다.
+
+    Args:
+        samples: 정렬된 점수 리스트
+        score: 내 점수
+
+    Returns:
+        백분위 (표본이 없으면 None)
+    """
+    if not samples:
+        return None
+    below = bisect_left(samples, score)
+    ties = bisect_right(samples, score) - below
+    return (below + ties / 2) / len(samples)
+
+
+def percentile_in_histogram(histogram: dict, score: float) -> Optional[float]:
+    """
+    "0-10": count 형식 히스토그램에서 score의 백분위(0~1)를 계산합니다 (구간 내부는 선형 보간).
+
+    Returns:
+        백분위 (히스토그램이 비어 있으면 None)
+    """
+    total = sum(histogram.values())
+    if total <= 0:
+        return None
+    below = 0.0
+    for bin_range, count in histogram.items():
+        bin_start, bin_end = (float(x) for x in bin_range.split("-"))
+        if score >= bin_end:
+            below += count
+        elif score > bin_start:
+            below += count * (score - bin_start) / (bin_end - bin_start)
+    return min(1.0, below / total)
+
+
+# =============================================================================
+# 배분 계산
+# =============================================================================
+
+def course_difficulty(difficulty: Optional[dict]) -> float:
+    """과제/시험 난이도와 분량(1~5) 중 값이 있는 항목의 평균 (없으면 DEFAULT_DIFFICULTY)."""
+    values = [difficulty[field] for field in DIFFICULTY_FIELDS if difficulty and difficulty.get(field) is not None]
+    return sum(values) / len(values) if values else DEFAULT_DIFFICULTY
+
+
+def remaining_weight(items: List[dict]) -> float:
+    """
+    아직 제출하지 않은 평가 비중 (0~1).
+
+    weight는 백분율이므로 등록된 항목의 합이 100보다 작으면 나머지(예: 아직 등록하지 않은 기말고사)도 남은 비중으로 봅니다.
+    """
+    total = sum(item["weight"] for item in items)
+    unlisted = max(0, 100 - total)
+    return (sum(item["weight"] for item in items if not item.get("submitted")) + unlisted) / max(100, total)
+
+
+def current_percentile(items: List[dict]) -> float:
+    """제출한 평가 항목 백분위의 weight 가중 평균 (백분위가 있는 항목이 없으면 DEFAULT_PERCENTILE)."""
+    scored = [(item["weight"], item["percentile"]) for item in items
+              if item.get("submitted") and item.get("percentile") is not None]
+    total = sum(weight for weight, _ in scored)
+    if total <= 0:
+        return DEFAULT_PERCENTILE
+    return sum(weight * percentile for weight, percentile in scored) / total
+
+
+def course_demand(course: dict) -> float:
+    """
+    과목 하나의 노력 수요를 계산합니다.
+
+    Args:
+        course: {"grade": 목표 성적, "difficulty": 난이도 딕셔너리 또는 None,
+                 "items": [{"weight", "submitted", "percentile"(0~1 또는 None)}]}
+
+    Returns:
+        0 이상의 수요 값 (남은 평가가 없으면 0)
+    """
+    items = course.get("items") or []
+    target = GRADE_PERCENTILES.get(course.get("grade"), DEFAULT_PERCENTILE)
+    gap = min(1.5, max(0.0, target - current_percentile(items) + 0.5))
+    difficulty = 0.5 + (course_difficulty(course.get("difficulty")) - 1) / 4
+    return remaining_weight(items) * difficulty * (0.2 + gap)
+
+
+def allocate_integers(weights: List[float], total: int = 100) -> List[int]:
+    """
+    weights에 비례하면서 합이 정확히 total인 정수 리스트를 반환합니다 (최대 잔여 방식).
+
+    잔여가 같으면 앞 순서를 우선하므로 결과가 결정적입니다. 모든 weight가 0이면 균등 배분합니다.
+    """
+    if not weights:
+        return []
+    weight_sum = sum(weights)
+    if weight_sum <= 0:
+        weights, weight_sum = [1.0] * len(weights), float(len(weights))
+
+    quotas = [w * total / weight_sum for w in weights]
+    result = [int(q) for q in quotas]
+    order = sorted(range(len(quotas)), key=lambda i: (result[i] - quotas[i], i))
+    for i in order[:total - sum(result)]:
+        result[i] += 1
+    return result
+
+
+def allocate_effort(courses: List[dict]) -> List[int]:
+    """
+    과목별 노력 배분 비율(%)을 계산합니다.
+
+    Args:
+        courses: course_demand 입력 형식의 과목 리스트
+
+    Returns:
+        courses 순서의 effort_percent 리스트 (0~100 정수, 합계 100)
+    """
+    return allocate_integers([course_demand(course) for course in courses])
+
+
+def summarize_allocation(names: List[str], efforts: List[int]) -> str:
+    """LLM 없이 배분 결과를 설명하는 overall_advice 문장을 생성합니다."""
+    ranked = sorted(zip(names, efforts), key=lambda pair: -pair[1])
+    parts = ", ".join(f"{name} {effort}%" for name, effort in ranked)
+    return f"남은 평가 비중과 난이도, 목표 성적까지의 격차를 고려해 {parts} 순으로 학습 시간을 배분하세요."
+
+
+# =============================================================================
+# 메인 함수 (계산 시간 확인)
+# =============================================================================
+
+def main() -> None:
+    """과목 수별 allocate_effort 호출 시간을 출력합니다."""
+    grades = list(GRADE_PERCENTILES)
+    for num_courses in [3, 6, 10]:
+        courses = [{
+                "grade"     : grades[i % len(grades)],
+                "difficulty": {"assignment_difficulty": 1 + i % 5, "exam_difficulty": 5 - i % 5, "workload": 3},
+                "items"     : [{"weight": 20, "submitted": j < 2, "percentile": 0.1 * (i + j) % 1} for j in range(5)],
+        } for i in range(num_courses)]
+        repeat = 10000
+        start = time.perf_counter()
+        for _ in range(repeat):
+            efforts = allocate_effort(courses)
+        elapsed_us = (time.perf_counter() - start) / repeat * 1e6
+        print(f"{num_courses:>3} courses: {elapsed_us:7.1f} µs/call  {efforts} (sum {sum(efforts)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,21 +5,43 @@ CSV 데이터 임포트 모듈.
 CSV 파일의 학수번호를 기준으로 강의를 생성하거나 기존 강의에 수강평을 추가합니다.
 
 입력 파일 형식:
-    - CSV 파일 (UTF-8-BOM 인코딩 지원)
-    - 필수 컬럼: course_code, review
+    - CSV 파일 (UTF-8-BOM 인코딩 지원), 여러 파일 또는 크롤러 출력 디렉터리(*.csv) 지정 가능
+    - 필수 컬럼: review, course_code (없으면 --course-code 또는 파일명 앞의 학수번호 사용, 예: cose341_klue_reviews.csv)
     - 선택 컬럼: professor, lecture_id, year, semester
 
+처리 방식:
+    - 파일별 CSV 파싱은 --workers개 프로세스에서 병렬로 수행하고, DB 입력은 메인 프로세스 하나가 담당
+      (워커는 --chunk-size 행씩 파싱하는 대로 보내므로 큰 파일도 전체를 메모리에 올리지 않음)
+    - 학수번호 -> 과목 ID는 시작 시 한 번 읽은 메모리 맵으로 변환 (처음 보는 학수번호만 과목 생성)
+    - 수강평은 --chunk-size 행씩 executemany로 입력하고 전체를 하나의 트랜잭션으로 커밋 (synchronous=OFF)
+    - (course_id, content_hash) 유니크 인덱스와 INSERT OR IGNORE로 중복 수강평을 건너뛰므로 같은 파일을
+      다시 임포트해도 아무것도 추가되지 않음
+
 사용법:
-    python import_csv.py
+    python import_csv.py                              # crawling/klue_reviews_multi.csv
+    python import_csv.py crawling/                    # 디렉터리의 모든 CSV
+    python import_csv.py a.csv b.csv --workers 4 --chunk-size 5000
+    python import_csv.py reviews.csv --course-code COSE341
 
 주의사항:
     - init_db.py를 먼저 실행하여 데이터베이스를 초기화해야 합니다.
-    - CSV 파일 경로: crawling/klue_reviews_multi.csv
+    - content_hash 컬럼이 없는 기존 DB는 처음 실행할 때 컬럼을 추가하고 기존 수강평의 해시를 채웁니다
+      (이미 중복으로 들어간 수강평은 첫 번째 행에만 해시를 채우고 삭제하지 않음).
 """
 
+import argparse
 import csv
-import sqlite3
+import glob
 import os
+import re
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Manager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from label_reviews import content_hash
+from review_recency import ensure_columns, parse_term
 
 # =============================================================================
 # 경로 및 상수 설정
@@ -38,103 +60,282 @@ COURSE_NAME_MAP = {
         "COSE389": "기업가정신과리더십",
 }
 
+DEFAULT_CHUNK_SIZE = 5000
+
+# 과목별 수강평 중복 판정 인덱스 (content_hash가 NULL인 행은 중복 판정 대상이 아님)
+CREATE_CONTENT_HASH_INDEX_SQL = ("CREATE UNIQUE INDEX IF NOT EXISTS idx_course_reviews_content_hash "
+                                 "ON course_reviews (course_id, content_hash)")
+
+# 파일명 앞의 학수번호 (예: cose341_klue_reviews.csv -> COSE341)
+_FILENAME_CODE_RE = re.compile(r"^([A-Za-z]{4}\d{3})(?:_|\.|$)")
+
+ParsedRow = Tuple[str, str, Optional[int], Optional[int], str]  # (course_code, content, year, semester, hash)
+
 
 # =============================================================================
-# 메인 함수
+# 스키마
 # =============================================================================
 
-def import_data() -> None:
+def add_content_hash(conn: sqlite3.Connection) -> int:
     """
-    CSV 파일에서 수강평 데이터를 읽어 데이터베이스에 저장합니다.
+    course_reviews에 content_hash 컬럼과 유니크 인덱스가 없으면 추가하고, 해시가 비어 있는 수강평을 채웁니다
+    (커밋하지 않음, migrations.py용).
 
-    이 함수는 다음 작업을 수행합니다:
-        1. CSV 파일 존재 여부 확인
-        2. UTF-8-BOM 인코딩으로 CSV 파일 읽기
-        3. 각 행에 대해:
-           - 학수번호로 기존 강의 조회 또는 새 강의 생성
-           - 수강평을 course_reviews 테이블에 저장
+    POST /course-reviews는 수강평을 저장할 때 같은 해시를 기록하므로, 해시가 비어 있는 행은 컬럼 추가 전에 저장된 수강평입니다.
+    과목 안에서 내용이 같은 행이 이미 여러 개면 가장 먼저 들어간 행에만 해시를 채웁니다.
+
+    Returns:
+        해시를 새로 채운 수강평 수
+    """
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(course_reviews)")}
+    if "content_hash" not in existing:
+        conn.execute("ALTER TABLE course_reviews ADD COLUMN content_hash TEXT")
+    conn.execute(CREATE_CONTENT_HASH_INDEX_SQL)
+
+    seen = {(course_id, h) for course_id, h in conn.execute(
+            "SELECT course_id, content_hash FROM course_reviews WHERE content_hash IS NOT NULL")}
+    updates = []
+    for review_id, course_id, content in conn.execute(
+            "SELECT id, course_id, content FROM course_reviews WHERE content_hash IS NULL ORDER BY id"):
+        key = (course_id, content_hash((content or "").strip()))
+        if key not in seen:
+            seen.add(key)
+            updates.append((key[1], review_id))
+    conn.executemany("UPDATE course_reviews SET content_hash = ? WHERE id = ?", updates)
+    return len(updates)
+
+
+def ensure_content_hash(conn: sqlite3.Connection) -> int:
+    """
+    add_content_hash 후 커밋합니다.
+
+    Returns:
+        해시를 새로 채운 수강평 수
+    """
+    backfilled = add_content_hash(conn)
+    conn.commit()
+    return backfilled
+
+
+# =============================================================================
+# CSV 파싱 (워커 프로세스)
+# =============================================================================
+
+def collect_csv_files(paths: List[str]) -> List[str]:
+    """파일과 디렉터리 목록을 CSV 파일 목록으로 펼칩니다 (디렉터리는 *.csv, 이름순)."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.csv"))))
+        else:
+            files.append(path)
+    return files
+
+
+def parse_file(path: str, default_course_code: Optional[str] = None,
+               chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[List[ParsedRow], int]]:
+    """
+    CSV 파일 하나를 읽어 입력할 행을 chunk_size개씩 돌려줍니다 (파일 전체를 메모리에 올리지 않음).
+
+    Args:
+        path: CSV 파일 경로
+        default_course_code: course_code 컬럼이 없거나 비어 있을 때 사용할 학수번호
+            (None이면 파일명 앞의 학수번호, 그것도 없으면 해당 행을 건너뜀)
+        chunk_size: 한 번에 돌려줄 행 수
+
+    Yields:
+        (변환된 행 목록, 그 사이에 건너뛴 행 수)
 
     Raises:
-        파일이 없거나 필수 컬럼이 없는 경우 에러 메시지를 출력하고 종료합니다.
+        ValueError: review 컬럼이 없는 경우
+    """
+    if default_course_code is None:
+        match = _FILENAME_CODE_RE.match(os.path.basename(path))
+        default_course_code = match.group(1).upper() if match else None
 
-    Note:
-        - 빈 course_code나 review는 건너뜁니다.
-        - 100개 단위로 진행 상황을 출력합니다.
+    rows: List[ParsedRow] = []
+    skipped = 0
+    # encoding='utf-8-sig': 엑셀/윈도우 저장 시 생기는 BOM 문자(\ufeff) 제거
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f, skipinitialspace=True)
+        if not reader.fieldnames or "review" not in reader.fieldnames:
+            raise ValueError(f"'review' 컬럼을 찾을 수 없습니다 (감지된 컬럼: {reader.fieldnames})")
+        for row in reader:
+            course_code = (row.get("course_code") or "").strip() or default_course_code
+            content = (row.get("review") or "").strip()
+            if not course_code or not content:
+                skipped += 1
+                continue
+            year, semester = parse_term(row.get("year"), row.get("semester"))
+            rows.append((course_code, content, year, semester, content_hash(content)))
+            if len(rows) >= chunk_size:
+                yield rows, skipped
+                rows, skipped = [], 0
+    if rows or skipped:
+        yield rows, skipped
+
+
+def _parse_file_to_queue(queue, index: int, path: str, default_course_code: Optional[str], chunk_size: int) -> None:
+    """워커 프로세스: parse_file의 청크를 (파일 번호, 행 목록, 건너뛴 행 수)로 큐에 넣고, 끝나면 (파일 번호, None, 0)을 넣습니다."""
+    try:
+        for rows, skipped in parse_file(path, default_course_code, chunk_size):
+            queue.put((index, rows, skipped))
+    finally:
+        queue.put((index, None, 0))
+
+
+def iter_parsed_chunks(files: List[str], default_course_code: Optional[str], workers: int,
+                       chunk_size: int) -> Iterator[Tuple[int, Optional[List[ParsedRow]], int]]:
+    """
+    파일들을 workers개 프로세스에서 파싱하며, 파싱된 청크를 도착하는 대로 돌려줍니다.
+
+    큐 크기를 워커 수의 2배로 제한하므로 DB 입력이 느리면 워커가 기다립니다 (메모리에는 최대 몇 청크만 유지).
+    workers가 1이면 메인 프로세스에서 파일 순서대로 파싱합니다.
+
+    Yields:
+        (파일 번호, 행 목록, 건너뛴 행 수), 파일이 끝나면 (파일 번호, None, 0)
+
+    Raises:
+        ValueError: review 컬럼이 없는 파일이 있는 경우 (해당 파일이 끝난 시점에 발생)
     """
-    if not os.path.exists(CSV_FILE):
-        print(f"❌ 오류: 파일을 찾을 수 없습니다.")
-        print(f"   👉 경로: {CSV_FILE}")
+    if workers <= 1:
+        for index, path in enumerate(files):
+            for rows, skipped in parse_file(path, default_course_code, chunk_size):
+                yield index, rows, skipped
+            yield index, None, 0
         return
 
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
+    # Manager를 먼저 종료해야 큐에 넣으려고 기다리던 워커가 끝나고 executor 종료가 멈추지 않음
+    with ProcessPoolExecutor(workers) as executor, Manager() as manager:
+        queue = manager.Queue(maxsize=workers * 2)
+        futures = [executor.submit(_parse_file_to_queue, queue, index, path, default_course_code, chunk_size)
+                   for index, path in enumerate(files)]
+        pending = len(files)
+        while pending:
+            index, rows, skipped = queue.get()
+            if rows is None:
+                pending -= 1
+                futures[index].result()  # 워커에서 발생한 예외를 다시 발생
+            yield index, rows, skipped
+
+
+# =============================================================================
+# 메인 함수
+# =============================================================================
+
+def resolve_course_ids(conn: sqlite3.Connection, course_ids: Dict[str, int], codes: List[str]) -> None:
+    """course_ids 맵에 없는 학수번호의 과목을 생성하고 맵에 추가합니다 (기본 수강생 99명)."""
+    for code in dict.fromkeys(codes):
+        if code not in course_ids:
+            cursor = conn.execute("INSERT INTO courses (name, course_code, total_students) VALUES (?, ?, 99)",
+                                  (COURSE_NAME_MAP.get(code, code), code))
+            course_ids[code] = cursor.lastrowid
+            print(f"🆕 새 강의 추가: {COURSE_NAME_MAP.get(code, code)} ({code})")
+
+
+def import_data(paths: Optional[List[str]] = None, db_name: str = DB_NAME, workers: Optional[int] = None,
+                chunk_size: int = DEFAULT_CHUNK_SIZE, course_code: Optional[str] = None) -> Dict[str, float]:
+    """
+    CSV 파일들에서 수강평 데이터를 읽어 데이터베이스에 저장합니다.
+
+    이 함수는 다음 작업을 수행합니다:
+        1. content_hash 컬럼/유니크 인덱스 확인 및 기존 수강평 해시 채우기
+        2. 학수번호 -> 과목 ID 맵 로드
+        3. 파일별 CSV 파싱 (workers개 프로세스 병렬, chunk_size 행씩 메인 프로세스로 전달)
+        4. 도착한 청크부터 INSERT OR IGNORE (중복 수강평 건너뜀)
+        5. 전체 입력을 한 번에 커밋
+
+    Args:
+        paths: CSV 파일 또는 디렉터리 목록 (기본값: crawling/klue_reviews_multi.csv)
+        db_name: 데이터베이스 파일 경로
+        workers: 파싱 프로세스 수 (기본값: min(파일 수, CPU 수), 1이면 메인 프로세스에서 파싱)
+        chunk_size: 워커가 한 번에 보내고 executemany 한 번에 넣는 행 수
+        course_code: course_code 컬럼이 없는 CSV에 사용할 학수번호
+
+    Returns:
+        파일 수, 읽은 행 수, 추가/중복/건너뛴 행 수, 소요 시간(초), 초당 처리 행 수
 
-    print(f"📥 CSV 데이터 삽입 시작... (파일: {os.path.basename(CSV_FILE)})")
+    Raises:
+        FileNotFoundError: CSV 파일이 없는 경우
+    """
+    files = collect_csv_files(paths or [CSV_FILE])
+    missing = [path for path in files if not os.path.exists(path)]
+    if missing or not files:
+        raise FileNotFoundError(f"CSV 파일을 찾을 수 없습니다: {', '.join(missing) or paths}")
+    workers = max(1, min(workers or os.cpu_count() or 1, len(files)))
 
+    started = time.perf_counter()
+    conn = sqlite3.connect(db_name)
+    stats = {"files": len(files), "rows": 0, "inserted": 0, "duplicates": 0, "skipped": 0}
     try:
-        # [핵심 수정] encoding='utf-8-sig': 엑셀/윈도우 저장 시 생기는 BOM 문자(\ufeff) 제거
-        with open(CSV_FILE, newline='', encoding='utf-8-sig') as f:
-            # 헤더의 앞뒤 공백 제거 (skipinitialspace=True)
-            reader = csv.DictReader(f, skipinitialspace=True)
-
-            # 헤더(컬럼명) 확인용 (디버깅)
-            headers = reader.fieldnames
-            print(f"ℹ️  감지된 컬럼: {headers}")
-
-            # 필수 컬럼이 있는지 검사
-            if not headers or 'course_code' not in headers:
-                print("❌ 'course_code' 컬럼을 찾을 수 없습니다!")
-                print("   👉 CSV 파일의 첫 번째 줄이 'course_code,professor,...' 형식인지 확인해주세요.")
-                return
-
-            count = 0
-            for row in reader:
-                # 딕셔너리 키 접근 시 공백 제거 처리
-                course_code = row.get('course_code', '').strip()
-                review_content = row.get('review', '').strip()
-
-                if not course_code or not review_content:
-                    continue
+        ensure_columns(conn)
+        backfilled = ensure_content_hash(conn)
+        if backfilled:
+            print(f"🔑 기존 수강평 {backfilled}개의 content_hash를 채웠습니다.")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA cache_size = -65536")  # 64MB
+        course_ids = dict(conn.execute("SELECT course_code, id FROM courses WHERE course_code IS NOT NULL"))
 
-                # 강의명 매핑
-                course_name = COURSE_NAME_MAP.get(course_code, course_code)
-
-                # 1. 강의 존재 여부 확인 (학수번호 기준)
-                cursor.execute("SELECT id FROM courses WHERE course_code = ?", (course_code,))
-                result = cursor.fetchone()
-
-                if result:
-                    course_id = result[0]
-                else:
-                    # 2. 없으면 새로 생성 (기본 수강생 99명)
-                    # print(f"🆕 새 강의 추가: {course_name} ({course_code})")
-                    cursor.execute('''
-                                   INSERT INTO courses (name, course_code, total_students)
-                                   VALUES (?, ?, 99)
-                                   ''', (course_name, course_code))
-                    course_id = cursor.lastrowid
-
-                # 3. 리뷰 데이터 삽입
-                cursor.execute('''
-                               INSERT INTO course_reviews (course_id, content)
-                               VALUES (?, ?)
-                               ''', (course_id, review_content))
-
-                count += 1
-
-                if count % 100 == 0:
-                    print(f"   ...{count}개 처리 중")
-
-        conn.commit()
-        print(f"✅ 총 {count}개의 리뷰 처리 완료!")
-
-    except Exception as e:
-        print(f"❌ 오류 발생: {e}")
-        import traceback
-        traceback.print_exc()
+        print(f"📥 CSV 데이터 삽입 시작... (파일 {len(files)}개, 파싱 워커 {workers}개)")
+        chunks = iter_parsed_chunks(files, course_code, workers, chunk_size)
+        file_stats = [{"rows": 0, "inserted": 0, "skipped": 0} for _ in files]  # 파일별 진행 상황 출력용
+        try:
+            conn.execute("BEGIN")
+            for index, rows, skipped in chunks:
+                counts = file_stats[index]
+                if rows is None:
+                    print(f"   ...{os.path.basename(files[index])}: {counts['rows']}개 중 {counts['inserted']}개 추가, "
+                          f"건너뜀 {counts['skipped']}개")
+                    continue
+                resolve_course_ids(conn, course_ids, [row[0] for row in rows])
+                cursor = conn.executemany(
+                        "INSERT OR IGNORE INTO course_reviews (course_id, content, year, semester, content_hash) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        [(course_ids[code], content, year, semester, h) for code, content, year, semester, h in rows])
+                counts["rows"] += len(rows)
+                counts["inserted"] += cursor.rowcount
+                counts["skipped"] += skipped
+                stats["rows"] += len(rows) + skipped
+                stats["inserted"] += cursor.rowcount
+                stats["duplicates"] += len(rows) - cursor.rowcount
+                stats["skipped"] += skipped
+            conn.commit()
+        finally:
+            chunks.close()
+    except Exception:
+        conn.rollback()
+        raise
     finally:
         conn.close()
 
+    stats["seconds"] = time.perf_counter() - started
+    stats["rows_per_second"] = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="크롤링한 수강평 CSV를 DB에 임포트 (중복 수강평은 건너뜀)")
+    parser.add_argument("paths", nargs="*", help="CSV 파일 또는 디렉터리 (기본값: crawling/klue_reviews_multi.csv)")
+    parser.add_argument("--db", default=DB_NAME, help="데이터베이스 파일 경로")
+    parser.add_argument("--workers", type=int, default=None, help="CSV 파싱 프로세스 수 (기본값: min(파일 수, CPU 수))")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="executemany 한 번에 넣는 행 수")
+    parser.add_argument("--course-code", default=None, help="course_code 컬럼이 없는 CSV에 사용할 학수번호")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"❌ 오류: '{args.db}' 파일을 찾을 수 없습니다. init_db.py를 먼저 실행해주세요.")
+        return
+    try:
+        stats = import_data(args.paths, args.db, args.workers, args.chunk_size, args.course_code)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ 오류: {e}")
+        return
+
+    print(f"✅ 총 {stats['rows']:,}개 행 처리 완료! (추가 {stats['inserted']:,}개, 중복 {stats['duplicates']:,}개, "
+          f"건너뜀 {stats['skipped']:,}개)")
+    print(f"⏱️ {stats['seconds']:.2f}s, {stats['rows_per_second']:,.0f} rows/s")
+
 
 if __name__ == "__main__":
-    import_data()
+    main()
@@ -9,7 +9,14 @@
     - courses: 강의 정보 (id, name, course_code, total_students)
     - evaluation_items: 평가 항목 (id, course_id, name, weight, my_score, is_submitted)
     - other_student_scores: 다른 학생들의 점수 데이터 (id, evaluation_item_id, score)
-    - course_reviews: 강의 수강평 (id, course_id, content)
+    - course_reviews: 강의 수강평 (id, course_id, content, year, semester, content_hash),
+      (course_id, year, semester) 인덱스, (course_id, content_hash) 유니크 인덱스
+    - course_review_digests / course_review_digest_chunks: 수강평 요약 (review_digest.py가 채움)
+    - course_review_labels: 수강평별 난이도 라벨 (label_reviews.py가 채움)
+    - course_reviews_fts: 수강평 전문 검색 색인 (FTS5 trigram, 트리거로 course_reviews와 동기화)
+    - schema_migrations: 적용된 마이그레이션 버전 (migrations.py, 조회 인덱스 포함)
+
+기존 DB를 지우지 않고 최신 스키마로 올리려면 init_db.py 대신 migrations.py를 실행합니다.
 
 사용법:
     python init_db.py
@@ -18,11 +25,18 @@
 import sqlite3
 import os
 
+from import_csv import CREATE_CONTENT_HASH_INDEX_SQL
+from label_reviews import CREATE_TABLE_SQL as CREATE_LABEL_TABLE_SQL
+from migrations import migrate
+from review_digest import CREATE_TABLES_SQL as CREATE_DIGEST_TABLES_SQL
+from review_recency import CREATE_INDEX_SQL as CREATE_REVIEW_TERM_INDEX_SQL
+from review_search import CREATE_INDEX_SQL as CREATE_REVIEW_SEARCH_SQL
+
 # 데이터베이스 파일명 상수
 DB_NAME = "hackathon.db"
 
 
-def init_db() -> None:
+def init_db(db_name: str = DB_NAME) -> None:
     """
     데이터베이스를 초기화하고 테이블 스키마를 생성합니다.
 
@@ -32,17 +46,24 @@ def init_db() -> None:
         3. 외래 키 제약조건 활성화
         4. 5개의 테이블 생성 (student_profile, courses, evaluation_items,
            other_student_scores, course_reviews)
+        5. 수강평 요약 테이블 생성 (course_review_digests, course_review_digest_chunks)
+        6. 수강평 라벨 테이블 생성 (course_review_labels)
+        7. 수강평 검색 색인과 동기화 트리거 생성 (course_reviews_fts)
+        8. migrations.py의 마이그레이션 적용 (조회 인덱스, 학수번호 유니크 인덱스)
+
+    Args:
+        db_name: 생성할 데이터베이스 파일 경로 (기본값: hackathon.db)
 
     Note:
         이 함수를 실행하면 기존 데이터가 모두 삭제됩니다.
         프로덕션 환경에서는 주의해서 사용해야 합니다.
     """
     # 기존 파일 삭제 (스키마 변경 적용)
-    if os.path.exists(DB_NAME):
-        os.remove(DB_NAME)
-        print(f"🗑️ 기존 {DB_NAME} 파일을 삭제했습니다.")
+    if os.path.exists(db_name):
+        os.remove(db_name)
+        print(f"🗑️ 기존 {db_name} 파일을 삭제했습니다.")
 
-    conn = sqlite3.connect(DB_NAME)
+    conn = sqlite3.connect(db_name)
     cursor = conn.cursor()
     cursor.execute("PRAGMA foreign_keys = ON;")
 
@@ -160,6 +181,12 @@ def init_db() -> None:
                        NULL,
                        content
                        TEXT,
+                       year
+                       INTEGER, -- 작성 연도 (예: 2025)
+                       semester
+                       INTEGER, -- 작성 학기 (1, 2)
+                       content_hash
+                       TEXT,    -- 내용 해시 (import_csv.py 중복 판정)
                        FOREIGN
                        KEY
                    (
@@ -171,9 +198,26 @@ def init_db() -> None:
                        )
                    ''')
 
+    cursor.execute(CREATE_REVIEW_TERM_INDEX_SQL)
+    cursor.execute(CREATE_CONTENT_HASH_INDEX_SQL)
+
+    # 6. Course Review Digests (review_digest.py)
+    for sql in CREATE_DIGEST_TABLES_SQL:
+        cursor.execute(sql)
+
+    # 7. Course Review Labels (label_reviews.py)
+    cursor.execute(CREATE_LABEL_TABLE_SQL)
+
+    # 8. Course Review Search (review_search.py, FTS5 + 동기화 트리거)
+    for sql in CREATE_REVIEW_SEARCH_SQL:
+        cursor.execute(sql)
+
     conn.commit()
+
+    # 9. 인덱스 등 나머지 스키마 (migrations.py, 최신 버전으로 기록)
+    migrate(conn)
     conn.close()
-    print(f"🎉 '{DB_NAME}' 파일 생성 및 스키마 업데이트 완료! (심플 버전)")
+    print(f"🎉 '{db_name}' 파일 생성 및 스키마 업데이트 완료! (심플 버전)")
 
 
 if __name__ == "__main__":
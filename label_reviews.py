@@ -0,0 +1,261 @@
+"""
+수강평별 난이도 라벨 일괄 추출 모듈.
+
+조언 요청마다 LLM이 수강평 원문에서 난이도를 다시 추론하지 않도록,
+course_reviews의 각 행에 구조화된 라벨을 한 번만 추출해 course_review_labels 테이블에 저장합니다.
+AI 조언 엔드포인트는 이 라벨을 SQL로 집계해 난이도를 계산하고 LLM은 요약/조언 문장에만 사용합니다.
+
+추출 항목 (1~5 정수, 언급이 없으면 NULL):
+    - assignment_difficulty: 과제 난이도
+    - exam_difficulty: 시험 난이도
+    - workload: 과제/공부 분량
+    - grading_leniency: 채점/학점 관대함
+
+동작 방식:
+    - 라벨이 없거나 내용이 바뀐(content_hash 불일치) 수강평만 BATCH_SIZE개씩 묶어 요청
+    - asyncio.Semaphore로 동시 요청 수를 --concurrency 이하로 제한
+    - 배치가 끝날 때마다 커밋하므로 중단 후 다시 실행하면 남은 수강평부터 이어서 처리
+    - 실패한 배치는 지수 백오프로 재시도하고, 끝내 실패하면 다음 실행에서 다시 시도
+
+사용법:
+    python label_reviews.py                       # 전체 수강평 라벨링
+    python label_reviews.py --course-id 1         # 특정 과목만
+    python label_reviews.py --concurrency 8 --limit 200
+
+    # 로컬 OpenAI 대역(benchmark/fake_openai.py)으로 실행
+    uvicorn benchmark.fake_openai:app --port 9100 &
+    OPENAI_BASE_URL=http://localhost:9100/v1 OPENAI_API_KEY=test python label_reviews.py
+
+환경 변수:
+    OPENAI_API_KEY: OpenAI API 키 (필수)
+    OPENAI_BASE_URL: OpenAI 호환 서버 주소 (선택, 로컬 대역 사용 시)
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import sqlite3
+import time
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from advice_prompts import (
+    ADVICE_MODEL,
+    REVIEW_LABEL_FIELDS,
+    REVIEW_LABEL_SCHEMA,
+    build_review_label_prompt,
+    parse_llm_json,
+)
+
+# =============================================================================
+# 경로 및 상수 설정
+# =============================================================================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_NAME = os.path.join(BASE_DIR, "hackathon.db")
+
+BATCH_SIZE = 10  # 한 번의 호출로 라벨링할 수강평 수
+MAX_RETRIES = 3
+
+CREATE_TABLE_SQL = '''
+                   CREATE TABLE IF NOT EXISTS course_review_labels
+                   (
+                       review_id             INTEGER PRIMARY KEY,
+                       course_id             INTEGER NOT NULL,
+                       content_hash          TEXT    NOT NULL,
+                       assignment_difficulty INTEGER,
+                       exam_difficulty       INTEGER,
+                       workload              INTEGER,
+                       grading_leniency      INTEGER,
+                       model                 TEXT,
+                       labeled_at            TEXT
+                   )
+                   '''
+
+
+# =============================================================================
+# 유틸리티
+# =============================================================================
+
+def content_hash(content: str) -> str:
+    """수강평 내용의 해시 (내용이 수정되면 다시 라벨링하기 위해 사용)."""
+    return hashlib.sha256((content or "").encode("utf-8")).hexdigest()
+
+
+def ensure_table(conn: sqlite3.Connection) -> None:
+    """라벨 테이블이 없으면 생성합니다."""
+    conn.execute(CREATE_TABLE_SQL)
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_course_review_labels_course_id ON course_review_labels (course_id)")
+    conn.commit()
+
+
+def pending_reviews(conn: sqlite3.Connection, course_id: Optional[int] = None) -> List[Tuple[int, int, str]]:
+    """
+    라벨이 없거나 내용이 바뀐 수강평을 조회합니다.
+
+    Args:
+        conn: SQLite 연결
+        course_id: 과목 ID (생략 시 전체)
+
+    Returns:
+        (review_id, course_id, content) 리스트
+    """
+    sql = '''
+          SELECT r.id, r.course_id, r.content, l.content_hash
+          FROM course_reviews r
+                   LEFT JOIN course_review_labels l ON l.review_id = r.id
+          WHERE r.content IS NOT NULL
+          '''
+    params: tuple = ()
+    if course_id is not None:
+        sql += " AND r.course_id = ?"
+        params = (course_id,)
+    sql += " ORDER BY r.id"
+
+    return [(rid, cid, content) for rid, cid, content, stored_hash in conn.execute(sql, params)
+            if stored_hash != content_hash(content)]
+
+
+def _clamp_label(value) -> Optional[int]:
+    """1~5 범위 밖이거나 정수가 아닌 값은 NULL로 처리합니다."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    value = int(round(value))
+    return value if 1 <= value <= 5 else None
+
+
+# =============================================================================
+# 배치 라벨링
+# =============================================================================
+
+async def label_batch(client, batch: List[Tuple[int, int, str]]) -> List[dict]:
+    """
+    수강평 한 배치를 라벨링합니다.
+
+    Args:
+        client: AsyncOpenAI 클라이언트
+        batch: (review_id, course_id, content) 리스트
+
+    Returns:
+        REVIEW_LABEL_SCHEMA의 labels 항목 리스트 (배치에 없는 review_id는 제외)
+    """
+    response = await client.responses.create(
+            model=ADVICE_MODEL,
+            input=build_review_label_prompt([(rid, content) for rid, _, content in batch]),
+            text={
+                    "verbosity": "low",
+                    "format"   : {
+                            "type"  : "json_schema",
+                            "name"  : "review_labels",
+                            "schema": REVIEW_LABEL_SCHEMA
+                    }
+            },
+            reasoning={"effort": "minimal"},
+    )
+    batch_ids = {rid for rid, _, _ in batch}
+    return [label for label in parse_llm_json(response.output_text)["labels"] if label.get("review_id") in batch_ids]
+
+
+def save_labels(conn: sqlite3.Connection, batch: List[Tuple[int, int, str]], labels: List[dict]) -> int:
+    """
+    배치의 라벨을 저장하고 커밋합니다. 응답에 빠진 수강평은 저장하지 않아 다음 실행에서 다시 처리됩니다.
+
+    Returns:
+        저장된 라벨 수
+    """
+    by_id = {rid: (cid, content) for rid, cid, content in batch}
+    now = datetime.now().isoformat(timespec="seconds")
+    rows = [
+            (label["review_id"], by_id[label["review_id"]][0], content_hash(by_id[label["review_id"]][1]),
+             *[_clamp_label(label.get(field)) for field in REVIEW_LABEL_FIELDS], ADVICE_MODEL, now)
+            for label in labels
+    ]
+    conn.executemany('''
+                     INSERT OR REPLACE INTO course_review_labels
+                     (review_id, course_id, content_hash, assignment_difficulty, exam_difficulty,
+                      workload, grading_leniency, model, labeled_at)
+                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                     ''', rows)
+    conn.commit()
+    return len(rows)
+
+
+async def run(conn: sqlite3.Connection, client, reviews: List[Tuple[int, int, str]], concurrency: int) -> dict:
+    """
+    수강평을 배치로 나누어 동시 요청 수를 제한하며 라벨링합니다.
+
+    Args:
+        conn: SQLite 연결 (이벤트 루프 스레드에서만 사용)
+        client: AsyncOpenAI 클라이언트
+        reviews: 라벨링할 (review_id, course_id, content) 리스트
+        concurrency: 동시 요청 수 상한
+
+    Returns:
+        처리 결과 (labeled, failed_batches, elapsed)
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    batches = [reviews[i:i + BATCH_SIZE] for i in range(0, len(reviews), BATCH_SIZE)]
+    stats = {"labeled": 0, "failed_batches": 0}
+    start = time.perf_counter()
+
+    async def worker(batch):
+        async with semaphore:
+            for attempt in range(MAX_RETRIES):
+                try:
+                    labels = await label_batch(client, batch)
+                    break
+                except Exception as e:
+                    if attempt == MAX_RETRIES - 1:
+                        print(f"   ⚠ 배치 실패 (review_id {batch[0][0]}~{batch[-1][0]}): {e}")
+                        stats["failed_batches"] += 1
+                        return
+                    await asyncio.sleep(2 ** attempt)
+
+        stats["labeled"] += save_labels(conn, batch, labels)
+        print(f"   ...{stats['labeled']}/{len(reviews)}개 라벨링 완료")
+
+    await asyncio.gather(*(worker(batch) for batch in batches))
+    stats["elapsed"] = time.perf_counter() - start
+    return stats
+
+
+# =============================================================================
+# 메인 함수
+# =============================================================================
+
+def main() -> None:
+    """라벨이 필요한 수강평을 찾아 일괄 라벨링합니다."""
+    parser = argparse.ArgumentParser(description="수강평별 난이도 라벨 일괄 추출")
+    parser.add_argument("--course-id", type=int, help="라벨링할 과목 ID (생략 시 전체)")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시 요청 수 (기본값: 4)")
+    parser.add_argument("--limit", type=int, help="이번 실행에서 처리할 최대 수강평 수")
+    parser.add_argument("--db", default=DB_NAME, help="SQLite 데이터베이스 경로")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    from openai import AsyncOpenAI
+
+    load_dotenv(dotenv_path=os.path.join(BASE_DIR, ".env"))
+    client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+    conn = sqlite3.connect(args.db)
+    ensure_table(conn)
+
+    reviews = pending_reviews(conn, args.course_id)
+    if args.limit is not None:
+        reviews = reviews[:args.limit]
+
+    print(f"🏷️ 수강평 라벨링 시작... (대상 {len(reviews)}개, 배치 {BATCH_SIZE}개, 동시 요청 {args.concurrency}개)")
+
+    try:
+        stats = asyncio.run(run(conn, client, reviews, args.concurrency))
+    finally:
+        conn.close()
+
+    print(f"✅ {stats['labeled']}개 라벨링 완료 ({stats['elapsed']:.1f}초, 실패 배치 {stats['failed_batches']}개)")
+    if stats["failed_batches"]:
+        print("   👉 다시 실행하면 실패한 수강평부터 이어서 처리합니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,19 +5,72 @@ FastAPI 기반 성적 분포 예측 및 학습 전략 추천 시스템.
 SetTransformer 딥러닝 모델을 활용한 히스토그램 예측과 OpenAI API 기반 학습 조언을 제공합니다.
 """
 
-from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi import FastAPI, BackgroundTasks, Depends, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean
+from sqlalchemy import create_engine, func, Column, Integer, String, Float, Boolean, Index
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Set, Tuple
 import os
+import asyncio
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import APIConnectionError, AsyncOpenAI, InternalServerError, OpenAI, RateLimitError
 import redis
+import redis.asyncio as async_redis
+from redis.backoff import NoBackoff
+from redis.retry import Retry
 import json
 import hashlib
+import time
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from advice_jobs import (
+    POP_TIMEOUT,
+    AdviceJobQueue,
+    FailoverJobBackend,
+    JobBackendUnavailable,
+    MemoryJobBackend,
+    RedisJobBackend,
+)
+from advice_prompts import (
+    ADVICE_MODEL,
+    COURSE_ADVICE_SCHEMA,
+    COURSE_PROSE_SCHEMA,
+    SEMESTER_ADVICE_SCHEMA,
+    StreamingJsonFields,
+    build_course_advice_prompt,
+    build_multi_grade_advice_prompt,
+    build_semester_plan_prompt,
+    multi_grade_advice_schema,
+    parse_llm_json,
+    split_multi_grade_result,
+)
+from difficulty_classifier import load_classifier
+from effort_allocation import allocate_effort, percentile_in_histogram, percentile_in_samples, summarize_allocation
+from label_reviews import content_hash
+from metrics import (CACHE_REQUESTS, CONTENT_TYPE, METRICS_FLUSH_INTERVAL, ML_LAYER_OUTPUT_BYTES, ML_LAYER_SECONDS,
+                     ML_PREDICT_SECONDS, OPENAI_REQUEST_SECONDS, REDIS_COMMAND_SECONDS, REDIS_ERRORS, MetricsMiddleware,
+                     add_query_observer, cache_prefix, flush_snapshot, instrument_sqlalchemy, instrument_threadpool,
+                     observe_openai_usage, remove_snapshot, render_metrics, set_size_bucket)
+from migrations import migrate
+from profiling import ProfilingMiddleware, admin_token_valid, list_profiles, load_profile
+from resilience import CLOSED, OPEN, CircuitBreaker
+from response_cache import RedisCacheBackend, SqliteCacheBackend, TieredCache, decode_payload, encode_payload
+from review_compression import compress_reviews
+from review_digest import format_reviews, rebuild_course_digest, review_set_hash
+from review_recency import filter_recent, recency_weights
+from review_search import query_terms, relevant_review_ids, search_reviews
+from slow_queries import (SLOW_QUERY_CONNECT_ARGS, SLOW_QUERY_MS, SORT_KEYS as SLOW_QUERY_SORT_KEYS, SlowQueryMiddleware,
+                          recent_slow_queries, reset_stats as reset_slow_query_stats, statement_stats, stats_since,
+                          track_query)
+from tracing import TracingMiddleware, record_span, setup_tracing, span, start_span, trace_query
 
 # =============================================================================
 # 환경 설정 및 외부 서비스 초기화
@@ -27,10 +80,30 @@ ENV_PATH = os.path.join(BASE_DIR, ".env")
 load_dotenv(dotenv_path=ENV_PATH)
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))  # 동시 OpenAI 호출 수 상한
+OPENAI_DEADLINE = float(os.getenv("OPENAI_DEADLINE", "60"))  # 조언 요청당 OpenAI 대기+호출 제한 시간(초)
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "60"))  # OpenAI HTTP 요청 1회 제한 시간(초), 백그라운드 작업 포함
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))  # SDK 자동 재시도 횟수
+# OpenAI 서킷 브레이커: 연속 실패(연결 오류/타임아웃/5xx/429) 횟수와 처음 열렸을 때 시험 호출까지 대기 시간(초)
+OPENAI_BREAKER_FAILURES = int(os.getenv("OPENAI_BREAKER_FAILURES", "5"))
+OPENAI_BREAKER_RESET = float(os.getenv("OPENAI_BREAKER_RESET", "30"))
+DISCONNECT_POLL_INTERVAL = 0.5  # 클라이언트 연결 끊김 확인 주기(초)
+
+# 성적 분포 예측 호출 중 계층별(input_proj, 어텐션/FFN, decoder) 시간과 출력 크기를 기록할 비율 (0이면 비활성)
+ML_LAYER_SAMPLE_RATE = float(os.getenv("ML_LAYER_SAMPLE_RATE", "0.01"))
+
+# 관리자 엔드포인트(/admin/*)와 요청 프로파일링(X-Profile 헤더) 인증 토큰 (비우면 관리자 기능 비활성)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
 openai_client = None
+async_openai_client = None
+openai_breaker = CircuitBreaker("openai", OPENAI_BREAKER_FAILURES, OPENAI_BREAKER_RESET)
 
 if OPENAI_API_KEY:
-    openai_client = OpenAI(api_key=OPENAI_API_KEY)
+    # 동기 클라이언트는 백그라운드 작업(수강평 요약 갱신)용, 비동기 클라이언트는 조언 엔드포인트용
+    openai_client = OpenAI(api_key=OPENAI_API_KEY, timeout=OPENAI_TIMEOUT, max_retries=OPENAI_MAX_RETRIES)
+    async_openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY, timeout=min(OPENAI_TIMEOUT, OPENAI_DEADLINE),
+                                      max_retries=OPENAI_MAX_RETRIES)
     print("✅ OpenAI Client initialized successfully.")
 else:
     print("⚠ Warning: OPENAI_API_KEY not found.")
@@ -44,34 +117,103 @@ REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
 REDIS_DB = int(os.getenv("REDIS_DB", "0"))
 CACHE_TTL = int(os.getenv("CACHE_TTL", "3600"))  # 기본 1시간
 
-redis_client = None
+# 응답 캐시 백엔드 조회 순서 (redis, sqlite 중 쉼표 구분). 기본값은 Redis 아래에 SQLite 파일 캐시를 두는 write-through 계층
+CACHE_BACKENDS = [b.strip() for b in os.getenv("CACHE_BACKENDS", "redis,sqlite").split(",") if b.strip()]
+# SQLite 파일 캐시 경로와 최대 항목 수 (여러 워커 프로세스가 같은 파일을 공유)
+CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", os.path.join(BASE_DIR, "cache", "response_cache.db"))
+CACHE_SQLITE_MAX_ENTRIES = int(os.getenv("CACHE_SQLITE_MAX_ENTRIES", "5000"))
+# 직렬화 결과가 이 크기(바이트) 이상인 캐시 값은 zlib으로 압축 (0이면 압축하지 않음)
+CACHE_COMPRESS_MIN_BYTES = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", "1024"))
+
+# 한 번의 LLM 호출로 함께 생성해 캐시에 채워 둘 목표 성적 구간
+ADVICE_GRADE_TIERS = [g.strip() for g in os.getenv("ADVICE_GRADE_TIERS", "A+,A0,B+,B0").split(",") if g.strip()]
+
+# 원본 수강평 대신 review_digest.py로 생성한 과목별 요약을 조언 프롬프트에 사용할지 여부
+USE_REVIEW_DIGEST = os.getenv("USE_REVIEW_DIGEST", "true").lower() in ("1", "true", "yes")
+
+# 원문 수강평을 프롬프트에 넣기 전 로컬 압축(유사 중복 제거 + 정보량 기준 선택) 사용 여부와 토큰 예산
+USE_REVIEW_COMPRESSION = os.getenv("USE_REVIEW_COMPRESSION", "true").lower() in ("1", "true", "yes")
+REVIEW_TOKEN_BUDGET = int(os.getenv("REVIEW_TOKEN_BUDGET", "8000"))
+
+# 원문 수강평을 프롬프트에 넣기 전 FTS5 검색으로 학생 선호도/성적 관련 수강평만 후보로 남길지 여부,
+# 후보 수 상한과 이보다 적게 찾으면 전체를 쓰는 최소 결과 수, 선호도와 함께 검색할 성적 관련 단어
+USE_REVIEW_SEARCH = os.getenv("USE_REVIEW_SEARCH", "true").lower() in ("1", "true", "yes")
+REVIEW_SEARCH_LIMIT = int(os.getenv("REVIEW_SEARCH_LIMIT", "150"))
+REVIEW_SEARCH_MIN_RESULTS = int(os.getenv("REVIEW_SEARCH_MIN_RESULTS", "20"))
+REVIEW_SEARCH_GRADE_TERMS = os.getenv("REVIEW_SEARCH_GRADE_TERMS", "학점 성적 채점 시험 과제 A+ 상대평가 절대평가 커트")
+
+# label_reviews.py 라벨이 과목 수강평의 이 비율 이상을 덮으면 난이도를 SQL 집계로 계산하고 LLM은 문장만 생성
+LABEL_MIN_COVERAGE = float(os.getenv("LABEL_MIN_COVERAGE", "0.8"))
+
+# 라벨이 부족한 과목은 difficulty_classifier.py로 학습한 로컬 분류기로 난이도를 추정 (LLM 난이도 추출 생략)
+USE_DIFFICULTY_CLASSIFIER = os.getenv("USE_DIFFICULTY_CLASSIFIER", "true").lower() in ("1", "true", "yes")
+
+# 학기 계획의 노력 배분은 effort_allocation.py로 로컬 계산하고, 전체 조언 문장(overall_advice)만 LLM으로 생성할지 여부
+SEMESTER_ADVICE_LLM = os.getenv("SEMESTER_ADVICE_LLM", "true").lower() in ("1", "true", "yes")
+
+# 비동기 조언 작업(POST /advice-jobs): 프로세스당 워커 수, 작업당 OpenAI 제한 시간(HTTP 타임아웃과 무관), 결과 대기 최대 시간
+ADVICE_JOB_WORKERS = int(os.getenv("ADVICE_JOB_WORKERS", "4"))
+ADVICE_JOB_DEADLINE = float(os.getenv("ADVICE_JOB_DEADLINE", "300"))
+ADVICE_JOB_MAX_WAIT = 30
+
+# 가장 많이 요청된 (과목, 목표 성적) 조언을 미리 생성할 시각(HH:MM, 쉼표 구분, 비우면 비활성)과 대상 조합 수
+ADVICE_PREWARM_TIMES = [t.strip() for t in os.getenv("ADVICE_PREWARM_TIMES", "").split(",") if t.strip()]
+ADVICE_PREWARM_TOP = int(os.getenv("ADVICE_PREWARM_TOP", "20"))
+GRADE_PATTERN = re.compile(r"^(?:[A-D][+0-]?|F|P)$")  # 요청 빈도 집계 대상 목표 성적 형식
+
+# Redis 명령 제한 시간(초): 연결 수립 / 명령 응답. 응답이 없는 Redis가 요청을 붙잡지 않도록 짧게 설정
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "1"))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.5"))
+# Redis 서킷 브레이커: 연속 실패 횟수, 처음 열렸을 때 재연결 시도까지 대기 시간(초, 실패할 때마다 2배), 정상 상태 확인 주기(초)
+REDIS_BREAKER_FAILURES = int(os.getenv("REDIS_BREAKER_FAILURES", "3"))
+REDIS_BREAKER_RESET = float(os.getenv("REDIS_BREAKER_RESET", "2"))
+REDIS_HEALTH_INTERVAL = float(os.getenv("REDIS_HEALTH_INTERVAL", "5"))
+# 동기 Redis 연결 풀 크기 (요청 처리 스레드풀과 이벤트 루프가 공유, 모두 사용 중이면 REDIS_SOCKET_TIMEOUT초까지 대기)
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+
+# 캐시 값은 response_cache.encode_payload의 바이너리 형식이므로 응답을 문자열로 디코딩하지 않음
+redis_pool = redis.BlockingConnectionPool(
+        host=REDIS_HOST,
+        port=REDIS_PORT,
+        db=REDIS_DB,
+        max_connections=REDIS_MAX_CONNECTIONS,
+        timeout=REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+        socket_timeout=REDIS_SOCKET_TIMEOUT,
+        retry=Retry(NoBackoff(), 0)
+)
+# 클라이언트 자체 재시도 대신 서킷 브레이커가 실패를 집계 (재시도는 타임아웃을 몇 배로 늘림)
+redis_client = redis.Redis(connection_pool=redis_pool, retry=Retry(NoBackoff(), 0))
+redis_breaker = CircuitBreaker("redis", REDIS_BREAKER_FAILURES, REDIS_BREAKER_RESET, max_reset_timeout=60)
 
 try:
-    redis_client = redis.Redis(
-            host=REDIS_HOST,
-            port=REDIS_PORT,
-            db=REDIS_DB,
-            decode_responses=True,
-            socket_connect_timeout=2
-    )
     redis_client.ping()
     print("✅ Redis Client initialized successfully.")
-except (redis.ConnectionError, redis.TimeoutError) as e:
-    print(f"⚠ Warning: Redis connection failed ({e}). Cache disabled.")
-    redis_client = None
+except Exception as e:
+    # 시작 시 연결에 실패해도 redis_health_monitor가 백그라운드에서 재연결하면 캐시가 다시 켜짐
+    print(f"⚠ Warning: Redis connection failed ({e}). Cache disabled until reconnected.")
+    redis_breaker.trip(e)
 
 # =============================================================================
 # 데이터베이스 설정
 # SQLite 데이터베이스 및 SQLAlchemy ORM 설정
 # =============================================================================
-DB_PATH = os.path.join(BASE_DIR, "hackathon.db")
+DB_PATH = os.getenv("DB_PATH", os.path.join(BASE_DIR, "hackathon.db"))  # 부하 테스트 등에서 다른 DB 파일을 사용할 때 지정
 SQLALCHEMY_DATABASE_URL = f"sqlite:///{DB_PATH}"
 
 engine = create_engine(
-        SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+        SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False, **SLOW_QUERY_CONNECT_ARGS}
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
+instrument_sqlalchemy()  # 쿼리 실행 시간을 한 번 재서 /metrics에 기록하고 아래 소비자에 전달
+if SLOW_QUERY_MS > 0:
+    add_query_observer(track_query)  # 쿼리 문장별 통계와 느린 쿼리 로그 (GET /admin/slow-queries)
+
+# 요청별 트레이스 (TRACE_EXPORTER가 설정된 경우에만 미들웨어와 쿼리 span 기록을 추가)
+TRACING_ENABLED = setup_tracing()
+if TRACING_ENABLED:
+    add_query_observer(trace_query)
 
 
 # =============================================================================
@@ -88,8 +230,9 @@ class StudentProfileModel(Base):
 class OtherStudentScoreModel(Base):
     """다른 학생들의 점수 데이터 저장 모델."""
     __tablename__ = "other_student_scores"
+    __table_args__ = (Index("ix_other_student_scores_item_score", "evaluation_item_id", "score"),)
     id = Column(Integer, primary_key=True, index=True)
-    evaluation_item_id = Column(Integer, index=True)
+    evaluation_item_id = Column(Integer)
     score = Column(Float)
 
 
@@ -98,7 +241,7 @@ class CourseModel(Base):
     __tablename__ = "courses"
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String)
-    course_code = Column(String, index=True)
+    course_code = Column(String, unique=True, index=True)
     total_students = Column(Integer, default=99)
 
 
@@ -116,13 +259,54 @@ class EvaluationItemModel(Base):
 class CourseReviewModel(Base):
     """과목 수강평 저장 모델."""
     __tablename__ = "course_reviews"
+    __table_args__ = (Index("idx_course_reviews_course_term", "course_id", "year", "semester"),
+                      Index("idx_course_reviews_content_hash", "course_id", "content_hash", unique=True))
     id = Column(Integer, primary_key=True, index=True)
     course_id = Column(Integer, index=True)
     content = Column(String)
+    year = Column(Integer, nullable=True)
+    semester = Column(Integer, nullable=True)
+    content_hash = Column(String, nullable=True)  # 공백을 제거한 내용의 해시 (import_csv.py와 같은 중복 판정)
+
+
+class CourseReviewDigestModel(Base):
+    """과목별 수강평 요약(digest) 저장 모델. review_digest.py가 생성합니다."""
+    __tablename__ = "course_review_digests"
+    course_id = Column(Integer, primary_key=True)
+    review_hash = Column(String, nullable=False)
+    last_review_id = Column(Integer, nullable=False)
+    review_count = Column(Integer, nullable=False)
+    digest = Column(String, nullable=False)
+    raw_tokens = Column(Integer)
+    digest_tokens = Column(Integer)
+    updated_at = Column(String)
+
+
+class CourseReviewLabelModel(Base):
+    """수강평별 난이도 라벨 저장 모델. label_reviews.py가 생성합니다."""
+    __tablename__ = "course_review_labels"
+    review_id = Column(Integer, primary_key=True)
+    course_id = Column(Integer, index=True, nullable=False)
+    content_hash = Column(String, nullable=False)
+    assignment_difficulty = Column(Integer, nullable=True)
+    exam_difficulty = Column(Integer, nullable=True)
+    workload = Column(Integer, nullable=True)
+    grading_leniency = Column(Integer, nullable=True)
+    model = Column(String)
+    labeled_at = Column(String)
 
 
 Base.metadata.create_all(bind=engine)
 
+# create_all은 기존 테이블에 컬럼/인덱스를 추가하지 않으므로 기존 DB는 migrations.py로 최신 스키마까지 올림
+# (수강평 학기 컬럼, 전문 검색 색인, 주요 조회 인덱스 등, 여러 워커가 동시에 시작해도 한 번만 적용)
+# 기존 데이터에 따라 실패할 수 있는 수동 마이그레이션(학수번호 유니크 인덱스)은 경고만 출력하고 python migrations.py로 적용
+_conn = sqlite3.connect(DB_PATH, timeout=60)
+try:
+    migrate(_conn, include_manual=False)
+finally:
+    _conn.close()
+
 
 # =============================================================================
 # Pydantic 스키마 (요청/응답 모델)
@@ -192,6 +376,8 @@ class CourseReviewCreate(BaseModel):
     """과목 수강평 생성 요청 스키마."""
     course_id: int
     content: str
+    year: Optional[int] = Field(None, description="작성 연도 (예: 2025)")
+    semester: Optional[int] = Field(None, description="작성 학기 (1, 2)")
 
 
 class CourseReviewResponse(CourseReviewCreate):
@@ -227,6 +413,56 @@ class ReviewAnalysisResponse(BaseModel):
     advice: str = Field(..., description="목표 성적 달성 조언")
 
 
+class ReviewDigestResponse(BaseModel):
+    """과목 수강평 요약 상태 응답 스키마."""
+    course_id: int
+    review_count: int = Field(..., description="현재 요약 대상(최근 학기) 수강평 수")
+    digest_review_count: int = Field(..., description="요약에 반영된 수강평 수")
+    is_fresh: bool = Field(..., description="요약이 현재 수강평 집합과 일치하는지 여부")
+    raw_tokens: Optional[int] = Field(None, description="원본 수강평 프롬프트 토큰 수 (추정)")
+    digest_tokens: Optional[int] = Field(None, description="요약 프롬프트 토큰 수 (추정)")
+    updated_at: Optional[str] = None
+    digest: str
+
+
+class ReviewSearchResult(BaseModel):
+    """수강평 검색 결과 항목 스키마."""
+    id: int
+    course_id: int
+    content: str
+    year: Optional[int] = None
+    semester: Optional[int] = None
+    score: float = Field(..., description="관련성 점수 (클수록 관련성 높음)")
+
+
+class ReviewSearchResponse(BaseModel):
+    """수강평 검색 응답 스키마."""
+    query: str
+    terms: List[str] = Field(..., description="검색에 사용된 단어 (조사 제거)")
+    total: int = Field(..., description="전체 검색 결과 수")
+    limit: int
+    offset: int
+    results: List[ReviewSearchResult]
+
+
+class DifficultySignalsResponse(BaseModel):
+    """수강평 라벨 집계 응답 스키마."""
+    course_id: int
+    total_reviews: int = Field(..., description="과목 수강평 수")
+    labeled_reviews: int = Field(..., description="라벨링된 수강평 수")
+    assignment_difficulty: Optional[float] = Field(None, description="과제 난이도 평균 (1~5)")
+    exam_difficulty: Optional[float] = Field(None, description="시험 난이도 평균 (1~5)")
+    workload: Optional[float] = Field(None, description="과제/공부 분량 평균 (1~5)")
+    grading_leniency: Optional[float] = Field(None, description="채점 관대함 평균 (1~5)")
+    source: str = Field("labels", description="집계 출처 (labels: LLM 라벨, classifier: 로컬 분류기)")
+
+
+class MultiGradeAdviceResponse(BaseModel):
+    """목표 성적별 과목 학습 조언 응답 스키마."""
+    course_id: int
+    advice_by_grade: Dict[str, ReviewAnalysisResponse] = Field(..., description="목표 성적별 분석 및 조언")
+
+
 class SemesterPlanItem(BaseModel):
     """학기 계획 항목 스키마."""
     course_index: int = Field(..., description="입력된 과목 순서 (1부터 시작)")
@@ -239,6 +475,34 @@ class SemesterPlanResponse(BaseModel):
     overall_advice: str = Field(..., description="전체 학기 운영을 위한 1-2문장 조언")
 
 
+class AdviceJobCreate(BaseModel):
+    """비동기 조언 작업 생성 요청 스키마 (kind에 따라 필요한 필드만 사용)."""
+    kind: str = Field(..., description="course_advice | course_advice_grades | semester_advice")
+    course_id: Optional[int] = Field(None, description="course_advice, course_advice_grades")
+    objective_grade: Optional[str] = Field(None, description="course_advice")
+    grades: Optional[List[str]] = Field(None, description="course_advice_grades (기본값: ADVICE_GRADE_TIERS)")
+    course_ids: Optional[List[int]] = Field(None, description="semester_advice")
+    target_grades: Optional[List[str]] = Field(None, description="semester_advice")
+
+
+class AdviceJobResponse(BaseModel):
+    """비동기 조언 작업 상태 응답 스키마."""
+    job_id: str
+    kind: str
+    params: dict
+    status: str = Field(..., description="queued | running | done | failed")
+    result: Optional[dict] = Field(None, description="완료 시 해당 조언 엔드포인트의 응답과 같은 형식")
+    error: Optional[dict] = Field(None, description="실패 시 {status_code, detail}")
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+
+class AdvicePrewarmResponse(BaseModel):
+    """조언 prewarm 결과 응답 스키마."""
+    jobs: List[AdviceJobResponse]
+
+
 class CumulativeHistogramResponse(BaseModel):
     """과목별 누적 히스토그램 응답 스키마."""
     course_id: int
@@ -266,31 +530,129 @@ app.add_middleware(
         allow_methods=["*"],
         allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+if SLOW_QUERY_MS > 0:
+    app.add_middleware(SlowQueryMiddleware)
+if TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware)
+app.add_middleware(ProfilingMiddleware, admin_token=ADMIN_TOKEN)
 
 ml_predictor = None
+review_classifier = None
+advice_job_queue = None
+prewarm_task = None
+redis_health_task = None
+metrics_flush_task = None
 
 
 @app.on_event("startup")
 async def startup_event():
-    """애플리케이션 시작 시 ML 모델을 로드합니다."""
-    global ml_predictor
+    """
+    애플리케이션 시작 시 ML 모델과 수강평 난이도 분류기를 로드하고
+    조언 작업 워커, Redis 상태 확인 작업, 지표 파일 기록 작업을 시작합니다.
+    """
+    global ml_predictor, review_classifier, advice_job_queue, prewarm_task, redis_health_task, metrics_flush_task
+    redis_health_task = asyncio.create_task(redis_health_monitor())
+    instrument_threadpool()
+    metrics_flush_task = asyncio.create_task(metrics_flusher())
+    # BRPOP이 POP_TIMEOUT초 동안 응답을 기다리므로 명령 제한 시간은 그보다 길게 설정 (그 외 명령은 FailoverJobBackend가 제한)
+    # Redis 장애 중(시작 시 포함)에는 redis_breaker가 열려 있는 동안 메모리 백엔드로 대신 처리
+    job_backend = FailoverJobBackend(
+            RedisJobBackend(async_redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB,
+                                              decode_responses=True,
+                                              socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+                                              socket_timeout=POP_TIMEOUT + REDIS_SOCKET_TIMEOUT + 1,
+                                              retry=Retry(NoBackoff(), 0))),
+            MemoryJobBackend(),
+            redis_breaker,
+            timeout=REDIS_SOCKET_TIMEOUT
+    )
+    advice_job_queue = AdviceJobQueue(job_backend, run_advice_job, ADVICE_JOB_WORKERS)
+    advice_job_queue.start()
+    print(f"✓ Advice job workers started ({job_backend.name}, {ADVICE_JOB_WORKERS} workers)")
+    if ADVICE_PREWARM_TIMES:
+        try:
+            print(f"✓ Advice prewarm scheduled in {seconds_until_next_prewarm(datetime.now()) / 3600:.1f}h")
+            prewarm_task = asyncio.create_task(prewarm_scheduler())
+        except ValueError:
+            print(f"⚠ Invalid ADVICE_PREWARM_TIMES {ADVICE_PREWARM_TIMES} (expected HH:MM). Prewarm disabled.")
+
+    if USE_DIFFICULTY_CLASSIFIER:
+        review_classifier = load_classifier()
+        if review_classifier is None:
+            print("⚠ Difficulty classifier not found. (python difficulty_classifier.py train)")
+        elif not review_classifier.is_reliable:
+            print("⚠ Difficulty classifier agreement too low. LLM difficulty extraction will be used.")
+        else:
+            print("✓ Difficulty classifier loaded successfully")
+
     try:
         from ML.model_loader import HistogramPredictor
         model_path = os.path.join(BASE_DIR, "ML", "best_model_nnj359uw.pt")
-        ml_predictor = HistogramPredictor(model_path=model_path)
+        ml_predictor = HistogramPredictor(
+                model_path=model_path,
+                stage_timer=record_predict_stage,
+                layer_timer=record_predict_layer,
+                layer_sample_rate=ML_LAYER_SAMPLE_RATE
+        )
         print("✓ ML model loaded successfully")
     except:
         print("⚠ ML module skipped.")
         ml_predictor = None
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """조언 작업 워커, prewarm 스케줄러, Redis 상태 확인 작업, 지표 파일 기록 작업을 종료합니다."""
+    if prewarm_task:
+        prewarm_task.cancel()
+    if redis_health_task:
+        redis_health_task.cancel()
+    if metrics_flush_task:
+        metrics_flush_task.cancel()
+        remove_snapshot()
+    if advice_job_queue:
+        await advice_job_queue.stop()
+        await advice_job_queue.backend.primary.client.aclose()
+
+
 def get_db():
-    """데이터베이스 세션 의존성 주입 함수."""
+    """데이터베이스 세션 의존성 주입 함수 (세션 수명을 db.session span으로 기록)."""
+    db_span = start_span("db.session")
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+        db_span.end()
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """
+    관리자 토큰(X-Admin-Token 헤더)을 확인하는 의존성.
+
+    Raises:
+        HTTPException: 503 - ADMIN_TOKEN이 설정되지 않은 경우
+        HTTPException: 403 - 토큰이 없거나 일치하지 않는 경우
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=503, detail="Admin endpoints disabled (ADMIN_TOKEN not set)")
+    if not admin_token_valid(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+def record_predict_stage(stage: str, seconds: float) -> None:
+    """HistogramPredictor.predict 단계별 시간을 /metrics와 현재 요청 트레이스에 기록합니다."""
+    ML_PREDICT_SECONDS.observe(seconds, stage=stage)
+    record_span(f"ml.predict.{stage}", seconds)
+
+
+def record_predict_layer(layer: str, seconds: float, set_size: int, output_bytes: int) -> None:
+    """샘플링된 예측 호출의 모델 계층별 시간과 출력 텐서 크기를 입력 점수 개수 구간별로 기록합니다."""
+    bucket = set_size_bucket(set_size)
+    ML_LAYER_SECONDS.observe(seconds, layer=layer, set_size=bucket)
+    ML_LAYER_OUTPUT_BYTES.observe(output_bytes, layer=layer, set_size=bucket)
+    record_span(f"ml.layer.{layer}", seconds, set_size=set_size, output_bytes=output_bytes)
 
 
 def calculate_histogram_statistics(histogram: dict) -> dict:
@@ -353,6 +715,32 @@ def calculate_histogram_statistics(histogram: dict) -> dict:
     }
 
 
+def histogram_percentile(histogram: dict, score: float, total_students: int) -> Optional[float]:
+    """
+    히스토그램에서 score 아래에 있는 학생 비율(백분위, 0-100)을 계산합니다 (score가 속한 구간은 선형 보간).
+
+    Args:
+        histogram: 히스토그램 딕셔너리 (예: {"0-10": 5, "10-20": 10, ...})
+        score: 백분위를 구할 점수
+        total_students: 전체 학생 수 (백분위의 분모)
+
+    Returns:
+        백분위 (total_students가 0 이하이면 None)
+    """
+    cumulative_below = 0
+    for bin_range, count in histogram.items():
+        bin_start = int(bin_range.split('-')[0])
+        bin_end = int(bin_range.split('-')[1])
+
+        if score > bin_end:
+            cumulative_below += count
+        elif bin_start <= score <= bin_end:
+            cumulative_below += count * (score - bin_start) / (bin_end - bin_start)
+            break
+
+    return (cumulative_below / total_students) * 100 if total_students > 0 else None
+
+
 # =============================================================================
 # 유틸리티 함수
 # =============================================================================
@@ -374,271 +762,988 @@ def generate_cache_key(prefix: str, *args, **kwargs) -> str:
     return f"cache:{prefix}:{key_hash}"
 
 
-def get_cached_response(cache_key: str):
+# Redis 장애 중에 요청된 캐시 무효화 패턴 (재연결 후 Redis 명령을 실행하기 전에 먼저 적용)
+pending_redis_invalidations: Set[str] = set()
+pending_invalidations_lock = threading.Lock()
+
+
+def replay_redis_invalidations() -> bool:
+    """
+    Redis 장애 중 밀린 캐시 무효화를 적용합니다.
+
+    재연결 후 첫 Redis 명령(redis_call/redis_pipeline)과 redis_health_monitor가 호출하므로
+    수강평 추가 전에 Redis에 저장된 조언 캐시가 재연결 후 응답으로 사용되지 않습니다.
+
+    Returns:
+        밀린 무효화를 모두 적용했으면 True, Redis 호출이 실패하면 False (브레이커에 실패 기록)
+    """
+    with pending_invalidations_lock:
+        patterns = sorted(pending_redis_invalidations)
+    for pattern in patterns:
+        try:
+            keys = redis_client.keys(pattern)
+            if keys:
+                redis_client.delete(*keys)
+        except Exception as e:
+            redis_breaker.record_failure(e)
+            REDIS_ERRORS.inc(command="invalidate")
+            print(f"Cache invalidation replay error: {e}")
+            return False
+        with pending_invalidations_lock:
+            pending_redis_invalidations.discard(pattern)
+    if patterns:
+        print(f"✓ Replayed {len(patterns)} pending cache invalidation(s) on Redis")
+    return True
+
+
+def redis_call(command: str, *args, **kwargs):
     """
-    Redis에서 캐시된 응답을 가져옵니다.
+    서킷 브레이커를 거쳐 Redis 명령을 실행합니다.
+
+    브레이커가 열려 있으면 Redis에 접속하지 않고 바로 None을 반환하며,
+    실패(연결 오류/REDIS_SOCKET_TIMEOUT 초과)는 브레이커에 기록한 뒤 None을 반환합니다.
 
     Args:
-        cache_key: 캐시 키
+        command: redis.Redis 메서드 이름 (예: "get", "setex")
+        *args, **kwargs: 명령 인자
 
     Returns:
-        캐시된 데이터 (없으면 None)
+        명령 결과 (브레이커가 열려 있거나 실패하면 None)
     """
-    if not redis_client:
+    if not redis_breaker.allow():
+        return None
+    if pending_redis_invalidations and not replay_redis_invalidations():
         return None
-
     try:
-        cached_data = redis_client.get(cache_key)
-        if cached_data:
-            return json.loads(cached_data)
+        with REDIS_COMMAND_SECONDS.time(command=command):
+            result = getattr(redis_client, command)(*args, **kwargs)
     except Exception as e:
-        print(f"Cache get error: {e}")
-
-    return None
+        redis_breaker.record_failure(e)
+        REDIS_ERRORS.inc(command=command)
+        print(f"Cache {command} error: {e}")
+        return None
+    redis_breaker.record_success()
+    return result
 
 
-def set_cached_response(cache_key: str, data: dict, ttl: int = None):
+def redis_pipeline(commands: List[tuple]) -> Optional[list]:
     """
-    Redis에 응답을 캐시합니다.
+    여러 Redis 명령을 파이프라인으로 한 번의 왕복에 실행합니다 (서킷 브레이커는 redis_call과 동일하게 적용).
 
     Args:
-        cache_key: 캐시 키
-        data: 저장할 데이터
-        ttl: Time To Live (초 단위), None이면 기본값 사용
-    """
-    if not redis_client:
-        return
+        commands: [(명령 이름, *인자), ...]
 
+    Returns:
+        명령별 결과 리스트 (브레이커가 열려 있거나 실패하면 None)
+    """
+    if not commands or not redis_breaker.allow():
+        return None
+    if pending_redis_invalidations and not replay_redis_invalidations():
+        return None
     try:
-        ttl = ttl or CACHE_TTL
-        redis_client.setex(cache_key, ttl, json.dumps(data))
+        with REDIS_COMMAND_SECONDS.time(command="pipeline"):
+            pipe = redis_client.pipeline(transaction=False)
+            for command, *args in commands:
+                getattr(pipe, command)(*args)
+            results = pipe.execute()
     except Exception as e:
-        print(f"Cache set error: {e}")
-
+        redis_breaker.record_failure(e)
+        REDIS_ERRORS.inc(command="pipeline")
+        print(f"Cache pipeline error: {e}")
+        return None
+    redis_breaker.record_success()
+    return results
 
-def invalidate_cache_pattern(pattern: str):
-    """
-    패턴에 일치하는 모든 캐시를 무효화합니다.
 
-    Args:
-        pattern: 캐시 키 패턴 (예: "cache:course_advice:*")
-    """
-    if not redis_client:
-        return
+def create_response_cache() -> TieredCache:
+    """CACHE_BACKENDS 순서대로 응답 캐시 계층을 구성합니다 (알 수 없는 이름은 무시)."""
+    backends = []
+    for name in CACHE_BACKENDS:
+        if name == "redis":
+            backends.append(RedisCacheBackend(redis_call, redis_pipeline))
+        elif name == "sqlite":
+            try:
+                backends.append(SqliteCacheBackend(CACHE_SQLITE_PATH, CACHE_SQLITE_MAX_ENTRIES))
+            except sqlite3.Error as e:
+                print(f"⚠ Warning: SQLite cache unavailable ({e}).")
+        else:
+            print(f"⚠ Unknown cache backend '{name}' ignored.")
+    print(f"✅ Response cache: {' → '.join(b.name for b in backends) or 'disabled'}")
+    return TieredCache(backends, CACHE_TTL)
 
-    try:
-        keys = redis_client.keys(pattern)
-        if keys:
-            redis_client.delete(*keys)
-    except Exception as e:
-        print(f"Cache invalidation error: {e}")
 
+response_cache = create_response_cache()
 
-# =============================================================================
-# API 엔드포인트
-# =============================================================================
 
-# -----------------------------------------------------------------------------
-# System
-# -----------------------------------------------------------------------------
+async def redis_health_monitor():
+    """
+    Redis 상태를 주기적으로 확인하는 백그라운드 작업.
 
-@app.get("/health", tags=["System"])
-async def health_check():
+    - 브레이커가 닫혀 있으면 REDIS_HEALTH_INTERVAL초마다 PING하여 요청이 실패하기 전에 장애를 감지
+    - 브레이커가 열려 있으면 대기 시간(지수 백오프)이 지난 뒤 PING으로 재연결을 시도하고,
+      성공하면 브레이커를 닫고 장애 중 밀린 캐시 무효화를 적용한 뒤 캐시를 다시 사용
     """
-    서버 상태 확인 엔드포인트.
+    while True:
+        await asyncio.sleep(redis_breaker.retry_in() or REDIS_HEALTH_INTERVAL)
+        if redis_breaker.state == CLOSED:
+            await run_in_threadpool(redis_call, "ping")
+        elif redis_breaker.allow():
+            try:
+                await run_in_threadpool(redis_client.ping)
+                redis_breaker.record_success()
+            except Exception as e:
+                redis_breaker.record_failure(e)
+                continue
+            await run_in_threadpool(replay_redis_invalidations)
+
+
+async def metrics_flusher():
+    """
+    METRICS_FLUSH_INTERVAL초마다 이 워커의 지표를 파일로 기록하는 백그라운드 작업.
 
-    Returns:
-        dict: {"status": "healthy"} 형태의 상태 정보
+    /metrics는 요청을 받은 워커가 모든 워커의 지표 파일을 합산하여 반환합니다.
+    스레드풀 사용량 게이지는 이벤트 루프에서만 읽을 수 있으므로 이벤트 루프에서 기록합니다.
     """
-    return {"status": "healthy"}
+    while True:
+        try:
+            flush_snapshot()
+        except OSError as e:
+            print(f"Metrics flush error: {e}")
+        await asyncio.sleep(METRICS_FLUSH_INTERVAL)
 
 
-@app.get("/dummy-histo", tags=["Development"])
-async def get_dummy_histogram():
+def get_cached_response(cache_key: str):
     """
-    테스트용 더미 히스토그램 데이터를 반환합니다.
+    응답 캐시(CACHE_BACKENDS 계층)에서 캐시된 응답을 가져옵니다.
 
-    개발 및 디버깅 목적으로 사용되는 샘플 히스토그램 데이터입니다.
+    Args:
+        cache_key: 캐시 키
 
     Returns:
-        dict: 10개 구간의 더미 성적 분포 데이터
+        캐시된 데이터 (없거나 캐시를 사용할 수 없으면 None)
     """
-    return {"0-10" : 5, "10-20": 15, "20-30": 25, "30-40": 10, "40-50": 8, "50-60": 12, "60-70": 7, "70-80": 3,
-            "80-90": 1, "90-100": 0}
-
+    with span("cache.get", prefix=cache_prefix(cache_key)) as cache_span:
+        try:
+            response = decode_payload(response_cache.get(cache_key))
+        except ValueError as e:  # 손상되었거나 알 수 없는 형식 버전 (json.JSONDecodeError 포함)
+            print(f"Cache decode error: {e}")
+            response = None
+        cache_span.set(hit=bool(response))
+    CACHE_REQUESTS.inc(prefix=cache_prefix(cache_key), result="hit" if response else "miss")
+    return response
 
-# -----------------------------------------------------------------------------
-# Student Profile
-# -----------------------------------------------------------------------------
 
-@app.put("/student-profile", response_model=StudentProfileResponse, tags=["Student Profile"])
-async def update_student_profile(profile: StudentProfileCreate, db: Session = Depends(get_db)):
+def get_cached_responses(cache_keys: List[str]) -> Dict[str, dict]:
     """
-    학생 프로필을 업데이트합니다.
-
-    ID 1번 학생의 프로필을 항상 업데이트하며, 프로필이 없으면 새로 생성합니다.
-    학생의 선호도 및 특성 정보는 AI 학습 조언 생성 시 활용됩니다.
+    여러 캐시 키의 응답을 한 번에 가져옵니다 (Redis는 MGET 한 번, SQLite는 쿼리 한 번).
 
     Args:
-        profile: 학생 프로필 생성 요청 (preferences 포함)
-        db: 데이터베이스 세션
+        cache_keys: 캐시 키 리스트
 
     Returns:
-        StudentProfileResponse: 업데이트된 학생 프로필 정보
+        {캐시 키: 캐시된 데이터} (캐시에 있는 키만 포함)
     """
-    student_id = 1
-    existing_profile = db.query(StudentProfileModel).filter(StudentProfileModel.id == student_id).first()
-
-    if existing_profile:
-        # 기존 프로필 업데이트
-        existing_profile.preferences = profile.preferences
-        db.commit()
-        db.refresh(existing_profile)
-        return existing_profile
-    else:
-        # 프로필이 없으면 새로 생성
-        new_profile = StudentProfileModel(id=student_id, preferences=profile.preferences)
-        db.add(new_profile)
-        db.commit()
-        db.refresh(new_profile)
-        return new_profile
+    responses = {}
+    with span("cache.get_many", keys=len(cache_keys)) as cache_span:
+        for cache_key, raw in response_cache.get_many(cache_keys).items():
+            try:
+                responses[cache_key] = decode_payload(raw)
+            except ValueError as e:
+                print(f"Cache decode error: {e}")
+        cache_span.set(hits=len(responses))
+    for cache_key in cache_keys:
+        CACHE_REQUESTS.inc(prefix=cache_prefix(cache_key), result="hit" if responses.get(cache_key) else "miss")
+    return responses
 
 
-@app.get("/student-profile", response_model=StudentProfileResponse, tags=["Student Profile"])
-async def get_student_profile(db: Session = Depends(get_db)):
+def set_cached_response(cache_key: str, data: dict, ttl: int = None):
     """
-    학생 프로필을 조회합니다.
-
-    ID 1번 학생의 프로필 정보를 반환합니다.
+    응답 캐시의 모든 계층에 응답을 저장합니다.
 
     Args:
-        db: 데이터베이스 세션
-
-    Returns:
-        StudentProfileResponse: 학생 프로필 정보 (id, preferences)
-
-    Raises:
-        HTTPException: 404 - 학생 프로필이 없는 경우
+        cache_key: 캐시 키
+        data: 저장할 데이터
+        ttl: Time To Live (초 단위), None이면 기본값 사용
     """
-    student_id = 1
-    profile = db.query(StudentProfileModel).filter(StudentProfileModel.id == student_id).first()
+    with span("cache.set", prefix=cache_prefix(cache_key)):
+        response_cache.set(cache_key, encode_payload(data, CACHE_COMPRESS_MIN_BYTES), ttl or CACHE_TTL)
 
-    if not profile:
-        raise HTTPException(status_code=404, detail="학생 프로필이 없습니다.")
 
-    return profile
+def set_cached_responses(items: Dict[str, dict], ttl: int = None):
+    """
+    여러 응답을 한 번에 캐시합니다 (Redis는 파이프라인 한 번, SQLite는 트랜잭션 하나).
 
+    Args:
+        items: {캐시 키: 저장할 데이터}
+        ttl: Time To Live (초 단위), None이면 기본값 사용
+    """
+    with span("cache.set_many", keys=len(items)):
+        response_cache.set_many({key: encode_payload(data, CACHE_COMPRESS_MIN_BYTES) for key, data in items.items()},
+                                ttl or CACHE_TTL)
 
-# -----------------------------------------------------------------------------
-# Course Management
-# -----------------------------------------------------------------------------
 
-@app.post("/courses", response_model=CourseResponse, tags=["Courses"])
-async def create_course(course: CourseCreate, db: Session = Depends(get_db)):
+def invalidate_cache_pattern(pattern: str):
     """
-    새로운 과목을 생성합니다.
+    패턴에 일치하는 모든 캐시를 무효화합니다.
 
-    Args:
-        course: 과목 생성 요청 (name, course_code, total_students)
-        db: 데이터베이스 세션
+    Redis 계층의 무효화는 먼저 pending_redis_invalidations에 기록한 뒤 적용하므로,
+    Redis 장애(브레이커 열림, 명령 실패)로 지우지 못한 패턴은 재연결 후 replay_redis_invalidations가 적용합니다.
 
-    Returns:
-        CourseResponse: 생성된 과목 정보
+    Args:
+        pattern: 캐시 키 패턴 (예: "cache:course_advice:*")
     """
-    new_course = CourseModel(**course.dict())
-    db.add(new_course)
-    db.commit()
-    db.refresh(new_course)
-    return new_course
+    if "redis" in response_cache.names:
+        with pending_invalidations_lock:
+            pending_redis_invalidations.add(pattern)
+    response_cache.delete_pattern(pattern)
 
 
-@app.get("/courses", response_model=List[CourseResponse], tags=["Courses"])
-async def get_all_courses(db: Session = Depends(get_db)):
+def aggregate_difficulty_signals(course_id: int, db: Session) -> dict:
     """
-    모든 과목 목록을 조회합니다.
+    label_reviews.py가 저장한 수강평 라벨을 SQL로 집계합니다.
 
     Args:
+        course_id: 과목 ID
         db: 데이터베이스 세션
 
     Returns:
-        List[CourseResponse]: 전체 과목 정보 리스트
+        DifficultySignalsResponse 형식 딕셔너리 (평균값은 라벨이 없으면 None)
     """
-    return db.query(CourseModel).all()
+    labeled, assignment, exam, workload, leniency = db.query(
+            func.count(CourseReviewLabelModel.review_id),
+            func.avg(CourseReviewLabelModel.assignment_difficulty),
+            func.avg(CourseReviewLabelModel.exam_difficulty),
+            func.avg(CourseReviewLabelModel.workload),
+            func.avg(CourseReviewLabelModel.grading_leniency),
+    ).join(CourseReviewModel, CourseReviewModel.id == CourseReviewLabelModel.review_id).filter(
+            CourseReviewModel.course_id == course_id).one()
+    total = db.query(func.count(CourseReviewModel.id)).filter(CourseReviewModel.course_id == course_id).scalar()
 
+    return {
+            "course_id"            : course_id,
+            "total_reviews"        : total,
+            "labeled_reviews"      : labeled,
+            "assignment_difficulty": assignment,
+            "exam_difficulty"      : exam,
+            "workload"             : workload,
+            "grading_leniency"     : leniency,
+            "source"               : "labels",
+    }
 
-# -----------------------------------------------------------------------------
-# Evaluation Items
-# -----------------------------------------------------------------------------
 
-@app.post("/evaluation-items", response_model=EvaluationItemResponse, tags=["Evaluation Items"])
-async def create_evaluation_item(item: EvaluationItemCreate, db: Session = Depends(get_db)):
+def classify_difficulty_signals(course_id: int, db: Session) -> Optional[dict]:
     """
-    새로운 평가 항목을 생성합니다.
+    로컬 난이도 분류기로 과목 수강평 전체를 채점해 집계합니다.
 
-    과제, 시험 등의 평가 항목을 생성합니다.
+    분류기가 없거나, 검증 일치율이 낮거나, 확신할 수 있는 예측이 부족하면
+    (difficulty_classifier.py의 대체 규칙) None을 반환합니다.
 
     Args:
-        item: 평가 항목 생성 요청 (course_id, name, weight, my_score, is_submitted)
+        course_id: 과목 ID
         db: 데이터베이스 세션
 
     Returns:
-        EvaluationItemResponse: 생성된 평가 항목 정보
+        aggregate_difficulty_signals와 같은 형식의 딕셔너리 (source="classifier") 또는 None
     """
-    new_item = EvaluationItemModel(**item.dict())
-    db.add(new_item)
-    db.commit()
-    db.refresh(new_item)
-    return new_item
+    if review_classifier is None:
+        return None
+
+    contents = [r.content for r in db.query(CourseReviewModel.content).filter(
+            CourseReviewModel.course_id == course_id, CourseReviewModel.content.isnot(None)).all()]
+    predicted = review_classifier.predict_course_signals(contents)
+    if predicted is None:
+        return None
 
+    return {"course_id": course_id, "total_reviews": len(contents), **predicted, "source": "classifier"}
 
-@app.get("/evaluation-items", response_model=List[EvaluationItemResponse], tags=["Evaluation Items"])
-async def get_all_evaluation_items(db: Session = Depends(get_db)):
+
+def get_course_difficulty_signals(course_id: int, db: Session) -> Optional[dict]:
     """
-    모든 평가 항목 목록을 조회합니다.
+    AI 조언에 사용할 수 있을 만큼 라벨이 쌓였으면 난이도 집계값을 반환합니다.
+
+    라벨 비율이 LABEL_MIN_COVERAGE 미만이거나 과제/시험 난이도 언급이 전혀 없으면
+    로컬 분류기 예측으로 대신하고, 분류기도 사용할 수 없으면
+    None을 반환하여 LLM이 수강평에서 난이도를 직접 추출하도록 합니다.
 
     Args:
+        course_id: 과목 ID
         db: 데이터베이스 세션
 
     Returns:
-        List[EvaluationItemResponse]: 전체 평가 항목 정보 리스트
+        aggregate_difficulty_signals / classify_difficulty_signals 결과 또는 None
     """
-    return db.query(EvaluationItemModel).all()
+    signals = aggregate_difficulty_signals(course_id, db)
+    if not signals["total_reviews"] or signals["labeled_reviews"] / signals["total_reviews"] < LABEL_MIN_COVERAGE:
+        return classify_difficulty_signals(course_id, db)
+    if signals["assignment_difficulty"] is None or signals["exam_difficulty"] is None:
+        return classify_difficulty_signals(course_id, db)
+    return signals
 
 
-# -----------------------------------------------------------------------------
-# Course Reviews
-# -----------------------------------------------------------------------------
+def difficulty_from_signals(signals: dict) -> dict:
+    """집계 평균을 ReviewAnalysisResponse의 1~5 정수 난이도로 변환합니다."""
+    return {
+            "assignment_difficulty": min(5, max(1, int(round(signals["assignment_difficulty"])))),
+            "exam_difficulty"      : min(5, max(1, int(round(signals["exam_difficulty"])))),
+    }
 
-@app.post("/course-reviews", response_model=CourseReviewResponse, tags=["Course Reviews"])
-async def create_course_review(review: CourseReviewCreate, db: Session = Depends(get_db)):
-    """
-    새로운 과목 수강평을 생성합니다.
 
-    수강평이 추가되면 AI 조언 생성에 사용되는 모든 캐시가 자동으로 무효화됩니다.
+def _compress_for_prompt(reviews: List[tuple], token_budget: int,
+                         weights: Optional[Dict[int, float]] = None) -> List[tuple]:
+    """USE_REVIEW_COMPRESSION이 켜져 있으면 수강평을 토큰 예산 안으로 압축합니다 (weights: 수강평 id별 최신성 가중치)."""
+    if not USE_REVIEW_COMPRESSION:
+        return reviews
+    selected, _ = compress_reviews(reviews, token_budget,
+                                   weights=[weights[r[0]] for r in reviews] if weights else None)
+    return selected
 
-    Args:
-        review: 수강평 생성 요청 (course_id, content)
-        db: 데이터베이스 세션
+
+def get_recent_reviews(course_id: int, db: Session) -> Tuple[List[tuple], Optional[Dict[int, float]]]:
+    """
+    과목의 최근 학기 수강평과 시간 감쇠 가중치를 조회합니다 (review_recency 정책, review_digest.fetch_reviews와 같은 집합).
 
     Returns:
-        CourseReviewResponse: 생성된 수강평 정보
+        (id 순 (id, content) 목록, 수강평 id별 가중치 또는 None)
     """
-    new_review = CourseReviewModel(**review.dict())
-    db.add(new_review)
-    db.commit()
-    db.refresh(new_review)
+    rows = db.query(CourseReviewModel.id, CourseReviewModel.content, CourseReviewModel.year,
+                    CourseReviewModel.semester).filter(
+            CourseReviewModel.course_id == course_id).order_by(CourseReviewModel.id).all()
+    rows = filter_recent([tuple(r) for r in rows])
+    weights = recency_weights(rows)
+    return [(r[0], r[1]) for r in rows], (dict(zip((r[0] for r in rows), weights)) if weights else None)
 
-    # 해당 과목의 모든 캐시 무효화
-    invalidate_cache_pattern(f"cache:course_advice:*")
-    invalidate_cache_pattern(f"cache:semester_advice:*")
 
-    return new_review
+def sqlite_connection(db: Session) -> sqlite3.Connection:
+    """세션이 사용하는 sqlite3 연결 (FTS5 등 ORM으로 표현하기 어려운 쿼리용)."""
+    return db.connection().connection.dbapi_connection
 
 
-@app.get("/course-reviews", response_model=List[CourseReviewResponse], tags=["Course Reviews"])
-async def get_all_course_reviews(db: Session = Depends(get_db)):
+def select_relevant_reviews(course_id: int, reviews: List[tuple], db: Session) -> List[tuple]:
     """
-    모든 과목 수강평 목록을 조회합니다.
+    학생 선호도와 성적 관련 단어로 수강평을 검색해 관련 있는 수강평만 후보로 남깁니다 (USE_REVIEW_SEARCH).
+
+    Args:
+        course_id: 과목 ID
+        reviews: id 순 (id, content) 후보 목록 (최근 학기 정책 적용 후)
+        db: 데이터베이스 세션
+
+    Returns:
+        관련성 상위 REVIEW_SEARCH_LIMIT개 후보 (id 순). 찾은 수가 REVIEW_SEARCH_MIN_RESULTS보다 적으면 reviews 그대로
+    """
+    query = " ".join(filter(None, [get_student_preferences(db), REVIEW_SEARCH_GRADE_TERMS]))
+    candidates = {r[0] for r in reviews}
+    ranked = [review_id for review_id in relevant_review_ids(sqlite_connection(db), course_id, query, limit=-1)
+              if review_id in candidates][:REVIEW_SEARCH_LIMIT]
+    if len(ranked) < REVIEW_SEARCH_MIN_RESULTS:
+        return reviews
+    selected = set(ranked)
+    return [r for r in reviews if r[0] in selected]
+
+
+def get_course_reviews_text(course_id: int, db: Session,
+                            background_tasks: Optional[BackgroundTasks] = None) -> Optional[str]:
+    """
+    AI 조언 프롬프트에 넣을 과목 수강평 문자열을 생성합니다.
+
+    review_digest.py로 생성한 요약이 있으면 원본 수강평 대신 요약을 사용하고,
+    요약 이후 추가된 수강평만 원문으로 덧붙입니다. 요약이 없거나 기존 수강평이 변경되어
+    요약을 쓸 수 없으면 원본 수강평을 사용합니다.
+    요약과 원문 모두 최근 REVIEW_RECENT_SEMESTERS개 학기의 수강평만 대상으로 합니다.
+    원문 수강평은 review_compression으로 유사 중복을 제거하고 REVIEW_TOKEN_BUDGET 안에서
+    정보량 × 최신성 가중치가 높은 수강평만 남깁니다 (요약과 함께 쓰는 경우 요약 토큰을 뺀 나머지 예산).
+    USE_REVIEW_SEARCH가 켜져 있으면 요약 없이 원문만 쓰는 경우 FTS5 검색으로 학생 선호도/성적 관련 수강평을 먼저 추립니다.
+    background_tasks가 주어지면 오래된 요약의 재생성을 백그라운드로 예약합니다.
+
+    Args:
+        course_id: 과목 ID
+        db: 데이터베이스 세션
+        background_tasks: 요약 재생성 예약용 BackgroundTasks (선택)
+
+    Returns:
+        프롬프트용 수강평 문자열 (수강평이 없으면 None)
+    """
+    reviews, weights = get_recent_reviews(course_id, db)
+    if not reviews:
+        return None
+
+    if not USE_REVIEW_DIGEST:
+        if USE_REVIEW_SEARCH:
+            reviews = select_relevant_reviews(course_id, reviews, db)
+        return format_reviews(_compress_for_prompt(reviews, REVIEW_TOKEN_BUDGET, weights))
+
+    digest = db.query(CourseReviewDigestModel).filter(CourseReviewDigestModel.course_id == course_id).first()
+    covered = [r for r in reviews if digest and r[0] <= digest.last_review_id]
+
+    if not digest or review_set_hash(covered) != digest.review_hash:
+        # 요약이 없거나 기존 수강평이 변경됨 → 원문 사용 후 요약 재생성
+        if background_tasks is not None and openai_client:
+            background_tasks.add_task(rebuild_course_digest, DB_PATH, openai_client, course_id)
+        if USE_REVIEW_SEARCH:
+            reviews = select_relevant_reviews(course_id, reviews, db)
+        return format_reviews(_compress_for_prompt(reviews, REVIEW_TOKEN_BUDGET, weights))
+
+    text = f"[수강평 {digest.review_count}개 요약]\n{digest.digest}"
+    new_reviews = reviews[len(covered):]
+    if new_reviews:
+        budget = max(REVIEW_TOKEN_BUDGET - (digest.digest_tokens or 0), REVIEW_TOKEN_BUDGET // 4)
+        text += f"\n[요약 이후 추가된 수강평]\n{format_reviews(_compress_for_prompt(new_reviews, budget, weights))}"
+        if background_tasks is not None and openai_client:
+            background_tasks.add_task(rebuild_course_digest, DB_PATH, openai_client, course_id)
+    return text
+
+
+def get_student_preferences(db: Session) -> Optional[str]:
+    """학생 프로필의 학습 선호도를 조회합니다 (예: id=1 고정)."""
+    student_id = 1
+    profile = db.query(StudentProfileModel).filter(StudentProfileModel.id == student_id).first()
+    return profile.preferences if profile and profile.preferences else None
+
+
+def prepare_course_prompt(course_id: int, db: Session,
+                          background_tasks: Optional[BackgroundTasks] = None) -> tuple:
+    """
+    과목 조언 프롬프트에 필요한 수강평 문자열, 학생 선호도, 난이도 집계를 준비합니다.
+
+    DB 조회와 수강평 압축/분류기 채점이 포함되어 있으므로 비동기 엔드포인트에서는
+    run_in_threadpool로 실행합니다.
+
+    Args:
+        course_id: 과목 ID
+        db: 데이터베이스 세션
+        background_tasks: 수강평 요약 갱신 예약용 (선택)
+
+    Returns:
+        (수강평 문자열, 학생 선호도, 난이도 집계 또는 None)
+
+    Raises:
+        HTTPException: 404 - 해당 과목의 수강평이 없는 경우
+    """
+    course_reviews_str = get_course_reviews_text(course_id, db, background_tasks)
+    if not course_reviews_str:
+        raise HTTPException(status_code=404, detail="리뷰 데이터가 없습니다.")
+
+    # 라벨 집계가 충분하면 난이도는 SQL 집계값을 쓰고 LLM은 요약/조언만 생성
+    return course_reviews_str, get_student_preferences(db), get_course_difficulty_signals(course_id, db)
+
+
+llm_semaphore = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+
+# OpenAI 장애로 보는 예외 (연결 오류/SDK 타임아웃, 5xx, 429). 잘못된 요청(4xx)은 브레이커에 기록하지 않음
+OPENAI_FAILURES = (APIConnectionError, InternalServerError, RateLimitError)
+
+
+def usage_attributes(response) -> dict:
+    """트레이스 span에 붙일 OpenAI 토큰 사용량 (usage가 없으면 빈 dict)."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return {}
+    return {"input_tokens": getattr(usage, "input_tokens", None), "output_tokens": getattr(usage, "output_tokens", None)}
+
+
+def check_openai_breaker() -> None:
+    """
+    OpenAI 서킷 브레이커가 열려 있으면 호출 없이 바로 503으로 실패합니다.
+
+    Raises:
+        HTTPException: 503 - 최근 OpenAI 호출이 연속으로 실패하여 브레이커가 열린 경우 (Retry-After 헤더 포함)
+    """
+    if not openai_breaker.allow():
+        retry_in = max(1, int(openai_breaker.retry_in() + 0.5))
+        raise HTTPException(status_code=503, detail=f"AI Error: OpenAI 일시적으로 사용 불가 ({retry_in}초 후 재시도)",
+                            headers={"Retry-After": str(retry_in)})
+
+
+async def create_llm_response(request: Optional[Request], deadline: float = OPENAI_DEADLINE, **kwargs):
+    """
+    비동기 OpenAI 클라이언트로 Responses API를 호출합니다.
+
+    - 전역 세마포어로 동시 호출 수를 OPENAI_MAX_CONCURRENCY 이하로 제한합니다.
+    - 세마포어 대기를 포함해 deadline초 안에 끝나지 않으면 호출을 취소합니다.
+    - 기다리는 동안 클라이언트 연결이 끊기면 호출을 취소하여 세마포어 자리를 바로 반납합니다.
+    - OpenAI 서킷 브레이커가 열려 있으면 세마포어를 기다리지 않고 바로 실패하며,
+      호출 결과(성공, 장애성 실패, 호출 시작 후 제한 시간 초과)를 브레이커에 기록합니다.
+
+    Args:
+        request: 연결 끊김 확인용 요청 객체 (None이면 확인하지 않음)
+        deadline: 제한 시간(초)
+        **kwargs: responses.create 인자
+
+    Returns:
+        OpenAI Response 객체
+
+    Raises:
+        HTTPException: 503 - OpenAI 서킷 브레이커가 열려 있음
+        HTTPException: 504 - 제한 시간 초과
+        HTTPException: 499 - 클라이언트 연결 끊김
+    """
+    check_openai_breaker()
+    started = False
+
+    async def call():
+        nonlocal started
+        async with llm_semaphore:
+            started = True
+            outcome = "error"
+            start = time.perf_counter()
+            llm_span = start_span("openai.create", model=kwargs.get("model"))
+            try:
+                response = await async_openai_client.responses.create(**kwargs)
+                outcome = "ok"
+            except OPENAI_FAILURES as e:
+                openai_breaker.record_failure(e)
+                raise
+            except asyncio.CancelledError:
+                outcome = "cancelled"  # 제한 시간 초과 또는 클라이언트 연결 끊김
+                raise
+            finally:
+                OPENAI_REQUEST_SECONDS.observe(time.perf_counter() - start, call="create", outcome=outcome)
+                llm_span.set(outcome=outcome, **usage_attributes(response if outcome == "ok" else None))
+                llm_span.end()
+            openai_breaker.record_success()
+            observe_openai_usage("create", response)
+            return response
+
+    task = asyncio.ensure_future(asyncio.wait_for(call(), timeout=deadline))
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+            if done:
+                return task.result()
+            if request is not None and await request.is_disconnected():
+                print(f"⚠ Client disconnected. OpenAI call cancelled ({request.url.path})")
+                raise HTTPException(status_code=499, detail="Client disconnected")
+    except asyncio.TimeoutError as e:
+        if started:
+            # 세마포어 대기만으로 시간이 초과된 경우는 OpenAI 장애가 아니므로 기록하지 않음
+            openai_breaker.record_failure(e)
+        raise HTTPException(status_code=504, detail=f"AI Error: OpenAI 응답 시간 초과 ({deadline:g}초)")
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+async def stream_llm_text(deadline: float = OPENAI_DEADLINE, **kwargs):
+    """
+    비동기 OpenAI 클라이언트로 Responses API를 스트리밍 호출하여 출력 텍스트 조각을 차례로 반환합니다.
+
+    create_llm_response와 같은 세마포어, 제한 시간(스트림 전체 기준), OpenAI 서킷 브레이커를 적용합니다.
+    클라이언트 연결이 끊기면 StreamingResponse가 이 생성기를 취소하므로 스트림을 닫고 세마포어를 반납합니다.
+
+    Args:
+        deadline: 제한 시간(초)
+        **kwargs: responses.create 인자 (stream=True는 자동 추가)
+
+    Yields:
+        출력 텍스트 조각 (response.output_text.delta)
+
+    Raises:
+        HTTPException: 503 - OpenAI 서킷 브레이커가 열려 있음
+        HTTPException: 504 - 제한 시간 초과
+        RuntimeError: OpenAI가 실패 이벤트를 보낸 경우
+    """
+    check_openai_breaker()
+    loop = asyncio.get_running_loop()
+    expires_at = loop.time() + deadline
+
+    def remaining() -> float:
+        left = expires_at - loop.time()
+        if left <= 0:
+            raise asyncio.TimeoutError
+        return left
+
+    try:
+        await asyncio.wait_for(llm_semaphore.acquire(), remaining())
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f"AI Error: OpenAI 응답 시간 초과 ({deadline:g}초)")
+
+    stream = None
+    outcome = "error"
+    start = time.perf_counter()
+    # 생성기 안에서 컨텍스트를 바꾸면 yield 사이에 호출자 컨텍스트로 새므로 컨텍스트를 바꾸지 않는 span 사용
+    llm_span = start_span("openai.stream", model=kwargs.get("model"))
+    try:
+        stream = await asyncio.wait_for(async_openai_client.responses.create(stream=True, **kwargs), remaining())
+        events = stream.__aiter__()
+        while True:
+            try:
+                event = await asyncio.wait_for(events.__anext__(), remaining())
+            except StopAsyncIteration:
+                openai_breaker.record_success()
+                outcome = "ok"
+                return
+            if event.type == "response.output_text.delta":
+                yield event.delta
+            elif event.type == "response.completed":
+                observe_openai_usage("stream", event.response)
+                llm_span.set(**usage_attributes(event.response))
+            elif event.type in ("response.failed", "response.incomplete", "error"):
+                raise RuntimeError(f"OpenAI stream {event.type}")
+    except OPENAI_FAILURES as e:
+        openai_breaker.record_failure(e)
+        raise
+    except (asyncio.CancelledError, GeneratorExit):
+        outcome = "cancelled"  # 클라이언트 연결 끊김으로 생성기가 닫힌 경우
+        raise
+    except asyncio.TimeoutError as e:
+        outcome = "timeout"
+        openai_breaker.record_failure(e)
+        raise HTTPException(status_code=504, detail=f"AI Error: OpenAI 응답 시간 초과 ({deadline:g}초)")
+    finally:
+        OPENAI_REQUEST_SECONDS.observe(time.perf_counter() - start, call="stream", outcome=outcome)
+        llm_span.set(outcome=outcome)
+        llm_span.end()
+        llm_semaphore.release()
+        if stream is not None:
+            await stream.close()
+
+
+def course_advice_request(objective_grade: str, preferences: Optional[str], course_reviews_str: str,
+                          signals: Optional[dict]) -> dict:
+    """과목 조언용 responses.create 인자를 생성합니다 (난이도 집계가 있으면 요약/조언만 요청)."""
+    return {
+            "model"    : ADVICE_MODEL,
+            "input"    : build_course_advice_prompt(objective_grade, preferences, course_reviews_str, signals),
+            "text"     : {
+                    "verbosity": "low",
+                    "format"   : {
+                            "type"  : "json_schema",
+                            "name"  : "course_advice",
+                            "schema": COURSE_PROSE_SCHEMA if signals else COURSE_ADVICE_SCHEMA
+                    }
+            },
+            "reasoning": {"effort": "minimal"},
+    }
+
+
+def semester_advice_request(courses: List[dict], efforts: List[int], preferences: Optional[str]) -> dict:
+    """학기 전체 조언(overall_advice)용 responses.create 인자를 생성합니다 (노력 배분은 이미 계산된 값 사용)."""
+    return {
+            "model"    : ADVICE_MODEL,
+            "input"    : build_semester_plan_prompt(courses, efforts, preferences),
+            "text"     : {
+                    "verbosity": "low",
+                    "format"   : {
+                            "type"  : "json_schema",
+                            "name"  : "semester_advice",
+                            "schema": SEMESTER_ADVICE_SCHEMA
+                    }
+            },
+            "reasoning": {"effort": "minimal"},
+    }
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Server-Sent Events 형식의 이벤트 문자열을 생성합니다."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def sse_response(events) -> StreamingResponse:
+    """SSE 이벤트 생성기(또는 이벤트 문자열 리스트)를 프록시 버퍼링 없이 전송하는 응답을 생성합니다."""
+    return StreamingResponse(events, media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+async def stream_advice_events(request_kwargs: dict, initial_fields: dict, response_model, cache_key: str,
+                               transform: Optional[Callable[[dict], dict]] = None):
+    """
+    조언 LLM 출력을 스트리밍하며 완성된 필드를 SSE 이벤트로 보냅니다.
+
+    이벤트 종류:
+        - field: {"name": 필드 이름, "value": 값} - 필드 값이 완성될 때마다 (initial_fields는 즉시)
+        - result: 검증된 최종 응답 객체 - 전체 출력이 끝난 뒤 (결과는 cache_key에 저장)
+        - error: {"status_code": 코드, "detail": 메시지} - 실패 시 (캐시에 저장하지 않음)
+
+    Args:
+        request_kwargs: responses.create 인자
+        initial_fields: LLM 호출 전에 이미 알고 있는 필드 (예: 라벨 집계 난이도)
+        response_model: 최종 응답 검증용 Pydantic 모델
+        cache_key: 결과를 저장할 캐시 키
+        transform: 보내기 전에 필드/결과에 적용할 변환 (캐시에는 변환 전 결과를 저장, 예: 학기 계획 과목 순서 복원)
+
+    Yields:
+        SSE 이벤트 문자열
+    """
+    def present(data: dict) -> dict:
+        return transform(data) if transform else data
+
+    for name, value in initial_fields.items():
+        yield sse_event("field", {"name": name, "value": present({name: value})[name]})
+
+    parser = StreamingJsonFields()
+    try:
+        async for delta in stream_llm_text(**request_kwargs):
+            for name, value in parser.feed(delta):
+                yield sse_event("field", {"name": name, "value": present({name: value})[name]})
+        result = response_model(**{**initial_fields, **parse_llm_json(parser.buffer)})
+    except HTTPException as e:
+        yield sse_event("error", {"status_code": e.status_code, "detail": e.detail})
+        return
+    except json.JSONDecodeError as e:
+        yield sse_event("error", {"status_code": 500, "detail": f"JSON Parse Error: {str(e)}"})
+        return
+    except Exception as e:
+        yield sse_event("error", {"status_code": 500, "detail": f"AI Error: {str(e)}"})
+        return
+
+    set_cached_response(cache_key, result.model_dump())
+    yield sse_event("result", present(result.model_dump()))
+
+
+# =============================================================================
+# API 엔드포인트
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# System
+# -----------------------------------------------------------------------------
+
+@app.get("/health", tags=["System"])
+async def health_check():
+    """
+    서버 상태 확인 엔드포인트.
+
+    의존성(Redis, OpenAI)의 서킷 브레이커 상태를 함께 반환합니다. 브레이커가 열려 있어도 서버는
+    캐시 없이 / AI 조언 없이 계속 응답하므로 HTTP 상태 코드는 200이며, status만 "degraded"로 표시합니다.
+
+    Returns:
+        dict: {"status": "healthy" | "degraded", "dependencies": {이름: 브레이커 상태}, "cache_backends": [...]}
+    """
+    dependencies = {"redis": redis_breaker.snapshot(), "openai": openai_breaker.snapshot()}
+    dependencies["openai"]["configured"] = async_openai_client is not None
+    degraded = any(dep["state"] != CLOSED for dep in dependencies.values())
+    return {"status": "degraded" if degraded else "healthy", "dependencies": dependencies,
+            "cache_backends": response_cache.names}
+
+
+@app.get("/metrics", tags=["System"])
+async def get_metrics():
+    """
+    Prometheus 형식 지표 엔드포인트.
+
+    모든 uvicorn 워커의 지표를 합산하여 반환합니다. 외부에는 Caddy에서 차단되며, 같은 네트워크의
+    Prometheus가 app:8000/metrics를 수집하는 용도입니다.
+
+    주요 지표:
+        - http_request_duration_seconds{method, route, status}, http_requests_in_progress{method, route}
+        - db_query_duration_seconds{operation}, redis_command_duration_seconds{command}, redis_errors_total{command}
+        - openai_request_duration_seconds{call, outcome}, openai_tokens_total{call, type}
+        - ml_predict_duration_seconds{stage} (preprocess / forward / postprocess)
+        - ml_layer_duration_seconds{layer, set_size}, ml_layer_output_bytes{layer, set_size} (ML_LAYER_SAMPLE_RATE 비율)
+        - cache_requests_total{prefix, result}
+        - threadpool_busy_threads, threadpool_max_threads, threadpool_waiting_tasks
+
+    Returns:
+        Response: text/plain (Prometheus 텍스트 형식 0.0.4)
+    """
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
+
+
+@app.get("/dummy-histo", tags=["Development"])
+async def get_dummy_histogram():
+    """
+    테스트용 더미 히스토그램 데이터를 반환합니다.
+
+    개발 및 디버깅 목적으로 사용되는 샘플 히스토그램 데이터입니다.
+
+    Returns:
+        dict: 10개 구간의 더미 성적 분포 데이터
+    """
+    return {"0-10" : 5, "10-20": 15, "20-30": 25, "30-40": 10, "40-50": 8, "50-60": 12, "60-70": 7, "70-80": 3,
+            "80-90": 1, "90-100": 0}
+
+
+# -----------------------------------------------------------------------------
+# Student Profile
+# -----------------------------------------------------------------------------
+
+@app.put("/student-profile", response_model=StudentProfileResponse, tags=["Student Profile"])
+async def update_student_profile(profile: StudentProfileCreate, db: Session = Depends(get_db)):
+    """
+    학생 프로필을 업데이트합니다.
+
+    ID 1번 학생의 프로필을 항상 업데이트하며, 프로필이 없으면 새로 생성합니다.
+    학생의 선호도 및 특성 정보는 AI 학습 조언 생성 시 활용됩니다.
+
+    Args:
+        profile: 학생 프로필 생성 요청 (preferences 포함)
+        db: 데이터베이스 세션
+
+    Returns:
+        StudentProfileResponse: 업데이트된 학생 프로필 정보
+    """
+    student_id = 1
+    existing_profile = db.query(StudentProfileModel).filter(StudentProfileModel.id == student_id).first()
+
+    if existing_profile:
+        # 기존 프로필 업데이트
+        existing_profile.preferences = profile.preferences
+        db.commit()
+        db.refresh(existing_profile)
+        return existing_profile
+    else:
+        # 프로필이 없으면 새로 생성
+        new_profile = StudentProfileModel(id=student_id, preferences=profile.preferences)
+        db.add(new_profile)
+        db.commit()
+        db.refresh(new_profile)
+        return new_profile
+
+
+@app.get("/student-profile", response_model=StudentProfileResponse, tags=["Student Profile"])
+async def get_student_profile(db: Session = Depends(get_db)):
+    """
+    학생 프로필을 조회합니다.
+
+    ID 1번 학생의 프로필 정보를 반환합니다.
+
+    Args:
+        db: 데이터베이스 세션
+
+    Returns:
+        StudentProfileResponse: 학생 프로필 정보 (id, preferences)
+
+    Raises:
+        HTTPException: 404 - 학생 프로필이 없는 경우
+    """
+    student_id = 1
+    profile = db.query(StudentProfileModel).filter(StudentProfileModel.id == student_id).first()
+
+    if not profile:
+        raise HTTPException(status_code=404, detail="학생 프로필이 없습니다.")
+
+    return profile
+
+
+# -----------------------------------------------------------------------------
+# Course Management
+# -----------------------------------------------------------------------------
+
+@app.post("/courses", response_model=CourseResponse, tags=["Courses"])
+async def create_course(course: CourseCreate, db: Session = Depends(get_db)):
+    """
+    새로운 과목을 생성합니다.
+
+    Args:
+        course: 과목 생성 요청 (name, course_code, total_students)
+        db: 데이터베이스 세션
+
+    Returns:
+        CourseResponse: 생성된 과목 정보
+
+    Raises:
+        HTTPException: 409 - 같은 학수번호의 과목이 이미 있는 경우
+    """
+    new_course = CourseModel(**course.dict())
+    db.add(new_course)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Course code already exists")
+    db.refresh(new_course)
+    return new_course
+
+
+@app.get("/courses", response_model=List[CourseResponse], tags=["Courses"])
+async def get_all_courses(db: Session = Depends(get_db)):
+    """
+    모든 과목 목록을 조회합니다.
+
+    Args:
+        db: 데이터베이스 세션
+
+    Returns:
+        List[CourseResponse]: 전체 과목 정보 리스트
+    """
+    return db.query(CourseModel).all()
+
+
+# -----------------------------------------------------------------------------
+# Evaluation Items
+# -----------------------------------------------------------------------------
+
+@app.post("/evaluation-items", response_model=EvaluationItemResponse, tags=["Evaluation Items"])
+async def create_evaluation_item(item: EvaluationItemCreate, db: Session = Depends(get_db)):
+    """
+    새로운 평가 항목을 생성합니다.
+
+    과제, 시험 등의 평가 항목을 생성합니다.
+
+    Args:
+        item: 평가 항목 생성 요청 (course_id, name, weight, my_score, is_submitted)
+        db: 데이터베이스 세션
+
+    Returns:
+        EvaluationItemResponse: 생성된 평가 항목 정보
+    """
+    new_item = EvaluationItemModel(**item.dict())
+    db.add(new_item)
+    db.commit()
+    db.refresh(new_item)
+    return new_item
+
+
+@app.get("/evaluation-items", response_model=List[EvaluationItemResponse], tags=["Evaluation Items"])
+async def get_all_evaluation_items(db: Session = Depends(get_db)):
+    """
+    모든 평가 항목 목록을 조회합니다.
+
+    Args:
+        db: 데이터베이스 세션
+
+    Returns:
+        List[EvaluationItemResponse]: 전체 평가 항목 정보 리스트
+    """
+    return db.query(EvaluationItemModel).all()
+
+
+# -----------------------------------------------------------------------------
+# Course Reviews
+# -----------------------------------------------------------------------------
+
+@app.post("/course-reviews", response_model=CourseReviewResponse, tags=["Course Reviews"])
+async def create_course_review(review: CourseReviewCreate, background_tasks: BackgroundTasks,
+                               db: Session = Depends(get_db)):
+    """
+    새로운 과목 수강평을 생성합니다.
+
+    수강평이 추가되면 AI 조언 생성에 사용되는 모든 캐시가 자동으로 무효화되고,
+    해당 과목의 수강평 요약이 백그라운드에서 증분 갱신됩니다.
+
+    Args:
+        review: 수강평 생성 요청 (course_id, content, 선택: year, semester)
+        background_tasks: 수강평 요약 갱신 예약용
+        db: 데이터베이스 세션
+
+    Returns:
+        CourseReviewResponse: 생성된 수강평 정보
+
+    Raises:
+        HTTPException: 409 - 같은 과목에 내용이 같은 수강평이 이미 있는 경우
+    """
+    new_review = CourseReviewModel(**review.dict(), content_hash=content_hash(review.content.strip()))
+    db.add(new_review)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Duplicate review for this course")
+    db.refresh(new_review)
+
+    # 해당 과목의 모든 캐시 무효화
+    invalidate_cache_pattern(f"cache:course_advice:*")
+    invalidate_cache_pattern(f"cache:semester_advice:*")
+
+    if USE_REVIEW_DIGEST and openai_client:
+        background_tasks.add_task(rebuild_course_digest, DB_PATH, openai_client, new_review.course_id)
+
+    return new_review
+
+
+@app.get("/course-reviews", response_model=List[CourseReviewResponse], tags=["Course Reviews"])
+async def get_all_course_reviews(db: Session = Depends(get_db)):
+    """
+    모든 과목 수강평 목록을 조회합니다.
 
     Args:
         db: 데이터베이스 세션
@@ -649,6 +1754,101 @@ async def get_all_course_reviews(db: Session = Depends(get_db)):
     return db.query(CourseReviewModel).all()
 
 
+@app.get("/course-reviews/search", response_model=ReviewSearchResponse, tags=["Course Reviews"])
+async def search_course_reviews(q: str = Query(..., min_length=1, description="검색어"),
+                                course_id: Optional[int] = Query(None, description="과목 ID 필터"),
+                                match: str = Query("all", pattern="^(all|any)$",
+                                                   description="all: 모든 단어 포함, any: 하나 이상 포함"),
+                                limit: int = Query(20, ge=1, le=100),
+                                offset: int = Query(0, ge=0),
+                                db: Session = Depends(get_db)):
+    """
+    수강평 본문을 전문 검색(FTS5, trigram)하여 관련성 순으로 페이지 단위 조회합니다.
+
+    검색어는 조사를 제거한 단어로 나뉘며, 3글자 이상 단어는 FTS5 bm25 점수로,
+    2글자 단어는 부분 문자열 포함 여부로 점수를 매깁니다. 점수가 같으면 최신 수강평이 먼저 옵니다.
+
+    Args:
+        q: 검색어 (예: "팀플 과제", "시험 족보")
+        course_id: 과목 ID 필터 (선택)
+        match: 단어 결합 방식 (all 또는 any)
+        limit: 페이지 크기 (1~100)
+        offset: 건너뛸 결과 수
+        db: 데이터베이스 세션
+
+    Returns:
+        ReviewSearchResponse: 전체 결과 수와 현재 페이지 결과
+    """
+    total, rows = await run_in_threadpool(search_reviews, sqlite_connection(db), q, course_id, limit, offset,
+                                          match == "all")
+    return ReviewSearchResponse(
+            query=q,
+            terms=query_terms(q),
+            total=total,
+            limit=limit,
+            offset=offset,
+            results=[ReviewSearchResult(id=row[0], course_id=row[1], content=row[2], year=row[3], semester=row[4],
+                                        score=row[5]) for row in rows]
+    )
+
+
+@app.get("/courses/{course_id}/difficulty-signals", response_model=DifficultySignalsResponse,
+         tags=["Course Reviews"])
+def get_course_difficulty_signals_endpoint(course_id: int, db: Session = Depends(get_db)):
+    """
+    AI 조언에 사용되는 과목 난이도 집계값을 조회합니다.
+
+    수강평 라벨(label_reviews.py)이 충분하면 라벨 집계를, 부족하면 로컬 분류기 예측 집계를 반환합니다.
+    둘 다 사용할 수 없으면 라벨 집계(source="labels")를 그대로 반환합니다.
+    동기 DB 조회와 과목 전체 수강평의 분류기 예측을 실행하므로 이벤트 루프가 아닌 스레드풀에서 실행됩니다 (def).
+
+    Args:
+        course_id: 과목 ID
+        db: 데이터베이스 세션
+
+    Returns:
+        DifficultySignalsResponse: 라벨링 현황과 과제/시험 난이도, 분량, 채점 관대함 평균 및 집계 출처
+    """
+    signals = get_course_difficulty_signals(course_id, db) or aggregate_difficulty_signals(course_id, db)
+    return DifficultySignalsResponse(**signals)
+
+
+@app.get("/courses/{course_id}/review-digest", response_model=ReviewDigestResponse, tags=["Course Reviews"])
+async def get_course_review_digest(course_id: int, db: Session = Depends(get_db)):
+    """
+    과목의 수강평 요약(digest)과 토큰 절감 현황을 조회합니다.
+
+    요약은 review_digest.py 실행 또는 수강평 추가 시 백그라운드로 생성되며,
+    AI 조언 엔드포인트가 원본 수강평 대신 프롬프트에 사용합니다.
+
+    Args:
+        course_id: 과목 ID
+        db: 데이터베이스 세션
+
+    Returns:
+        ReviewDigestResponse: 요약 내용, 최신 여부, 원본/요약 토큰 수
+
+    Raises:
+        HTTPException: 404 - 해당 과목의 요약이 아직 생성되지 않은 경우
+    """
+    digest = db.query(CourseReviewDigestModel).filter(CourseReviewDigestModel.course_id == course_id).first()
+    if not digest:
+        raise HTTPException(status_code=404, detail="수강평 요약이 아직 생성되지 않았습니다.")
+
+    reviews, _ = get_recent_reviews(course_id, db)
+
+    return ReviewDigestResponse(
+            course_id=course_id,
+            review_count=len(reviews),
+            digest_review_count=digest.review_count,
+            is_fresh=review_set_hash(reviews) == digest.review_hash,
+            raw_tokens=digest.raw_tokens,
+            digest_tokens=digest.digest_tokens,
+            updated_at=digest.updated_at,
+            digest=digest.digest
+    )
+
+
 # -----------------------------------------------------------------------------
 # Other Student Scores
 # -----------------------------------------------------------------------------
@@ -749,18 +1949,7 @@ def predict_histogram(evaluation_item_id: int, db: Session = Depends(get_db)):
     my_percentile = None
 
     if my_score is not None:
-        cumulative_below = 0
-        for bin_range, count in histogram.items():
-            bin_start = int(bin_range.split('-')[0])
-            bin_end = int(bin_range.split('-')[1])
-
-            if my_score > bin_end:
-                cumulative_below += count
-            elif bin_start <= my_score <= bin_end:
-                cumulative_below += count * (my_score - bin_start) / (bin_end - bin_start)
-                break
-
-        my_percentile = (cumulative_below / total) * 100 if total > 0 else None
+        my_percentile = histogram_percentile(histogram, my_score, total)
 
     statistics = calculate_histogram_statistics(histogram)
 
@@ -776,142 +1965,573 @@ def predict_histogram(evaluation_item_id: int, db: Session = Depends(get_db)):
     )
 
 
-# -----------------------------------------------------------------------------
-# AI Advice (OpenAI API)
-# -----------------------------------------------------------------------------
+# -----------------------------------------------------------------------------
+# AI Advice (OpenAI API)
+# -----------------------------------------------------------------------------
+
+async def generate_course_advice(request: Optional[Request], course_id: int, objective_grade: str, db: Session,
+                                 background_tasks: Optional[BackgroundTasks] = None,
+                                 deadline: float = OPENAI_DEADLINE) -> ReviewAnalysisResponse:
+    """
+    과목 조언을 생성하고 course_advice 캐시에 저장합니다 (캐시 확인은 호출하는 쪽에서 수행).
+
+    Args:
+        request: 클라이언트 연결 끊김 확인용 (None이면 확인하지 않음, 예: 비동기 작업)
+        course_id: 과목 ID
+        objective_grade: 목표 성적
+        db: 데이터베이스 세션 (프롬프트 준비 후 닫음)
+        background_tasks: 수강평 요약 갱신 예약용 (선택)
+        deadline: OpenAI 대기+호출 제한 시간(초)
+
+    Returns:
+        ReviewAnalysisResponse
+
+    Raises:
+        HTTPException: 404 - 해당 과목의 수강평이 없는 경우
+        HTTPException: 500 - AI 분석 실패 시
+        HTTPException: 504 - OpenAI 응답 시간 초과
+    """
+    course_reviews_str, preferences, signals = await run_in_threadpool(
+            prepare_course_prompt, course_id, db, background_tasks)
+    db.close()  # LLM 응답을 기다리는 동안 DB 연결을 풀에 반납
+
+    try:
+        response = await create_llm_response(
+                request, deadline, **course_advice_request(objective_grade, preferences, course_reviews_str, signals))
+
+        result = parse_llm_json(response.output_text)
+        if signals:
+            result = {**difficulty_from_signals(signals), **result}
+
+        # 결과를 캐시에 저장
+        set_cached_response(generate_cache_key("course_advice", course_id, objective_grade), result)
+
+        return ReviewAnalysisResponse(**result)
+    except HTTPException:
+        raise
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=500,
+                            detail=f"JSON Parse Error: {str(e)} - Response: {response.output_text[:200]}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"AI Error: {str(e)}")
+
+
+@app.get("/courses/{course_id}/advice", response_model=ReviewAnalysisResponse, tags=["AI Advice"])
+async def get_course_advice(
+        course_id: int,
+        objective_grade: str,
+        request: Request,
+        background_tasks: BackgroundTasks,
+        prefetch_grades: bool = Query(False, description="다른 목표 성적 구간의 조언도 한 번의 호출로 함께 생성하여 캐시"),
+        db: Session = Depends(get_db)
+):
+    """
+    과목의 수강평을 분석하여 목표 성적 달성을 위한 학습 조언을 제공합니다.
+
+    OpenAI API를 사용하여 수강평을 분석하고:
+    - 과제 및 시험 난이도를 1-5 척도로 평가
+    - 시험/과제 공통 언급 사항 요약
+    - 목표 성적 달성을 위한 맞춤형 학습 전략 제공
+    - 학생 프로필의 선호도 정보를 고려한 조언
+
+    Redis 캐시를 사용하여 동일한 요청에 대한 응답 속도를 향상시킵니다 (TTL: 1시간).
+    수강평 요약(review_digest.py)이 있으면 원본 수강평 대신 요약을 프롬프트에 사용합니다.
+    수강평 라벨(label_reviews.py)이 충분히 쌓인 과목은 난이도를 SQL 집계로 계산하고 LLM은 요약/조언만 작성합니다.
+    라벨이 부족하면 로컬 난이도 분류기(difficulty_classifier.py)의 예측 집계를 대신 사용합니다.
+    prefetch_grades=true이면 캐시 미스 시 ADVICE_GRADE_TIERS의 다른 목표 성적 조언까지
+    한 번의 호출로 생성해 각각의 캐시 키에 저장하므로, 이후 목표 성적을 바꿔도 캐시에서 응답합니다.
+    OpenAI 호출은 비동기로 기다리므로 조언 요청이 몰려도 스레드풀을 점유하지 않습니다
+    (동시 호출 수 OPENAI_MAX_CONCURRENCY, 제한 시간 OPENAI_DEADLINE, 연결이 끊기면 호출 취소).
+
+    Args:
+        course_id: 과목 ID
+        objective_grade: 목표 성적 (예: "A+", "A0", "B+", "B0")
+        request: 클라이언트 연결 끊김 확인용
+        background_tasks: 수강평 요약 갱신 예약용
+        prefetch_grades: 다른 목표 성적 조언을 함께 생성할지 여부
+        db: 데이터베이스 세션
+
+    Returns:
+        ReviewAnalysisResponse: 학습 조언 및 난이도 분석 결과
+            - assignment_difficulty: 과제 난이도 (1-5 척도)
+            - exam_difficulty: 시험 난이도 (1-5 척도)
+            - summary: 시험/과제 공통 언급 요약
+            - advice: 목표 성적 달성을 위한 전략 조언
+
+    Raises:
+        HTTPException: 503 - OpenAI API 키가 설정되지 않은 경우
+        HTTPException: 404 - 해당 과목의 수강평이 없는 경우
+        HTTPException: 500 - AI 분석 실패 시
+        HTTPException: 504 - OpenAI 응답 시간 초과
+    """
+    if not async_openai_client:
+        raise HTTPException(status_code=503, detail="OpenAI API Key missing")
+
+    record_advice_request(course_id, objective_grade)
+
+    # 캐시 키 생성
+    cache_key = generate_cache_key("course_advice", course_id, objective_grade)
+
+    # 캐시된 응답 확인
+    cached_response = get_cached_response(cache_key)
+    if cached_response:
+        return ReviewAnalysisResponse(**cached_response)
+
+    if prefetch_grades:
+        other_keys = {g: generate_cache_key("course_advice", course_id, g)
+                      for g in ADVICE_GRADE_TIERS if g != objective_grade}
+        cached_others = get_cached_responses(list(other_keys.values()))
+        grades = [objective_grade] + [g for g, key in other_keys.items() if not cached_others.get(key)]
+        results = await generate_multi_grade_advice(request, course_id, grades, db, background_tasks)
+        return ReviewAnalysisResponse(**results[objective_grade])
+
+    return await generate_course_advice(request, course_id, objective_grade, db, background_tasks)
+
+
+@app.get("/courses/{course_id}/advice/stream", tags=["AI Advice"])
+async def stream_course_advice(
+        course_id: int,
+        objective_grade: str,
+        background_tasks: BackgroundTasks,
+        db: Session = Depends(get_db)
+):
+    """
+    과목 학습 조언을 Server-Sent Events로 스트리밍합니다.
+
+    /courses/{course_id}/advice와 같은 조언을 생성하되, 전체 응답을 기다리지 않고
+    과제/시험 난이도, 요약, 조언 필드가 완성되는 대로 field 이벤트로 보낸 뒤
+    검증된 ReviewAnalysisResponse를 result 이벤트로 보냅니다.
+    끝까지 생성된 결과만 /courses/{course_id}/advice와 같은 캐시 키에 저장하며,
+    캐시 히트 시에는 result 이벤트 하나를 바로 보냅니다.
+    라벨 집계/분류기 난이도가 있으면 LLM 호출 전에 난이도 field 이벤트를 먼저 보냅니다.
+
+    이벤트 형식:
+        event: field   data: {"name": "assignment_difficulty", "value": 4}
+        event: result  data: {"assignment_difficulty": 4, "exam_difficulty": 3, "summary": "...", "advice": "..."}
+        event: error   data: {"status_code": 504, "detail": "..."}
+
+    Args:
+        course_id: 과목 ID
+        objective_grade: 목표 성적 (예: "A+", "A0", "B+", "B0")
+        background_tasks: 수강평 요약 갱신 예약용
+        db: 데이터베이스 세션
+
+    Returns:
+        StreamingResponse: text/event-stream 응답
+
+    Raises:
+        HTTPException: 503 - OpenAI API 키가 설정되지 않은 경우
+        HTTPException: 404 - 해당 과목의 수강평이 없는 경우
+    """
+    if not async_openai_client:
+        raise HTTPException(status_code=503, detail="OpenAI API Key missing")
+
+    record_advice_request(course_id, objective_grade)
+
+    cache_key = generate_cache_key("course_advice", course_id, objective_grade)
+    cached_response = get_cached_response(cache_key)
+    if cached_response:
+        return sse_response([sse_event("result", ReviewAnalysisResponse(**cached_response).model_dump())])
+
+    course_reviews_str, preferences, signals = await run_in_threadpool(
+            prepare_course_prompt, course_id, db, background_tasks)
+    db.close()  # LLM 응답을 기다리는 동안 DB 연결을 풀에 반납
+
+    return sse_response(stream_advice_events(
+            course_advice_request(objective_grade, preferences, course_reviews_str, signals),
+            difficulty_from_signals(signals) if signals else {},
+            ReviewAnalysisResponse,
+            cache_key,
+    ))
+
+
+async def generate_multi_grade_advice(request: Optional[Request], course_id: int, grades: List[str], db: Session,
+                                      background_tasks: Optional[BackgroundTasks] = None,
+                                      deadline: float = OPENAI_DEADLINE) -> Dict[str, dict]:
+    """
+    여러 목표 성적에 대한 과목 조언을 한 번의 OpenAI 호출로 생성하고 성적별로 캐시합니다.
+
+    수강평 전체를 목표 성적마다 반복 전송하지 않도록 난이도/요약은 한 번만,
+    조언은 목표 성적별로 생성한 뒤 각 결과를 course_advice 캐시 키에 나누어 저장합니다.
+
+    Args:
+        request: 클라이언트 연결 끊김 확인용 (None이면 확인하지 않음)
+        course_id: 과목 ID
+        grades: 생성할 목표 성적 리스트
+        db: 데이터베이스 세션
+        background_tasks: 수강평 요약 갱신 예약용 (선택)
+        deadline: OpenAI 대기+호출 제한 시간(초)
+
+    Returns:
+        {목표 성적: ReviewAnalysisResponse 형식 딕셔너리}
+
+    Raises:
+        HTTPException: 404 - 해당 과목의 수강평이 없는 경우
+        HTTPException: 500 - AI 분석 실패 시
+        HTTPException: 504 - OpenAI 응답 시간 초과
+    """
+    course_reviews_str, preferences, signals = await run_in_threadpool(
+            prepare_course_prompt, course_id, db, background_tasks)
+    db.close()  # LLM 응답을 기다리는 동안 DB 연결을 풀에 반납
+
+    try:
+        response = await create_llm_response(
+                request,
+                deadline,
+                model=ADVICE_MODEL,
+                input=build_multi_grade_advice_prompt(grades, preferences, course_reviews_str, signals),
+                text={
+                        "verbosity": "low",
+                        "format"   : {
+                                "type"  : "json_schema",
+                                "name"  : "course_advice_by_grade",
+                                "schema": multi_grade_advice_schema(grades, include_difficulty=signals is None)
+                        }
+                },
+                reasoning={"effort": "minimal"},
+        )
+
+        result = parse_llm_json(response.output_text)
+        if signals:
+            result = {**difficulty_from_signals(signals), **result}
+        results = split_multi_grade_result(result, grades)
+    except HTTPException:
+        raise
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=500,
+                            detail=f"JSON Parse Error: {str(e)} - Response: {response.output_text[:200]}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"AI Error: {str(e)}")
+
+    if set(results) != set(grades):
+        raise HTTPException(status_code=500, detail="AI Error: 일부 목표 성적에 대한 조언이 누락되었습니다.")
+
+    # 목표 성적별로 단일 조언과 동일한 캐시 키에 저장
+    set_cached_responses({generate_cache_key("course_advice", course_id, grade): result
+                          for grade, result in results.items()})
+
+    return results
+
+
+@app.get("/courses/{course_id}/advice/grades", response_model=MultiGradeAdviceResponse, tags=["AI Advice"])
+async def get_course_advice_by_grades(
+        course_id: int,
+        request: Request,
+        background_tasks: BackgroundTasks,
+        grades: Optional[List[str]] = Query(None, description="목표 성적 리스트 (기본값: ADVICE_GRADE_TIERS)"),
+        db: Session = Depends(get_db)
+):
+    """
+    여러 목표 성적에 대한 과목 학습 조언을 한 번에 제공합니다.
+
+    캐시에 없는 목표 성적만 모아 한 번의 OpenAI 호출로 생성하고,
+    결과는 목표 성적별 course_advice 캐시에 저장되어 /courses/{course_id}/advice 에서도 재사용됩니다.
+
+    사용 예시:
+        /courses/1/advice/grades?grades=A+&grades=A0&grades=B+
+
+    Args:
+        course_id: 과목 ID
+        request: 클라이언트 연결 끊김 확인용
+        background_tasks: 수강평 요약 갱신 예약용
+        grades: 목표 성적 리스트 (생략 시 ADVICE_GRADE_TIERS)
+        db: 데이터베이스 세션
+
+    Returns:
+        MultiGradeAdviceResponse: 목표 성적별 난이도 분석 및 조언
+
+    Raises:
+        HTTPException: 503 - OpenAI API 키가 설정되지 않은 경우
+        HTTPException: 404 - 해당 과목의 수강평이 없는 경우
+        HTTPException: 500 - AI 분석 실패 시
+        HTTPException: 504 - OpenAI 응답 시간 초과
+    """
+    if not async_openai_client:
+        raise HTTPException(status_code=503, detail="OpenAI API Key missing")
+
+    return await get_multi_grade_advice(request, course_id, list(dict.fromkeys(grades or ADVICE_GRADE_TIERS)),
+                                        db, background_tasks)
+
+
+async def get_multi_grade_advice(request: Optional[Request], course_id: int, grades: List[str], db: Session,
+                                 background_tasks: Optional[BackgroundTasks] = None,
+                                 deadline: float = OPENAI_DEADLINE) -> MultiGradeAdviceResponse:
+    """
+    목표 성적별 조언을 캐시에서 찾고, 캐시에 없는 목표 성적만 한 번의 OpenAI 호출로 생성합니다.
+
+    Args:
+        request: 클라이언트 연결 끊김 확인용 (None이면 확인하지 않음)
+        course_id: 과목 ID
+        grades: 목표 성적 리스트 (중복 없음)
+        db: 데이터베이스 세션
+        background_tasks: 수강평 요약 갱신 예약용 (선택)
+        deadline: OpenAI 대기+호출 제한 시간(초)
+
+    Returns:
+        MultiGradeAdviceResponse
+    """
+    cache_keys = {grade: generate_cache_key("course_advice", course_id, grade) for grade in grades}
+    cached_responses = get_cached_responses(list(cache_keys.values()))
+    advice_by_grade = {grade: cached_responses[key] for grade, key in cache_keys.items() if cached_responses.get(key)}
+    missing_grades = [grade for grade in grades if grade not in advice_by_grade]
+
+    if missing_grades:
+        advice_by_grade.update(await generate_multi_grade_advice(
+                request, course_id, missing_grades, db, background_tasks, deadline))
+
+    return MultiGradeAdviceResponse(
+            course_id=course_id,
+            advice_by_grade={grade: ReviewAnalysisResponse(**advice_by_grade[grade]) for grade in grades}
+    )
+
+
+def canonical_course_grades(course_ids: List[int], target_grades: List[str]) -> List[Tuple[int, str]]:
+    """
+    학기 조언 요청을 과목 순서와 무관한 (과목 ID, 목표 성적) 쌍 목록으로 정규화합니다.
+
+    캐시 키와 LLM 프롬프트는 이 정렬된 순서를 사용하고, 응답은 remap_semester_plan으로 요청 순서로 되돌립니다.
+
+    Raises:
+        HTTPException: 400 - 과목 수와 목표 성적 수가 다르거나 같은 과목이 중복된 경우
+    """
+    if len(course_ids) != len(target_grades):
+        raise HTTPException(status_code=400, detail="과목 수와 목표 성적 수가 일치해야 합니다.")
+    if len(set(course_ids)) != len(course_ids):
+        raise HTTPException(status_code=400, detail="같은 과목을 중복해서 선택할 수 없습니다.")
+    return sorted(zip(course_ids, target_grades))
+
+
+def semester_cache_key(pairs: List[Tuple[int, str]]) -> str:
+    """정규화된 (과목 ID, 목표 성적) 쌍의 학기 조언 캐시 키."""
+    return generate_cache_key("semester_advice", tuple(pairs))
+
+
+def remap_semester_plan(plan: dict, pairs: List[Tuple[int, str]], course_ids: List[int]) -> dict:
+    """
+    정규화된 순서의 학기 계획(course_index)을 요청한 과목 순서로 바꿉니다.
+
+    courses가 없는 부분 결과(스트리밍 필드)는 그대로 반환합니다.
+
+    Args:
+        plan: 정규화된 순서 기준 SemesterPlanResponse 형식 딕셔너리
+        pairs: canonical_course_grades 결과
+        course_ids: 요청한 순서의 과목 ID 리스트
+
+    Returns:
+        course_index가 요청 순서(1부터 시작)인 딕셔너리
+    """
+    if "courses" not in plan:
+        return plan
+    effort_by_index = {item["course_index"]: item["effort_percent"] for item in plan["courses"]}
+    canonical_index = {cid: idx for idx, (cid, _) in enumerate(pairs, start=1)}
+    return {
+            **plan,
+            "courses": [{"course_index": idx, "effort_percent": effort_by_index.get(canonical_index[cid], 0)}
+                        for idx, cid in enumerate(course_ids, start=1)]
+    }
+
+
+def item_percentile(my_score: Optional[float], samples: Optional[List[float]], total_students: int) -> Optional[float]:
+    """
+    평가 항목 점수의 학급 내 백분위(0~1)를 계산합니다.
+
+    ML 모델이 로드되어 있으면 예측 히스토그램을, 없거나 실패하면 다른 학생 점수 표본을 분포로 사용합니다.
+    """
+    if my_score is None or not samples:
+        return None
+    if ml_predictor is not None:
+        try:
+            return percentile_in_histogram(ml_predictor.predict(samples, total_students=total_students), my_score)
+        except Exception as e:
+            print(f"⚠ Prediction failed for effort allocation: {e}")
+    return percentile_in_samples(sorted(samples), my_score)
+
+
+def load_semester_courses(course_ids: List[int], db: Session) -> tuple:
+    """
+    학기 계획에 필요한 과목 이름, 노력 배분용 평가 항목, 학생 선호도를 조회합니다.
+
+    Returns:
+        ({과목 ID: {"name", "items": [{"weight", "submitted", "percentile"}]}}, 학생 선호도)
+    """
+    courses = {
+            cid: {"name": name, "total_students": total_students or 99, "items": []}
+            for cid, name, total_students in db.query(CourseModel.id, CourseModel.name, CourseModel.total_students)
+            .filter(CourseModel.id.in_(course_ids))
+    }
+    items = db.query(EvaluationItemModel).filter(EvaluationItemModel.course_id.in_(course_ids)).all()
+
+    samples: Dict[int, List[float]] = {}
+    scored_ids = [item.id for item in items if item.my_score is not None]
+    if scored_ids:
+        for item_id, score in db.query(OtherStudentScoreModel.evaluation_item_id, OtherStudentScoreModel.score) \
+                .filter(OtherStudentScoreModel.evaluation_item_id.in_(scored_ids)):
+            samples.setdefault(item_id, []).append(score)
+
+    for item in items:
+        course = courses[item.course_id]
+        course["items"].append({
+                "weight"    : item.weight,
+                "submitted" : bool(item.is_submitted) or item.my_score is not None,
+                "percentile": item_percentile(item.my_score, samples.get(item.id), course["total_students"]),
+        })
+    return courses, get_student_preferences(db)
+
+
+def load_difficulty_signals(course_id: int) -> Optional[dict]:
+    """새 DB 세션으로 과목의 라벨/분류기 난이도 집계를 조회합니다 (run_in_threadpool용)."""
+    db = SessionLocal()
+    try:
+        return get_course_difficulty_signals(course_id, db)
+    finally:
+        db.close()
+
+
+async def get_course_analysis(request: Optional[Request], course_id: int, objective_grade: str,
+                              background_tasks: Optional[BackgroundTasks] = None,
+                              deadline: float = OPENAI_DEADLINE, generate_missing: bool = True) -> Optional[dict]:
+    """
+    학기 계획에 사용할 과목 분석(난이도/요약)을 가져옵니다.
 
-@app.get("/courses/{course_id}/advice", response_model=ReviewAnalysisResponse, tags=["AI Advice"])
-def get_course_advice(course_id: int, objective_grade: str, db: Session = Depends(get_db)):
+    난이도와 요약은 목표 성적과 무관하므로 같은 목표 성적의 과목 조언 캐시를 먼저,
+    없으면 ADVICE_GRADE_TIERS의 다른 목표 성적 캐시를 재사용합니다.
+    캐시가 전혀 없을 때만 과목 조언을 생성하며, 결과는 /courses/{course_id}/advice 캐시에도 저장됩니다.
+
+    Returns:
+        ReviewAnalysisResponse 형식 딕셔너리 (수강평이 없거나, generate_missing=False인데 캐시가 없으면 None)
     """
-    과목의 수강평을 분석하여 목표 성적 달성을 위한 학습 조언을 제공합니다.
+    cache_keys = [generate_cache_key("course_advice", course_id, grade)
+                  for grade in [objective_grade] + [g for g in ADVICE_GRADE_TIERS if g != objective_grade]]
+    cached_responses = get_cached_responses(cache_keys)
+    for cache_key in cache_keys:
+        if cached_responses.get(cache_key):
+            return cached_responses[cache_key]
+    if not generate_missing:
+        return None
 
-    OpenAI API를 사용하여 수강평을 분석하고:
-    - 과제 및 시험 난이도를 1-5 척도로 평가
-    - 시험/과제 공통 언급 사항 요약
-    - 목표 성적 달성을 위한 맞춤형 학습 전략 제공
-    - 학생 프로필의 선호도 정보를 고려한 조언
+    db = SessionLocal()
+    try:
+        return (await generate_course_advice(request, course_id, objective_grade, db, background_tasks,
+                                             deadline)).model_dump()
+    except HTTPException as e:
+        if e.status_code == 404:
+            return None
+        raise
+    finally:
+        db.close()
 
-    Redis 캐시를 사용하여 동일한 요청에 대한 응답 속도를 향상시킵니다 (TTL: 1시간).
+
+async def prepare_semester_prompt(request: Optional[Request], pairs: List[Tuple[int, str]], db: Session,
+                                  background_tasks: Optional[BackgroundTasks] = None,
+                                  deadline: float = OPENAI_DEADLINE, generate_missing: bool = True) -> tuple:
+    """
+    학기 계획에 필요한 과목별 분석, 노력 배분 입력, 학생 선호도를 준비합니다.
+
+    수강평 원문 대신 과목별 분석(캐시된 과목 조언의 난이도/요약)을 모으고,
+    캐시에 없는 과목 분석은 동시에 생성합니다 (generate_missing=False이면 생성하지 않음).
+    분석이 없는 과목은 라벨/분류기 난이도 집계를 노력 배분의 난이도로 사용합니다.
 
     Args:
-        course_id: 과목 ID
-        objective_grade: 목표 성적 (예: "A+", "A0", "B+", "B0")
-        db: 데이터베이스 세션
+        request: 클라이언트 연결 끊김 확인용 (None이면 확인하지 않음)
+        pairs: canonical_course_grades 결과
+        db: 데이터베이스 세션 (조회 후 닫음)
+        background_tasks: 수강평 요약 갱신 예약용 (선택)
+        deadline: 과목 분석 생성 시 OpenAI 대기+호출 제한 시간(초)
+        generate_missing: 캐시에 없는 과목 분석을 LLM으로 생성할지 여부
 
     Returns:
-        ReviewAnalysisResponse: 학습 조언 및 난이도 분석 결과
-            - assignment_difficulty: 과제 난이도 (1-5 척도)
-            - exam_difficulty: 시험 난이도 (1-5 척도)
-            - summary: 시험/과제 공통 언급 요약
-            - advice: 목표 성적 달성을 위한 전략 조언
+        (pairs 순서의 {"name", "grade", "analysis", "difficulty", "items"} 리스트, 학생 선호도)
 
     Raises:
-        HTTPException: 503 - OpenAI API 키가 설정되지 않은 경우
-        HTTPException: 404 - 해당 과목의 수강평이 없는 경우
-        HTTPException: 500 - AI 분석 실패 시
+        HTTPException: 404 - 없는 과목이 있거나, 과목 분석을 생성하는데 선택한 과목들의 수강평이 없는 경우
     """
-    if not openai_client:
-        raise HTTPException(status_code=503, detail="OpenAI API Key missing")
+    infos, preferences = await run_in_threadpool(load_semester_courses, [cid for cid, _ in pairs], db)
+    db.close()  # 과목 분석과 LLM 응답을 기다리는 동안 DB 연결을 풀에 반납
 
-    # 캐시 키 생성
-    cache_key = generate_cache_key("course_advice", course_id, objective_grade)
+    missing = [cid for cid, _ in pairs if cid not in infos]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"과목을 찾을 수 없습니다: {missing}")
 
-    # 캐시된 응답 확인
-    cached_response = get_cached_response(cache_key)
-    if cached_response:
-        return ReviewAnalysisResponse(**cached_response)
+    analyses = await asyncio.gather(*(get_course_analysis(request, cid, grade, background_tasks, deadline,
+                                                          generate_missing)
+                                      for cid, grade in pairs))
+    if generate_missing and not any(analyses):
+        raise HTTPException(status_code=404, detail="선택한 과목들에 대한 리뷰 데이터가 없습니다.")
 
-    reviews = db.query(CourseReviewModel).filter(CourseReviewModel.course_id == course_id).all()
-    if not reviews:
-        raise HTTPException(status_code=404, detail="리뷰 데이터가 없습니다.")
-    course_reviews_str = "\n".join([f"- {r.content}" for r in reviews])
+    courses = []
+    for (cid, grade), analysis in zip(pairs, analyses):
+        difficulty = analysis or await run_in_threadpool(load_difficulty_signals, cid)
+        courses.append({"name"      : infos[cid]["name"], "grade": grade, "analysis": analysis,
+                        "difficulty": difficulty, "items": infos[cid]["items"]})
+    return courses, preferences
 
-    # --- 학생 프로필 정보 조회 (예: id=1 고정) ---
-    student_id = 1
-    profile = db.query(StudentProfileModel).filter(StudentProfileModel.id == student_id).first()
-    preferences = profile.preferences if profile and profile.preferences else None
 
-    import json
-    import re
+def semester_allocation(courses: List[dict]) -> dict:
+    """prepare_semester_prompt의 과목 목록으로 노력 배분(courses 필드)을 로컬 계산합니다 (같은 순서의 course_index)."""
+    return {"courses": [{"course_index": idx, "effort_percent": effort}
+                        for idx, effort in enumerate(allocate_effort(courses), start=1)]}
 
-    try:
-        response = openai_client.responses.create(
-                model="gpt-5-mini",
-                input=f"""
-            목표성적: {objective_grade}
-            사용자 선호도 및 특성: {preferences}
-            이건 이전 수강자들의 강의평 입니다. 각 강의평은 과목 ID와 함께 주어집니다.
-            강의평에서 과제의 난이도와 관련한 정보를 추출해서 난이도를 정수형으로 추출해서 반환해주세요.
-            강의평에서 시험의 난이도와 관련한 정보를 추출해서 난이도를 정수형으로 추출해서 반환해주세요.
-            난이도는 1부터 5까지의 정수로 추출해주세요.
-            1: 매우 쉬움
-            2: 쉬움
-            3: 보통
-            4: 어려움
-            5: 매우 어려움
-            시험과 과제와 관련해 공통된 언급들은 정리해서 1-2문장으로 정리해주세요.
-            정리한 내용을 바탕으로 각 과제와 시험 중 어느 곳에 집중해야 할지 1-2문장으로 정리해서 조언형식으로 반환해주세요.
-            이 때 조언에는 과제와 시험 난이도 특성을 근거로 각 과제와 시험 중 어느 곳에 집중해야 할지 정리해주세요.
-            조언에는 목표성적에 따라 각 과제와 시험 중 어느 곳에 집중해야 할지 정리해주세요.
-            만약 하지 않아도 되는 과제가 있다면 그 과제는 하지 않아도 된다고 정리해주세요.
-            만약 그런 과제가 없다면 이 부분은 언급하지 말아주세요.
-            사용자 선호도 및 특성을 고려하여 조언을 주세요.
-            각 과제의 성적 비중이 어느 정도인지에 따라 각 과제와 시험 중 어느 곳에 집중해야 할지 정리해주세요.
-            비중이 크고 작은 것을 판단할 때에는 강의평에 언급된 경우에 대한 내용을 참고해주세요.
-            
-            강의평:
-            {course_reviews_str}
-            """,
-                text={
-                        "verbosity": "low",
-                        "format"   : {
-                                "type"  : "json_schema",
-                                "name"  : "course_advice",
-                                "schema": {
-                                        "type"                : "object",
-                                        "properties"          : {
-                                                "assignment_difficulty": {"type": "integer"},
-                                                "exam_difficulty"      : {"type": "integer"},
-                                                "summary"              : {"type": "string"},
-                                                "advice"               : {"type": "string"}
-                                        },
-                                        "required"            : ["assignment_difficulty", "exam_difficulty", "summary",
-                                                                 "advice"],
-                                        "additionalProperties": False
-                                }
-                        }
-                },
-                reasoning={"effort": "minimal"},
-        )
 
-        text = response.output_text.strip()
+async def generate_semester_advice(request: Optional[Request], course_ids: List[int], target_grades: List[str],
+                                   db: Session, background_tasks: Optional[BackgroundTasks] = None,
+                                   deadline: float = OPENAI_DEADLINE) -> SemesterPlanResponse:
+    """
+    학기 학습 계획을 생성하고 semester_advice 캐시에 저장합니다 (캐시 확인은 호출하는 쪽에서 수행).
 
-        # Try to extract JSON from markdown code blocks if present
-        json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', text, re.DOTALL)
-        if json_match:
-            text = json_match.group(1)
+    과목별 분석을 모은 뒤 노력 배분은 effort_allocation.py로 로컬 계산하고,
+    SEMESTER_ADVICE_LLM이 켜져 있으면 전체 조언 문장만 짧은 LLM 요청으로 생성합니다.
+    조언 문장 생성이 실패하면 배분 결과를 설명하는 로컬 문장으로 대신 응답합니다 (이 경우 캐시하지 않음).
+    캐시에는 정규화된 과목 순서의 결과를 저장하고, 응답은 요청한 과목 순서로 되돌립니다.
 
-        # Try to find JSON object in the text
-        if not text.startswith('{'):
-            json_match = re.search(r'\{.*\}', text, re.DOTALL)
-            if json_match:
-                text = json_match.group(0)
+    Args:
+        request: 클라이언트 연결 끊김 확인용 (None이면 확인하지 않음, 예: 비동기 작업)
+        course_ids: 수강할 과목 ID 리스트
+        target_grades: 각 과목의 목표 성적 리스트
+        db: 데이터베이스 세션 (프롬프트 준비 후 닫음)
+        background_tasks: 수강평 요약 갱신 예약용 (선택)
+        deadline: OpenAI 대기+호출 제한 시간(초)
 
-        result = json.loads(text)
+    Returns:
+        SemesterPlanResponse
 
-        # 결과를 캐시에 저장
-        set_cached_response(cache_key, result)
+    Raises:
+        HTTPException: 400 - 과목 수와 목표 성적 수가 다르거나 같은 과목이 중복된 경우
+        HTTPException: 404 - 없는 과목이 있거나 선택한 과목들에 대한 수강평이 없는 경우
+        HTTPException: 500 - 과목 분석 실패 시
+        HTTPException: 504 - OpenAI 응답 시간 초과 (과목 분석)
+    """
+    pairs = canonical_course_grades(course_ids, target_grades)
+    courses, preferences = await prepare_semester_prompt(request, pairs, db, background_tasks, deadline,
+                                                         SEMESTER_ADVICE_LLM)
+    result = semester_allocation(courses)
+    efforts = [item["effort_percent"] for item in result["courses"]]
+
+    overall_advice = None
+    if SEMESTER_ADVICE_LLM:
+        try:
+            response = await create_llm_response(
+                    request, deadline, **semester_advice_request(courses, efforts, preferences))
+            overall_advice = parse_llm_json(response.output_text)["overall_advice"]
+        except HTTPException as e:
+            if e.status_code == 499:
+                raise
+            print(f"⚠ Semester advice LLM failed ({e.detail}). Using local summary.")
+        except Exception as e:
+            print(f"⚠ Semester advice LLM failed ({e}). Using local summary.")
 
-        return ReviewAnalysisResponse(**result)
-    except json.JSONDecodeError as e:
-        raise HTTPException(status_code=500,
-                            detail=f"JSON Parse Error: {str(e)} - Response: {response.output_text[:200]}")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"AI Error: {str(e)}")
+    result["overall_advice"] = overall_advice or summarize_allocation([c["name"] for c in courses], efforts)
+
+    # 결과를 정규화된 과목 순서 그대로 캐시에 저장
+    if overall_advice or not SEMESTER_ADVICE_LLM:
+        set_cached_response(semester_cache_key(pairs), result)
+
+    return SemesterPlanResponse(**remap_semester_plan(result, pairs, course_ids))
 
 
 @app.get("/semester-advice", response_model=SemesterPlanResponse, tags=["AI Advice"])
-def get_semester_advice(
+async def get_semester_advice(
+        request: Request,
+        background_tasks: BackgroundTasks,
         course_ids: List[int] = Query(..., description="수강할 과목 ID 리스트 (예: 1, 2, 3)"),
         target_grades: List[str] = Query(..., description="각 과목의 목표 성적 (예: A+, A, B+)"),
         db: Session = Depends(get_db)
@@ -919,17 +2539,23 @@ def get_semester_advice(
     """
     여러 과목의 수강평을 종합 분석하여 전체 학기 학습 계획을 제공합니다.
 
-    OpenAI API를 사용하여 각 과목의 수강평을 종합 분석하고:
-    - 각 과목별 노력 배분 비율(%) 계산 (합계 100%)
-    - 전체 학기 운영을 위한 전략 조언 제공
+    - 각 과목별 노력 배분 비율(%) 계산 (합계 100%, 과목 수 제한 없음):
+      effort_allocation.py가 난이도, 남은 평가 항목 비중, 현재 점수 백분위와 목표 성적의 격차로 로컬 계산
+    - 전체 학기 운영을 위한 전략 조언 제공 (SEMESTER_ADVICE_LLM이 켜져 있으면 LLM, 아니면 로컬 문장)
     - 학생 프로필의 선호도 정보를 고려한 맞춤형 계획
 
     Redis 캐시를 사용하여 동일한 요청에 대한 응답 속도를 향상시킵니다 (TTL: 1시간).
+    캐시 키는 과목 순서와 무관한 (과목, 목표 성적) 쌍 집합이며, 응답은 요청한 과목 순서로 반환합니다.
+    수강평 원문을 모두 보내는 대신 과목별 분석(캐시된 과목 조언의 난이도/요약, 없으면 과목별로 동시에 생성)을
+    모아 짧은 조언 문장 요청 한 번만 보내므로, 새 과목 조합도 과목 조언 캐시를 재사용합니다.
+    OpenAI 호출은 비동기로 기다리며 동시 호출 수와 제한 시간, 연결 끊김 시 취소가 적용됩니다.
 
     사용 예시:
         /semester-advice?course_ids=1&course_ids=2&course_ids=3&target_grades=A+&target_grades=B0&target_grades=A0
 
     Args:
+        request: 클라이언트 연결 끊김 확인용
+        background_tasks: 수강평 요약 갱신 예약용
         course_ids: 수강할 과목 ID 리스트
         target_grades: 각 과목의 목표 성적 리스트 (course_ids와 순서 일치 필요)
         db: 데이터베이스 세션
@@ -941,131 +2567,371 @@ def get_semester_advice(
 
     Raises:
         HTTPException: 503 - OpenAI API 키가 설정되지 않은 경우
-        HTTPException: 400 - 과목 수와 목표 성적 수가 일치하지 않는 경우
-        HTTPException: 404 - 선택한 과목들에 대한 수강평이 없는 경우
+        HTTPException: 400 - 과목 수와 목표 성적 수가 일치하지 않거나 같은 과목이 중복된 경우
+        HTTPException: 404 - 없는 과목이 있거나 선택한 과목들에 대한 수강평이 없는 경우
         HTTPException: 500 - AI 분석 실패 시
+        HTTPException: 504 - OpenAI 응답 시간 초과
     """
-    if not openai_client:
+    if not async_openai_client:
         raise HTTPException(status_code=503, detail="OpenAI API Key missing")
 
-    if len(course_ids) != len(target_grades):
-        raise HTTPException(status_code=400, detail="과목 수와 목표 성적 수가 일치해야 합니다.")
-
-    # 캐시 키 생성
-    cache_key = generate_cache_key("semester_advice", tuple(course_ids), tuple(target_grades))
+    # 과목 순서와 무관한 캐시 키 생성
+    pairs = canonical_course_grades(course_ids, target_grades)
 
-    # 캐시된 응답 확인
-    cached_response = get_cached_response(cache_key)
+    # 캐시된 응답 확인 (요청한 과목 순서로 되돌려 반환)
+    cached_response = get_cached_response(semester_cache_key(pairs))
     if cached_response:
-        return SemesterPlanResponse(**cached_response)
+        return SemesterPlanResponse(**remap_semester_plan(cached_response, pairs, course_ids))
 
-    combined_reviews_text = ""
+    return await generate_semester_advice(request, course_ids, target_grades, db, background_tasks)
 
-    for idx, (cid, grade) in enumerate(zip(course_ids, target_grades)):
-        course = db.query(CourseModel).filter(CourseModel.id == cid).first()
-        if not course:
-            continue
 
-        reviews = db.query(CourseReviewModel).filter(CourseReviewModel.course_id == cid).all()
-        review_texts = "\n".join([f"- {r.content}" for r in reviews]) if reviews else "리뷰 없음"
+@app.get("/semester-advice/stream", tags=["AI Advice"])
+async def stream_semester_advice(
+        request: Request,
+        background_tasks: BackgroundTasks,
+        course_ids: List[int] = Query(..., description="수강할 과목 ID 리스트 (예: 1, 2, 3)"),
+        target_grades: List[str] = Query(..., description="각 과목의 목표 성적 (예: A+, A, B+)"),
+        db: Session = Depends(get_db)
+):
+    """
+    학기 학습 계획을 Server-Sent Events로 스트리밍합니다.
 
-        combined_reviews_text += f"\n[과목 {idx + 1}: {course.name} (목표: {grade})]\n{review_texts}\n"
+    /semester-advice와 같은 계획을 생성하되, 과목 분석을 모으기 전에 progress 이벤트를 먼저 보내고,
+    로컬 계산한 courses(노력 배분)를 LLM 호출 전에 field 이벤트로 보낸 뒤
+    overall_advice가 완성되면 field 이벤트로 보내고 검증된 SemesterPlanResponse를 result 이벤트로 보냅니다.
+    끝까지 생성된 결과만 /semester-advice와 같은 캐시 키에 저장하며, 캐시 히트 시에는 result 이벤트 하나를 바로 보냅니다.
+    클라이언트 연결이 끊기면 아직 생성 중인 과목 분석의 OpenAI 호출을 취소합니다.
+    이벤트 형식은 /courses/{course_id}/advice/stream과 같고, progress 이벤트가 추가됩니다:
+        event: progress  data: {"stage": "course_analysis", "courses": 3}
 
-        # --- 학생 프로필 정보 조회 (예: id=1 고정) ---
-    student_id = 1
-    profile = db.query(StudentProfileModel).filter(StudentProfileModel.id == student_id).first()
-    preferences = profile.preferences if profile and profile.preferences else None
+    Args:
+        request: 클라이언트 연결 끊김 확인용
+        background_tasks: 수강평 요약 갱신 예약용
+        course_ids: 수강할 과목 ID 리스트
+        target_grades: 각 과목의 목표 성적 리스트 (course_ids와 순서 일치 필요)
+        db: 데이터베이스 세션
+
+    Returns:
+        StreamingResponse: text/event-stream 응답
+            (없는 과목, 수강평 없음, 과목 분석 실패는 스트림 시작 후 error 이벤트로 전송)
+
+    Raises:
+        HTTPException: 503 - OpenAI API 키가 설정되지 않은 경우
+        HTTPException: 400 - 과목 수와 목표 성적 수가 일치하지 않거나 같은 과목이 중복된 경우
+    """
+    if not async_openai_client:
+        raise HTTPException(status_code=503, detail="OpenAI API Key missing")
+
+    pairs = canonical_course_grades(course_ids, target_grades)
+    cached_response = get_cached_response(semester_cache_key(pairs))
+    if cached_response:
+        return sse_response([sse_event(
+                "result", SemesterPlanResponse(**remap_semester_plan(cached_response, pairs, course_ids)).model_dump())])
+
+    return sse_response(semester_advice_events(request, pairs, course_ids, db, background_tasks))
 
-    if not combined_reviews_text:
-        raise HTTPException(status_code=404, detail="선택한 과목들에 대한 리뷰 데이터가 없습니다.")
 
-    import json
-    import re
+async def semester_advice_events(request: Request, pairs: List[Tuple[int, str]], course_ids: List[int], db: Session,
+                                 background_tasks: BackgroundTasks):
+    """
+    /semester-advice/stream의 SSE 이벤트를 생성합니다.
+
+    과목 분석 생성(캐시에 없는 과목마다 LLM 호출)은 몇 초가 걸릴 수 있으므로 시작 전에 progress 이벤트를 보내
+    클라이언트가 첫 바이트를 바로 받도록 합니다. 클라이언트가 끊기면(499) 이벤트 없이 종료합니다.
 
+    Yields:
+        SSE 이벤트 문자열
+    """
+    yield sse_event("progress", {"stage": "course_analysis", "courses": len(pairs)})
     try:
-        response = openai_client.responses.create(
-                model="gpt-5-mini",
-                input=f"""
-            사용자 선호도 및 특성: {preferences}
-            너는 학습 계획을 설계하는 조교이다.
-
-            반드시 아래 JSON Schema를 만족하는 JSON 한 개만 출력해야 한다.
-            - JSON 이외의 텍스트(설명, 마크다운 등)는 절대 출력하지 마라.
-
-            과목 3개에 대한 리뷰가 주어지며,
-            선택한 과목들의 목표 성적은 순서대로: {", ".join(target_grades)}
-            (하지만 목표 성적은 JSON 출력 형식에는 포함하지 않는다.)
-
-            아래 규칙에 따라 JSON을 생성하라.
-
-            [규칙]
-            1) 각 과목에 대해 effort_percent(0~100 정수)를 정하라.
-            2) effort_percent들의 합은 반드시 100이 되어야 한다.
-            3) courses 배열의 course_index는 1, 2, 3 중 하나로 고정한다.
-            4) 전체 학기에 대한 조언(overall_advice)은 1~2문장으로만 작성한다.
-            5) 사용자 선호도 및 특성을 고려하여 조언을 작성한다.
-
-            --------- 수강평 시작 ---------
-            {combined_reviews_text}
-            --------- 수강평 끝 ---------
-            """,
-                text={
-                        "verbosity": "low",
-                        "format"   : {
-                                "type"  : "json_schema",
-                                "name"  : "semester_plan",
-                                "schema": {
-                                        "type"                : "object",
-                                        "properties"          : {
-                                                "courses"       : {
-                                                        "type" : "array",
-                                                        "items": {
-                                                                "type"                : "object",
-                                                                "properties"          : {
-                                                                        "course_index"  : {"type": "integer"},
-                                                                        "effort_percent": {"type": "integer"}
-                                                                },
-                                                                "required"            : ["course_index",
-                                                                                         "effort_percent"],
-                                                                "additionalProperties": False
-                                                        }
-                                                },
-                                                "overall_advice": {"type": "string"}
-                                        },
-                                        "required"            : ["courses", "overall_advice"],
-                                        "additionalProperties": False
-                                }
-                        }
-                },
-                reasoning={"effort": "minimal"},
-        )
+        courses, preferences = await prepare_semester_prompt(request, pairs, db, background_tasks,
+                                                             generate_missing=SEMESTER_ADVICE_LLM)
+    except HTTPException as e:
+        if e.status_code != 499:
+            yield sse_event("error", {"status_code": e.status_code, "detail": e.detail})
+        return
+    except Exception as e:
+        yield sse_event("error", {"status_code": 500, "detail": f"AI Error: {str(e)}"})
+        return
+    finally:
+        db.close()
+    allocation = semester_allocation(courses)
+    efforts = [item["effort_percent"] for item in allocation["courses"]]
 
-        text = response.output_text.strip()
+    if not SEMESTER_ADVICE_LLM:
+        result = {**allocation, "overall_advice": summarize_allocation([c["name"] for c in courses], efforts)}
+        set_cached_response(semester_cache_key(pairs), result)
+        yield sse_event("result", remap_semester_plan(result, pairs, course_ids))
+        return
 
-        # Try to extract JSON from markdown code blocks if present
-        json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', text, re.DOTALL)
-        if json_match:
-            text = json_match.group(1)
+    async for event in stream_advice_events(
+            semester_advice_request(courses, efforts, preferences),
+            allocation,
+            SemesterPlanResponse,
+            semester_cache_key(pairs),
+            lambda plan: remap_semester_plan(plan, pairs, course_ids),
+    ):
+        yield event
 
-        # Try to find JSON object in the text
-        if not text.startswith('{'):
-            json_match = re.search(r'\{.*\}', text, re.DOTALL)
-            if json_match:
-                text = json_match.group(0)
 
-        result = json.loads(text)
+# -----------------------------------------------------------------------------
+# AI Advice Jobs (비동기 작업 큐)
+# -----------------------------------------------------------------------------
 
-        # 결과를 캐시에 저장
-        set_cached_response(cache_key, result)
+advice_count_tasks = set()  # 실행 중인 요청 집계 작업 (작업이 끝나기 전에 가비지 컬렉션되지 않도록 참조 유지)
 
-        return SemesterPlanResponse(**result)
 
-    except json.JSONDecodeError as e:
-        raise HTTPException(status_code=500,
-                            detail=f"JSON Parse Error: {str(e)} - Response: {response.output_text[:200]}")
+def job_backend_unavailable(error: JobBackendUnavailable) -> HTTPException:
+    """Redis 장애로 작업 저장소를 쓸 수 없을 때의 503 응답 (브레이커가 다시 시험 호출할 때까지를 Retry-After로 안내)."""
+    return HTTPException(status_code=error.status_code, detail=error.detail,
+                         headers={"Retry-After": str(max(1, int(redis_breaker.retry_in() + 0.5)))})
+
+
+def record_advice_request(course_id: int, objective_grade: str):
+    """
+    prewarm 대상 선정을 위해 (과목, 목표 성적) 조언 요청 횟수를 집계합니다.
+
+    집계는 백그라운드 작업으로 실행하므로 Redis가 느리거나 죽어도 응답을 기다리게 하지 않습니다.
+    """
+    if advice_job_queue is None or not GRADE_PATTERN.match(objective_grade):
+        return
+    task = asyncio.create_task(count_advice_request(f"{course_id}:{objective_grade}"))
+    advice_count_tasks.add(task)
+    task.add_done_callback(advice_count_tasks.discard)
+
+
+async def count_advice_request(member: str):
+    """조언 요청 횟수 하나를 기록합니다 (Redis 장애 중에는 FailoverJobBackend가 메모리에 기록, 실패는 무시)."""
+    try:
+        await advice_job_queue.backend.count_request(member)
     except Exception as e:
-        print(f"OpenAI Error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"AI 분석 중 오류가 발생했습니다.")
+        print(f"Advice request count error: {e!r}")
+
+
+async def run_advice_job(kind: str, params: dict) -> dict:
+    """
+    조언 작업 하나를 실행합니다 (AdviceJobQueue 워커가 호출).
+
+    HTTP 요청과 무관하게 실행되므로 연결 끊김 확인 없이 ADVICE_JOB_DEADLINE을 제한 시간으로 사용합니다.
+    캐시에 결과가 있으면 OpenAI를 호출하지 않습니다.
+
+    Args:
+        kind: course_advice | course_advice_grades | semester_advice
+        params: 작업 파라미터 (AdviceJobCreate에서 kind에 해당하는 필드)
+
+    Returns:
+        해당 조언 엔드포인트의 응답과 같은 형식의 딕셔너리
+
+    Raises:
+        HTTPException: 알 수 없는 작업 종류, 또는 조언 생성 실패 (작업 error에 기록)
+    """
+    db = SessionLocal()
+    try:
+        if kind == "course_advice":
+            cached_response = get_cached_response(
+                    generate_cache_key("course_advice", params["course_id"], params["objective_grade"]))
+            if cached_response:
+                return ReviewAnalysisResponse(**cached_response).model_dump()
+            return (await generate_course_advice(None, params["course_id"], params["objective_grade"], db,
+                                                 deadline=ADVICE_JOB_DEADLINE)).model_dump()
+
+        if kind == "course_advice_grades":
+            return (await get_multi_grade_advice(None, params["course_id"], params["grades"], db,
+                                                 deadline=ADVICE_JOB_DEADLINE)).model_dump()
+
+        if kind == "semester_advice":
+            pairs = canonical_course_grades(params["course_ids"], params["target_grades"])
+            cached_response = get_cached_response(semester_cache_key(pairs))
+            if cached_response:
+                return SemesterPlanResponse(
+                        **remap_semester_plan(cached_response, pairs, params["course_ids"])).model_dump()
+            return (await generate_semester_advice(None, params["course_ids"], params["target_grades"], db,
+                                                   deadline=ADVICE_JOB_DEADLINE)).model_dump()
+
+        raise HTTPException(status_code=400, detail=f"Unknown job kind: {kind}")
+    finally:
+        db.close()
+
+
+def advice_job_spec(job: AdviceJobCreate) -> tuple:
+    """
+    작업 생성 요청을 검증하여 (kind, params, dedupe_key)를 반환합니다.
+
+    같은 조언을 생성하는 작업이 대기/실행 중이면 새로 만들지 않도록 결과 캐시 키를 dedupe_key로 사용합니다.
+
+    Raises:
+        HTTPException: 400 - 알 수 없는 작업 종류이거나 필요한 필드가 없는 경우
+    """
+    if job.kind == "course_advice":
+        if job.course_id is None or not job.objective_grade:
+            raise HTTPException(status_code=400, detail="course_advice 작업에는 course_id와 objective_grade가 필요합니다.")
+        return ("course_advice", {"course_id": job.course_id, "objective_grade": job.objective_grade},
+                generate_cache_key("course_advice", job.course_id, job.objective_grade))
+
+    if job.kind == "course_advice_grades":
+        if job.course_id is None:
+            raise HTTPException(status_code=400, detail="course_advice_grades 작업에는 course_id가 필요합니다.")
+        grades = list(dict.fromkeys(job.grades or ADVICE_GRADE_TIERS))
+        return ("course_advice_grades", {"course_id": job.course_id, "grades": grades},
+                generate_cache_key("course_advice_grades", job.course_id, tuple(grades)))
+
+    if job.kind == "semester_advice":
+        if not job.course_ids:
+            raise HTTPException(status_code=400, detail="semester_advice 작업에는 course_ids와 target_grades가 필요합니다.")
+        canonical_course_grades(job.course_ids, job.target_grades or [])
+        # 결과의 course_index가 요청 순서를 따르므로 작업 중복 판단은 순서까지 같은 요청끼리만 (캐시는 순서 무관)
+        return ("semester_advice", {"course_ids": job.course_ids, "target_grades": job.target_grades},
+                generate_cache_key("semester_advice_job", tuple(job.course_ids), tuple(job.target_grades)))
+
+    raise HTTPException(status_code=400, detail=f"Unknown job kind: {job.kind}")
+
+
+async def prewarm_advice(top: int) -> List[dict]:
+    """
+    가장 많이 요청된 (과목, 목표 성적) 조합 중 캐시에 없는 조언을 과목별 course_advice_grades 작업으로 등록합니다.
+
+    같은 과목의 목표 성적들은 한 작업(한 번의 OpenAI 호출)으로 묶습니다.
+
+    Args:
+        top: 요청 빈도 상위 조합 수
+
+    Returns:
+        등록된 작업 리스트
+    """
+    grades_by_course: Dict[int, List[str]] = {}
+    requested = [member.split(":", 1) for member, _ in await advice_job_queue.backend.top_requests(top)]
+    cache_keys = [generate_cache_key("course_advice", int(course_id), grade) for course_id, grade in requested]
+    cached_responses = get_cached_responses(cache_keys)
+    for (course_id, grade), cache_key in zip(requested, cache_keys):
+        if not cached_responses.get(cache_key):
+            grades_by_course.setdefault(int(course_id), []).append(grade)
+
+    jobs = []
+    for course_id, grades in grades_by_course.items():
+        jobs.append(await advice_job_queue.submit(
+                "course_advice_grades", {"course_id": course_id, "grades": grades},
+                dedupe_key=generate_cache_key("course_advice_grades", course_id, tuple(grades))))
+    return jobs
+
+
+def seconds_until_next_prewarm(now: datetime) -> float:
+    """ADVICE_PREWARM_TIMES 중 가장 가까운 다음 시각까지 남은 시간(초)."""
+    candidates = []
+    for time_str in ADVICE_PREWARM_TIMES:
+        hour, minute = map(int, time_str.split(":"))
+        run_at = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        candidates.append(run_at if run_at > now else run_at + timedelta(days=1))
+    return (min(candidates) - now).total_seconds()
+
+
+async def prewarm_scheduler():
+    """ADVICE_PREWARM_TIMES마다 요청 빈도 상위 ADVICE_PREWARM_TOP개 조합의 조언을 미리 생성하도록 작업을 등록합니다."""
+    while True:
+        await asyncio.sleep(seconds_until_next_prewarm(datetime.now()))
+        try:
+            jobs = await prewarm_advice(ADVICE_PREWARM_TOP)
+            print(f"🔥 Advice prewarm: {len(jobs)} jobs queued")
+        except Exception as e:
+            print(f"⚠ Advice prewarm error: {e}")
+
+
+@app.post("/advice-jobs", response_model=AdviceJobResponse, status_code=202, tags=["AI Advice"])
+async def create_advice_job(job: AdviceJobCreate):
+    """
+    조언 생성을 비동기 작업으로 등록하고 작업 ID를 바로 반환합니다.
+
+    LLM 호출이 HTTP 요청 수명과 분리되므로 Caddy/클라이언트 타임아웃이 나도 생성 결과를 잃지 않습니다.
+    결과는 GET /advice-jobs/{job_id}로 폴링하거나 wait 파라미터로 기다려 받습니다.
+    같은 조언을 생성하는 작업이 이미 대기/실행 중이면 그 작업을 반환하고,
+    결과는 해당 조언 엔드포인트와 같은 캐시 키에 저장됩니다.
+
+    작업 종류:
+        - course_advice: {"course_id": 1, "objective_grade": "A+"} → /courses/{course_id}/advice 결과
+        - course_advice_grades: {"course_id": 1, "grades": ["A+", "A0"]} → /courses/{course_id}/advice/grades 결과
+        - semester_advice: {"course_ids": [1, 2], "target_grades": ["A+", "B0"]} → /semester-advice 결과
+
+    Args:
+        job: 작업 생성 요청
+
+    Returns:
+        AdviceJobResponse: 등록된 작업 (status: queued)
+
+    Raises:
+        HTTPException: 503 - OpenAI API 키가 설정되지 않은 경우
+        HTTPException: 400 - 작업 종류나 파라미터가 잘못된 경우
+        HTTPException: 503 - Redis 장애로 작업을 큐에 넣지 못한 경우 (Retry-After 헤더 포함)
+    """
+    if not async_openai_client:
+        raise HTTPException(status_code=503, detail="OpenAI API Key missing")
+
+    kind, params, dedupe_key = advice_job_spec(job)
+    if kind == "course_advice":
+        record_advice_request(params["course_id"], params["objective_grade"])
+
+    try:
+        return AdviceJobResponse(**await advice_job_queue.submit(kind, params, dedupe_key))
+    except JobBackendUnavailable as e:
+        raise job_backend_unavailable(e)
+
+
+@app.get("/advice-jobs/{job_id}", response_model=AdviceJobResponse, tags=["AI Advice"])
+async def get_advice_job(
+        job_id: str,
+        wait: float = Query(0, ge=0, le=ADVICE_JOB_MAX_WAIT, description="작업이 끝날 때까지 기다릴 최대 시간(초)")
+):
+    """
+    조언 작업 상태와 결과를 조회합니다.
+
+    wait > 0이면 작업이 끝나거나 wait초가 지날 때까지 기다린 뒤 응답합니다 (long polling).
+    Redis 장애 중에 등록된 작업은 프로세스 메모리에 저장되므로 작업을 등록한 서버 프로세스에서만 조회할 수 있습니다.
+
+    Args:
+        job_id: 작업 ID
+        wait: 최대 대기 시간(초, 0~30)
+
+    Returns:
+        AdviceJobResponse: 작업 상태 (queued | running | done | failed)
+
+    Raises:
+        HTTPException: 404 - 작업이 없거나 만료된 경우 (보관 시간 24시간)
+        HTTPException: 503 - Redis에 저장된 작업을 Redis 장애로 조회할 수 없는 경우 (Retry-After 헤더 포함)
+    """
+    try:
+        job = await advice_job_queue.wait(job_id, wait) if wait else await advice_job_queue.get(job_id)
+    except JobBackendUnavailable as e:
+        raise job_backend_unavailable(e)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return AdviceJobResponse(**job)
+
+
+@app.post("/advice-jobs/prewarm", response_model=AdvicePrewarmResponse, tags=["AI Advice"])
+async def prewarm_advice_jobs(top: int = Query(ADVICE_PREWARM_TOP, ge=1, le=200, description="요청 빈도 상위 조합 수")):
+    """
+    가장 많이 요청된 (과목, 목표 성적) 조합의 조언을 미리 생성하도록 작업을 등록합니다.
+
+    수강신청 기간 등 요청이 몰리기 전에 호출하면 캐시가 채워져 조언 요청이 OpenAI 호출 없이 응답합니다.
+    ADVICE_PREWARM_TIMES를 설정하면 매일 해당 시각에 자동으로 실행됩니다.
+    이미 캐시된 조합은 건너뛰고, 같은 과목의 목표 성적들은 한 작업으로 묶습니다.
+
+    Args:
+        top: 요청 빈도 상위 조합 수
+
+    Returns:
+        AdvicePrewarmResponse: 등록된 작업 리스트
+
+    Raises:
+        HTTPException: 503 - OpenAI API 키가 설정되지 않은 경우
+        HTTPException: 503 - Redis 장애로 작업을 큐에 넣지 못한 경우 (Retry-After 헤더 포함)
+    """
+    if not async_openai_client:
+        raise HTTPException(status_code=503, detail="OpenAI API Key missing")
+
+    try:
+        return AdvicePrewarmResponse(jobs=[AdviceJobResponse(**job) for job in await prewarm_advice(top)])
+    except JobBackendUnavailable as e:
+        raise job_backend_unavailable(e)
 
 
 # -----------------------------------------------------------------------------
@@ -1075,7 +2941,7 @@ def get_semester_advice(
 @app.delete("/cache/clear", tags=["System"])
 async def clear_cache(pattern: str = "*"):
     """
-    Redis 캐시를 무효화합니다.
+    응답 캐시(모든 계층)를 무효화합니다.
 
     특정 패턴에 일치하는 캐시 키들을 삭제하여 캐시를 무효화합니다.
     AI 조언 응답이 변경되었을 때 수동으로 캐시를 갱신할 수 있습니다.
@@ -1092,9 +2958,9 @@ async def clear_cache(pattern: str = "*"):
         dict: 삭제 결과 메시지
 
     Raises:
-        HTTPException: 503 - Redis가 사용 불가능한 경우
+        HTTPException: 503 - 캐시 계층인 Redis가 사용 불가능한 경우 (재연결 후 지워지지 않은 캐시가 다시 보이지 않도록)
     """
-    if not redis_client:
+    if "redis" in response_cache.names and redis_breaker.state == OPEN:
         raise HTTPException(status_code=503, detail="Redis not available")
 
     full_pattern = f"cache:{pattern}" if not pattern.startswith("cache:") else pattern
@@ -1103,6 +2969,93 @@ async def clear_cache(pattern: str = "*"):
     return {"message": f"Cache cleared for pattern: {full_pattern}"}
 
 
+# -----------------------------------------------------------------------------
+# Admin
+# -----------------------------------------------------------------------------
+
+@app.get("/admin/profiles", tags=["Admin"], dependencies=[Depends(require_admin)])
+async def get_profiles(limit: int = Query(50, ge=1, le=500)):
+    """
+    저장된 요청 프로파일 목록을 최신순으로 반환합니다.
+
+    X-Profile: 1 헤더(관리자 토큰 필요) 또는 PROFILE_SAMPLE_RATE로 선택된 요청이 profiling.py의
+    샘플링 프로파일러로 기록되며, 모든 워커가 같은 PROFILE_DIR을 사용합니다.
+
+    Args:
+        limit: 반환할 최대 개수
+
+    Returns:
+        dict: {"profiles": [{"profile_id", "method", "path", "route", "status", "duration_ms", "samples",
+                             "overlapping_requests", "top_self", ...}]}
+    """
+    return {"profiles": await run_in_threadpool(list_profiles, limit)}
+
+
+@app.get("/admin/profiles/{profile_id}", response_class=PlainTextResponse, tags=["Admin"],
+         dependencies=[Depends(require_admin)])
+async def download_profile(profile_id: str):
+    """
+    프로파일을 collapsed stack 형식으로 내려받습니다 (flamegraph.pl, speedscope 입력).
+
+    Args:
+        profile_id: 프로파일 ID (응답 헤더 X-Profile-Id 또는 목록의 profile_id)
+
+    Returns:
+        PlainTextResponse: "스레드;함수;...;함수 샘플 수" 줄 목록
+
+    Raises:
+        HTTPException: 404 - 프로파일이 없는 경우
+    """
+    content = await run_in_threadpool(load_profile, profile_id)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(content, headers={"Content-Disposition": f'attachment; filename="{profile_id}.collapsed"'})
+
+
+@app.get("/admin/slow-queries", tags=["Admin"], dependencies=[Depends(require_admin)])
+async def get_slow_queries(sort: str = Query("total", description="total | mean | max | count | slow | per_request"),
+                           limit: int = Query(50, ge=1, le=500)):
+    """
+    쿼리 문장별 실행 통계와 최근 느린 쿼리를 반환합니다 (요청을 처리한 워커 프로세스의 통계).
+
+    slow_queries.py가 SQLAlchemy 이벤트로 모든 쿼리를 측정하며, 느린 쿼리(SLOW_QUERY_MS 이상)는
+    파라미터, EXPLAIN QUERY PLAN, 호출한 엔드포인트와 함께 SLOW_QUERY_LOG에도 기록됩니다.
+
+    Args:
+        sort: 정렬 기준 (total: 누적 시간, mean, max, count, slow: 느린 횟수, per_request: 요청당 최대 실행 횟수)
+        limit: 반환할 최대 문장 수
+
+    Returns:
+        dict: {"pid", "threshold_ms", "since", "statements": [{"statement", "count", "total_ms", "mean_ms", "max_ms",
+               "slow_count", "max_per_request", "n_plus_one_suspect", "endpoints", "plan", "full_scan"}],
+               "recent": [{"time", "endpoint", "duration_ms", "statement", "parameters", "plan", "full_scan"}]}
+
+    Raises:
+        HTTPException: 400 - 알 수 없는 정렬 기준
+    """
+    if sort not in SLOW_QUERY_SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(SLOW_QUERY_SORT_KEYS)}")
+    return {
+            "pid"         : os.getpid(),
+            "threshold_ms": SLOW_QUERY_MS,
+            "since"       : datetime.fromtimestamp(stats_since()).isoformat(timespec="seconds"),
+            "statements"  : statement_stats(sort, limit),
+            "recent"      : recent_slow_queries(limit),
+    }
+
+
+@app.delete("/admin/slow-queries", tags=["Admin"], dependencies=[Depends(require_admin)])
+async def clear_slow_queries():
+    """
+    요청을 처리한 워커 프로세스의 쿼리 통계와 최근 느린 쿼리 목록을 초기화합니다.
+
+    Returns:
+        dict: {"pid", "cleared": True}
+    """
+    reset_slow_query_stats()
+    return {"pid": os.getpid(), "cleared": True}
+
+
 @app.get("/courses/{course_id}/cumulative-histogram", response_model=CumulativeHistogramResponse,
          tags=["ML Prediction"])
 def get_cumulative_histogram(course_id: int, db: Session = Depends(get_db)):
@@ -1210,19 +3163,7 @@ def get_cumulative_histogram(course_id: int, db: Session = Depends(get_db)):
 
         if valid_items > 0:
             my_cumulative_score = cumulative_score_sum
-
-            cumulative_below = 0
-            for bin_range, count in cumulative_histogram.items():
-                bin_start = int(bin_range.split('-')[0])
-                bin_end = int(bin_range.split('-')[1])
-
-                if my_cumulative_score > bin_end:
-                    cumulative_below += count
-                elif bin_start <= my_cumulative_score <= bin_end:
-                    cumulative_below += count * (my_cumulative_score - bin_start) / (bin_end - bin_start)
-                    break
-
-            my_percentile = (cumulative_below / total_students) * 100 if total_students > 0 else None
+            my_percentile = histogram_percentile(cumulative_histogram, my_cumulative_score, total_students)
 
     statistics = calculate_histogram_statistics(cumulative_histogram)
 
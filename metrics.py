@@ -0,0 +1,432 @@
+"""
+Prometheus 형식 지표(metrics) 수집 모듈.
+
+print 로그만으로는 요청 지연 시간과 병목 구간을 알 수 없으므로, 주요 경로(HTTP 라우트, SQLAlchemy 쿼리, Redis 명령,
+OpenAI 호출, 성적 분포 예측 모델)의 지연 시간 히스토그램과 카운터/게이지를 수집하여 GET /metrics로 노출합니다.
+외부 의존성 없이 Prometheus 텍스트 형식(0.0.4)을 직접 생성합니다.
+
+구성:
+    - Counter / Gauge / Histogram: 레이블별 값을 dict로 보관하는 지표 (기록은 잠금 + dict 갱신 + bisect 한 번)
+    - MetricsMiddleware: 라우트 템플릿(예: /courses/{course_id}/advice)별 요청 지연 시간과 처리 중 요청 수를 기록하는
+      ASGI 미들웨어 (스트리밍 응답은 마지막 조각 전송까지 측정)
+    - instrument_sqlalchemy(): 모든 Engine의 쿼리 실행 시간을 한 번 재서 SQL 종류(SELECT/INSERT/...)별로 기록하고,
+      add_query_observer()로 등록된 소비자(tracing.py의 db.query span, slow_queries.py의 문장별 통계)에 전달
+    - 애플리케이션 지표 정의 (아래 "지표 정의" 절)
+
+여러 uvicorn 워커 프로세스:
+    - /metrics 요청은 워커 중 하나가 받으므로, 각 워커가 METRICS_FLUSH_INTERVAL초마다 자기 지표를
+      METRICS_DIR/<pid>.json에 기록하고 /metrics는 모든 워커 파일을 합산하여 반환
+      (카운터/히스토그램/게이지 모두 합산, 요청을 받은 워커는 현재 값을 사용)
+    - 3 × METRICS_FLUSH_INTERVAL초 동안 갱신되지 않은 파일(종료된 워커)은 제외
+
+사용 예시 (main.py):
+    app.add_middleware(MetricsMiddleware)
+    instrument_sqlalchemy()
+    add_query_observer(trace_query)
+    with REDIS_COMMAND_SECONDS.time(command="get"):
+        ...
+    CACHE_REQUESTS.inc(prefix="course_advice", result="hit")
+    text = render_metrics()
+
+환경 변수:
+    METRICS_DIR: 워커별 지표 파일 디렉터리, 기본값 <임시 디렉터리>/realthon-metrics-<uvicorn 상위 프로세스 pid>
+    METRICS_FLUSH_INTERVAL: 워커별 지표 파일 기록 주기(초), 기본값 5
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# =============================================================================
+# 상수 설정
+# =============================================================================
+METRICS_DIR = os.getenv("METRICS_DIR", os.path.join(tempfile.gettempdir(), f"realthon-metrics-{os.getppid()}"))
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 히스토그램 기본 구간(초): 밀리초 단위 DB/Redis 조회부터 수십 초 LLM 호출까지
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# 모델 계층 하나는 수십 µs ~ 수 ms이므로 더 잘게 나눈 구간
+LAYER_BUCKETS = (0.00002, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+ACTIVATION_BYTES_BUCKETS = tuple(1024 * 4 ** i for i in range(10))  # 1KiB ~ 256MiB
+SET_SIZE_BUCKETS = (16, 64, 256, 1024, 4096)  # ml_layer_* 지표의 set_size 레이블 구간 (입력 점수 개수)
+
+LabelValues = Tuple[str, ...]
+
+
+# =============================================================================
+# 지표 타입
+# =============================================================================
+
+class _Metric:
+    """레이블 값 튜플별로 값을 보관하는 지표의 공통 부분."""
+
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, object] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, object]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def collect(self) -> Dict[LabelValues, object]:
+        """현재 값 복사본 {레이블 값 튜플: 값}."""
+        with self._lock:
+            return {key: (list(value) if isinstance(value, list) else value) for key, value in self._values.items()}
+
+
+class Counter(_Metric):
+    """증가만 하는 누적 값."""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """증감하는 현재 값. set_function으로 수집 시점에 값을 계산할 수도 있음."""
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._function: Optional[Callable[[], float]] = None
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """레이블 없는 게이지의 값을 수집 시점에 function()으로 계산합니다."""
+        self._function = function
+
+    def collect(self) -> Dict[LabelValues, object]:
+        if self._function is not None:
+            try:
+                return {(): float(self._function())}
+            except Exception:
+                return {}
+        return super().collect()
+
+
+class Histogram(_Metric):
+    """구간별 누적 개수와 합계로 분포를 기록하는 지표 (값: [구간별 개수..., +Inf 개수, 합계])."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[index] += 1
+            counts[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """with 블록 실행 시간(초)을 기록합니다 (예외가 발생해도 기록)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+
+REGISTRY: List[_Metric] = []
+
+
+# =============================================================================
+# 수집 / 워커 간 합산 / 텍스트 형식 출력
+# =============================================================================
+
+def snapshot() -> dict:
+    """현재 프로세스의 모든 지표 값 {이름: [[레이블 값..., 값], ...]} (JSON 저장용)."""
+    return {metric.name: [[*key, value] for key, value in metric.collect().items()] for metric in REGISTRY}
+
+
+def flush_snapshot() -> None:
+    """현재 프로세스 지표를 METRICS_DIR/<pid>.json에 기록합니다 (임시 파일 후 교체하여 읽는 쪽이 깨진 파일을 보지 않음)."""
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    path = os.path.join(METRICS_DIR, f"{os.getpid()}.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump(snapshot(), f, separators=(",", ":"))
+    os.replace(path + ".tmp", path)
+
+
+def remove_snapshot() -> None:
+    """종료하는 워커의 지표 파일을 삭제합니다."""
+    try:
+        os.remove(os.path.join(METRICS_DIR, f"{os.getpid()}.json"))
+    except OSError:
+        pass
+
+
+def _merge(total: Dict[LabelValues, object], values: Dict[LabelValues, object]) -> None:
+    for key, value in values.items():
+        if key not in total:
+            total[key] = list(value) if isinstance(value, list) else value
+        elif isinstance(value, list):
+            total[key] = [a + b for a, b in zip(total[key], value)]
+        else:
+            total[key] += value
+
+
+def collect_all() -> Dict[str, Dict[LabelValues, object]]:
+    """현재 프로세스 값과 다른 워커의 최근 지표 파일을 합산합니다."""
+    merged = {metric.name: metric.collect() for metric in REGISTRY}
+    now = time.time()
+    try:
+        names = os.listdir(METRICS_DIR)
+    except OSError:
+        names = []
+    for name in names:
+        if not name.endswith(".json") or name == f"{os.getpid()}.json":
+            continue
+        path = os.path.join(METRICS_DIR, name)
+        try:
+            if now - os.path.getmtime(path) > 3 * METRICS_FLUSH_INTERVAL:
+                continue
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for metric_name, rows in data.items():
+            if metric_name in merged:
+                _merge(merged[metric_name], {tuple(row[:-1]): row[-1] for row in rows})
+    return merged
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def render_metrics() -> str:
+    """모든 워커의 지표를 합산하여 Prometheus 텍스트 형식으로 반환합니다."""
+    merged = collect_all()
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        for key, value in sorted(merged.get(metric.name, {}).items()):
+            if metric.type == "histogram":
+                cumulative = 0
+                for bound, count in zip([*metric.buckets, "+Inf"], value[:-1]):
+                    cumulative += count
+                    le = "+Inf" if bound == "+Inf" else repr(float(bound))
+                    labels = _format_labels(metric.labelnames, key, f'le="{le}"')
+                    lines.append(f"{metric.name}_bucket{labels} {cumulative}")
+                lines.append(f"{metric.name}_count{_format_labels(metric.labelnames, key)} {cumulative}")
+                lines.append(f"{metric.name}_sum{_format_labels(metric.labelnames, key)} {value[-1]!r}")
+            else:
+                suffix = "_total" if metric.type == "counter" and not metric.name.endswith("_total") else ""
+                lines.append(f"{metric.name}{suffix}{_format_labels(metric.labelnames, key)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# =============================================================================
+# 지표 정의
+# =============================================================================
+HTTP_REQUEST_SECONDS = Histogram("http_request_duration_seconds", "HTTP request latency by route template",
+                                 ["method", "route", "status"])
+HTTP_REQUESTS_IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests currently being handled",
+                                  ["method", "route"])
+DB_QUERY_SECONDS = Histogram("db_query_duration_seconds", "SQLAlchemy query execution time", ["operation"])
+REDIS_COMMAND_SECONDS = Histogram("redis_command_duration_seconds", "Redis command latency (cache path)", ["command"])
+REDIS_ERRORS = Counter("redis_errors_total", "Failed Redis commands", ["command"])
+OPENAI_REQUEST_SECONDS = Histogram("openai_request_duration_seconds",
+                                   "OpenAI Responses API call latency (excluding concurrency wait)", ["call", "outcome"])
+OPENAI_TOKENS = Counter("openai_tokens_total", "OpenAI token usage reported in responses", ["call", "type"])
+CACHE_REQUESTS = Counter("cache_requests_total", "Response cache lookups by key prefix", ["prefix", "result"])
+ML_PREDICT_SECONDS = Histogram("ml_predict_duration_seconds", "HistogramPredictor.predict time by stage", ["stage"])
+ML_LAYER_SECONDS = Histogram("ml_layer_duration_seconds",
+                             "FlexibleHistogramPredictor submodule forward time (sampled calls)",
+                             ["layer", "set_size"], buckets=LAYER_BUCKETS)
+ML_LAYER_OUTPUT_BYTES = Histogram("ml_layer_output_bytes",
+                                  "FlexibleHistogramPredictor submodule output tensor size (sampled calls)",
+                                  ["layer", "set_size"], buckets=ACTIVATION_BYTES_BUCKETS)
+THREADPOOL_BUSY = Gauge("threadpool_busy_threads", "Threadpool threads running sync endpoints/run_in_threadpool")
+THREADPOOL_LIMIT = Gauge("threadpool_max_threads", "Threadpool capacity")
+THREADPOOL_WAITING = Gauge("threadpool_waiting_tasks", "Tasks waiting for a threadpool thread")
+
+UNMATCHED_ROUTE = "unmatched"
+_route_cache: Dict[Tuple[str, str], str] = {}
+_ROUTE_CACHE_SIZE = 4096
+
+
+# =============================================================================
+# 수집 지점
+# =============================================================================
+
+def observe_openai_usage(call: str, response) -> None:
+    """OpenAI 응답의 usage(input/output 토큰 수)를 기록합니다 (usage가 없으면 무시)."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    OPENAI_TOKENS.inc(getattr(usage, "input_tokens", 0) or 0, call=call, type="input")
+    OPENAI_TOKENS.inc(getattr(usage, "output_tokens", 0) or 0, call=call, type="output")
+
+
+def cache_prefix(cache_key: str) -> str:
+    """캐시 키 "cache:<prefix>:<hash>"의 prefix."""
+    parts = cache_key.split(":", 2)
+    return parts[1] if len(parts) == 3 else "other"
+
+
+def set_size_bucket(set_size: int) -> str:
+    """입력 점수 개수를 SET_SIZE_BUCKETS 구간 레이블("<=64", ">4096" 등)로 변환합니다 (레이블 값 수 제한)."""
+    index = bisect_left(SET_SIZE_BUCKETS, set_size)
+    return f"<={SET_SIZE_BUCKETS[index]}" if index < len(SET_SIZE_BUCKETS) else f">{SET_SIZE_BUCKETS[-1]}"
+
+
+# 쿼리 하나의 측정 결과를 받는 함수 (cursor, statement, parameters, executemany, seconds, error)
+QueryObserver = Callable[[object, str, object, bool, float, Optional[BaseException]], None]
+_query_observers: List[QueryObserver] = []
+
+
+def add_query_observer(observer: QueryObserver) -> None:
+    """instrument_sqlalchemy()가 측정한 쿼리마다 호출할 함수를 등록합니다 (실패한 쿼리는 error에 예외 전달)."""
+    _query_observers.append(observer)
+
+
+def _notify_query_observers(cursor, statement: str, parameters, executemany: bool, seconds: float,
+                            error: Optional[BaseException]) -> None:
+    for observer in _query_observers:
+        try:
+            observer(cursor, statement, parameters, executemany, seconds, error)
+        except Exception as e:  # 소비자 오류가 쿼리 실행에 영향을 주지 않도록
+            print(f"⚠ Query observer {getattr(observer, '__name__', observer)} failed: {e}")
+
+
+def instrument_sqlalchemy() -> None:
+    """
+    모든 SQLAlchemy Engine의 쿼리 실행 시간을 SQL 종류별로 DB_QUERY_SECONDS에 기록하고 등록된 소비자에 전달합니다.
+
+    쿼리 시간은 이 Engine 이벤트 한 벌로만 측정하며, 트레이스와 느린 쿼리 통계는 add_query_observer()로 결과를 받습니다.
+    """
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["query_started"].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        if operation not in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "PRAGMA"):
+            operation = "OTHER"
+        DB_QUERY_SECONDS.observe(seconds, operation=operation)
+        if _query_observers:
+            _notify_query_observers(cursor, statement, parameters, executemany, seconds, None)
+
+    @event.listens_for(Engine, "handle_error")
+    def _error(context):
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if not started:
+            return
+        seconds = time.perf_counter() - started.pop()
+        if _query_observers:
+            _notify_query_observers(context.cursor, context.statement or "", context.parameters,
+                                    bool(getattr(context.execution_context, "executemany", False)), seconds,
+                                    context.original_exception)
+
+
+def instrument_threadpool() -> None:
+    """요청 처리 스레드풀(anyio 기본 limiter) 사용량을 수집 시점에 계산하도록 등록합니다 (이벤트 루프 스레드에서 수집)."""
+    from anyio import to_thread
+
+    THREADPOOL_BUSY.set_function(lambda: to_thread.current_default_thread_limiter().borrowed_tokens)
+    THREADPOOL_LIMIT.set_function(lambda: to_thread.current_default_thread_limiter().total_tokens)
+    THREADPOOL_WAITING.set_function(lambda: to_thread.current_default_thread_limiter().statistics().tasks_waiting)
+
+
+def route_template(scope: dict) -> str:
+    """요청 경로에 해당하는 라우트 템플릿 (레이블 수가 경로 값에 따라 늘어나지 않도록)."""
+    cache_key = (scope["method"], scope["path"])
+    template = _route_cache.get(cache_key)
+    if template is not None:
+        return template
+    from starlette.routing import Match
+
+    template = UNMATCHED_ROUTE
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            template = route.path
+            break
+        if match == Match.PARTIAL and template == UNMATCHED_ROUTE:
+            template = route.path  # 경로는 맞고 메서드만 다른 경우 (405)
+    if len(_route_cache) >= _ROUTE_CACHE_SIZE:
+        _route_cache.clear()
+    _route_cache[cache_key] = template
+    return template
+
+
+class MetricsMiddleware:
+    """라우트별 요청 지연 시간과 처리 중 요청 수를 기록하는 ASGI 미들웨어."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method, route = scope["method"], route_template(scope)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc(method=method, route=route)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, method=method, route=route, status=status)
+            HTTP_REQUESTS_IN_PROGRESS.dec(method=method, route=route)
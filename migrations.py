@@ -0,0 +1,266 @@
+"""
+데이터베이스 스키마 마이그레이션 모듈.
+
+init_db.py는 DB 파일을 지우고 새로 만들며, main.py의 Base.metadata.create_all은 이미 있는 테이블에
+index=True 인덱스를 추가하지 않습니다. 이 모듈은 버전이 매겨진 마이그레이션을 schema_migrations 테이블에 기록하며
+기존 DB를 제자리에서 최신 스키마로 올립니다. 서버 시작(main.py), init_db.py, 합성 DB 생성기가 같은 함수를 사용합니다.
+
+마이그레이션:
+    1. review_term_columns: course_reviews.year/semester 컬럼과 (course_id, year, semester) 인덱스
+    2. review_search_index: 수강평 전문 검색 색인(FTS5)과 동기화 트리거
+    3. review_content_hash: course_reviews.content_hash 컬럼과 (course_id, content_hash) 유니크 인덱스
+    4. hot_path_indexes: 점수 조회용 (evaluation_item_id, score) 커버링 인덱스, 과목별 평가 항목/수강평 인덱스,
+       학수번호 인덱스 (유니크가 아님, 중복 학수번호가 있어도 적용)
+    5. unique_course_code: courses.course_code 유니크 인덱스 (중복 학수번호가 있으면 실패, 수동 적용)
+    - 새로 적용한 마이그레이션이 있으면 ANALYZE로 쿼리 플래너 통계 갱신
+
+수동 마이그레이션 (MANUAL_MIGRATIONS):
+    - 기존 데이터가 제약 조건을 위반하면 실패할 수 있는 마이그레이션은 서버 시작(main.py) 시 적용하지 않고
+      경고만 출력합니다 (중복 데이터 때문에 API가 시작되지 않는 일이 없도록).
+      데이터를 정리한 뒤 python migrations.py로 적용합니다. 그 뒤의 자동 마이그레이션은 건너뛰지 않고 적용합니다
+      (수동 마이그레이션은 뒤 버전에 의존하지 않아야 함).
+
+동시 실행:
+    - 마이그레이션마다 BEGIN IMMEDIATE로 쓰기 잠금을 잡은 뒤 버전을 다시 확인하므로
+      여러 uvicorn 워커가 동시에 시작해도 한 번만 적용됩니다 (각 마이그레이션은 다시 실행해도 안전).
+    - 마이그레이션 함수는 커밋하지 않으므로 스키마 변경과 schema_migrations 기록이 한 트랜잭션으로 커밋/롤백됩니다
+      (커밋하는 ensure_* 함수는 CLI와 임포트 스크립트용).
+
+사용법:
+    python migrations.py                 # hackathon.db를 최신 버전으로 마이그레이션
+    python migrations.py --db other.db   # 다른 DB
+    python migrations.py --status        # 적용된/대기 중인 마이그레이션 목록
+    python migrations.py --check         # 변경 없이 검사: 최신 버전인지, 주요 쿼리가 인덱스를 쓰는지
+                                         # (EXPLAIN QUERY PLAN, 문제가 있으면 종료 코드 1)
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Tuple
+
+from import_csv import add_content_hash
+from review_recency import add_columns as add_review_term_columns
+from review_search import create_index as create_review_search_index
+
+# =============================================================================
+# 상수 설정
+# =============================================================================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_NAME = os.path.join(BASE_DIR, "hackathon.db")
+
+REQUIRED_TABLES = ["courses", "evaluation_items", "other_student_scores", "course_reviews"]
+
+CREATE_MIGRATIONS_TABLE_SQL = '''
+                              CREATE TABLE IF NOT EXISTS schema_migrations
+                              (
+                                  version    INTEGER PRIMARY KEY,
+                                  name       TEXT NOT NULL,
+                                  applied_at TEXT NOT NULL
+                              )
+                              '''
+
+
+class MigrationError(Exception):
+    """마이그레이션을 적용할 수 없는 경우 (필수 테이블 없음, 데이터가 제약 조건을 위반 등)."""
+
+
+# =============================================================================
+# 마이그레이션
+# =============================================================================
+
+def _hot_path_indexes(conn: sqlite3.Connection) -> None:
+    # (evaluation_item_id, score)가 단일 컬럼 인덱스를 대체 (id는 rowid라 인덱스에 포함되어 점수 조회가 테이블을 읽지 않음)
+    conn.execute("DROP INDEX IF EXISTS ix_other_student_scores_evaluation_item_id")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_other_student_scores_item_score "
+                 "ON other_student_scores (evaluation_item_id, score)")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_evaluation_items_course_id ON evaluation_items (course_id)")
+    # 과목별 수강평을 id 순으로 읽을 때 정렬 없이 사용 ((course_id, year, semester) 인덱스는 정렬이 필요)
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_course_reviews_course_id ON course_reviews (course_id)")
+    # 학수번호 조회용 (ORM과 같은 이름, 수동 마이그레이션 5가 같은 이름의 유니크 인덱스로 교체)
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_courses_course_code ON courses (course_code)")
+
+
+def _unique_course_code(conn: sqlite3.Connection) -> None:
+    duplicates = conn.execute("SELECT course_code, COUNT(*) FROM courses WHERE course_code IS NOT NULL "
+                              "GROUP BY course_code HAVING COUNT(*) > 1").fetchall()
+    if duplicates:
+        codes = ", ".join(f"{code}({count}개)" for code, count in duplicates)
+        raise MigrationError(f"학수번호가 중복된 과목이 있어 유니크 인덱스를 만들 수 없습니다: {codes}")
+    # main.py ORM(unique=True, index=True)이 새 DB에 만드는 이름과 같게 유지
+    conn.execute("DROP INDEX IF EXISTS ix_courses_course_code")
+    conn.execute("CREATE UNIQUE INDEX ix_courses_course_code ON courses (course_code)")
+
+
+# (버전, 이름, 적용 함수) - 적용 함수는 migrate()의 트랜잭션 안에서 실행되므로 커밋하면 안 됨
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], object]]] = [
+        (1, "review_term_columns", add_review_term_columns),
+        (2, "review_search_index", create_review_search_index),
+        (3, "review_content_hash", add_content_hash),
+        (4, "hot_path_indexes", _hot_path_indexes),
+        (5, "unique_course_code", _unique_course_code),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+MANUAL_MIGRATIONS = {5}  # migrate(include_manual=False)에서 적용하지 않는 버전
+
+# 주요 조회 쿼리와 사용해야 하는 인덱스 후보 (--check에서 EXPLAIN QUERY PLAN으로 확인)
+HOT_QUERIES: List[Tuple[str, str, tuple, Tuple[str, ...]]] = [
+        ("scores_by_item",
+         "SELECT id, evaluation_item_id, score FROM other_student_scores WHERE evaluation_item_id = ?",
+         (1,), ("ix_other_student_scores_item_score",)),
+        ("scores_by_items",
+         "SELECT evaluation_item_id, score FROM other_student_scores WHERE evaluation_item_id IN (?, ?)",
+         (1, 2), ("ix_other_student_scores_item_score",)),
+        ("items_by_course",
+         "SELECT id, course_id, name, weight, my_score, is_submitted FROM evaluation_items WHERE course_id = ?",
+         (1,), ("ix_evaluation_items_course_id",)),
+        ("reviews_by_course",
+         "SELECT id, content, year, semester FROM course_reviews WHERE course_id = ? ORDER BY id",
+         (1,), ("ix_course_reviews_course_id",)),
+        ("review_count_by_course",
+         "SELECT COUNT(id) FROM course_reviews WHERE course_id = ?",
+         (1,), ("ix_course_reviews_course_id", "idx_course_reviews_course_term")),
+        ("course_by_code",
+         "SELECT id FROM courses WHERE course_code = ?",
+         ("COSE341",), ("ix_courses_course_code",)),
+]
+
+
+# =============================================================================
+# 실행
+# =============================================================================
+
+def applied_versions(conn: sqlite3.Connection) -> List[int]:
+    """적용된 마이그레이션 버전 목록 (schema_migrations 테이블이 없으면 빈 목록)."""
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_migrations'").fetchone():
+        return []
+    return [row[0] for row in conn.execute("SELECT version FROM schema_migrations ORDER BY version")]
+
+
+def migrate(conn: sqlite3.Connection, target: Optional[int] = None, verbose: bool = False,
+            include_manual: bool = True) -> List[int]:
+    """
+    대기 중인 마이그레이션을 순서대로 적용합니다.
+
+    Args:
+        conn: SQLite 연결
+        target: 이 버전까지만 적용 (생략 시 최신 버전)
+        verbose: 적용한 마이그레이션을 출력
+        include_manual: False면 대기 중인 수동 마이그레이션(MANUAL_MIGRATIONS)은 경고만 출력하고 건너뛰며
+            나머지는 적용 (서버 시작용)
+
+    Returns:
+        이번에 적용한 버전 목록
+
+    Raises:
+        MigrationError: 필수 테이블이 없거나 마이그레이션이 실패한 경우 (실패한 마이그레이션은 롤백)
+    """
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    missing = [table for table in REQUIRED_TABLES if table not in existing]
+    if missing:
+        raise MigrationError(f"테이블이 없습니다: {', '.join(missing)} (init_db.py를 먼저 실행해주세요)")
+    conn.execute(CREATE_MIGRATIONS_TABLE_SQL)
+    conn.commit()
+
+    applied = []
+    for version, name, apply in MIGRATIONS:
+        if target is not None and version > target:
+            break
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM schema_migrations WHERE version = ?", (version,)).fetchone():
+                conn.rollback()
+                continue
+            if not include_manual and version in MANUAL_MIGRATIONS:
+                conn.rollback()
+                print(f"⚠ 마이그레이션 {version:03d} {name} 대기 중: 자동으로 적용하지 않습니다. "
+                      f"python migrations.py로 적용해주세요.")
+                continue
+            apply(conn)
+            if not conn.in_transaction:
+                raise MigrationError(f"마이그레이션 {version} ({name})이 트랜잭션을 커밋했습니다 (적용 함수는 커밋하면 안 됨)")
+            conn.execute("INSERT OR IGNORE INTO schema_migrations (version, name, applied_at) VALUES (?, ?, ?)",
+                         (version, name, datetime.now(timezone.utc).isoformat(timespec="seconds")))
+            conn.commit()
+        except MigrationError:
+            conn.rollback()
+            raise
+        except sqlite3.Error as e:
+            conn.rollback()
+            raise MigrationError(f"마이그레이션 {version} ({name}) 실패: {e}") from e
+        applied.append(version)
+        if verbose:
+            print(f"⬆️ {version:03d} {name}")
+
+    if applied:
+        conn.execute("ANALYZE")
+        conn.commit()
+    return applied
+
+
+def check_query_plans(conn: sqlite3.Connection) -> List[str]:
+    """
+    HOT_QUERIES의 실행 계획을 확인합니다.
+
+    Returns:
+        문제 목록 (전체 테이블 스캔이거나 기대한 인덱스를 쓰지 않는 쿼리), 문제가 없으면 빈 목록
+    """
+    problems = []
+    for name, sql, params, expected in HOT_QUERIES:
+        try:
+            plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        except sqlite3.Error as e:
+            problems.append(f"{name}: {e}")
+            continue
+        full_scan = any(line.startswith("SCAN ") and "INDEX" not in line for line in plan)
+        if full_scan or not any(index in line for line in plan for index in expected):
+            problems.append(f"{name}: {' / '.join(plan)}")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="데이터베이스 스키마 마이그레이션")
+    parser.add_argument("--db", default=DB_NAME, help="데이터베이스 파일 경로")
+    parser.add_argument("--target", type=int, default=None, help="이 버전까지만 적용")
+    parser.add_argument("--status", action="store_true", help="적용된/대기 중인 마이그레이션 목록만 출력")
+    parser.add_argument("--check", action="store_true",
+                        help="변경 없이 최신 버전 여부와 주요 쿼리의 인덱스 사용을 확인 (문제가 있으면 종료 코드 1)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"❌ 오류: '{args.db}' 파일을 찾을 수 없습니다. init_db.py를 먼저 실행해주세요.")
+        sys.exit(1)
+    conn = sqlite3.connect(args.db, timeout=60)
+    try:
+        applied = set(applied_versions(conn))
+        if args.status or args.check:
+            for version, name, _ in MIGRATIONS:
+                manual = " (수동)" if version in MANUAL_MIGRATIONS and version not in applied else ""
+                print(f"{'✅' if version in applied else '⏳'} {version:03d} {name}{manual}")
+        if args.status:
+            return
+        if args.check:
+            problems = [f"대기 중인 마이그레이션: {v:03d}" for v, _, _ in MIGRATIONS if v not in applied]
+            problems += check_query_plans(conn)
+            for problem in problems:
+                print(f"❌ {problem}")
+            if problems:
+                sys.exit(1)
+            print(f"✅ 최신 버전({LATEST_VERSION:03d}), 주요 쿼리 {len(HOT_QUERIES)}개 모두 인덱스 사용")
+            return
+
+        try:
+            done = migrate(conn, args.target, verbose=True)
+        except MigrationError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(f"🎉 {len(done)}개 마이그레이션 적용 완료 (현재 버전: {max(applied_versions(conn), default=0):03d})"
+              if done else "✅ 이미 최신 버전입니다.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+요청 단위 온디맨드 프로파일링 모듈.
+
+운영 데이터에서만 느린 요청(예: 평가 항목이 많은 과목의 /courses/{id}/cumulative-histogram)을 로컬에서 재현하지 않고,
+실제 요청 하나를 샘플링 프로파일러로 실행해 collapsed stack(flamegraph.pl / speedscope 입력 형식) 파일로 저장합니다.
+저장된 프로파일은 관리자 엔드포인트(GET /admin/profiles)로 내려받습니다.
+
+프로파일 대상 선택:
+    - 요청 헤더: X-Profile: 1 과 X-Admin-Token: <ADMIN_TOKEN> (토큰이 맞지 않으면 헤더를 무시하고 평소처럼 처리)
+    - 샘플링: PROFILE_SAMPLE_RATE 비율의 요청을 무작위로 프로파일 (기본값 0, 토큰 불필요)
+    - 워커 프로세스당 동시에 하나만 프로파일 (이미 진행 중이면 건너뜀)
+
+동작 방식:
+    - 요청이 처리되는 동안 별도 스레드가 PROFILE_INTERVAL_MS마다 sys._current_frames()로 모든 스레드의 스택을 기록
+    - 동기 엔드포인트는 스레드풀에서 실행되고 cProfile은 활성화한 스레드만 측정하므로, 결정적 프로파일러 대신
+      스레드와 무관하게 동작하는 샘플링 방식을 사용
+    - 대기 중인 스레드(이벤트 루프 select, 스레드풀 대기열)는 제외하고, 앱 코드가 포함된 스택은 I/O 대기 중이어도 포함
+    - 같은 워커에서 겹쳐 처리된 다른 요청의 스택도 섞일 수 있으므로 겹친 요청 수를 메타데이터(overlapping_requests)에 기록
+
+저장 형식 (PROFILE_DIR, 모든 워커가 공유):
+    - <profile_id>.collapsed: "스레드;바깥 함수;...;안쪽 함수 샘플 수" 한 줄씩
+    - <profile_id>.json: 메서드, 경로, 라우트, 상태 코드, 요청 ID, 소요 시간, 샘플 수, 자체 시간 상위 함수
+    - PROFILE_MAX_FILES개를 넘으면 오래된 것부터 삭제
+
+환경 변수:
+    PROFILE_DIR: 저장 디렉터리, 기본값 cache/profiles
+    PROFILE_SAMPLE_RATE: 무작위로 프로파일할 요청 비율(0~1), 기본값 0
+    PROFILE_INTERVAL_MS: 스택 샘플링 주기(ms), 기본값 5
+    PROFILE_MAX_FILES: 보관할 프로파일 수, 기본값 200
+
+사용 예시:
+    curl -H "X-Profile: 1" -H "X-Admin-Token: $ADMIN_TOKEN" -i https://.../courses/3/cumulative-histogram
+    # 응답 헤더 X-Profile-Id로 프로파일 ID 확인 후
+    curl -H "X-Admin-Token: $ADMIN_TOKEN" https://.../admin/profiles/<profile_id> > profile.collapsed
+    flamegraph.pl profile.collapsed > profile.svg
+"""
+
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional
+
+# =============================================================================
+# 상수 설정
+# =============================================================================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(BASE_DIR, "cache", "profiles"))
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "200"))
+
+PROFILE_HEADER = "x-profile"
+ADMIN_TOKEN_HEADER = "x-admin-token"
+TOP_FUNCTIONS = 15  # 메타데이터에 기록할 자체 시간 상위 함수 수
+
+PROFILE_ID_RE = re.compile(r"^\d{8}-\d{6}-[0-9a-f]{8}$")
+
+# 스택의 가장 안쪽 프레임이 이 (파일, 함수)이면 대기 중인 스레드로 보고 제외 (앱 코드 프레임이 없을 때만)
+_IDLE_FRAMES = {
+        ("threading.py", "wait"), ("threading.py", "_wait_for_tstate_lock"),
+        ("selectors.py", "select"), ("queue.py", "get"), ("socket.py", "accept"), ("thread.py", "_worker"),
+}
+
+
+# =============================================================================
+# 샘플링 프로파일러
+# =============================================================================
+
+def _frame_label(code) -> str:
+    """프레임 표시 이름: 함수 (앱 기준 상대 경로 또는 site-packages 이후 경로:정의 줄)."""
+    filename = code.co_filename
+    if filename.startswith(BASE_DIR):
+        filename = os.path.relpath(filename, BASE_DIR)
+    elif "site-packages" in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[-1]
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ",")
+
+
+class SamplingProfiler:
+    """요청 하나를 처리하는 동안 모든 스레드의 스택을 주기적으로 기록하는 프로파일러."""
+
+    def __init__(self, metadata: dict, interval: float = PROFILE_INTERVAL_MS / 1000):
+        self.profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.metadata = metadata
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.overlapping_requests = 0
+        self._started = time.perf_counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, **metadata) -> None:
+        """샘플링을 멈춥니다. 파일 기록은 프로파일러 스레드에서 하므로 요청 처리는 기다리지 않습니다."""
+        self.metadata.update(metadata, duration_ms=round((time.perf_counter() - self._started) * 1000, 1))
+        self._stop.set()
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self._sample(own_ident)
+        try:
+            self._save()
+        except Exception as e:
+            print(f"⚠ Failed to save profile {self.profile_id}: {e}")
+
+    def _sample(self, own_ident: int) -> None:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        self.samples += 1
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            leaf = frame.f_code
+            labels, has_app_frame = [], False
+            while frame is not None:
+                code = frame.f_code
+                has_app_frame = has_app_frame or (code.co_filename.startswith(BASE_DIR)
+                                                  and "site-packages" not in code.co_filename)
+                labels.append(_frame_label(code))
+                frame = frame.f_back
+            if not has_app_frame and (os.path.basename(leaf.co_filename), leaf.co_name) in _IDLE_FRAMES:
+                continue
+            labels.append(names.get(ident, f"thread-{ident}").replace(";", ","))
+            self.stacks[";".join(reversed(labels))] += 1
+
+    def _save(self) -> None:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        self_time: Counter = Counter()
+        for stack, count in self.stacks.items():
+            self_time[stack.rsplit(";", 1)[-1]] += count
+        self.metadata.update(
+                profile_id=self.profile_id,
+                created_at=time.strftime("%Y-%m-%dT%H:%M:%S"),
+                interval_ms=round(self.interval * 1000, 3),
+                samples=self.samples,
+                overlapping_requests=self.overlapping_requests,
+                pid=os.getpid(),
+                top_self=[{"function": name, "samples": count} for name, count in self_time.most_common(TOP_FUNCTIONS)],
+        )
+        base = os.path.join(PROFILE_DIR, self.profile_id)
+        with open(base + ".collapsed", "w", encoding="utf-8") as f:
+            f.writelines(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(self.metadata, f, ensure_ascii=False)
+        print(f"🔬 Saved profile {self.profile_id} ({self.metadata.get('path')}, {self.samples} samples)")
+        prune_profiles()
+
+
+# =============================================================================
+# 저장된 프로파일 조회
+# =============================================================================
+
+def prune_profiles(max_files: int = PROFILE_MAX_FILES) -> None:
+    """오래된 프로파일을 삭제해 max_files개만 남깁니다 (ID가 시각으로 시작하므로 이름순 = 생성순)."""
+    ids = sorted(name[:-5] for name in os.listdir(PROFILE_DIR) if name.endswith(".json"))
+    for profile_id in ids[:max(len(ids) - max_files, 0)]:
+        for ext in (".json", ".collapsed"):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, profile_id + ext))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles(limit: int = 50) -> List[dict]:
+    """저장된 프로파일 메타데이터를 최신순으로 반환합니다."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    ids = sorted((name[:-5] for name in os.listdir(PROFILE_DIR) if name.endswith(".json")), reverse=True)
+    profiles = []
+    for profile_id in ids[:limit]:
+        try:
+            with open(os.path.join(PROFILE_DIR, profile_id + ".json"), encoding="utf-8") as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+def load_profile(profile_id: str) -> Optional[str]:
+    """
+    collapsed stack 파일 내용을 반환합니다.
+
+    Args:
+        profile_id: 프로파일 ID (형식이 맞지 않으면 경로로 사용하지 않고 None 반환)
+
+    Returns:
+        Optional[str]: 파일 내용 (없으면 None)
+    """
+    if not PROFILE_ID_RE.match(profile_id):
+        return None
+    try:
+        with open(os.path.join(PROFILE_DIR, profile_id + ".collapsed"), encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+# =============================================================================
+# 수집 지점
+# =============================================================================
+
+def admin_token_valid(provided: Optional[str], admin_token: str) -> bool:
+    """관리자 토큰 비교 (ADMIN_TOKEN이 비어 있으면 항상 거부)."""
+    return bool(admin_token) and provided is not None and hmac.compare_digest(provided.encode(), admin_token.encode())
+
+
+class ProfilingMiddleware:
+    """
+    X-Profile 헤더(관리자 토큰 필요) 또는 PROFILE_SAMPLE_RATE로 선택된 요청을 프로파일하는 ASGI 미들웨어.
+    프로파일한 요청의 응답에는 X-Profile-Id 헤더를 붙입니다.
+    """
+
+    def __init__(self, app, admin_token: str = "", sample_rate: float = PROFILE_SAMPLE_RATE):
+        self.app = app
+        self.admin_token = admin_token
+        self.sample_rate = sample_rate
+        self.active: Optional[SamplingProfiler] = None
+
+    def _requested(self, headers: Dict[str, str]) -> bool:
+        if headers.get(PROFILE_HEADER, "").lower() in ("1", "true", "yes"):
+            return admin_token_valid(headers.get(ADMIN_TOKEN_HEADER), self.admin_token)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if self.active is not None:
+            self.active.overlapping_requests += 1
+            await self.app(scope, receive, send)
+            return
+
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+        if not self._requested(headers):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = SamplingProfiler({"method": scope["method"], "path": scope["path"],
+                                     "query": scope.get("query_string", b"").decode("latin-1"),
+                                     "request_id": headers.get("x-request-id")})
+        self.active = profiler
+        status = 500
+
+        async def send_with_profile_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", profiler.profile_id.encode())]
+            await send(message)
+
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            self.active = None
+            route = scope.get("route")
+            profiler.stop(status=status, route=route.path if route is not None else None)
@@ -0,0 +1,118 @@
+"""
+목표 성적별 조언 생성 방식 비교 모듈.
+
+같은 과목의 수강평으로 다음 두 방식의 토큰 사용량과 응답 시간을 비교합니다.
+
+비교 방식:
+    - per-grade: 목표 성적마다 build_course_advice_prompt로 개별 호출 (기존 /courses/{id}/advice 경로)
+    - multi-grade: build_multi_grade_advice_prompt로 모든 목표 성적을 한 번에 호출
+
+출력 항목:
+    - 호출 수, 입력/출력 토큰 합계, 총 소요 시간(초)
+    - multi-grade 방식의 입력 토큰 절감률
+
+사용법:
+    python prompt/multi_grade_advice_compare.py [course_code] [grade ...]
+    예: python prompt/multi_grade_advice_compare.py COSE341 A+ A0 B+
+
+환경 변수:
+    OPENAI_API_KEY: OpenAI API 키 (필수)
+"""
+
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+from openai import OpenAI
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from advice_prompts import (  # noqa: E402
+    ADVICE_MODEL,
+    COURSE_ADVICE_SCHEMA,
+    build_course_advice_prompt,
+    build_multi_grade_advice_prompt,
+    multi_grade_advice_schema,
+    parse_llm_json,
+    split_multi_grade_result,
+)
+
+# 환경 변수 로드 (.env 파일에서 OPENAI_API_KEY 읽기)
+load_dotenv()
+
+# =============================================================================
+# OpenAI 클라이언트 초기화
+# =============================================================================
+client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+# =============================================================================
+# 비교 대상 설정
+# =============================================================================
+course_code = sys.argv[1] if len(sys.argv) > 1 else "COSE341"
+grades = sys.argv[2:] or ["A+", "A0", "B+"]
+preferences = "암기형, 객관식 선호, 과제보다 시험 선호"
+
+df = pd.read_csv(os.path.join(BASE_DIR, "crawling", "klue_reviews_multi.csv"))
+reviews = df[df["course_code"] == course_code]["review"].dropna().tolist()
+course_reviews_str = "\n".join([f"- {review}" for review in reviews])
+
+print(f"과목: {course_code} / 수강평 {len(reviews)}개 / 목표 성적: {', '.join(grades)}")
+
+
+def call(prompt: str, name: str, schema: dict):
+    """Structured Output 호출을 수행하고 (파싱 결과, usage, 소요 시간)을 반환합니다."""
+    start = time.perf_counter()
+    response = client.responses.create(
+            model=ADVICE_MODEL,
+            input=prompt,
+            text={
+                    "verbosity": "low",
+                    "format"   : {"type": "json_schema", "name": name, "schema": schema}
+            },
+            reasoning={"effort": "minimal"},
+    )
+    elapsed = time.perf_counter() - start
+    return parse_llm_json(response.output_text), response.usage, elapsed
+
+
+# =============================================================================
+# 1) per-grade: 목표 성적마다 개별 호출
+# =============================================================================
+per_grade = {"calls": 0, "input_tokens": 0, "output_tokens": 0, "seconds": 0.0}
+for grade in grades:
+    _, usage, elapsed = call(build_course_advice_prompt(grade, preferences, course_reviews_str),
+                             "course_advice", COURSE_ADVICE_SCHEMA)
+    per_grade["calls"] += 1
+    per_grade["input_tokens"] += usage.input_tokens
+    per_grade["output_tokens"] += usage.output_tokens
+    per_grade["seconds"] += elapsed
+
+# =============================================================================
+# 2) multi-grade: 한 번의 호출로 모든 목표 성적 생성
+# =============================================================================
+result, usage, elapsed = call(build_multi_grade_advice_prompt(grades, preferences, course_reviews_str),
+                              "course_advice_by_grade", multi_grade_advice_schema(grades))
+multi_grade = {
+        "calls"        : 1,
+        "input_tokens" : usage.input_tokens,
+        "output_tokens": usage.output_tokens,
+        "seconds"      : elapsed,
+}
+
+# =============================================================================
+# 결과 출력
+# =============================================================================
+print(f"\n{'mode':<12} {'calls':>5} {'input_tok':>10} {'output_tok':>10} {'seconds':>8}")
+for mode, stats in (("per-grade", per_grade), ("multi-grade", multi_grade)):
+    print(f"{mode:<12} {stats['calls']:>5} {stats['input_tokens']:>10} "
+          f"{stats['output_tokens']:>10} {stats['seconds']:>8.2f}")
+
+saved = 1 - multi_grade["input_tokens"] / per_grade["input_tokens"]
+print(f"\n입력 토큰 절감률: {saved * 100:.1f}%")
+
+print("\nmulti-grade 조언:")
+for grade, advice in split_multi_grade_result(result, grades).items():
+    print(f"  [{grade}] {advice['advice']}")
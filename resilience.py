@@ -0,0 +1,138 @@
+"""
+외부 의존성(Redis, OpenAI) 장애 대응용 서킷 브레이커 모듈.
+
+의존성이 느려지거나 죽었을 때 요청마다 타임아웃까지 기다리면 꼬리 지연(tail latency)이 타임아웃 길이만큼 늘어나므로,
+연속 실패가 쌓이면 브레이커를 열어(open) 일정 시간 동안 호출 없이 바로 실패하고,
+그 시간이 지나면 시험 호출 하나만 허용(half-open)하여 회복 여부를 확인합니다.
+
+상태 전이:
+    closed ──(연속 실패 failure_threshold회)──▶ open ──(open_for초 경과)──▶ half_open
+    half_open ──(시험 호출 성공)──▶ closed
+    half_open ──(시험 호출 실패)──▶ open (open_for를 2배로 늘림, 최대 max_reset_timeout, ±10% 지터)
+
+동작 방식:
+    - allow(): 호출해도 되는지 확인 (open이면 False, half_open이면 시험 호출 하나만 True)
+    - record_success() / record_failure(error): 호출 결과 기록
+    - 시험 호출이 결과를 기록하지 않고 끝나도(예: 클라이언트 연결 끊김으로 취소) reset_timeout 뒤에는 다시 시험 호출을 허용
+    - 동기 Redis 호출은 스레드풀에서도 실행되므로 상태 변경은 threading.Lock으로 보호
+
+사용 예시 (main.py):
+    redis_breaker = CircuitBreaker("redis", failure_threshold=3, reset_timeout=5)
+    if redis_breaker.allow():
+        try:
+            value = redis_client.get(key)
+            redis_breaker.record_success()
+        except redis.RedisError as e:
+            redis_breaker.record_failure(e)
+"""
+
+import random
+import threading
+import time
+from typing import Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """연속 실패 횟수 기반 서킷 브레이커."""
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 max_reset_timeout: float = 300.0):
+        """
+        Args:
+            name: 의존성 이름 (/health 표시용)
+            failure_threshold: 브레이커를 여는 연속 실패 횟수
+            reset_timeout: 처음 열렸을 때 half_open까지 기다리는 시간(초)
+            max_reset_timeout: 시험 호출 실패가 반복될 때 늘어나는 대기 시간의 상한(초)
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+
+        self.state = CLOSED
+        self.failures = 0
+        self.trips = 0  # 연속으로 열린 횟수 (대기 시간 지수 증가용)
+        self.open_until = 0.0
+        self.probe_started_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_failure_at: Optional[float] = None
+        self.opened_count = 0
+        self.rejected_count = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """호출을 허용할지 결정합니다 (open 상태의 거절 횟수도 집계)."""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and now >= self.open_until:
+                self.state = HALF_OPEN
+                self.probe_started_at = None
+            if self.state == HALF_OPEN:
+                if self.probe_started_at is None or now - self.probe_started_at >= self.reset_timeout:
+                    self.probe_started_at = now
+                    return True
+            self.rejected_count += 1
+            return False
+
+    def record_success(self) -> None:
+        """호출 성공을 기록합니다 (half_open이면 closed로 전환)."""
+        with self._lock:
+            if self.state != CLOSED:
+                print(f"✓ {self.name} circuit closed (recovered)")
+            self.state = CLOSED
+            self.failures = 0
+            self.trips = 0
+            self.probe_started_at = None
+
+    def record_failure(self, error: Optional[BaseException] = None) -> None:
+        """호출 실패를 기록합니다 (연속 실패가 기준을 넘거나 시험 호출이 실패하면 open으로 전환)."""
+        with self._lock:
+            now = time.monotonic()
+            self.failures += 1
+            self.last_failure_at = now
+            if error is not None:
+                self.last_error = f"{type(error).__name__}: {error}"[:200]
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self._open(now)
+
+    def trip(self, error: Optional[BaseException] = None) -> None:
+        """연속 실패 횟수와 무관하게 즉시 open으로 전환합니다 (예: 시작 시 연결 실패)."""
+        with self._lock:
+            if error is not None:
+                self.last_error = f"{type(error).__name__}: {error}"[:200]
+            self._open(time.monotonic())
+
+    def _open(self, now: float) -> None:
+        self.trips += 1
+        open_for = min(self.reset_timeout * 2 ** (self.trips - 1), self.max_reset_timeout)
+        open_for *= random.uniform(0.9, 1.1)  # 여러 워커 프로세스가 동시에 시험 호출하지 않도록 지터
+        self.state = OPEN
+        self.open_until = now + open_for
+        self.probe_started_at = None
+        self.opened_count += 1
+        print(f"⚠ {self.name} circuit open for {open_for:.1f}s ({self.last_error})")
+
+    def retry_in(self) -> float:
+        """open 상태에서 half_open까지 남은 시간(초), 그 외 상태는 0."""
+        with self._lock:
+            return max(0.0, self.open_until - time.monotonic()) if self.state == OPEN else 0.0
+
+    def snapshot(self) -> dict:
+        """/health 응답용 상태."""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                    "state"               : self.state,
+                    "consecutive_failures": self.failures,
+                    "retry_in"            : round(max(0.0, self.open_until - now), 1) if self.state == OPEN else 0.0,
+                    "opened_count"        : self.opened_count,
+                    "rejected_count"      : self.rejected_count,
+                    "last_error"          : self.last_error,
+                    "last_failure_ago"    : round(now - self.last_failure_at, 1) if self.last_failure_at else None,
+            }
@@ -0,0 +1,318 @@
+"""
+AI 조언 응답 캐시 백엔드 모듈.
+
+Redis가 없거나 재시작/FLUSH로 비워지면 모든 조언 요청이 수 초짜리 유료 LLM 호출이 되므로,
+캐시 저장소를 백엔드로 분리하고 로컬 SQLite 파일 캐시를 단독 또는 Redis 아래 계층으로 사용할 수 있게 합니다.
+
+구성:
+    - RedisCacheBackend: 서킷 브레이커를 거치는 Redis 명령 함수(main.redis_call)로 읽고 쓰는 캐시
+    - SqliteCacheBackend: SQLite 테이블 캐시 (TTL 만료 + 항목 수 기준 제거). WAL 모드 파일 하나를
+      여러 uvicorn 워커 프로세스가 함께 사용하고, 프로세스를 재시작해도 유지
+    - TieredCache: 여러 백엔드를 순서대로 조회하는 계층 캐시 (CACHE_BACKENDS="redis,sqlite")
+
+저장 형식 (encode_payload / decode_payload):
+    - 첫 바이트가 형식 버전: 0x01 = UTF-8 JSON, 0x02 = zlib으로 압축한 UTF-8 JSON
+      (직렬화 결과가 compress_min_bytes 이상이고 압축해서 작아질 때만 압축)
+    - json.dumps 기본값(ensure_ascii)은 한글 한 글자를 \\uXXXX 6바이트로 저장하므로 UTF-8(3바이트)로 저장
+    - orjson이 설치되어 있으면 사용하고, 없으면 표준 json으로 같은 형식을 생성 (워커 간 호환)
+    - 버전 바이트가 없는 값('{' 또는 '['로 시작)은 이전 json.dumps 문자열로 읽으므로 배포 중에도 기존 캐시를 그대로 사용하고,
+      알 수 없는 버전은 캐시 미스로 처리
+
+동작 방식:
+    - get: 앞 계층부터 조회하고, 뒤 계층에서 찾으면 남은 TTL로 앞 계층에 다시 채움 (Redis가 비워져도 SQLite에서 복구)
+    - set: 모든 계층에 기록 (write-through)
+    - get_many / set_many: 여러 키를 한 번에 조회/기록 (Redis는 MGET / 파이프라인, SQLite는 쿼리/트랜잭션 하나)
+    - delete_pattern: 모든 계층에서 Redis 글롭 패턴(*, ?, [...])에 일치하는 키 삭제
+    - 백엔드 오류는 캐시 미스로 처리 (요청은 캐시 없이 진행)
+
+사용 예시 (main.py):
+    cache = TieredCache([RedisCacheBackend(redis_call, redis_pipeline), SqliteCacheBackend("cache/response_cache.db")])
+    cache.set("cache:course_advice:...", encode_payload(data), ttl=3600)
+    data = decode_payload(cache.get("cache:course_advice:..."))
+
+    # 기존 JSON 문자열 대비 항목 크기 / 인코딩·디코딩 시간 비교
+    python benchmark/cache_codec.py
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+CacheValue = Union[bytes, str]
+CacheEntry = Tuple[CacheValue, Optional[int]]  # (값, 남은 TTL(초), 알 수 없으면 None)
+
+SQLITE_BUSY_TIMEOUT = 1.0  # 다른 워커가 쓰는 중일 때 기다리는 최대 시간(초), 초과하면 캐시 미스로 처리
+
+FORMAT_JSON = 0x01
+FORMAT_JSON_ZLIB = 0x02
+ZLIB_LEVEL = 6
+
+
+# =============================================================================
+# 직렬화
+# =============================================================================
+
+def _dumps(data: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(raw: Union[bytes, str]) -> Any:
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def encode_payload(data: Any, compress_min_bytes: int = 1024) -> bytes:
+    """
+    캐시에 저장할 값을 버전 바이트가 붙은 바이너리로 직렬화합니다.
+
+    Args:
+        data: JSON으로 표현 가능한 값
+        compress_min_bytes: 이 크기(바이트) 이상이면 zlib 압축 시도 (0 이하이면 압축하지 않음)
+
+    Returns:
+        저장할 바이트열
+    """
+    body = _dumps(data)
+    if 0 < compress_min_bytes <= len(body):
+        compressed = zlib.compress(body, ZLIB_LEVEL)
+        if len(compressed) < len(body):
+            return bytes([FORMAT_JSON_ZLIB]) + compressed
+    return bytes([FORMAT_JSON]) + body
+
+
+def decode_payload(raw: Optional[CacheValue]) -> Any:
+    """
+    encode_payload로 저장한 값(또는 이전 json.dumps 문자열)을 복원합니다.
+
+    Returns:
+        복원한 값 (raw가 None이면 None)
+
+    Raises:
+        ValueError: 알 수 없는 형식 버전이거나 손상된 값
+    """
+    if raw is None:
+        return None
+    if isinstance(raw, str):
+        return json.loads(raw)
+    if not raw:
+        raise ValueError("empty cache value")
+    version = raw[0]
+    if version == FORMAT_JSON:
+        return _loads(raw[1:])
+    if version == FORMAT_JSON_ZLIB:
+        return _loads(zlib.decompress(raw[1:]))
+    if raw[:1] in (b"{", b"["):
+        return _loads(raw)
+    raise ValueError(f"unknown cache format version {version}")
+
+
+# =============================================================================
+# 저장소 백엔드
+# =============================================================================
+
+class RedisCacheBackend:
+    """
+    Redis 캐시.
+
+    명령은 서킷 브레이커를 거치는 call(command, *args)로, 여러 명령은 pipeline([(command, *args), ...])으로
+    한 번의 왕복에 실행합니다.
+    """
+
+    name = "redis"
+
+    def __init__(self, call: Callable, pipeline: Callable):
+        self.call = call
+        self.pipeline = pipeline
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        value = self.call("get", key)
+        return (value, None) if value is not None else None
+
+    def get_many(self, keys: List[str]) -> Dict[str, CacheEntry]:
+        values = self.call("mget", keys) or []
+        return {key: (value, None) for key, value in zip(keys, values) if value is not None}
+
+    def set(self, key: str, value: CacheValue, ttl: int) -> None:
+        self.call("setex", key, ttl, value)
+
+    def set_many(self, items: Dict[str, CacheValue], ttl: int) -> None:
+        self.pipeline([("setex", key, ttl, value) for key, value in items.items()])
+
+    def delete_pattern(self, pattern: str) -> None:
+        keys = self.call("keys", pattern)
+        if keys:
+            self.call("delete", *keys)
+
+
+class SqliteCacheBackend:
+    """
+    SQLite 파일 캐시.
+
+    만료 시각(expires_at) 인덱스로 만료 항목을 지우고, 항목 수가 max_entries를 넘으면 만료가 가장 가까운
+    (가장 오래전에 저장된) 항목부터 제거합니다. 조회 시에는 쓰기를 하지 않아 워커 간 잠금 경합이 없습니다.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, max_entries: int = 5000):
+        """
+        Args:
+            path: SQLite 파일 경로 (디렉터리가 없으면 생성)
+            max_entries: 보관할 최대 항목 수
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()  # 스레드풀에서도 호출되므로 스레드별 연결 사용
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute("""
+                     CREATE TABLE IF NOT EXISTS response_cache (
+                         key        TEXT PRIMARY KEY,
+                         value      BLOB NOT NULL,
+                         expires_at REAL NOT NULL
+                     )
+                     """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_response_cache_expires ON response_cache (expires_at)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=SQLITE_BUSY_TIMEOUT)
+            conn.execute("PRAGMA journal_mode=WAL")  # 읽기가 다른 워커의 쓰기를 기다리지 않도록
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        now = time.time()
+        row = self._conn().execute("SELECT value, expires_at FROM response_cache WHERE key = ? AND expires_at > ?",
+                                   (key, now)).fetchone()
+        return (row[0], max(1, int(row[1] - now))) if row else None
+
+    def get_many(self, keys: List[str]) -> Dict[str, CacheEntry]:
+        now = time.time()
+        rows = self._conn().execute(f"SELECT key, value, expires_at FROM response_cache "
+                                    f"WHERE key IN ({','.join('?' * len(keys))}) AND expires_at > ?",
+                                    (*keys, now)).fetchall()
+        return {key: (value, max(1, int(expires_at - now))) for key, value, expires_at in rows}
+
+    def set(self, key: str, value: CacheValue, ttl: int) -> None:
+        self.set_many({key: value}, ttl)
+
+    def set_many(self, items: Dict[str, CacheValue], ttl: int) -> None:
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO response_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                             [(key, value, now + ttl) for key, value in items.items()])
+            conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+            excess = conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute("""
+                             DELETE FROM response_cache
+                              WHERE key IN (SELECT key FROM response_cache ORDER BY expires_at LIMIT ?)
+                             """, (excess,))
+
+    def delete_pattern(self, pattern: str) -> None:
+        # SQLite GLOB은 Redis KEYS 패턴과 같은 *, ?, [...] 문법을 사용
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM response_cache WHERE key GLOB ?", (pattern,))
+
+    def stats(self) -> dict:
+        count, size = self._conn().execute("SELECT COUNT(*), COALESCE(SUM(length(value)), 0) FROM response_cache "
+                                           "WHERE expires_at > ?", (time.time(),)).fetchone()
+        return {"entries": count, "bytes": size, "max_entries": self.max_entries}
+
+
+# =============================================================================
+# 계층 캐시
+# =============================================================================
+
+class TieredCache:
+    """백엔드 목록을 앞에서부터 조회하고 모든 백엔드에 기록하는 계층 캐시."""
+
+    def __init__(self, backends: List, default_ttl: int = 3600):
+        self.backends = backends
+        self.default_ttl = default_ttl
+
+    @property
+    def names(self) -> List[str]:
+        return [backend.name for backend in self.backends]
+
+    def get(self, key: str) -> Optional[CacheValue]:
+        """
+        캐시 값을 조회합니다.
+
+        Returns:
+            저장된 값 (모든 계층에 없으면 None). 뒤 계층에서 찾으면 앞 계층에 남은 TTL로 다시 채움
+        """
+        for level, backend in enumerate(self.backends):
+            try:
+                entry = backend.get(key)
+            except Exception as e:
+                print(f"Cache get error ({backend.name}): {e}")
+                continue
+            if entry is None:
+                continue
+            value, ttl = entry
+            for upper in self.backends[:level]:
+                self._try(upper, "set", key, value, ttl or self.default_ttl)
+            return value
+        return None
+
+    def get_many(self, keys: List[str]) -> Dict[str, CacheValue]:
+        """
+        여러 키를 계층마다 한 번씩 조회합니다 (앞 계층에 없는 키만 다음 계층에서 조회).
+
+        Returns:
+            {키: 저장된 값} (찾은 키만 포함)
+        """
+        found: Dict[str, CacheValue] = {}
+        missing = list(dict.fromkeys(keys))
+        for level, backend in enumerate(self.backends):
+            if not missing:
+                break
+            try:
+                entries = backend.get_many(missing)
+            except Exception as e:
+                print(f"Cache get_many error ({backend.name}): {e}")
+                continue
+            for key, (value, ttl) in entries.items():
+                found[key] = value
+                for upper in self.backends[:level]:
+                    self._try(upper, "set", key, value, ttl or self.default_ttl)
+            missing = [key for key in missing if key not in entries]
+        return found
+
+    def set(self, key: str, value: CacheValue, ttl: Optional[int] = None) -> None:
+        for backend in self.backends:
+            self._try(backend, "set", key, value, ttl or self.default_ttl)
+
+    def set_many(self, items: Dict[str, CacheValue], ttl: Optional[int] = None) -> None:
+        if not items:
+            return
+        for backend in self.backends:
+            self._try(backend, "set_many", items, ttl or self.default_ttl)
+
+    def delete_pattern(self, pattern: str) -> None:
+        for backend in self.backends:
+            self._try(backend, "delete_pattern", pattern)
+
+    @staticmethod
+    def _try(backend, method: str, *args) -> None:
+        try:
+            getattr(backend, method)(*args)
+        except Exception as e:
+            print(f"Cache {method} error ({backend.name}): {e}")
@@ -0,0 +1,267 @@
+"""
+수강평 로컬 압축 모듈.
+
+AI 조언 프롬프트에 수강평을 넣기 전에 네트워크 호출 없이 수강평 수와 토큰 수를 줄입니다.
+요청마다 인라인으로 실행할 수 있도록 수천 개의 수강평도 수십 ms 안에 처리하는 것을 목표로 합니다.
+
+처리 단계:
+    1. 정규화: 공백/문장부호를 제거한 한글·영문·숫자 문자열로 변환
+    2. 중복 제거: 글자 n-gram(shingle) 집합의 MinHash 서명과 LSH 밴딩으로
+       유사도(Jaccard 추정치)가 DEDUP_THRESHOLD 이상인 수강평을 제거
+    3. 추출 선택: 과제/시험/난이도 등 키워드 점수가 높은 수강평부터
+       토큰 예산(token_budget)과 최대 개수(top_k) 안에서 선택
+    4. 선택된 수강평을 원래 순서(id 순)로 반환
+
+사용법:
+    from review_compression import compress_reviews
+    selected, stats = compress_reviews([(1, "과제가 많아요"), ...], token_budget=6000)
+
+    # 크롤링 CSV로 압축률과 처리 시간 확인
+    python review_compression.py [csv_path] [token_budget]
+"""
+
+import math
+import re
+import time
+import zlib
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from advice_prompts import estimate_tokens
+
+# =============================================================================
+# 상수 설정
+# =============================================================================
+SHINGLE_SIZE = 3  # 한글은 음절 단위 3-gram이 표현 차이에 덜 민감함
+NUM_PERM = 32  # MinHash 서명 길이
+LSH_BANDS = 8  # NUM_PERM = LSH_BANDS * rows_per_band
+DEDUP_THRESHOLD = 0.7  # 이 이상 유사하면 중복으로 간주
+DEFAULT_TOP_K = 80
+
+_PRIME = 4294967311  # 2^32보다 큰 소수 (uint64 범위에서 a*x+b가 넘치지 않음)
+_rng = np.random.default_rng(20251)
+_PERM_A = _rng.integers(1, 1 << 32, NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 1 << 32, NUM_PERM, dtype=np.uint64)
+
+_NORMALIZE_RE = re.compile(r"[^0-9a-z가-힣]+")
+
+# 난이도/성적 판단에 도움이 되는 키워드와 가중치
+KEYWORD_WEIGHTS = {
+        "과제"  : 3.0, "시험": 3.0, "난이도": 3.0, "중간": 2.0, "기말": 2.0, "퀴즈": 2.0,
+        "어렵"  : 2.0, "어려": 2.0, "쉽"  : 2.0, "쉬움": 2.0, "빡세": 2.0, "널널": 2.0,
+        "학점"  : 2.0, "성적": 2.0, "채점": 2.0, "비중": 2.0, "분량": 2.0, "족보": 2.0,
+        "출석"  : 1.0, "팀플": 1.5, "프로젝트": 1.5, "레포트": 1.5, "보고서": 1.5, "발표": 1.0,
+        "객관식": 1.5, "서술형": 1.5, "암기": 1.5, "오픈북": 1.5, "절평": 2.0, "상대평가": 2.0,
+        "절대평가": 2.0, "a+" : 1.0, "공부": 1.0, "시간": 0.5,
+}
+
+
+# =============================================================================
+# MinHash 중복 제거
+# =============================================================================
+
+def normalize(text: str) -> str:
+    """소문자로 바꾸고 한글·영문·숫자 이외의 문자를 제거합니다."""
+    return _NORMALIZE_RE.sub("", (text or "").lower())
+
+
+@lru_cache(maxsize=20000)
+def minhash_signature(text: str) -> np.ndarray:
+    """
+    수강평의 MinHash 서명을 계산합니다.
+
+    같은 수강평은 요청마다 반복해서 들어오므로 내용 문자열 기준으로 캐시합니다.
+
+    Args:
+        text: 수강평 원문
+
+    Returns:
+        [NUM_PERM] uint64 서명 배열
+    """
+    norm = normalize(text)
+    if len(norm) <= SHINGLE_SIZE:
+        shingles = {norm}
+    else:
+        shingles = {norm[i:i + SHINGLE_SIZE] for i in range(len(norm) - SHINGLE_SIZE + 1)}
+
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+    values = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _PRIME
+    return values.min(axis=1)
+
+
+def near_duplicate_clusters(texts: Sequence[str], threshold: float = DEDUP_THRESHOLD) -> List[int]:
+    """
+    LSH 밴딩으로 유사 수강평 후보를 찾고 MinHash 추정 유사도로 검증해 클러스터로 묶습니다.
+
+    같은 밴드 버킷에 들어간 수강평은 버킷의 첫 수강평과만 비교하고(별 모양 연결),
+    검증을 통과한 쌍을 union-find로 합칩니다.
+
+    Args:
+        texts: 수강평 원문 리스트
+        threshold: 중복으로 간주할 Jaccard 추정치 하한
+
+    Returns:
+        각 수강평의 클러스터 대표 인덱스 리스트 (중복이 없으면 자기 자신)
+    """
+    parent = list(range(len(texts)))
+    if len(texts) < 2:
+        return parent
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    signatures = np.stack([minhash_signature(t) for t in texts])
+    rows = NUM_PERM // LSH_BANDS
+
+    pairs = set()
+    for band in range(LSH_BANDS):
+        heads: Dict[bytes, int] = {}
+        band_sig = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        for idx, key in enumerate(band_sig.view(f"V{rows * 8}").ravel().tolist()):
+            head = heads.setdefault(key, idx)
+            if head != idx:
+                pairs.add((head, idx))
+
+    if pairs:
+        left, right = np.array(list(pairs)).T
+        similarity = (signatures[left] == signatures[right]).mean(axis=1)
+        for i, j in zip(left[similarity >= threshold].tolist(), right[similarity >= threshold].tolist()):
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    return [find(i) for i in range(len(texts))]
+
+
+# =============================================================================
+# 추출 선택
+# =============================================================================
+
+_KEYWORD_RE = re.compile("|".join(re.escape(k) for k in sorted(KEYWORD_WEIGHTS, key=len, reverse=True)))
+
+
+@lru_cache(maxsize=20000)
+def informativeness(text: str) -> float:
+    """
+    수강평이 난이도/성적 판단에 얼마나 도움이 되는지 점수를 계산합니다.
+
+    키워드별 등장 횟수(최대 2회)에 가중치를 곱해 합산하고,
+    긴 수강평이 점수를 독식하지 않도록 길이의 로그로 나눕니다.
+
+    Args:
+        text: 수강평 원문
+
+    Returns:
+        정보량 점수 (키워드가 없으면 0)
+    """
+    lowered = (text or "").lower()
+    counts: Dict[str, int] = {}
+    for keyword in _KEYWORD_RE.findall(lowered):
+        counts[keyword] = counts.get(keyword, 0) + 1
+    score = sum(KEYWORD_WEIGHTS[keyword] * min(count, 2) for keyword, count in counts.items())
+    if score == 0:
+        return 0.0
+    return score / math.log(len(lowered) + math.e)
+
+
+@lru_cache(maxsize=20000)
+def _review_tokens(text: str) -> int:
+    """프롬프트의 "- 내용" 한 줄에 해당하는 추정 토큰 수 (줄바꿈 포함)."""
+    return estimate_tokens(f"- {text}") + 1
+
+
+def compress_reviews(reviews: Sequence[Tuple[int, str]], token_budget: int,
+                     top_k: int = DEFAULT_TOP_K,
+                     threshold: float = DEDUP_THRESHOLD,
+                     weights: Optional[Sequence[float]] = None) -> Tuple[List[Tuple[int, str]], dict]:
+    """
+    유사 중복을 제거하고 정보량이 높은 수강평을 토큰 예산 안에서 선택합니다.
+
+    유사 수강평 클러스터마다 정보량 점수가 가장 높은 하나만 남긴 뒤,
+    점수가 높은 순서로 예산과 개수 제한 안에 들어오는 수강평을 선택합니다.
+    키워드가 하나도 없는 수강평은 예산이 남는 경우에만 뒤이어 채워집니다.
+    weights(예: review_recency의 시간 감쇠 가중치)가 주어지면 정보량 점수에 곱하고,
+    점수가 같으면 가중치가 큰 수강평을 먼저 선택합니다.
+
+    Args:
+        reviews: id 순으로 정렬된 (id, content) 수강평 목록
+        token_budget: 선택된 수강평의 추정 토큰 합 상한
+        top_k: 선택할 최대 수강평 수
+        weights: reviews 순서의 수강평별 가중치 (선택)
+        threshold: 중복으로 간주할 Jaccard 추정치 하한
+
+    Returns:
+        (선택된 (id, content) 목록 (원래 순서 유지), 통계 딕셔너리)
+    """
+    start = time.perf_counter()
+    texts = [content or "" for _, content in reviews]
+    clusters = near_duplicate_clusters(texts, threshold)
+    weights = list(weights) if weights is not None else [1.0] * len(texts)
+    scores = [informativeness(t) * w for t, w in zip(texts, weights)]
+    tokens = [_review_tokens(t) for t in texts]
+
+    # 클러스터별 대표: 점수가 가장 높은(같으면 먼저 나온) 수강평
+    representatives: Dict[int, int] = {}
+    for idx, root in enumerate(clusters):
+        best = representatives.get(root)
+        if best is None or scores[idx] > scores[best]:
+            representatives[root] = idx
+
+    order = sorted(representatives.values(), key=lambda i: (-scores[i], -weights[i], i))
+
+    selected = []
+    used_tokens = 0
+    for idx in order:
+        if len(selected) >= top_k:
+            break
+        if used_tokens + tokens[idx] > token_budget:
+            continue
+        selected.append(idx)
+        used_tokens += tokens[idx]
+
+    selected.sort()
+    stats = {
+            "input_reviews"   : len(reviews),
+            "duplicates"      : len(reviews) - len(representatives),
+            "selected_reviews": len(selected),
+            "input_tokens"    : sum(tokens),
+            "output_tokens"   : used_tokens,
+            "elapsed_ms"      : round((time.perf_counter() - start) * 1000, 2),
+    }
+    return [reviews[i] for i in selected], stats
+
+
+# =============================================================================
+# 압축률 확인용 실행
+# =============================================================================
+
+if __name__ == "__main__":
+    import csv
+    import os
+    import sys
+
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "crawling", "klue_reviews_multi.csv")
+    budget = int(sys.argv[2]) if len(sys.argv) > 2 else 6000
+
+    by_course: Dict[str, List[Tuple[int, str]]] = {}
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        for i, row in enumerate(csv.DictReader(f, skipinitialspace=True)):
+            if row.get("review", "").strip():
+                by_course.setdefault(row.get("course_code") or "ALL", []).append((i, row["review"].strip()))
+
+    print(f"{'course':<10} {'reviews':>8} {'dups':>5} {'kept':>5} {'tokens':>8} {'→':>1} {'kept_tok':>8} "
+          f"{'cold_ms':>8} {'warm_ms':>8}")
+    for course_code, course_reviews in by_course.items():
+        for cached in (minhash_signature, informativeness, _review_tokens):
+            cached.cache_clear()
+        _, cold = compress_reviews(course_reviews, budget)
+        _, warm = compress_reviews(course_reviews, budget)
+        print(f"{course_code:<10} {cold['input_reviews']:>8} {cold['duplicates']:>5} {cold['selected_reviews']:>5} "
+              f"{cold['input_tokens']:>8} {'→':>1} {cold['output_tokens']:>8} "
+              f"{cold['elapsed_ms']:>8.1f} {warm['elapsed_ms']:>8.1f}")
@@ -0,0 +1,395 @@
+"""
+과목별 수강평 요약(digest) 생성 모듈.
+
+수강평 전체를 매 조언 요청마다 프롬프트에 붙이면 수강평이 늘어날수록 토큰, 비용, 지연이 함께 커집니다.
+이 모듈은 과목별 수강평을 한 번만 map-reduce 방식으로 요약해 두고,
+AI 조언 엔드포인트가 원본 수강평 대신 요약본을 프롬프트에 사용할 수 있도록 합니다.
+
+동작 방식:
+    1. 과목의 최근 학기 수강평(REVIEW_RECENT_SEMESTERS)을 학기별로 묶고, 학기 안에서 id 순으로 CHUNK_SIZE개씩 청크로 나눔
+    2. map: 각 청크를 학습 전략에 필요한 사실 위주로 요약 (같은 해시의 청크 요약이 저장되어 있으면 재사용)
+    3. reduce: 청크 요약들을 하나의 과목 요약으로 통합
+    4. 수강평 집합 해시, 마지막 수강평 id, 토큰 수와 함께 course_review_digests 테이블에 저장
+
+증분 갱신:
+    - 청크 경계가 학기마다 새로 시작하므로, 새 학기가 추가되어 가장 오래된 학기가 최근 학기 창에서 빠져도
+      남은 학기의 청크는 그대로이고 새 학기의 청크만 요약합니다 (청크 요약은 위치가 아니라 해시로 찾아 재사용).
+    - 기존 학기에 수강평이 추가되면 그 학기의 마지막 청크와 새 청크만 다시 요약합니다.
+    - 학기 정보가 없는 과목은 전체가 하나의 묶음이라 id 순 고정 크기 청크가 되며, 추가된 수강평에 대해서만 증분 갱신됩니다.
+    - 수강평 집합 해시가 저장된 값과 같으면 아무 작업도 하지 않습니다.
+
+테이블 구조:
+    - course_review_digests: 과목별 요약 (course_id, review_hash, last_review_id, review_count,
+      digest, raw_tokens, digest_tokens, updated_at)
+    - course_review_digest_chunks: 청크별 요약 (course_id, chunk_index, chunk_hash, summary)
+
+사용법:
+    python review_digest.py                  # 모든 과목의 요약 생성/갱신
+    python review_digest.py --course-id 1    # 특정 과목만 갱신
+    python review_digest.py --force          # 해시와 무관하게 모든 청크 재요약
+
+환경 변수:
+    OPENAI_API_KEY: OpenAI API 키 (필수)
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from advice_prompts import ADVICE_MODEL, estimate_tokens
+from metrics import OPENAI_REQUEST_SECONDS, observe_openai_usage
+from tracing import start_span
+from review_recency import ReviewRow, ensure_columns, filter_recent, term_key
+
+# =============================================================================
+# 경로 및 상수 설정
+# =============================================================================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_NAME = os.path.join(BASE_DIR, "hackathon.db")
+
+CHUNK_SIZE = 40  # map 단계에서 한 번에 요약할 수강평 수
+
+CREATE_TABLES_SQL = [
+        '''
+        CREATE TABLE IF NOT EXISTS course_review_digests
+        (
+            course_id      INTEGER PRIMARY KEY,
+            review_hash    TEXT    NOT NULL,
+            last_review_id INTEGER NOT NULL,
+            review_count   INTEGER NOT NULL,
+            digest         TEXT    NOT NULL,
+            raw_tokens     INTEGER,
+            digest_tokens  INTEGER,
+            updated_at     TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS course_review_digest_chunks
+        (
+            course_id   INTEGER NOT NULL,
+            chunk_index INTEGER NOT NULL,
+            chunk_hash  TEXT    NOT NULL,
+            summary     TEXT    NOT NULL,
+            PRIMARY KEY (course_id, chunk_index)
+        )
+        ''',
+]
+
+# 같은 과목의 요약이 동시에 두 번 생성되지 않도록 진행 중인 과목을 기록
+_building = set()
+_building_lock = threading.Lock()
+
+
+# =============================================================================
+# 해시 및 청크 유틸리티
+# =============================================================================
+
+def review_set_hash(reviews: Iterable[Tuple[int, str]]) -> str:
+    """
+    (id, content) 수강평 목록의 해시를 계산합니다.
+
+    Args:
+        reviews: id 순으로 정렬된 (id, content) 튜플 목록
+
+    Returns:
+        SHA-256 16진수 문자열
+    """
+    digest = hashlib.sha256()
+    for review_id, content in reviews:
+        digest.update(f"{review_id}\x1f{content or ''}\x1e".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def chunk_reviews(rows: List[ReviewRow], chunk_size: int = CHUNK_SIZE) -> List[List[Tuple[int, str]]]:
+    """
+    id 순으로 정렬된 수강평을 학기별로 묶은 뒤 학기 안에서 고정 크기 청크로 나눕니다.
+
+    청크 경계가 다른 학기의 수강평 수와 무관하므로 최근 학기 창이 움직여도 남은 학기의 청크는 바뀌지 않습니다.
+
+    Args:
+        rows: id 순으로 정렬된 (id, content, year, semester) 목록
+
+    Returns:
+        오래된 학기부터 (학기 정보가 없는 수강평이 먼저) (id, content) 청크 목록
+    """
+    terms = {}
+    for review_id, content, year, semester in rows:
+        terms.setdefault(term_key(year, semester), []).append((review_id, content))
+    chunks = []
+    for key in sorted(terms, key=lambda k: -1 if k is None else k):
+        reviews = terms[key]
+        chunks.extend(reviews[i:i + chunk_size] for i in range(0, len(reviews), chunk_size))
+    return chunks
+
+
+def format_reviews(reviews: Iterable[Tuple[int, str]]) -> str:
+    """수강평을 조언 프롬프트와 같은 "- 내용" 형식 문자열로 연결합니다."""
+    return "\n".join([f"- {content}" for _, content in reviews])
+
+
+# =============================================================================
+# map / reduce 프롬프트
+# =============================================================================
+
+def _summarize(client, prompt: str) -> str:
+    """요약 프롬프트를 호출하고 텍스트 결과를 반환합니다 (호출 시간과 토큰 사용량은 /metrics와 요청 트레이스에 기록)."""
+    outcome = "error"
+    start = time.perf_counter()
+    llm_span = start_span("openai.digest", model=ADVICE_MODEL)
+    try:
+        response = client.responses.create(
+                model=ADVICE_MODEL,
+                input=prompt,
+                text={"verbosity": "low"},
+                reasoning={"effort": "minimal"},
+        )
+        outcome = "ok"
+    finally:
+        OPENAI_REQUEST_SECONDS.observe(time.perf_counter() - start, call="digest", outcome=outcome)
+        llm_span.set(outcome=outcome)
+        llm_span.end()
+    observe_openai_usage("digest", response)
+    return response.output_text.strip()
+
+
+def map_chunk(client, reviews: List[Tuple[int, str]]) -> str:
+    """
+    수강평 청크 하나를 학습 전략에 필요한 사실 위주로 요약합니다.
+
+    Args:
+        client: OpenAI 클라이언트
+        reviews: (id, content) 수강평 청크
+
+    Returns:
+        청크 요약 문자열
+    """
+    return _summarize(client, f"""
+    아래는 한 과목에 대한 이전 수강자들의 강의평 일부입니다.
+    학습 전략 조언에 필요한 사실만 뽑아 "- " 로 시작하는 짧은 항목으로 요약해주세요.
+    반드시 포함할 내용:
+    - 과제의 난이도, 분량, 성적 비중, 하지 않아도 되는 과제가 있는지
+    - 시험의 난이도, 유형(객관식/서술형/암기/응용), 성적 비중
+    - 채점의 관대함, 출석/팀 프로젝트 등 성적에 영향을 주는 요소
+    여러 강의평에서 반복되는 의견은 끝에 (다수)라고 표시해주세요.
+    난이도나 성적과 관련 없는 감상, 교수님 인상 등은 제외해주세요.
+    최대 15개 항목까지만 작성해주세요.
+
+    강의평:
+    {format_reviews(reviews)}
+    """)
+
+
+def reduce_summaries(client, summaries: List[str]) -> str:
+    """
+    청크 요약들을 하나의 과목 요약으로 통합합니다.
+
+    Args:
+        client: OpenAI 클라이언트
+        summaries: 청크 요약 리스트
+
+    Returns:
+        과목 요약 문자열
+    """
+    if len(summaries) == 1:
+        return summaries[0]
+
+    joined = "\n\n".join([f"[요약 {i + 1}]\n{summary}" for i, summary in enumerate(summaries)])
+    return _summarize(client, f"""
+    아래는 한 과목의 강의평을 나누어 요약한 결과들입니다.
+    이를 하나의 요약으로 통합해 "- " 로 시작하는 짧은 항목으로 작성해주세요.
+    - 중복되는 내용은 합치고, 여러 요약에서 반복되는 의견은 끝에 (다수)라고 표시해주세요.
+    - 과제 난이도/분량/비중, 시험 난이도/유형/비중, 채점 관대함 순서로 정리해주세요.
+    - 서로 상반된 의견이 있으면 양쪽을 모두 짧게 남겨주세요.
+    - 최대 20개 항목까지만 작성해주세요.
+
+    {joined}
+    """)
+
+
+# =============================================================================
+# 요약 생성
+# =============================================================================
+
+def ensure_tables(conn: sqlite3.Connection) -> None:
+    """요약 테이블이 없으면 생성합니다 (수강평 학기 컬럼이 없는 기존 DB는 컬럼도 추가)."""
+    ensure_columns(conn)
+    for sql in CREATE_TABLES_SQL:
+        conn.execute(sql)
+    conn.commit()
+
+
+def fetch_reviews(conn: sqlite3.Connection, course_id: int) -> List[ReviewRow]:
+    """과목의 최근 학기 수강평(review_recency.filter_recent)을 id 순 (id, content, year, semester)로 조회합니다."""
+    rows = conn.execute(
+            "SELECT id, content, year, semester FROM course_reviews WHERE course_id = ? ORDER BY id", (course_id,)
+    ).fetchall()
+    return filter_recent(rows)
+
+
+def build_course_digest(conn: sqlite3.Connection, client, course_id: int, force: bool = False) -> dict:
+    """
+    과목 하나의 수강평 요약을 생성하거나 증분 갱신합니다.
+
+    Args:
+        conn: SQLite 연결
+        client: OpenAI 클라이언트
+        course_id: 과목 ID
+        force: True이면 해시와 무관하게 모든 청크를 다시 요약
+
+    Returns:
+        처리 결과 딕셔너리 (course_id, status, review_count, chunks, chunks_rebuilt, raw_tokens, digest_tokens)
+    """
+    rows = fetch_reviews(conn, course_id)
+    reviews = [(review_id, content) for review_id, content, _, _ in rows]
+    result = {"course_id": course_id, "status": "skipped", "review_count": len(reviews),
+              "chunks": 0, "chunks_rebuilt": 0, "raw_tokens": 0, "digest_tokens": 0}
+
+    if not reviews:
+        conn.execute("DELETE FROM course_review_digests WHERE course_id = ?", (course_id,))
+        conn.execute("DELETE FROM course_review_digest_chunks WHERE course_id = ?", (course_id,))
+        conn.commit()
+        result["status"] = "empty"
+        return result
+
+    review_hash = review_set_hash(reviews)
+    existing = conn.execute(
+            "SELECT review_hash, raw_tokens, digest_tokens FROM course_review_digests WHERE course_id = ?",
+            (course_id,)
+    ).fetchone()
+    if existing and existing[0] == review_hash and not force:
+        result.update(raw_tokens=existing[1], digest_tokens=existing[2])
+        return result
+
+    stored_chunks = {
+            index: (chunk_hash, summary)
+            for index, chunk_hash, summary in conn.execute(
+                    "SELECT chunk_index, chunk_hash, summary FROM course_review_digest_chunks WHERE course_id = ?",
+                    (course_id,)
+            )
+    }
+    # 학기 창이 움직이면 같은 청크의 위치가 바뀌므로 해시로 기존 요약을 찾음
+    summaries_by_hash = {chunk_hash: summary for chunk_hash, summary in stored_chunks.values()}
+
+    # map: 저장된 요약이 없는 청크만 다시 요약
+    chunks = chunk_reviews(rows)
+    summaries = []
+    for index, chunk in enumerate(chunks):
+        chunk_hash = review_set_hash(chunk)
+        if stored_chunks.get(index, (None,))[0] == chunk_hash and not force:
+            summaries.append(stored_chunks[index][1])
+            continue
+
+        if chunk_hash in summaries_by_hash and not force:
+            summary = summaries_by_hash[chunk_hash]
+        else:
+            summary = map_chunk(client, chunk)
+            result["chunks_rebuilt"] += 1
+        conn.execute('''
+                     INSERT OR REPLACE INTO course_review_digest_chunks (course_id, chunk_index, chunk_hash, summary)
+                     VALUES (?, ?, ?, ?)
+                     ''', (course_id, index, chunk_hash, summary))
+        conn.commit()  # 다음 청크 요약(OpenAI 호출) 동안 쓰기 잠금을 잡고 있지 않도록 청크마다 커밋
+        summaries.append(summary)
+
+    conn.execute("DELETE FROM course_review_digest_chunks WHERE course_id = ? AND chunk_index >= ?",
+                 (course_id, len(chunks)))
+    conn.commit()
+
+    # reduce: 청크 요약을 과목 요약으로 통합
+    digest = reduce_summaries(client, summaries)
+    raw_tokens = estimate_tokens(format_reviews(reviews))
+    digest_tokens = estimate_tokens(digest)
+
+    conn.execute('''
+                 INSERT OR REPLACE INTO course_review_digests
+                 (course_id, review_hash, last_review_id, review_count, digest, raw_tokens, digest_tokens, updated_at)
+                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                 ''', (course_id, review_hash, reviews[-1][0], len(reviews), digest, raw_tokens, digest_tokens,
+                       datetime.now().isoformat(timespec="seconds")))
+    conn.commit()
+
+    result.update(status="built", chunks=len(chunks), raw_tokens=raw_tokens, digest_tokens=digest_tokens)
+    return result
+
+
+def rebuild_course_digest(db_path: str, client, course_id: int) -> Optional[dict]:
+    """
+    백그라운드 작업용 진입점. 별도 SQLite 연결로 과목 요약을 갱신합니다.
+
+    같은 과목에 대한 갱신이 이미 진행 중이면 아무 작업도 하지 않고 None을 반환합니다.
+
+    Args:
+        db_path: SQLite 데이터베이스 파일 경로
+        client: OpenAI 클라이언트
+        course_id: 과목 ID
+
+    Returns:
+        build_course_digest 결과 (이미 진행 중이거나 실패하면 None)
+    """
+    with _building_lock:
+        if course_id in _building:
+            return None
+        _building.add(course_id)
+
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        ensure_tables(conn)
+        return build_course_digest(conn, client, course_id)
+    except Exception as e:
+        print(f"⚠ Review digest rebuild failed (course_id={course_id}): {e}")
+        return None
+    finally:
+        conn.close()
+        with _building_lock:
+            _building.discard(course_id)
+
+
+# =============================================================================
+# 메인 함수
+# =============================================================================
+
+def main() -> None:
+    """모든 과목(또는 지정 과목)의 수강평 요약을 생성하고 토큰 절감 결과를 출력합니다."""
+    parser = argparse.ArgumentParser(description="과목별 수강평 요약(digest) 생성")
+    parser.add_argument("--course-id", type=int, help="요약할 과목 ID (생략 시 전체 과목)")
+    parser.add_argument("--force", action="store_true", help="해시와 무관하게 모든 청크 재요약")
+    parser.add_argument("--db", default=DB_NAME, help="SQLite 데이터베이스 경로")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    from openai import OpenAI
+
+    load_dotenv(dotenv_path=os.path.join(BASE_DIR, ".env"))
+    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+    conn = sqlite3.connect(args.db)
+    ensure_tables(conn)
+
+    if args.course_id is not None:
+        course_ids = [args.course_id]
+    else:
+        course_ids = [row[0] for row in conn.execute("SELECT DISTINCT course_id FROM course_reviews ORDER BY 1")]
+
+    print(f"📝 수강평 요약 생성 시작... (대상 과목 {len(course_ids)}개)")
+    print(f"\n{'course':>6} {'status':>8} {'reviews':>8} {'chunks':>7} {'rebuilt':>8} "
+          f"{'raw_tok':>9} {'digest_tok':>10} {'saved':>7}")
+
+    try:
+        for course_id in course_ids:
+            r = build_course_digest(conn, client, course_id, force=args.force)
+            saved = 1 - r["digest_tokens"] / r["raw_tokens"] if r["raw_tokens"] else 0.0
+            print(f"{course_id:>6} {r['status']:>8} {r['review_count']:>8} {r['chunks']:>7} "
+                  f"{r['chunks_rebuilt']:>8} {r['raw_tokens']:>9} {r['digest_tokens']:>10} {saved * 100:>6.1f}%")
+    finally:
+        conn.close()
+
+    print("\n✅ 수강평 요약 생성 완료!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+수강평 최신성(학기) 기반 선택 모듈.
+
+크롤링된 수강평에는 작성 학기(year, semester)가 있으므로, 오래된 수강평이 최근 수강평과 같은 비중으로
+프롬프트에 들어가지 않도록 과목별로 최근 학기 수강평만 남기고 남은 수강평에도 시간 감쇠 가중치를 줍니다.
+프롬프트가 작아지고 최신 정보 위주가 되어 조언 호출이 빨라지고 비용이 줄어듭니다.
+
+선택 정책:
+    - 최근 학기 창: 과목별로 수강평이 있는 학기 중 최근 REVIEW_RECENT_SEMESTERS개 학기의 수강평만 사용
+      (0이면 전체 사용). 강의가 몇 년간 개설되지 않았어도 마지막 개설 학기들이 남습니다.
+    - 시간 감쇠: 과목의 가장 최근 학기로부터 REVIEW_HALF_LIFE_SEMESTERS학기가 지날 때마다 가중치가 절반
+      (0이면 감쇠 없음). review_compression.compress_reviews의 정보량 점수에 곱해져 토큰 예산 안의 선택 순서를 정합니다.
+    - 학기 정보가 없는 수강평(year가 NULL)은 과목에 학기 정보가 있는 수강평이 하나도 없을 때만 사용합니다.
+
+사용법:
+    from review_recency import filter_recent, recency_weights
+    rows = filter_recent([(id, content, year, semester), ...])
+    weights = recency_weights(rows)
+
+    # 기존 DB의 course_reviews에 CSV의 year/semester를 채우기 (학수번호 + 내용 기준 매칭)
+    python review_recency.py --backfill [csv_path]
+
+    # 과목별 정책 적용 전후 수강평 수/토큰 수 확인
+    python review_recency.py
+
+환경 변수:
+    REVIEW_RECENT_SEMESTERS: 과목별로 사용할 최근 학기 수, 기본값 4 (0이면 전체)
+    REVIEW_HALF_LIFE_SEMESTERS: 가중치 반감기(학기), 기본값 4 (0이면 감쇠 없음)
+"""
+
+import argparse
+import csv
+import os
+import sqlite3
+from typing import List, Optional, Sequence, Tuple
+
+from advice_prompts import estimate_tokens
+
+# =============================================================================
+# 상수 설정
+# =============================================================================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_NAME = os.path.join(BASE_DIR, "hackathon.db")
+CSV_FILE = os.path.join(BASE_DIR, "crawling", "klue_reviews_multi.csv")
+
+REVIEW_RECENT_SEMESTERS = int(os.getenv("REVIEW_RECENT_SEMESTERS", "4"))
+REVIEW_HALF_LIFE_SEMESTERS = float(os.getenv("REVIEW_HALF_LIFE_SEMESTERS", "4"))
+
+# 기존 DB에 추가할 컬럼과 과목별 학기 조회 인덱스
+TERM_COLUMNS = [("year", "INTEGER"), ("semester", "INTEGER")]
+CREATE_INDEX_SQL = ("CREATE INDEX IF NOT EXISTS idx_course_reviews_course_term "
+                    "ON course_reviews (course_id, year, semester)")
+
+ReviewRow = Tuple[int, str, Optional[int], Optional[int]]  # (id, content, year, semester)
+
+
+# =============================================================================
+# 스키마
+# =============================================================================
+
+def add_columns(conn: sqlite3.Connection) -> None:
+    """course_reviews에 year/semester 컬럼과 인덱스가 없으면 추가합니다 (커밋하지 않음, migrations.py용)."""
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(course_reviews)")}
+    if not existing:
+        return
+    for name, sql_type in TERM_COLUMNS:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE course_reviews ADD COLUMN {name} {sql_type}")
+    conn.execute(CREATE_INDEX_SQL)
+
+
+def ensure_columns(conn: sqlite3.Connection) -> None:
+    """course_reviews에 year/semester 컬럼과 인덱스가 없으면 추가하고 커밋합니다 (init_db.py 이전에 만든 DB 호환)."""
+    add_columns(conn)
+    conn.commit()
+
+
+def parse_term(year, semester) -> Tuple[Optional[int], Optional[int]]:
+    """CSV/요청의 year, semester 값을 정수로 변환합니다 (비어 있거나 숫자가 아니면 None)."""
+    try:
+        year = int(str(year).strip())
+    except (TypeError, ValueError):
+        return None, None
+    try:
+        semester = int(str(semester).strip())
+    except (TypeError, ValueError):
+        semester = None
+    return year, semester
+
+
+# =============================================================================
+# 선택 정책
+# =============================================================================
+
+def term_key(year: Optional[int], semester: Optional[int]) -> Optional[int]:
+    """학기 순서 값 (1학기 = 0, 2학기 이후 = 1). year가 없으면 None."""
+    if year is None:
+        return None
+    return year * 2 + (1 if (semester or 1) >= 2 else 0)
+
+
+def filter_recent(rows: Sequence[ReviewRow], recent_semesters: int = REVIEW_RECENT_SEMESTERS) -> List[ReviewRow]:
+    """
+    수강평이 있는 학기 중 최근 recent_semesters개 학기의 수강평만 남깁니다.
+
+    Args:
+        rows: id 순으로 정렬된 (id, content, year, semester) 목록
+        recent_semesters: 남길 학기 수 (0 이하이면 학기 정보가 있는 수강평 전체)
+
+    Returns:
+        선택된 행 목록 (원래 순서 유지). 학기 정보가 있는 행이 없으면 rows 전체
+    """
+    terms = sorted({term_key(row[2], row[3]) for row in rows} - {None}, reverse=True)
+    if not terms:
+        return list(rows)
+    cutoff = terms[min(len(terms), recent_semesters) - 1] if recent_semesters > 0 else terms[-1]
+    return [row for row in rows if (term_key(row[2], row[3]) or -1) >= cutoff]
+
+
+def recency_weights(rows: Sequence[ReviewRow],
+                    half_life: float = REVIEW_HALF_LIFE_SEMESTERS) -> Optional[List[float]]:
+    """
+    과목의 가장 최근 학기 기준 시간 감쇠 가중치 0.5 ** (경과 학기 / half_life)를 계산합니다.
+
+    Returns:
+        rows 순서의 가중치 목록 (감쇠가 꺼져 있거나 학기 정보가 없으면 None). 학기 정보가 없는 행은 가장 오래된 학기로 취급
+    """
+    keys = [term_key(row[2], row[3]) for row in rows]
+    known = [key for key in keys if key is not None]
+    if half_life <= 0 or not known:
+        return None
+    newest, oldest = max(known), min(known)
+    return [0.5 ** ((newest - (oldest if key is None else key)) / half_life) for key in keys]
+
+
+# =============================================================================
+# 기존 DB 학기 정보 채우기 / 확인용 실행
+# =============================================================================
+
+def backfill_terms(conn: sqlite3.Connection, csv_path: str = CSV_FILE) -> int:
+    """
+    year가 비어 있는 수강평에 CSV의 year/semester를 채웁니다 (학수번호 + 내용이 같은 행 기준).
+
+    Returns:
+        갱신된 수강평 수
+    """
+    ensure_columns(conn)
+    terms = {}
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f, skipinitialspace=True):
+            year, semester = parse_term(row.get("year"), row.get("semester"))
+            content = (row.get("review") or "").strip()
+            if year is not None and content:
+                terms.setdefault(((row.get("course_code") or "").strip(), content), (year, semester))
+
+    rows = conn.execute("""
+                        SELECT r.id, c.course_code, r.content
+                          FROM course_reviews r
+                          JOIN courses c ON c.id = r.course_id
+                         WHERE r.year IS NULL
+                        """).fetchall()
+    updates = [(*terms[(code, content)], review_id) for review_id, code, content in rows if (code, content) in terms]
+    conn.executemany("UPDATE course_reviews SET year = ?, semester = ? WHERE id = ?", updates)
+    conn.commit()
+    return len(updates)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="수강평 학기 정보 채우기 및 최신성 정책 적용 결과 확인")
+    parser.add_argument("--backfill", nargs="?", const=CSV_FILE, metavar="CSV", help="CSV의 year/semester로 기존 수강평 갱신")
+    parser.add_argument("--db", default=DB_NAME, help="SQLite DB 경로")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        if args.backfill:
+            print(f"✅ 학기 정보 {backfill_terms(conn, args.backfill)}개 수강평 갱신")
+
+        ensure_columns(conn)
+        print(f"정책: 최근 {REVIEW_RECENT_SEMESTERS}개 학기, 반감기 {REVIEW_HALF_LIFE_SEMESTERS}학기")
+        print(f"{'course':>6} {'reviews':>8} {'tokens':>8} {'→':>1} {'kept':>6} {'kept_tok':>8} {'min_w':>6}")
+        for (course_id,) in conn.execute("SELECT DISTINCT course_id FROM course_reviews ORDER BY 1").fetchall():
+            rows = conn.execute("SELECT id, content, year, semester FROM course_reviews WHERE course_id = ? ORDER BY id",
+                                (course_id,)).fetchall()
+            kept = filter_recent(rows)
+            weights = recency_weights(kept)
+            tokens = sum(estimate_tokens(row[1] or "") for row in rows)
+            kept_tokens = sum(estimate_tokens(row[1] or "") for row in kept)
+            print(f"{course_id:>6} {len(rows):>8} {tokens:>8} {'→':>1} {len(kept):>6} {kept_tokens:>8} "
+                  f"{min(weights) if weights else 1.0:>6.2f}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+수강평 전문 검색(FTS5) 모듈.
+
+course_reviews 본문을 SQLite FTS5 가상 테이블로 색인하여 내용으로 수강평을 검색하고,
+AI 조언 프롬프트에 넣을 수강평 후보를 학생 선호도/성적 관련 검색어로 좁힐 수 있도록 합니다.
+
+색인 구조:
+    - course_reviews_fts: course_reviews를 외부 콘텐츠(content='course_reviews')로 쓰는 FTS5 테이블.
+      한국어는 조사가 붙어 단어 단위 토크나이저로는 "과제가"와 "과제"가 맞지 않으므로 trigram 토크나이저 사용
+    - INSERT/UPDATE/DELETE 트리거로 course_reviews와 항상 동기화 (import_csv.py, POST /course-reviews 포함)
+    - 테이블을 처음 만들 때 기존 수강평 전체를 한 번 색인(rebuild)
+
+검색 규칙:
+    - 검색어를 공백/문장부호로 나누고 끝의 흔한 조사를 제거한 단어를 사용
+    - 3글자 이상 단어는 FTS5 MATCH로 찾고 bm25 점수로 정렬
+    - trigram은 3글자 미만 부분 문자열을 색인하지 않으므로 2글자 단어(예: "과제", "시험")는 부분 문자열(instr)로 비교
+      (과목 필터가 있으면 (course_id, ...) 인덱스로 범위를 줄인 뒤 비교)
+    - match_all=True이면 모든 단어, False이면 하나 이상의 단어를 포함하는 수강평
+    - 점수 = -bm25 + 부분 문자열로 찾은 단어 수 (클수록 관련성 높음), 같으면 최신 수강평(id 큰 순) 우선
+
+사용법:
+    from review_search import ensure_index, search_reviews
+    ensure_index(conn)
+    total, rows = search_reviews(conn, "팀플 과제 많음", course_id=2, limit=20)
+
+    # 검색어 확인
+    python review_search.py "시험 족보" --course-id 2
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import time
+from typing import List, Optional, Tuple
+
+# =============================================================================
+# 상수 설정
+# =============================================================================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_NAME = os.path.join(BASE_DIR, "hackathon.db")
+
+FTS_TABLE = "course_reviews_fts"
+MAX_QUERY_TERMS = 12
+_TERM_SPLIT_RE = re.compile(r"[^0-9A-Za-z가-힣+]+")
+# 끝에서 제거할 조사/어미 (긴 것부터 비교)
+_SUFFIXES = sorted(["은", "는", "이", "가", "을", "를", "에", "의", "도", "로", "으로", "와", "과", "에서", "에게",
+                    "이랑", "랑", "하고", "요", "이요", "입니다", "해요", "합니다"], key=len, reverse=True)
+
+CREATE_INDEX_SQL = [
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE}
+        USING fts5(content, content='course_reviews', content_rowid='id', tokenize='trigram')
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS course_reviews_fts_ai AFTER INSERT ON course_reviews BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, content) VALUES (new.id, new.content);
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS course_reviews_fts_ad AFTER DELETE ON course_reviews BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content) VALUES ('delete', old.id, old.content);
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS course_reviews_fts_au AFTER UPDATE OF content ON course_reviews BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content) VALUES ('delete', old.id, old.content);
+            INSERT INTO {FTS_TABLE}(rowid, content) VALUES (new.id, new.content);
+        END
+        """,
+]
+
+SearchRow = Tuple[int, int, str, Optional[int], Optional[int], float]  # (id, course_id, content, year, semester, score)
+
+
+# =============================================================================
+# 색인 생성
+# =============================================================================
+
+def create_index(conn: sqlite3.Connection) -> bool:
+    """
+    FTS5 테이블과 동기화 트리거가 없으면 생성하고, 새로 만든 경우 기존 수강평을 색인합니다 (커밋하지 않음, migrations.py용).
+
+    Returns:
+        색인을 새로 만들었으면 True
+    """
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)).fetchone()
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'course_reviews'").fetchone():
+        return False
+    for sql in CREATE_INDEX_SQL:
+        conn.execute(sql)
+    if not exists:
+        conn.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return not exists
+
+
+def ensure_index(conn: sqlite3.Connection) -> bool:
+    """
+    create_index 후 커밋합니다.
+
+    Returns:
+        색인을 새로 만들었으면 True
+    """
+    created = create_index(conn)
+    conn.commit()
+    return created
+
+
+# =============================================================================
+# 검색
+# =============================================================================
+
+def query_terms(text: str, limit: int = MAX_QUERY_TERMS) -> List[str]:
+    """검색어를 단어로 나누고 끝의 조사를 제거합니다 (중복 제거, 최대 limit개, 1글자 단어 제외)."""
+    terms = []
+    for word in _TERM_SPLIT_RE.split((text or "").lower()):
+        for suffix in _SUFFIXES:
+            if len(word) - len(suffix) >= 2 and word.endswith(suffix):
+                word = word[:-len(suffix)]
+                break
+        if len(word) >= 2 and word not in terms:
+            terms.append(word)
+    return terms[:limit]
+
+
+def search_reviews(conn: sqlite3.Connection, query: str, course_id: Optional[int] = None,
+                   limit: int = 20, offset: int = 0, match_all: bool = True) -> Tuple[int, List[SearchRow]]:
+    """
+    수강평을 검색하여 관련성 순으로 반환합니다.
+
+    Args:
+        conn: SQLite 연결 (ensure_index 이후)
+        query: 검색어
+        course_id: 과목 필터 (선택)
+        limit: 페이지 크기
+        offset: 건너뛸 결과 수
+        match_all: True이면 모든 단어, False이면 하나 이상의 단어 포함
+
+    Returns:
+        (전체 결과 수, [(id, course_id, content, year, semester, score), ...])
+    """
+    terms = query_terms(query)
+    if not terms:
+        return 0, []
+    long_terms = [t for t in terms if len(t) >= 3]
+    short_terms = [t for t in terms if len(t) < 3]
+
+    params: list = []
+    joins = ""
+    if long_terms:
+        # 단어를 큰따옴표로 감싸 FTS5 연산자/특수문자로 해석되지 않게 함
+        expression = f" {'AND' if match_all else 'OR'} ".join('"' + t.replace('"', '""') + '"' for t in long_terms)
+        joins = (f"{'JOIN' if match_all or not short_terms else 'LEFT JOIN'} "
+                 f"(SELECT rowid AS id, bm25({FTS_TABLE}) AS rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?) h "
+                 f"ON h.id = r.id")
+        params.append(expression)
+
+    like_exprs = ["(instr(lower(r.content), ?) > 0)" for _ in short_terms]
+    like_params = list(short_terms)
+    score = " + ".join((["-COALESCE(h.rank, 0)"] if long_terms else []) + like_exprs)
+
+    conditions, condition_params = [], []
+    if course_id is not None:
+        conditions.append("r.course_id = ?")
+        condition_params.append(course_id)
+    if short_terms:
+        if match_all:
+            conditions.extend(like_exprs)
+            condition_params.extend(like_params)
+        else:
+            alternatives = (["h.id IS NOT NULL"] if long_terms else []) + like_exprs
+            conditions.append(f"({' OR '.join(alternatives)})")
+            condition_params.extend(like_params)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    total = conn.execute(f"SELECT COUNT(*) FROM course_reviews r {joins} {where}",
+                         params + condition_params).fetchone()[0]
+    rows = conn.execute(f"""
+                        SELECT r.id, r.course_id, r.content, r.year, r.semester, {score} AS score
+                          FROM course_reviews r {joins} {where}
+                         ORDER BY score DESC, r.id DESC
+                         LIMIT ? OFFSET ?
+                        """, like_params + params + condition_params + [limit, offset]).fetchall()
+    return total, rows
+
+
+def relevant_review_ids(conn: sqlite3.Connection, course_id: int, query: str, limit: int) -> List[int]:
+    """과목 수강평 중 query의 단어를 하나 이상 포함하는 수강평 id를 관련성 순으로 최대 limit개 반환합니다."""
+    _, rows = search_reviews(conn, query, course_id=course_id, limit=limit, match_all=False)
+    return [row[0] for row in rows]
+
+
+# =============================================================================
+# 메인 함수 (검색 확인)
+# =============================================================================
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="수강평 전문 검색")
+    parser.add_argument("query", help="검색어")
+    parser.add_argument("--course-id", type=int, default=None, help="과목 ID 필터")
+    parser.add_argument("--limit", type=int, default=10, help="출력할 결과 수")
+    parser.add_argument("--any", action="store_true", help="단어 중 하나만 포함해도 검색")
+    parser.add_argument("--db", default=DB_NAME, help="SQLite DB 경로")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        if ensure_index(conn):
+            print(f"✅ {FTS_TABLE} 색인 생성 완료")
+        start = time.perf_counter()
+        total, rows = search_reviews(conn, args.query, args.course_id, args.limit, match_all=not args.any)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"🔎 단어 {query_terms(args.query)} → {total}개 ({elapsed_ms:.1f}ms)")
+        for review_id, course_id, content, year, semester, score in rows:
+            print(f"[{score:6.2f}] #{review_id} (과목 {course_id}, {year}-{semester}) {content[:80]}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+"""
+느린 쿼리 로그와 쿼리별 통계 모듈.
+
+/metrics의 DB_QUERY_SECONDS는 SQL 종류(SELECT/INSERT...)별 누적 시간만 보여주므로, 어떤 쿼리가 어느 엔드포인트에서
+느려졌는지, 테이블이 커지면서 전체 스캔으로 바뀌었는지, 요청 하나에서 같은 쿼리가 반복되는지(N+1)는 알 수 없습니다.
+metrics.instrument_sqlalchemy()가 잰 모든 쿼리의 실행 시간으로 쿼리 문장별 통계를 모으며 느린 쿼리는 실행 계획과 함께 기록합니다.
+
+구성:
+    - track_query(): metrics.add_query_observer()에 등록하면 쿼리 실행 시간을 문장별 통계에 더하고,
+      SLOW_QUERY_MS 이상이면 파라미터, EXPLAIN QUERY PLAN, 호출한 엔드포인트와 함께 기록
+    - SLOW_QUERY_CONNECT_ARGS: SQLite는 스캔 대부분이 결과를 읽는(fetch) 동안 일어나므로, create_engine에 넘기면
+      TimedCursor가 fetch 시간까지 포함해 커서가 닫힐 때 기록 (넘기지 않으면 execute 시간만 측정)
+    - SlowQueryMiddleware: 요청의 라우트 템플릿을 컨텍스트에 저장하고, 요청이 끝나면 요청 하나에서 같은 문장이
+      실행된 최대 횟수를 통계에 반영 (SLOW_QUERY_N_PLUS_ONE회 이상이면 N+1 의심으로 경고)
+    - statement_stats() / recent_slow_queries() / reset_stats(): 관리자 엔드포인트(GET/DELETE /admin/slow-queries)용
+
+문장 통계:
+    - IN (?, ?, ...) 목록은 길이와 무관하게 같은 문장으로 묶음
+    - 문장을 처음 볼 때 한 번 EXPLAIN QUERY PLAN을 저장하므로 느려지기 전에도 전체 스캔(full_scan)을 확인할 수 있음
+    - 워커 프로세스별 메모리 통계 (응답의 pid로 구분), 문장 종류가 SLOW_QUERY_MAX_STATEMENTS개를 넘으면 "<other>"로 합침
+
+느린 쿼리 로그 (SLOW_QUERY_LOG, 워커별 JSONL 파일, 크기 기준 교체):
+    {"time", "pid", "endpoint", "duration_ms", "statement", "parameters", "plan", "full_scan"}
+
+환경 변수:
+    SLOW_QUERY_MS: 느린 쿼리 기준(ms), 기본값 100 (0이면 측정과 통계 모두 비활성)
+    SLOW_QUERY_LOG: JSONL 파일 경로 ({pid}는 워커 프로세스 ID로 치환), 기본값 cache/slow_queries/slow-{pid}.jsonl
+                    (비우면 파일 기록 없이 통계와 최근 목록만 유지)
+    SLOW_QUERY_N_PLUS_ONE: 요청 하나에서 같은 문장이 이 횟수 이상 실행되면 N+1 의심, 기본값 20
+    SLOW_QUERY_MAX_STATEMENTS: 통계를 따로 모을 문장 종류 수, 기본값 500
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+from typing import Dict, List, Optional
+
+from metrics import route_template
+
+# =============================================================================
+# 상수 설정
+# =============================================================================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", os.path.join(BASE_DIR, "cache", "slow_queries", "slow-{pid}.jsonl"))
+SLOW_QUERY_N_PLUS_ONE = int(os.getenv("SLOW_QUERY_N_PLUS_ONE", "20"))
+SLOW_QUERY_MAX_STATEMENTS = int(os.getenv("SLOW_QUERY_MAX_STATEMENTS", "500"))
+
+SLOW_QUERY_LOG_MAX_BYTES = 20 * 1024 * 1024
+SLOW_QUERY_LOG_BACKUPS = 3
+RECENT_SLOW_QUERIES = 100  # 관리자 엔드포인트로 보여줄 최근 느린 쿼리 수
+MAX_PARAM_CHARS = 100  # 로그에 남길 파라미터 값 길이 (수강평 본문 등)
+OTHER_STATEMENT = "<other>"
+NO_ENDPOINT = "-"  # 요청 밖(서버 시작, 백그라운드 스레드)에서 실행된 쿼리
+
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+_endpoint: ContextVar[str] = ContextVar("slow_query_endpoint", default=NO_ENDPOINT)
+_request_counts: ContextVar[Optional[Dict[str, int]]] = ContextVar("slow_query_request_counts", default=None)
+
+_lock = threading.Lock()
+_stats: Dict[str, dict] = {}
+_normalized: Dict[str, str] = {}
+_recent: deque = deque(maxlen=RECENT_SLOW_QUERIES)
+_since = time.time()
+_log_handler: Optional[RotatingFileHandler] = None
+
+
+# =============================================================================
+# 문장 정규화 / 실행 계획
+# =============================================================================
+
+def normalize_statement(statement: str) -> str:
+    """공백을 합치고 IN (?, ?, ...) 목록을 IN (?...)로 바꿔 같은 쿼리를 하나로 묶습니다."""
+    normalized = _normalized.get(statement)
+    if normalized is None:
+        normalized = _IN_LIST_RE.sub("(?...)", " ".join(statement.split()))
+        if len(_normalized) < SLOW_QUERY_MAX_STATEMENTS * 4:
+            _normalized[statement] = normalized
+    return normalized
+
+
+def explain(dbapi_connection, statement: str, parameters) -> Optional[List[str]]:
+    """
+    SQLite EXPLAIN QUERY PLAN 결과를 "SEARCH t USING INDEX ..." 같은 줄 목록으로 반환합니다.
+
+    Returns:
+        실행 계획 줄 목록 (계획을 볼 수 없는 문장이거나 실패하면 None)
+    """
+    if not statement.lstrip()[:6].upper().startswith(_EXPLAINABLE):
+        return None
+    try:
+        rows = dbapi_connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ()).fetchall()
+    except (sqlite3.Error, AttributeError, TypeError, ValueError):
+        return None
+    return [row[3] for row in rows]
+
+
+def is_full_scan(plan: Optional[List[str]]) -> bool:
+    """실행 계획에 인덱스 없이 테이블 전체를 읽는 단계(SCAN <table>)가 있는지 확인합니다."""
+    return bool(plan) and any(line.startswith("SCAN ") and "INDEX" not in line for line in plan)
+
+
+def _short_params(parameters) -> list:
+    if parameters is None:
+        return []
+    if isinstance(parameters, dict):
+        parameters = list(parameters.values())
+    return [value[:MAX_PARAM_CHARS] + "…" if isinstance(value, str) and len(value) > MAX_PARAM_CHARS else value
+            for value in parameters]
+
+
+# =============================================================================
+# 기록
+# =============================================================================
+
+def _write_log(record: dict) -> None:
+    global _log_handler
+    if not SLOW_QUERY_LOG:
+        return
+    if _log_handler is None:
+        path = SLOW_QUERY_LOG.replace("{pid}", str(os.getpid()))
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        _log_handler = RotatingFileHandler(path, maxBytes=SLOW_QUERY_LOG_MAX_BYTES,
+                                           backupCount=SLOW_QUERY_LOG_BACKUPS, encoding="utf-8")
+        _log_handler.setFormatter(logging.Formatter("%(message)s"))
+    _log_handler.emit(logging.makeLogRecord({"msg": json.dumps(record, ensure_ascii=False, default=str)}))
+
+
+def record_query(dbapi_connection, statement: str, parameters, executemany: bool, seconds: float,
+                 endpoint: str = NO_ENDPOINT, counts: Optional[Dict[str, int]] = None) -> None:
+    """
+    실행된 쿼리 하나를 문장별 통계에 더하고, 느리면 실행 계획과 함께 기록합니다.
+
+    Args:
+        dbapi_connection: 실행 계획 조회에 사용할 sqlite3 연결
+        statement: 실행된 SQL
+        parameters: 바인딩 파라미터 (executemany면 파라미터 목록)
+        executemany: executemany 호출 여부 (실행 계획은 첫 번째 파라미터로 조회)
+        seconds: 실행 시간(초, 결과를 읽은 시간 포함)
+        endpoint: 쿼리를 실행한 요청의 "메서드 라우트"
+        counts: 요청 하나의 문장별 실행 횟수 (SlowQueryMiddleware가 만든 dict)
+    """
+    key = normalize_statement(statement)
+    first_params = (parameters[0] if parameters else None) if executemany else parameters
+    slow = seconds * 1000 >= SLOW_QUERY_MS
+
+    with _lock:
+        entry = _stats.get(key)
+        new_statement = entry is None and len(_stats) < SLOW_QUERY_MAX_STATEMENTS
+        if entry is None:
+            if not new_statement:
+                key = OTHER_STATEMENT
+            entry = _stats.setdefault(key, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0, "slow_count": 0,
+                                            "max_per_request": 0, "endpoints": {}, "plan": None})
+        entry["count"] += 1
+        entry["total_seconds"] += seconds
+        entry["max_seconds"] = max(entry["max_seconds"], seconds)
+        entry["endpoints"][endpoint] = entry["endpoints"].get(endpoint, 0) + 1
+        if slow:
+            entry["slow_count"] += 1
+
+    if counts is not None:
+        counts[key] = counts.get(key, 0) + 1
+
+    if not (new_statement or slow):
+        return
+    # 문장을 처음 볼 때와 느릴 때만 실행 계획 조회 (실행하지 않고 계획만 만드므로 빠름)
+    plan = explain(dbapi_connection, statement, first_params)
+    if key != OTHER_STATEMENT and plan is not None:
+        with _lock:
+            entry["plan"] = plan
+    if not slow:
+        return
+
+    record = {
+            "time"       : time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "pid"        : os.getpid(),
+            "endpoint"   : endpoint,
+            "duration_ms": round(seconds * 1000, 3),
+            "statement"  : key,
+            "parameters" : _short_params(first_params),
+            "plan"       : plan,
+            "full_scan"  : is_full_scan(plan),
+    }
+    with _lock:
+        _recent.append(record)
+    print(f"🐢 Slow query {record['duration_ms']:.1f}ms [{endpoint}] {key[:300]}"
+          + (" (full scan)" if record["full_scan"] else ""))
+    try:
+        _write_log(record)
+    except OSError as e:
+        print(f"⚠ Slow query log write failed: {e}")
+
+
+class TimedCursor(sqlite3.Cursor):
+    """
+    결과를 읽는 시간까지 쿼리 시간에 포함하는 커서.
+
+    SQLite는 execute()에서 첫 행까지만 진행하고 나머지 스캔은 fetch 중에 수행하므로, Engine 이벤트(after_cursor_execute)
+    시간만으로는 전체 스캔 쿼리도 빠르게 보입니다. SQLAlchemy가 결과를 다 읽으면 커서를 닫으므로 그때 기록합니다.
+    """
+
+    pending: Optional[tuple] = None
+    fetch_seconds = 0.0
+
+    def fetchone(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            self.fetch_seconds += time.perf_counter() - started
+
+    def fetchmany(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().fetchmany(*args, **kwargs)
+        finally:
+            self.fetch_seconds += time.perf_counter() - started
+
+    def fetchall(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            self.fetch_seconds += time.perf_counter() - started
+
+    def close(self):
+        pending, self.pending = self.pending, None
+        if pending is not None:
+            dbapi_connection, statement, parameters, executemany, seconds, endpoint, counts = pending
+            try:
+                record_query(dbapi_connection, statement, parameters, executemany, seconds + self.fetch_seconds,
+                             endpoint, counts)
+            except Exception as e:  # 기록 실패가 쿼리 결과 처리에 영향을 주지 않도록
+                print(f"⚠ Slow query record failed: {e}")
+        super().close()
+
+
+class TimedConnection(sqlite3.Connection):
+    """cursor()가 TimedCursor를 반환하는 sqlite3 연결 (create_engine의 connect_args={"factory": ...}로 사용)."""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+
+# create_engine(connect_args={..., **SLOW_QUERY_CONNECT_ARGS}) - 비활성이면 기본 sqlite3 연결 사용
+SLOW_QUERY_CONNECT_ARGS = {"factory": TimedConnection} if SLOW_QUERY_MS > 0 else {}
+
+
+def track_query(cursor, statement: str, parameters, executemany: bool, seconds: float,
+                error: Optional[BaseException] = None) -> None:
+    """
+    metrics.instrument_sqlalchemy()가 측정한 쿼리 하나를 문장별 통계와 느린 쿼리 로그에 기록합니다 (실패한 쿼리는 무시).
+
+    TimedCursor면 결과를 다 읽고 커서가 닫힐 때 fetch 시간을 더해 기록합니다.
+    """
+    if error is not None:
+        return
+    args = (cursor.connection, statement, parameters, executemany, seconds, _endpoint.get(), _request_counts.get())
+    if isinstance(cursor, TimedCursor):
+        cursor.pending = args
+    else:
+        record_query(*args)
+
+
+# =============================================================================
+# 요청 컨텍스트 (N+1 감지)
+# =============================================================================
+
+class SlowQueryMiddleware:
+    """요청의 라우트를 쿼리 기록에 전달하고, 요청 하나에서 같은 문장이 실행된 횟수를 집계하는 ASGI 미들웨어."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        endpoint = f"{scope['method']} {route_template(scope)}"
+        counts: Dict[str, int] = {}
+        endpoint_token = _endpoint.set(endpoint)
+        counts_token = _request_counts.set(counts)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _endpoint.reset(endpoint_token)
+            _request_counts.reset(counts_token)
+            suspects = []
+            with _lock:
+                for key, count in counts.items():
+                    entry = _stats.get(key)
+                    if entry is not None and count > entry["max_per_request"]:
+                        if count >= SLOW_QUERY_N_PLUS_ONE > entry["max_per_request"]:
+                            suspects.append((key, count))
+                        entry["max_per_request"] = count
+            for key, count in suspects:
+                print(f"🐢 Possible N+1: {count}x in one request [{endpoint}] {key[:300]}")
+
+
+# =============================================================================
+# 조회 (관리자 엔드포인트)
+# =============================================================================
+
+SORT_KEYS = {
+        "total"      : lambda s: s["total_ms"],
+        "mean"       : lambda s: s["mean_ms"],
+        "max"        : lambda s: s["max_ms"],
+        "count"      : lambda s: s["count"],
+        "slow"       : lambda s: s["slow_count"],
+        "per_request": lambda s: s["max_per_request"],
+}
+
+
+def statement_stats(sort: str = "total", limit: int = 50) -> List[dict]:
+    """
+    문장별 통계를 정렬해 반환합니다.
+
+    Args:
+        sort: SORT_KEYS 중 하나 (total, mean, max, count, slow, per_request)
+        limit: 최대 개수
+
+    Returns:
+        [{"statement", "count", "total_ms", "mean_ms", "max_ms", "slow_count", "max_per_request",
+          "n_plus_one_suspect", "endpoints", "plan", "full_scan"}, ...]
+    """
+    with _lock:
+        snapshot = [(key, dict(entry, endpoints=dict(entry["endpoints"]))) for key, entry in _stats.items()]
+    rows = [
+            {
+                    "statement"         : key,
+                    "count"             : entry["count"],
+                    "total_ms"          : round(entry["total_seconds"] * 1000, 3),
+                    "mean_ms"           : round(entry["total_seconds"] * 1000 / entry["count"], 3),
+                    "max_ms"            : round(entry["max_seconds"] * 1000, 3),
+                    "slow_count"        : entry["slow_count"],
+                    "max_per_request"   : entry["max_per_request"],
+                    "n_plus_one_suspect": entry["max_per_request"] >= SLOW_QUERY_N_PLUS_ONE,
+                    "endpoints"         : dict(sorted(entry["endpoints"].items(), key=lambda kv: -kv[1])),
+                    "plan"              : entry["plan"],
+                    "full_scan"         : is_full_scan(entry["plan"]),
+            }
+            for key, entry in snapshot
+    ]
+    rows.sort(key=SORT_KEYS[sort], reverse=True)
+    return rows[:limit]
+
+
+def recent_slow_queries(limit: int = RECENT_SLOW_QUERIES) -> List[dict]:
+    """최근 느린 쿼리 기록 (최신순)."""
+    with _lock:
+        return list(reversed(_recent))[:limit]
+
+
+def stats_since() -> float:
+    """통계 수집 시작(또는 마지막 초기화) 시각 (Unix 초)."""
+    return _since
+
+
+def reset_stats() -> None:
+    """문장별 통계와 최근 느린 쿼리 목록을 비웁니다."""
+    global _since
+    with _lock:
+        _stats.clear()
+        _recent.clear()
+        _since = time.time()
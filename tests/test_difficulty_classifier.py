@@ -0,0 +1,68 @@
+"""difficulty_classifier.py 예측 캐시 테스트."""
+
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+import difficulty_classifier
+from advice_prompts import REVIEW_LABEL_FIELDS
+from difficulty_classifier import fit
+
+WORDS = ["과제", "시험", "어려움", "쉬움", "많음", "적음", "교수님", "채점", "널널", "빡셈"]
+
+
+def make_texts(count: int, seed: int) -> list:
+    rng = np.random.default_rng(seed)
+    return [f"{i}-{seed} " + " ".join(rng.choice(WORDS, size=5)) for i in range(count)]
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    texts = make_texts(200, seed=0)
+    labels = np.random.default_rng(0).integers(0, difficulty_classifier.NUM_CLASSES,
+                                               size=(len(texts), len(REVIEW_LABEL_FIELDS)))
+    return fit(texts, labels)
+
+
+def test_cached_predictions_match_fresh_predictions(classifier):
+    texts = make_texts(30, seed=1)
+    classifier.clear_cache()
+    first = classifier.predict_proba_many(texts + texts[:5])
+    second = classifier.predict_proba_many(texts)
+    assert first.shape == (35, len(REVIEW_LABEL_FIELDS), difficulty_classifier.NUM_CLASSES)
+    np.testing.assert_allclose(first[:30], second)
+    np.testing.assert_allclose(first[30:], second[:5])
+    assert classifier.predict_proba_many([]).shape == (0, len(REVIEW_LABEL_FIELDS), difficulty_classifier.NUM_CLASSES)
+
+
+def test_predict_proba_many_is_thread_safe_when_cache_is_cleared(classifier, monkeypatch):
+    # 작은 캐시로 호출마다 다른 스레드의 clear()가 일어나게 함 (이전에는 KeyError)
+    monkeypatch.setattr(difficulty_classifier, "PREDICTION_CACHE_SIZE", 300)
+    batches = [make_texts(200, seed=10 + n) for n in range(8)]
+    classifier.clear_cache()
+    expected = [classifier.predict_proba_many(batch) for batch in batches]
+
+    errors = []
+    start = threading.Barrier(len(batches))
+
+    def worker(batch, want):
+        start.wait()
+        try:
+            for _ in range(30):
+                np.testing.assert_allclose(classifier.predict_proba_many(batch), want, rtol=1e-5)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=pair) for pair in zip(batches, expected)]
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)  # 스레드 전환을 자주 일으켜 캐시 갱신과 조회 사이의 경합을 드러냄
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert errors == []
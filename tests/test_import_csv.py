@@ -0,0 +1,78 @@
+"""import_csv.py 테스트: 청크 단위 파싱과 임포트 결과, 재임포트 시 중복 건너뛰기 확인."""
+
+import csv
+import sqlite3
+
+import pytest
+
+from import_csv import import_data, parse_file
+from init_db import init_db
+
+
+def write_csv(path, rows, fieldnames=("course_code", "review", "year", "semester")):
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    return str(path)
+
+
+@pytest.fixture
+def csv_files(tmp_path):
+    first = write_csv(tmp_path / "a.csv", [{"course_code": "COSE341", "review": f"운영체제 수강평 {i}",
+                                            "year": 2024, "semester": i % 2 + 1} for i in range(23)]
+                      + [{"course_code": "", "review": "학수번호 없음"}, {"course_code": "COSE341", "review": " "}])
+    second = write_csv(tmp_path / "cose111_reviews.csv", [{"review": f"전산수학 수강평 {i}"} for i in range(17)]
+                       + [{"review": "전산수학 수강평 0"}], fieldnames=("review",))
+    return [first, second]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "import.db")
+    init_db(path)
+    return path
+
+
+def test_parse_file_yields_fixed_size_chunks(csv_files):
+    chunks = list(parse_file(csv_files[0], chunk_size=10))
+    assert [len(rows) for rows, _ in chunks] == [10, 10, 3]
+    assert sum(skipped for _, skipped in chunks) == 2
+    assert [len(rows) for rows, _ in parse_file(csv_files[1], chunk_size=10)] == [10, 8]
+    assert {row[0] for rows, _ in parse_file(csv_files[1], chunk_size=10) for row in rows} == {"COSE111"}
+
+
+def test_parse_file_requires_review_column(tmp_path):
+    path = write_csv(tmp_path / "bad.csv", [{"course_code": "COSE341", "text": "리뷰"}],
+                     fieldnames=("course_code", "text"))
+    with pytest.raises(ValueError, match="review"):
+        list(parse_file(path))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_import_is_chunked_and_idempotent(csv_files, db_path, workers):
+    stats = import_data(csv_files, db_path, workers=workers, chunk_size=4)
+    assert (stats["rows"], stats["inserted"], stats["duplicates"], stats["skipped"]) == (43, 40, 1, 2)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        counts = dict(conn.execute("SELECT c.course_code, COUNT(*) FROM course_reviews r "
+                                   "JOIN courses c ON c.id = r.course_id GROUP BY c.course_code"))
+        assert counts == {"COSE341": 23, "COSE111": 17}
+    finally:
+        conn.close()
+
+    again = import_data(csv_files, db_path, workers=workers, chunk_size=4)
+    assert (again["inserted"], again["duplicates"]) == (0, 41)
+
+
+def test_import_fails_and_rolls_back_on_bad_file(csv_files, db_path, tmp_path):
+    bad = write_csv(tmp_path / "bad.csv", [{"course_code": "COSE341", "text": "리뷰"}],
+                    fieldnames=("course_code", "text"))
+    with pytest.raises(ValueError):
+        import_data(csv_files + [bad], db_path, workers=2, chunk_size=4)
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM course_reviews").fetchone()[0] == 0
+    finally:
+        conn.close()
@@ -0,0 +1,102 @@
+"""label_reviews.py 테스트: benchmark/fake_openai.py 대역으로 라벨 저장, 이어서 실행, 동시 요청 수 상한 확인."""
+
+import asyncio
+import sqlite3
+
+import httpx
+import pytest
+from openai import AsyncOpenAI
+
+import label_reviews
+from benchmark import fake_openai
+from init_db import init_db
+
+REVIEW_COUNT = 95  # BATCH_SIZE(10)개씩 10배치 (마지막 배치 5개)
+
+
+class InFlightCounter:
+    """fake_openai 앱을 감싸 동시에 처리 중인 요청 수의 최댓값과 전체 요청 수를 기록하는 ASGI 래퍼."""
+
+    def __init__(self, app):
+        self.app = app
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        self.in_flight += 1
+        self.requests += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(fake_openai, "LATENCY", 0.02)
+    monkeypatch.setattr(fake_openai, "JITTER", 0.0)
+    monkeypatch.setattr(fake_openai, "ERROR_RATE", 0.0)
+    return InFlightCounter(fake_openai.app)
+
+
+@pytest.fixture
+def conn(tmp_path):
+    path = str(tmp_path / "labels.db")
+    init_db(path)
+    conn = sqlite3.connect(path)
+    conn.executemany("INSERT INTO courses (name, course_code, total_students) VALUES (?, ?, 40)",
+                     [("운영체제", "COSE341"), ("전산수학I", "COSE111")])
+    conn.executemany("INSERT INTO course_reviews (course_id, content) VALUES (?, ?)",
+                     [(i % 2 + 1, f"수강평 {i}: 과제가 많고 시험은 보통") for i in range(REVIEW_COUNT)])
+    conn.commit()
+    label_reviews.ensure_table(conn)
+    yield conn
+    conn.close()
+
+
+def label(conn, server, reviews, concurrency):
+    async def run():
+        http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=server), base_url="http://fake")
+        client = AsyncOpenAI(api_key="test", base_url="http://fake/v1", http_client=http_client, max_retries=0)
+        async with http_client:
+            return await label_reviews.run(conn, client, reviews, concurrency)
+
+    return asyncio.run(run())
+
+
+def test_labels_are_written_within_concurrency_bound(conn, server):
+    stats = label(conn, server, label_reviews.pending_reviews(conn), concurrency=3)
+
+    assert (stats["labeled"], stats["failed_batches"]) == (REVIEW_COUNT, 0)
+    assert server.requests == 10
+    assert server.max_in_flight == 3
+    rows = conn.execute("SELECT l.course_id, r.course_id, l.content_hash, r.content, l.exam_difficulty "
+                        "FROM course_review_labels l JOIN course_reviews r ON r.id = l.review_id").fetchall()
+    assert len(rows) == REVIEW_COUNT
+    for label_course, review_course, stored_hash, content, exam_difficulty in rows:
+        assert label_course == review_course
+        assert stored_hash == label_reviews.content_hash(content)
+        assert 1 <= exam_difficulty <= 5
+
+
+def test_second_run_resumes_and_skips_labeled_reviews(conn, server):
+    first = label_reviews.pending_reviews(conn)[:40]
+    label(conn, server, first, concurrency=2)
+    assert server.requests == 4
+
+    # 라벨이 없는 55개와 내용이 바뀐 1개만 다시 요청
+    conn.execute("UPDATE course_reviews SET content = '시험이 매우 어려워요' WHERE id = ?", (first[0][0],))
+    conn.commit()
+    pending = label_reviews.pending_reviews(conn)
+    assert [rid for rid, _, _ in pending] == [first[0][0]] + [rid for rid in range(41, REVIEW_COUNT + 1)]
+
+    stats = label(conn, server, pending, concurrency=2)
+    assert stats["labeled"] == 56
+    assert server.requests == 4 + 6
+    assert server.max_in_flight <= 2
+    assert label_reviews.pending_reviews(conn) == []
+    assert conn.execute("SELECT COUNT(*) FROM course_review_labels").fetchone()[0] == REVIEW_COUNT
@@ -0,0 +1,117 @@
+"""migrations.py 테스트: 새 DB와 이전 스키마 DB가 최신 스키마로 올라가고 주요 쿼리가 인덱스를 쓰는지 확인."""
+
+import sqlite3
+
+import pytest
+
+from init_db import init_db
+from migrations import (HOT_QUERIES, LATEST_VERSION, MANUAL_MIGRATIONS, MIGRATIONS, MigrationError,
+                        applied_versions, check_query_plans, migrate)
+
+# 마이그레이션 도입 전 init_db.py가 만들던 스키마 (year/semester/content_hash 컬럼, 검색 색인, 조회 인덱스 없음)
+LEGACY_SCHEMA_SQL = [
+        "CREATE TABLE student_profile (id INTEGER PRIMARY KEY, preferences TEXT)",
+        "CREATE TABLE courses (id INTEGER PRIMARY KEY, name TEXT NOT NULL, course_code TEXT, total_students INTEGER)",
+        "CREATE TABLE evaluation_items (id INTEGER PRIMARY KEY, course_id INTEGER NOT NULL, name TEXT NOT NULL, "
+        "weight INTEGER NOT NULL, my_score REAL DEFAULT NULL, is_submitted BOOLEAN DEFAULT 0, "
+        "FOREIGN KEY (course_id) REFERENCES courses (id) ON DELETE CASCADE)",
+        "CREATE TABLE other_student_scores (id INTEGER PRIMARY KEY, evaluation_item_id INTEGER NOT NULL, "
+        "score REAL NOT NULL, FOREIGN KEY (evaluation_item_id) REFERENCES evaluation_items (id) ON DELETE CASCADE)",
+        "CREATE INDEX ix_other_student_scores_evaluation_item_id ON other_student_scores (evaluation_item_id)",
+        "CREATE TABLE course_reviews (id INTEGER PRIMARY KEY, course_id INTEGER NOT NULL, content TEXT NOT NULL, "
+        "FOREIGN KEY (course_id) REFERENCES courses (id) ON DELETE CASCADE)",
+]
+
+
+def query_plan(conn: sqlite3.Connection, sql: str, params: tuple) -> str:
+    return " / ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+
+
+def make_legacy_db(path, course_codes) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    for sql in LEGACY_SCHEMA_SQL:
+        conn.execute(sql)
+    conn.executemany("INSERT INTO courses (name, course_code, total_students) VALUES (?, ?, 40)",
+                     [(f"과목 {i}", code) for i, code in enumerate(course_codes)])
+    # ANALYZE 통계가 인덱스를 고르도록 과목/평가 항목 여러 개에 나눠 채움
+    conn.executemany("INSERT INTO courses (name, course_code, total_students) VALUES (?, ?, 40)",
+                     [(f"기타 과목 {i}", f"ETC{i:03d}") for i in range(20)])
+    conn.executemany("INSERT INTO evaluation_items (course_id, name, weight) VALUES (?, ?, 25)",
+                     [(course_id, name) for course_id in range(1, 21) for name in ("중간고사", "기말고사", "과제", "출석")])
+    conn.executemany("INSERT INTO other_student_scores (evaluation_item_id, score) VALUES (?, ?)",
+                     [(item_id, score) for item_id in range(1, 81) for score in range(60, 100, 2)])
+    conn.executemany("INSERT INTO course_reviews (course_id, content) VALUES (?, ?)",
+                     [(course_id, f"수강평 {course_id}-{i}") for course_id in range(2, 21) for i in range(5)])
+    conn.executemany("INSERT INTO course_reviews (course_id, content) VALUES (1, ?)",
+                     [("과제가 많아요",), ("시험이 어려워요",), ("과제가 많아요",)])
+    conn.commit()
+    return conn
+
+
+@pytest.fixture
+def fresh_db(tmp_path):
+    path = str(tmp_path / "fresh.db")
+    init_db(path)
+    conn = sqlite3.connect(path)
+    yield conn
+    conn.close()
+
+
+def test_init_db_applies_every_migration(fresh_db):
+    assert applied_versions(fresh_db) == [version for version, _, _ in MIGRATIONS]
+    assert migrate(fresh_db) == []
+
+
+@pytest.mark.parametrize("name, sql, params, expected", HOT_QUERIES, ids=[query[0] for query in HOT_QUERIES])
+def test_hot_queries_use_index_on_fresh_db(fresh_db, name, sql, params, expected):
+    plan = query_plan(fresh_db, sql, params)
+    assert any(index in plan for index in expected), plan
+
+
+def test_legacy_db_is_migrated_to_latest(tmp_path):
+    conn = make_legacy_db(tmp_path / "legacy.db", ["COSE341", "COSE342"])
+    try:
+        assert migrate(conn) == [version for version, _, _ in MIGRATIONS]
+        assert applied_versions(conn)[-1] == LATEST_VERSION
+        assert check_query_plans(conn) == []
+        # 같은 과목 안의 중복 수강평은 먼저 들어간 행에만 해시를 채움
+        hashed = conn.execute("SELECT COUNT(*) FROM course_reviews WHERE course_id = 1 AND content_hash IS NOT NULL")
+        assert hashed.fetchone()[0] == 2
+    finally:
+        conn.close()
+
+
+def test_startup_migration_skips_manual_step_with_duplicate_codes(tmp_path, capsys):
+    conn = make_legacy_db(tmp_path / "legacy.db", ["COSE341", "COSE341", "COSE342"])
+    try:
+        # 서버 시작 경로: 수동 마이그레이션만 건너뛰고 나머지는 적용
+        applied = migrate(conn, include_manual=False)
+        assert applied == [version for version, _, _ in MIGRATIONS if version not in MANUAL_MIGRATIONS]
+        assert "대기 중" in capsys.readouterr().out
+        assert check_query_plans(conn) == []
+        assert "ix_courses_course_code" in query_plan(conn, "SELECT id FROM courses WHERE course_code = ?",
+                                                      ("COSE341",))
+
+        # CLI 경로: 중복 학수번호가 남아 있으면 실패하고 롤백
+        with pytest.raises(MigrationError, match="COSE341"):
+            migrate(conn)
+        assert not set(applied_versions(conn)) & MANUAL_MIGRATIONS
+
+        conn.execute("UPDATE courses SET course_code = 'COSE343' WHERE id = 2")
+        conn.commit()
+        assert migrate(conn) == sorted(MANUAL_MIGRATIONS)
+        assert applied_versions(conn)[-1] == LATEST_VERSION
+        with pytest.raises(sqlite3.IntegrityError):
+            conn.execute("INSERT INTO courses (name, course_code) VALUES ('중복', 'COSE341')")
+    finally:
+        conn.close()
+
+
+def test_manual_step_does_not_block_later_migrations(tmp_path, monkeypatch):
+    monkeypatch.setattr("migrations.MANUAL_MIGRATIONS", {1})
+    conn = make_legacy_db(tmp_path / "legacy.db", ["COSE341"])
+    try:
+        assert migrate(conn, include_manual=False) == [version for version, _, _ in MIGRATIONS if version != 1]
+        assert migrate(conn) == [1]
+    finally:
+        conn.close()
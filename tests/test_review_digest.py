@@ -0,0 +1,76 @@
+"""review_digest.py 테스트: 학기별 청크 경계와 증분 갱신 시 다시 요약하는 청크 수 확인."""
+
+import sqlite3
+from functools import partial
+from types import SimpleNamespace
+
+import pytest
+
+import review_digest
+from init_db import init_db
+from review_recency import filter_recent
+
+
+class SummaryClient:
+    """responses.create 호출 수를 세고 호출마다 다른 요약을 돌려주는 OpenAI 클라이언트 대역."""
+
+    def __init__(self):
+        self.calls = 0
+        self.responses = SimpleNamespace(create=self.create)
+
+    def create(self, **kwargs):
+        self.calls += 1
+        return SimpleNamespace(output_text=f"- 요약 {self.calls}", usage=None)
+
+
+@pytest.fixture
+def conn(tmp_path):
+    path = str(tmp_path / "digest.db")
+    init_db(path)
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO courses (name, course_code, total_students) VALUES ('운영체제', 'COSE341', 40)")
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def add_reviews(conn, year, semester, count):
+    conn.executemany("INSERT INTO course_reviews (course_id, content, year, semester) VALUES (1, ?, ?, ?)",
+                     [(f"{year}-{semester} 수강평 {i}", year, semester) for i in range(count)])
+    conn.commit()
+
+
+def test_chunks_start_at_each_term():
+    rows = [(1, "a", 2024, 2), (2, "b", 2024, 1), (3, "c", 2024, 2), (4, "d", 2024, 1), (5, "e", 2024, 1)]
+    assert review_digest.chunk_reviews(rows, chunk_size=2) == [[(2, "b"), (4, "d")], [(5, "e")],
+                                                                [(1, "a"), (3, "c")]]
+    assert review_digest.chunk_reviews([(1, "a", None, None), (2, "b", None, None)], chunk_size=1) == [
+            [(1, "a")], [(2, "b")]]
+
+
+def test_sliding_term_window_only_summarizes_new_chunks(conn, monkeypatch):
+    monkeypatch.setattr(review_digest, "filter_recent", partial(filter_recent, recent_semesters=4))
+    size = review_digest.CHUNK_SIZE
+    # 학기별 청크: 1 + 2 + 3 + 1
+    terms = [(2023, 1, size - 3), (2023, 2, size + 3), (2024, 1, size * 2 + 5), (2024, 2, size - 1)]
+    for year, semester, count in terms:
+        add_reviews(conn, year, semester, count)
+    client = SummaryClient()
+
+    first = review_digest.build_course_digest(conn, client, 1)
+    assert (first["status"], first["chunks"], first["chunks_rebuilt"]) == ("built", 7, 7)
+
+    # 최근 4개 학기 창이 한 학기 밀려 2023-1이 빠지고 2025-1이 추가됨: 새 학기 청크만 요약
+    add_reviews(conn, 2025, 1, 4)
+    second = review_digest.build_course_digest(conn, client, 1)
+    assert second["review_count"] == sum(count for _, _, count in terms[1:]) + 4
+    assert (second["chunks"], second["chunks_rebuilt"]) == (7, 1)
+
+    # 기존 학기에 수강평 추가: 그 학기의 마지막 청크만 다시 요약 (청크가 가득 차도 다음 학기 경계는 그대로)
+    add_reviews(conn, 2024, 2, 1)
+    third = review_digest.build_course_digest(conn, client, 1)
+    assert (third["chunks"], third["chunks_rebuilt"]) == (7, 1)
+
+    assert review_digest.build_course_digest(conn, client, 1)["status"] == "skipped"
+    stored = conn.execute("SELECT COUNT(*) FROM course_review_digest_chunks WHERE course_id = 1").fetchone()[0]
+    assert stored == 7
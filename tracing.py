@@ -0,0 +1,382 @@
+"""
+요청 단위 트레이싱(span) 모듈.
+
+/metrics의 누적 지표로는 특정 요청 하나(예: 12초 걸린 /semester-advice)가 어디서 시간을 썼는지 알 수 없으므로,
+요청마다 DB 세션/쿼리, 캐시 조회, 모델 추론, LLM 호출 구간을 span으로 기록하고 요청 ID로 묶어 내보냅니다.
+외부 라이브러리 없이 동작하며, OTLP/HTTP(JSON) 형식으로 로컬 컬렉터에도 보낼 수 있습니다.
+
+구성:
+    - TracingMiddleware: 요청마다 루트 span(http.request)을 만들고 요청 ID를 응답 헤더 X-Request-ID로 반환
+    - span(name, **attrs): 현재 요청 트레이스에 하위 span을 기록하는 컨텍스트 매니저 (트레이스가 없으면 아무것도 하지 않음)
+    - start_span(name): 현재 컨텍스트를 바꾸지 않는 span (시작과 끝이 다른 스레드에서 실행되는 get_db 등)
+    - record_span(name, duration): 이미 측정된 구간을 span으로 기록 (SQLAlchemy 쿼리, 모델 단계별 시간)
+    - trace_query(): metrics.add_query_observer()에 등록하면 모든 Engine의 쿼리를 db.query span으로 기록
+    - 내보내기: 요청이 끝나면 트레이스 전체를 큐에 넣고 백그라운드 스레드가 기록 (요청 처리 스레드는 기다리지 않음)
+
+요청 ID:
+    - Caddy가 요청마다 X-Request-ID({http.request.uuid})를 붙여 전달하고, 없으면 앱에서 생성
+    - UUID 형식이면 하이픈을 뺀 값을 trace_id로 사용하므로 Caddy 접근 로그의 요청 ID로 트레이스를 바로 찾을 수 있음
+    - W3C traceparent 헤더가 있으면 그 trace_id와 부모 span을 이어서 사용
+    - contextvars로 전달되므로 run_in_threadpool, asyncio 작업 안의 span도 같은 트레이스에 기록됨
+
+내보내기 형식 (TRACE_EXPORTER):
+    - "jsonl": TRACE_FILE(워커별 파일)에 트레이스 하나당 한 줄 JSON, TRACE_FILE_MAX_MB마다 교체 (TRACE_FILE_BACKUPS개 보관)
+    - "otlp": TRACE_OTLP_ENDPOINT(예: http://localhost:4318/v1/traces)로 OTLP/HTTP JSON 전송
+    - 비우면 트레이싱 비활성 (미들웨어를 추가하지 않고 span()은 바로 반환)
+
+환경 변수:
+    TRACE_EXPORTER: jsonl | otlp | (비활성), 기본값 비활성
+    TRACE_FILE: JSONL 파일 경로 ({pid}는 워커 프로세스 ID로 치환), 기본값 cache/traces/trace-{pid}.jsonl
+    TRACE_FILE_MAX_MB: 파일 교체 크기(MB), 기본값 20
+    TRACE_FILE_BACKUPS: 보관할 이전 파일 수, 기본값 3
+    TRACE_OTLP_ENDPOINT: OTLP/HTTP 컬렉터 주소, 기본값 http://localhost:4318/v1/traces
+    TRACE_SAMPLE_RATE: 기록할 요청 비율(0~1), 기본값 1
+    TRACE_MIN_DURATION_MS: 이보다 빨리 끝난 요청은 내보내지 않음, 기본값 0 (모두 기록)
+
+사용 예시 (main.py):
+    app.add_middleware(TracingMiddleware)
+    with span("cache.get", prefix="course_advice") as s:
+        value = ...
+        s.set(hit=value is not None)
+"""
+
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+from typing import List, Optional, Tuple
+
+# =============================================================================
+# 상수 설정
+# =============================================================================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "").strip().lower()
+TRACE_FILE = os.getenv("TRACE_FILE", os.path.join(BASE_DIR, "cache", "traces", "trace-{pid}.jsonl"))
+TRACE_FILE_MAX_MB = float(os.getenv("TRACE_FILE_MAX_MB", "20"))
+TRACE_FILE_BACKUPS = int(os.getenv("TRACE_FILE_BACKUPS", "3"))
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1"))
+TRACE_MIN_DURATION_MS = float(os.getenv("TRACE_MIN_DURATION_MS", "0"))
+
+SERVICE_NAME = "realthon-api"
+REQUEST_ID_HEADER = "x-request-id"
+EXPORT_QUEUE_SIZE = 1000  # 내보내기가 밀리면 이후 트레이스는 버림 (요청 처리에 영향을 주지 않도록)
+MAX_STATEMENT_CHARS = 300
+
+_TRACEPARENT_RE = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+_REQUEST_ID_RE = re.compile(r"^[0-9A-Za-z._:-]{1,128}$")
+
+
+# =============================================================================
+# Span / Trace
+# =============================================================================
+
+class Span:
+    """구간 하나 (시작/종료 시각은 Unix 나노초)."""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], attributes: dict,
+                 start_ns: Optional[int] = None):
+        self.trace = trace
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = start_ns if start_ns is not None else time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"[:300]
+        self.trace.add(self)
+
+    def to_dict(self) -> dict:
+        return {
+                "span_id"    : self.span_id,
+                "parent_id"  : self.parent_id,
+                "name"       : self.name,
+                "start_ms"   : round((self.start_ns - self.trace.start_ns) / 1e6, 3),
+                "duration_ms": round(((self.end_ns or self.start_ns) - self.start_ns) / 1e6, 3),
+                "attributes" : self.attributes,
+                **({"error": self.error} if self.error else {}),
+        }
+
+
+class _NoopSpan:
+    """트레이스가 없을 때 span()이 반환하는 객체."""
+
+    def set(self, **attributes) -> None:
+        pass
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """요청 하나의 span 모음 (여러 스레드/작업에서 span이 추가되므로 잠금으로 보호)."""
+
+    def __init__(self, trace_id: str, request_id: str):
+        self.trace_id = trace_id
+        self.request_id = request_id
+        self.start_ns = time.time_ns()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+
+# 현재 (트레이스, 부모 span ID)
+_current: ContextVar[Optional[Tuple[Trace, Optional[str]]]] = ContextVar("trace_current", default=None)
+
+
+def current_request_id() -> Optional[str]:
+    """현재 요청 ID (트레이스가 없으면 None)."""
+    current = _current.get()
+    return current[0].request_id if current else None
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    현재 트레이스에 하위 span을 기록합니다. with 블록 안에서 만든 span은 이 span의 자식이 됩니다.
+
+    Yields:
+        Span (트레이스가 없으면 아무것도 하지 않는 객체)
+    """
+    current = _current.get()
+    if current is None:
+        yield NOOP_SPAN
+        return
+    trace, parent_id = current
+    s = Span(trace, name, parent_id, attributes)
+    token = _current.set((trace, s.span_id))
+    try:
+        yield s
+    except BaseException as e:
+        s.end(e)
+        raise
+    finally:
+        _current.reset(token)
+        s.end()
+
+
+def start_span(name: str, **attributes):
+    """현재 컨텍스트를 바꾸지 않는 span을 시작합니다 (span.end()로 종료, 트레이스가 없으면 NOOP_SPAN)."""
+    current = _current.get()
+    if current is None:
+        return NOOP_SPAN
+    return Span(current[0], name, current[1], attributes)
+
+
+def record_span(name: str, duration: float, error: Optional[BaseException] = None, **attributes) -> None:
+    """방금 끝난 duration초 구간을 현재 트레이스에 span으로 기록합니다."""
+    current = _current.get()
+    if current is None:
+        return
+    s = Span(current[0], name, current[1], attributes, start_ns=time.time_ns() - int(duration * 1e9))
+    s.end(error)
+
+
+# =============================================================================
+# 내보내기
+# =============================================================================
+
+class JsonlExporter:
+    """트레이스 하나를 JSON 한 줄로 기록 (워커별 파일, 크기 기준 교체)."""
+
+    def __init__(self, path: str, max_bytes: int, backups: int):
+        path = path.replace("{pid}", str(os.getpid()))
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        self.handler.setFormatter(logging.Formatter("%(message)s"))
+
+    def export(self, trace: Trace, root: Span) -> None:
+        record = {
+                "trace_id"   : trace.trace_id,
+                "request_id" : trace.request_id,
+                "name"       : root.name,
+                "start"      : time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(trace.start_ns / 1e9)),
+                "duration_ms": root.to_dict()["duration_ms"],
+                "attributes" : root.attributes,
+                "spans"      : [s.to_dict() for s in sorted(trace.spans, key=lambda s: s.start_ns) if s is not root],
+        }
+        self.handler.emit(logging.makeLogRecord({"msg": json.dumps(record, ensure_ascii=False, default=str)}))
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OtlpExporter:
+    """OTLP/HTTP JSON으로 로컬 컬렉터(OpenTelemetry Collector, Jaeger, Tempo 등)에 전송."""
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.failed = False
+
+    def export(self, trace: Trace, root: Span) -> None:
+        spans = [{
+                "traceId"          : trace.trace_id,
+                "spanId"           : s.span_id,
+                "parentSpanId"     : s.parent_id or "",
+                "name"             : s.name,
+                "kind"             : 2 if s is root else 1,  # SERVER / INTERNAL
+                "startTimeUnixNano": str(s.start_ns),
+                "endTimeUnixNano"  : str(s.end_ns or s.start_ns),
+                "attributes"       : [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+                "status"           : {"code": 2, "message": s.error} if s.error else {"code": 1},
+        } for s in trace.spans]
+        body = {"resourceSpans": [{
+                "resource"  : {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+                "scopeSpans": [{"scope": {"name": "tracing"}, "spans": spans}],
+        }]}
+        request = urllib.request.Request(self.endpoint, data=json.dumps(body, default=str).encode(),
+                                         headers={"Content-Type": "application/json"}, method="POST")
+        try:
+            urllib.request.urlopen(request, timeout=2).close()
+            self.failed = False
+        except OSError as e:
+            if not self.failed:  # 컬렉터가 없을 때 요청마다 로그가 쌓이지 않도록 처음 한 번만 출력
+                print(f"⚠ Trace export failed ({self.endpoint}): {e}")
+            self.failed = True
+
+
+_exporter = None
+_export_queue: "queue.Queue[Tuple[Trace, Span]]" = queue.Queue(maxsize=EXPORT_QUEUE_SIZE)
+_export_thread: Optional[threading.Thread] = None
+dropped_traces = 0
+
+
+def _export_loop() -> None:
+    while True:
+        trace, root = _export_queue.get()
+        try:
+            _exporter.export(trace, root)
+        except Exception as e:
+            print(f"Trace export error: {e}")
+
+
+def setup_tracing() -> bool:
+    """
+    TRACE_EXPORTER에 맞는 내보내기와 백그라운드 스레드를 준비합니다.
+
+    Returns:
+        트레이싱이 활성화되었으면 True
+    """
+    global _exporter, _export_thread
+    if TRACE_EXPORTER == "jsonl":
+        _exporter = JsonlExporter(TRACE_FILE, int(TRACE_FILE_MAX_MB * 1024 * 1024), TRACE_FILE_BACKUPS)
+        print(f"✅ Tracing enabled (jsonl: {_exporter.path})")
+    elif TRACE_EXPORTER == "otlp":
+        _exporter = OtlpExporter(TRACE_OTLP_ENDPOINT)
+        print(f"✅ Tracing enabled (otlp: {TRACE_OTLP_ENDPOINT})")
+    else:
+        if TRACE_EXPORTER:
+            print(f"⚠ Unknown TRACE_EXPORTER '{TRACE_EXPORTER}'. Tracing disabled.")
+        return False
+    _export_thread = threading.Thread(target=_export_loop, name="trace-exporter", daemon=True)
+    _export_thread.start()
+    return True
+
+
+def _submit(trace: Trace, root: Span) -> None:
+    global dropped_traces
+    if (root.end_ns - root.start_ns) / 1e6 < TRACE_MIN_DURATION_MS:
+        return
+    try:
+        _export_queue.put_nowait((trace, root))
+    except queue.Full:
+        dropped_traces += 1
+
+
+# =============================================================================
+# 수집 지점
+# =============================================================================
+
+def _ids_from_headers(headers: dict) -> Tuple[str, str, Optional[str]]:
+    """요청 헤더에서 (요청 ID, trace_id, 부모 span ID)를 정합니다."""
+    request_id = headers.get(REQUEST_ID_HEADER, "")
+    if not _REQUEST_ID_RE.match(request_id):
+        request_id = str(uuid.uuid4())
+    match = _TRACEPARENT_RE.match(headers.get("traceparent", ""))
+    if match:
+        return request_id, match.group(1), match.group(2)
+    compact = request_id.replace("-", "").lower()
+    trace_id = compact if re.fullmatch(r"[0-9a-f]{32}", compact) else uuid.uuid4().hex
+    return request_id, trace_id, None
+
+
+class TracingMiddleware:
+    """요청마다 루트 span을 만들고 응답에 X-Request-ID를 붙이는 ASGI 미들웨어."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or random.random() >= TRACE_SAMPLE_RATE:
+            await self.app(scope, receive, send)
+            return
+
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+        request_id, trace_id, parent_id = _ids_from_headers(headers)
+        trace = Trace(trace_id, request_id)
+        root = Span(trace, "http.request", parent_id, {"http.method": scope["method"], "http.path": scope["path"],
+                                                       "request_id": request_id})
+        token = _current.set((trace, root.span_id))
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                root.set(**{"http.status_code": message["status"]})
+                message["headers"] = [*message.get("headers", []), (b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        error = None
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            if route is not None:
+                root.set(**{"http.route": route.path})
+            root.end(error)
+            _submit(trace, root)
+
+
+def trace_query(cursor, statement: str, parameters, executemany: bool, seconds: float,
+                error: Optional[BaseException] = None) -> None:
+    """metrics.instrument_sqlalchemy()가 측정한 쿼리 하나를 db.query span으로 기록합니다 (트레이스가 없으면 무시)."""
+    if _current.get() is not None:
+        record_span("db.query", seconds, error, statement=" ".join(statement.split())[:MAX_STATEMENT_CHARS])